@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Sync throughput benchmark for Okta AI Agent.
+
+Starts the local Okta stand-in (scripts/fake_okta_api.py) with a generated tenant, points
+the sync engine at it with a throwaway database and runs SyncOrchestrator.run_sync.
+Reports per sync phase (graph node): duration, entities/sec, API calls per entity,
+DB write time (time spent holding the sync's DB write lock) and peak RSS.
+
+Nothing is read from or written to a real Okta org: the org URL, token and database
+location are always overridden, even when a .env file is present.
+
+Usage:
+    python scripts/benchmark_sync.py --size small
+    python scripts/benchmark_sync.py --size medium --latency-ms 40 --jitter-ms 10 --json results.json
+    python scripts/benchmark_sync.py --size small --rate-limit 600 --storm-every 20 --storm-duration 3
+    python scripts/benchmark_sync.py --size medium --baseline results.json --max-regression 15
+    python scripts/benchmark_sync.py --size small --env SYNC_SHADOW_TABLES=false --env SYNC_MAX_PARALLEL_NODES=1
+"""
+
+import argparse
+import asyncio
+import contextvars
+import importlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Setup project paths
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+FAKE_OKTA_SCRIPT = project_root / "scripts" / "fake_okta_api.py"
+
+# Entity model handled by each sync node (for entities/sec)
+MODEL_NODES = {
+    "Group": "groups",
+    "User": "users",
+    "Application": "applications",
+    "Authenticator": "authenticators",
+    "Policy": "policies",
+    "Device": "devices",
+}
+# fake_okta_api.py endpoint family -> sync node that calls it (for API calls per entity)
+FAMILY_NODES = {
+    "groups": "groups",
+    "group_users": "groups",
+    "users": "users",
+    "user_groups": "users",
+    "user_factors": "users",
+    "apps": "applications",
+    "app_users": "applications",
+    "authenticators": "authenticators",
+    "policies": "policies",
+    "devices": "devices",
+    "logs": "system_log",
+}
+# DB work done outside any graph node (WAL truncate, ANALYZE, snapshot export)
+POST_SYNC_PHASE = "post_sync"
+
+_current_phase: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("benchmark_phase", default=None)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # No /proc (macOS): fall back to the peak so far (bytes on macOS, KiB on Linux)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _fake_okta_request(base_url: str, path: str, method: str = "GET") -> Dict[str, Any]:
+    request = urllib.request.Request(f"{base_url}{path}", method=method)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def start_fake_okta(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    """Start fake_okta_api.py in its own process (so it doesn't share the sync's CPU or RSS)."""
+    command = [
+        sys.executable, str(FAKE_OKTA_SCRIPT),
+        "--port", str(port),
+        "--size", args.size,
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--rate-limit", str(args.rate_limit),
+        "--storm-every", str(args.storm_every),
+        "--storm-duration", str(args.storm_duration),
+        "--storm-ratio", str(args.storm_ratio),
+    ]
+    if args.users:
+        command += ["--users", str(args.users)]
+    process = subprocess.Popen(command)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Fake Okta API exited with code {process.returncode}")
+        try:
+            _fake_okta_request(base_url, "/__stats")
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Fake Okta API did not start within 300s")
+
+
+def configure_environment(args: argparse.Namespace, base_url: str, work_dir: Path) -> Dict[str, str]:
+    """Point settings at the fake org and a throwaway database (must run before importing src.config)."""
+    overrides = {
+        "OKTA_CLIENT_ORGURL": base_url,
+        "OKTA_API_TOKEN": "fake-okta-benchmark-token",
+        "TOKEN_METHOD": "API_TOKEN",
+        # The Okta SDK refuses non-https org URLs unless its testing flag is set
+        "OKTA_TESTING_TESTINGDISABLEHTTPSCHECK": "true",
+        "DB_DIR": str(work_dir),
+        "DB_FILENAME": "benchmark.db",
+        "SYNC_OKTA_DEVICES": "false" if args.no_devices else "true",
+        "SYNC_SYSTEM_LOG_CDC": "false",
+        "SYNC_SNAPSHOT_DIR": str(work_dir / "snapshots"),
+        "LOG_LEVEL": args.log_level,
+    }
+    for assignment in args.env:
+        key, separator, value = assignment.partition("=")
+        if not separator:
+            raise SystemExit(f"--env expects KEY=VALUE, got: {assignment}")
+        overrides[key] = value
+
+    os.environ.update(overrides)
+    # src.utils.logging runs load_dotenv(override=True); re-apply afterwards so a .env
+    # can never point the benchmark at a real org or database
+    importlib.import_module("src.utils.logging")
+    os.environ.update(overrides)
+    return overrides
+
+
+class _TimedLock(asyncio.Lock):
+    """Drop-in for the orchestrator's DB write lock that records hold time per phase."""
+
+    def __init__(self, recorder: "PhaseRecorder"):
+        super().__init__()
+        self._recorder = recorder
+        self._acquired_at = 0.0
+        self._holder: Optional[str] = None
+
+    async def acquire(self) -> bool:
+        result = await super().acquire()
+        self._acquired_at = time.perf_counter()
+        self._holder = _current_phase.get() or POST_SYNC_PHASE
+        return result
+
+    def release(self) -> None:
+        self._recorder.phase(self._holder)["db_seconds"] += time.perf_counter() - self._acquired_at
+        super().release()
+
+
+class PhaseRecorder:
+    """Collects duration, entity counts, DB write time and peak RSS per sync graph node."""
+
+    def __init__(self, sample_interval: float = 0.05):
+        self.sample_interval = sample_interval
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.running: set = set()
+        self.peak_rss = _rss_bytes()
+        self.pagination_errors = 0
+        self._sampler: Optional[asyncio.Task] = None
+
+    def phase(self, name: str) -> Dict[str, Any]:
+        return self.phases.setdefault(name, {
+            "seconds": 0.0, "entities": 0, "db_seconds": 0.0, "peak_rss_bytes": 0, "status": None,
+        })
+
+    def instrument(self, orchestrator) -> None:
+        """Wrap the orchestrator instance's node runner, batch writer and DB write lock."""
+        recorder = self
+        run_sync_node = orchestrator._run_sync_node
+        process_batch_to_db = orchestrator._process_batch_to_db
+
+        async def timed_run_sync_node(node):
+            token = _current_phase.set(node.name)
+            phase = recorder.phase(node.name)
+            recorder.running.add(node.name)
+            started = time.perf_counter()
+            try:
+                await run_sync_node(node)
+                phase["status"] = "completed"
+            except BaseException:
+                phase["status"] = "failed"
+                raise
+            finally:
+                phase["seconds"] += time.perf_counter() - started
+                recorder.running.discard(node.name)
+                _current_phase.reset(token)
+
+        async def counting_process_batch_to_db(session, model, batch):
+            count = await process_batch_to_db(session, model, batch)
+            node_name = MODEL_NODES.get(model.__name__) or _current_phase.get() or POST_SYNC_PHASE
+            recorder.phase(node_name)["entities"] += count or 0
+            return count
+
+        orchestrator._run_sync_node = timed_run_sync_node
+        orchestrator._process_batch_to_db = counting_process_batch_to_db
+        orchestrator._db_write_lock = _TimedLock(self)
+
+        # Listings that stopped early (e.g. a 429 the SDK gave up on) show up as incomplete phases
+        from src.core.okta.client.client import OktaClientWrapper
+        note_pagination_error = OktaClientWrapper._note_pagination_error
+
+        def counting_note_pagination_error(wrapper, entity_name):
+            recorder.pagination_errors += 1
+            return note_pagination_error(wrapper, entity_name)
+
+        OktaClientWrapper._note_pagination_error = counting_note_pagination_error
+
+    async def _sample(self) -> None:
+        while True:
+            rss = _rss_bytes()
+            self.peak_rss = max(self.peak_rss, rss)
+            for name in list(self.running):
+                phase = self.phase(name)
+                phase["peak_rss_bytes"] = max(phase["peak_rss_bytes"], rss)
+            await asyncio.sleep(self.sample_interval)
+
+    def start(self) -> None:
+        self._sampler = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._sampler:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+
+
+async def run_benchmark_sync(base_url: str, run_number: int, work_dir: Path) -> Dict[str, Any]:
+    """Run one full SyncOrchestrator.run_sync against the fake org and return its metrics."""
+    from sqlalchemy import select
+    from src.config.settings import settings
+    from src.core.okta.sync.engine import SyncOrchestrator
+    from src.core.okta.sync.models import SyncHistory, SyncStatus
+    from src.core.okta.sync.operations import DatabaseOperations
+
+    tenant_id = settings.tenant_id
+    db = DatabaseOperations()
+    # Explicit path: discovery would prefer an existing sqlite_db/okta_sync.db of a real install
+    await db.init_db(db_path=work_dir / settings.DB_FILENAME)
+    resolved = Path(settings.SQLITE_PATH).resolve()
+    if not resolved.is_relative_to(work_dir.resolve()):
+        raise RuntimeError(f"Benchmark database resolved to {resolved}, outside {work_dir}; refusing to sync")
+
+    async with db.get_session() as session:
+        sync_history = SyncHistory(
+            tenant_id=tenant_id,
+            status=SyncStatus.RUNNING,
+            start_time=datetime.now(timezone.utc),
+            progress_percentage=0
+        )
+        session.add(sync_history)
+        await session.commit()
+        await session.refresh(sync_history)
+        sync_id = sync_history.id
+
+    orchestrator = SyncOrchestrator(tenant_id, db)
+    orchestrator.cancellation_flag = asyncio.Event()
+    recorder = PhaseRecorder()
+    recorder.instrument(orchestrator)
+
+    _fake_okta_request(base_url, "/__stats/reset", method="POST")
+    rss_before = _rss_bytes()
+    recorder.start()
+    started = time.perf_counter()
+    error = None
+    try:
+        await orchestrator.run_sync()
+    except Exception as e:
+        error = str(e)
+    finally:
+        wall_seconds = time.perf_counter() - started
+        await recorder.stop()
+
+    async with db.get_session() as session:
+        history_entry = (await session.execute(select(SyncHistory).where(SyncHistory.id == sync_id))).scalars().first()
+        if history_entry:
+            history_entry.status = SyncStatus.FAILED if error else SyncStatus.COMPLETED
+            history_entry.success = error is None
+            history_entry.end_time = datetime.now(timezone.utc)
+            history_entry.error_details = error
+            await session.commit()
+
+    server_stats = _fake_okta_request(base_url, "/__stats")
+    api_calls: Dict[str, int] = {}
+    rate_limited = 0
+    for family, family_stats in server_stats["families"].items():
+        node_name = FAMILY_NODES.get(family, family)
+        api_calls[node_name] = api_calls.get(node_name, 0) + family_stats["calls"]
+        rate_limited += family_stats["rate_limited"]
+
+    phases = []
+    for name, phase in recorder.phases.items():
+        entities = phase["entities"]
+        calls = api_calls.get(name, 0)
+        phases.append({
+            "phase": name,
+            "status": phase["status"],
+            "seconds": round(phase["seconds"], 3),
+            "entities": entities,
+            "entities_per_second": round(entities / phase["seconds"], 1) if entities and phase["seconds"] else None,
+            "api_calls": calls,
+            "api_calls_per_entity": round(calls / entities, 3) if entities else None,
+            "db_seconds": round(phase["db_seconds"], 3),
+            "peak_rss_mb": round(phase["peak_rss_bytes"] / 1048576, 1) if phase["peak_rss_bytes"] else None,
+        })
+
+    total_entities = sum(phase["entities"] for phase in recorder.phases.values())
+    total_calls = sum(family_stats["calls"] for family_stats in server_stats["families"].values())
+    return {
+        "run": run_number,
+        "error": error,
+        "tenant": server_stats["tenant"],
+        "wall_seconds": round(wall_seconds, 3),
+        "entities": total_entities,
+        "entities_per_second": round(total_entities / wall_seconds, 1) if wall_seconds else None,
+        "api_calls": total_calls,
+        "api_calls_per_entity": round(total_calls / total_entities, 3) if total_entities else None,
+        "rate_limited_responses": rate_limited,
+        "max_concurrent_requests": server_stats["max_in_flight"],
+        "pagination_errors": recorder.pagination_errors,
+        "db_seconds": round(sum(phase["db_seconds"] for phase in recorder.phases.values()), 3),
+        "rss_start_mb": round(rss_before / 1048576, 1),
+        "peak_rss_mb": round(recorder.peak_rss / 1048576, 1),
+        "phases": phases,
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    tenant = result["tenant"]
+    print(f"\n📊 Run {result['run']}: {tenant['users']} users, {tenant['groups']} groups, "
+          f"{tenant['apps']} apps, {tenant['devices']} devices")
+    header = f"{'phase':<18}{'status':<11}{'secs':>9}{'entities':>10}{'ent/s':>10}{'calls':>9}{'calls/ent':>11}{'db secs':>9}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    for phase in result["phases"]:
+        print(
+            f"{phase['phase']:<18}{phase['status'] or '-':<11}{phase['seconds']:>9.2f}{phase['entities']:>10}"
+            f"{fmt(phase['entities_per_second'], '.1f'):>10}{phase['api_calls']:>9}"
+            f"{fmt(phase['api_calls_per_entity'], '.3f'):>11}{phase['db_seconds']:>9.2f}"
+            f"{fmt(phase['peak_rss_mb'], '.1f'):>9}"
+        )
+    print("-" * len(header))
+    print(
+        f"{'total':<18}{'failed' if result['error'] else 'completed':<11}{result['wall_seconds']:>9.2f}"
+        f"{result['entities']:>10}{fmt(result['entities_per_second'], '.1f'):>10}{result['api_calls']:>9}"
+        f"{fmt(result['api_calls_per_entity'], '.3f'):>11}{result['db_seconds']:>9.2f}{result['peak_rss_mb']:>9.1f}"
+    )
+    print(f"  429 responses: {result['rate_limited_responses']}, incomplete listings: {result['pagination_errors']}, "
+          f"max concurrent requests: {result['max_concurrent_requests']}, RSS at start: {result['rss_start_mb']} MB")
+    if result["error"]:
+        print(f"  ❌ Sync failed: {result['error']}")
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Compare a run to the last run of a previous --json output.
+
+    Throughput (entities/sec) may drop and API calls per entity may grow by at most
+    max_regression percent, overall and for phases that took at least a second.
+    """
+    baseline_run = baseline["runs"][-1]
+    limit = max_regression / 100
+    regressions = []
+
+    def check(label, current, previous):
+        if previous.get("entities_per_second") and current.get("entities_per_second") is not None:
+            throughput_drop = 1 - current["entities_per_second"] / previous["entities_per_second"]
+        else:
+            throughput_drop = 0
+        if throughput_drop > limit:
+            regressions.append(
+                f"{label}: {current['entities_per_second']} entities/sec vs {previous['entities_per_second']} "
+                f"(-{throughput_drop:.0%})"
+            )
+        if previous.get("api_calls_per_entity") and current.get("api_calls_per_entity"):
+            call_growth = current["api_calls_per_entity"] / previous["api_calls_per_entity"] - 1
+            if call_growth > limit:
+                regressions.append(
+                    f"{label}: {current['api_calls_per_entity']} API calls/entity vs "
+                    f"{previous['api_calls_per_entity']} (+{call_growth:.0%})"
+                )
+
+    check("total", result, baseline_run)
+    previous_phases = {phase["phase"]: phase for phase in baseline_run["phases"]}
+    for phase in result["phases"]:
+        previous = previous_phases.get(phase["phase"])
+        if phase["entities_per_second"] and previous and previous["seconds"] >= 1 and phase["seconds"] >= 1:
+            check(phase["phase"], phase, previous)
+    return regressions
+
+
+async def run_benchmark(args: argparse.Namespace, base_url: str, work_dir: Path) -> List[Dict[str, Any]]:
+    from src.core.okta.sync.operations import DatabaseOperations
+
+    results = []
+    try:
+        for run_number in range(1, args.runs + 1):
+            result = await run_benchmark_sync(base_url, run_number, work_dir)
+            print_report(result)
+            results.append(result)
+            if result["error"]:
+                break
+    finally:
+        await DatabaseOperations().close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SyncOrchestrator.run_sync against a local fake Okta API")
+    parser.add_argument("--size", choices=("small", "medium", "large"), default="small",
+                        help="Tenant size: small=1k, medium=10k, large=100k users")
+    parser.add_argument("--users", type=int, help="Exact user count (overrides --size)")
+    parser.add_argument("--runs", type=int, default=1, help="Consecutive syncs against the same database")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per API request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the added latency")
+    parser.add_argument("--rate-limit", type=int, default=100000, help="Requests per minute per endpoint family")
+    parser.add_argument("--storm-every", type=float, default=0.0, help="Start a 429 storm every N seconds (0 = off)")
+    parser.add_argument("--storm-duration", type=float, default=0.0, help="Length of each 429 storm in seconds")
+    parser.add_argument("--storm-ratio", type=float, default=1.0, help="Share of requests rejected during a storm")
+    parser.add_argument("--no-devices", action="store_true", help="Skip the devices phase")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra setting for the sync (repeatable), e.g. SYNC_MAX_PARALLEL_NODES=1")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Allowed throughput drop / API call growth vs --baseline, in percent")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the benchmark database directory")
+    parser.add_argument("--log-level", default="WARNING", help="Sync log level (default: WARNING)")
+    args = parser.parse_args()
+
+    os.chdir(project_root)
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    work_dir = Path(tempfile.mkdtemp(prefix="okta-sync-bench-"))
+    print(f"🔄 Starting fake Okta API on {base_url} (size={args.users or args.size})...")
+    server = start_fake_okta(args, port)
+    try:
+        overrides = configure_environment(args, base_url, work_dir)
+        results = asyncio.run(run_benchmark(args, base_url, work_dir))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        if args.keep_db:
+            print(f"Benchmark database kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "size": args.size,
+            "users": args.users,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "rate_limit": args.rate_limit,
+            "storm_every": args.storm_every,
+            "storm_duration": args.storm_duration,
+            "storm_ratio": args.storm_ratio,
+            "devices": not args.no_devices,
+            "env": {key: value for key, value in overrides.items() if key.startswith(("SYNC_", "SQLITE_", "OKTA_CONCURRENT"))},
+        },
+        "runs": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file_handle:
+            json.dump(output, file_handle, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+    if any(result["error"] for result in results):
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file_handle:
+            baseline = json.load(file_handle)
+        if baseline.get("config") != output["config"]:
+            print(f"\n⚠️  {args.baseline} was recorded with a different configuration; results may not be comparable")
+        regressions = compare_to_baseline(results[-1], baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regressions against {args.baseline} (max {args.max_regression:.0f}%):")
+            for regression in regressions:
+                print(f"  • {regression}")
+            return 1
+        print(f"\n✅ No regressions against {args.baseline} (max {args.max_regression:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
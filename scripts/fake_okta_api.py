@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Local Okta API stand-in for sync benchmarks.
+
+Serves a deterministic, generated tenant over the endpoints the sync engine uses:
+users, groups, group members, user groups, user factors, applications, application
+users, policies, authenticators, devices (expand=userSummary) and an empty System Log.
+
+Behaves like Okta where it matters for sync performance:
+- Cursor pagination with `limit`/`after` and Link rel="next" headers
+- Per-endpoint X-Rate-Limit-Limit/Remaining/Reset headers and 429s once a bucket is empty
+- Optional 429 storms (every --storm-every seconds for --storm-duration seconds)
+- Injected latency with jitter
+
+Call counts per endpoint family are available at GET /__stats (POST /__stats/reset clears them).
+
+Usage:
+    python scripts/fake_okta_api.py --size medium --port 8499 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# Users per --size preset
+TENANT_SIZES = {
+    "small": 1000,
+    "medium": 10000,
+    "large": 100000,
+}
+
+POLICY_TYPES = ("OKTA_SIGN_ON", "PASSWORD", "MFA_ENROLL", "ACCESS_POLICY")
+POLICIES_PER_TYPE = 10
+AUTHENTICATORS = (
+    ("okta_email", "Email", "email"),
+    ("okta_password", "Password", "password"),
+    ("okta_verify", "Okta Verify", "app"),
+    ("phone_number", "Phone", "phone"),
+    ("google_otp", "Google Authenticator", "app"),
+    ("webauthn", "Security Key or Biometric", "security_key"),
+)
+DEPARTMENTS = ("Engineering", "Sales", "Marketing", "Finance", "Support", "IT", "Legal", "HR")
+
+# Every generated entity was last updated before this, so incremental syncs list nothing new
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_LAST_UPDATED_FILTER = re.compile(r'lastUpdated gt "([^"]+)"')
+
+
+def _okta_id(prefix: str, index: int) -> str:
+    """20-character Okta-style ID whose numeric suffix is the entity index."""
+    return f"{prefix}{index:017d}"
+
+
+def _index_of(okta_id: str) -> int:
+    return int(okta_id[3:])
+
+
+def _timestamp(index: int, minutes_per_step: int = 7) -> str:
+    return (BASE_TIME - timedelta(minutes=index * minutes_per_step)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeTenant:
+    """Deterministic generated tenant; entities are built on request from their index."""
+
+    def __init__(self, users: int, groups_per_user: int = 3, seed: int = 42):
+        self.user_count = users
+        self.group_count = max(10, users // 20)
+        self.app_count = max(5, min(200, users // 500))
+        self.device_count = users // 2
+        self.groups_per_user = groups_per_user
+        self.rng = random.Random(seed)
+
+        # ~5% of users are deprovisioned; they have no memberships, factors or assignments
+        self.deprovisioned = {index for index in range(users) if index % 20 == 19}
+        self.active_users = [index for index in range(users) if index not in self.deprovisioned]
+        self.all_users = list(range(users))
+
+        # Group 0 is "Everyone"; other memberships are spread over the remaining groups
+        self.user_groups: Dict[int, List[int]] = {}
+        self.group_members: Dict[int, List[int]] = defaultdict(list)
+        for user_index in self.active_users:
+            groups = [0] + sorted(self.rng.sample(range(1, self.group_count), groups_per_user))
+            self.user_groups[user_index] = groups
+            for group_index in groups:
+                self.group_members[group_index].append(user_index)
+
+        # App 0 is assigned to Everyone (one very large app); others get one group plus a few direct users
+        self.app_users: Dict[int, List[Tuple[int, Optional[int]]]] = {}
+        for app_index in range(self.app_count):
+            group_index = 0 if app_index == 0 else 1 + (app_index * 11) % (self.group_count - 1)
+            assignments = [(user_index, group_index) for user_index in self.group_members[group_index]]
+            if app_index:
+                assigned = {user_index for user_index, _ in assignments}
+                assignments.extend(
+                    (user_index, None)
+                    for user_index in self.active_users[app_index::self.app_count * 10]
+                    if user_index not in assigned
+                )
+            self.app_users[app_index] = assignments
+
+    # --- Entity builders ---
+
+    def user(self, index: int) -> Dict[str, Any]:
+        login = f"user{index}@bench.example.com"
+        return {
+            "id": _okta_id("00u", index),
+            "status": "DEPROVISIONED" if index in self.deprovisioned else "ACTIVE",
+            "created": _timestamp(index, 11),
+            "activated": _timestamp(index, 11),
+            "statusChanged": _timestamp(index, 5),
+            "lastLogin": _timestamp(index, 3),
+            "lastUpdated": _timestamp(index, 2),
+            "passwordChanged": _timestamp(index, 4),
+            "type": {"id": "oty00000000000000001"},
+            "profile": {
+                "firstName": f"First{index}",
+                "lastName": f"Last{index}",
+                "email": login,
+                "login": login,
+                "mobilePhone": f"+1555{index:07d}",
+                "primaryPhone": None,
+                "employeeNumber": str(100000 + index),
+                "department": DEPARTMENTS[index % len(DEPARTMENTS)],
+                "title": "Engineer" if index % 3 else "Manager",
+                "organization": "Bench Corp",
+                "userType": "Employee",
+                "countryCode": "US",
+                "manager": f"user{index // 10}@bench.example.com",
+            },
+            "credentials": {"provider": {"type": "OKTA", "name": "OKTA"}},
+            "_links": {"self": {"href": f"/api/v1/users/{_okta_id('00u', index)}"}},
+        }
+
+    def group(self, index: int) -> Dict[str, Any]:
+        name = "Everyone" if index == 0 else f"Bench Group {index}"
+        return {
+            "id": _okta_id("00g", index),
+            "created": _timestamp(index, 13),
+            "lastUpdated": _timestamp(index, 3),
+            "lastMembershipUpdated": _timestamp(index, 2),
+            "objectClass": ["okta:user_group"],
+            "type": "BUILT_IN" if index == 0 else "OKTA_GROUP",
+            "profile": {"name": name, "description": f"{name} (generated)"},
+            "_links": {},
+        }
+
+    def factors(self, user_index: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": _okta_id("sms", user_index),
+                "factorType": "sms",
+                "provider": "OKTA",
+                "vendorName": "OKTA",
+                "status": "ACTIVE",
+                "created": _timestamp(user_index, 6),
+                "lastUpdated": _timestamp(user_index, 2),
+                "profile": {"phoneNumber": f"+1555{user_index:07d}"},
+            },
+            {
+                "id": _okta_id("opf", user_index),
+                "factorType": "push",
+                "provider": "OKTA",
+                "vendorName": "OKTA",
+                "status": "ACTIVE",
+                "created": _timestamp(user_index, 6),
+                "lastUpdated": _timestamp(user_index, 2),
+                "profile": {
+                    "credentialId": f"user{user_index}@bench.example.com",
+                    "deviceType": "SmartPhone_IPhone",
+                    "name": f"iPhone {user_index}",
+                    "platform": "IOS",
+                    "version": "17.4",
+                },
+            },
+        ]
+
+    def app(self, index: int) -> Dict[str, Any]:
+        app_id = _okta_id("0oa", index)
+        policy_index = POLICY_TYPES.index("ACCESS_POLICY") * POLICIES_PER_TYPE + index % POLICIES_PER_TYPE
+        return {
+            "id": app_id,
+            "name": f"bench_app_{index}",
+            "label": "Everyone App" if index == 0 else f"Bench App {index}",
+            "status": "ACTIVE",
+            "signOnMode": "SAML_2_0",
+            "created": _timestamp(index, 17),
+            "lastUpdated": _timestamp(index, 3),
+            "features": [],
+            "visibility": {"autoSubmitToolbar": False, "hide": {"iOS": False, "web": False}},
+            "credentials": {
+                "signing": {"kid": f"kid-{index}"},
+                "userNameTemplate": {"template": "${source.login}", "type": "BUILT_IN"},
+            },
+            "settings": {
+                "app": {},
+                "notes": {"admin": None, "enduser": None},
+                "signOn": {
+                    "ssoAcsUrl": f"https://app{index}.bench.example.com/sso/saml",
+                    "audience": f"https://app{index}.bench.example.com",
+                    "destination": f"https://app{index}.bench.example.com/sso/saml",
+                    "honorForceAuthn": True,
+                    "attributeStatements": [],
+                },
+            },
+            "_links": {
+                "accessPolicy": {"href": f"/api/v1/policies/{_okta_id('00p', policy_index)}"},
+                "metadata": {"href": f"/api/v1/apps/{app_id}/sso/saml/metadata"},
+            },
+        }
+
+    def app_user(self, user_index: int, group_index: Optional[int]) -> Dict[str, Any]:
+        item = {
+            "id": _okta_id("00u", user_index),
+            "scope": "GROUP" if group_index is not None else "USER",
+            "status": "PROVISIONED",
+            "created": _timestamp(user_index, 9),
+            "lastUpdated": _timestamp(user_index, 2),
+            "credentials": {"userName": f"user{user_index}@bench.example.com"},
+            "profile": {},
+            "_links": {"user": {"href": f"/api/v1/users/{_okta_id('00u', user_index)}"}},
+        }
+        if group_index is not None:
+            group_name = "Everyone" if group_index == 0 else f"Bench Group {group_index}"
+            item["_links"]["group"] = {"name": group_name, "href": f"/api/v1/groups/{_okta_id('00g', group_index)}"}
+        return item
+
+    def policy(self, index: int) -> Dict[str, Any]:
+        policy_type = POLICY_TYPES[index // POLICIES_PER_TYPE]
+        return {
+            "id": _okta_id("00p", index),
+            "name": f"{policy_type.title()} Policy {index % POLICIES_PER_TYPE}",
+            "description": f"Generated {policy_type} policy",
+            "type": policy_type,
+            "status": "ACTIVE",
+            "priority": index % POLICIES_PER_TYPE + 1,
+            "system": index % POLICIES_PER_TYPE == 0,
+            "created": _timestamp(index, 19),
+            "lastUpdated": _timestamp(index, 3),
+            "_links": {},
+        }
+
+    def authenticator(self, index: int) -> Dict[str, Any]:
+        key, name, authenticator_type = AUTHENTICATORS[index]
+        return {
+            "id": _okta_id("aut", index),
+            "key": key,
+            "name": name,
+            "type": authenticator_type,
+            "status": "ACTIVE",
+            "created": _timestamp(index, 23),
+            "lastUpdated": _timestamp(index, 3),
+            "_links": {},
+        }
+
+    def device(self, index: int) -> Dict[str, Any]:
+        user_index = (index * 2) % self.user_count
+        device = {
+            "id": _okta_id("guo", index),
+            "status": "ACTIVE",
+            "created": _timestamp(index, 8),
+            "lastUpdated": _timestamp(index, 2),
+            "profile": {
+                "displayName": f"Bench Laptop {index}",
+                "platform": "MACOS" if index % 3 else "WINDOWS",
+                "manufacturer": "Apple" if index % 3 else "Dell",
+                "model": "MacBookPro18,3" if index % 3 else "Latitude 7440",
+                "osVersion": "14.4.1" if index % 3 else "10.0.22631",
+                "serialNumber": f"SN{index:010d}",
+                "udid": f"UDID-{index:012d}",
+                "registered": True,
+                "secureHardwarePresent": True,
+                "diskEncryptionType": "ALL_INTERNAL_VOLUMES",
+            },
+            "_embedded": {"users": []},
+        }
+        if user_index not in self.deprovisioned:
+            device["_embedded"]["users"].append({
+                "created": _timestamp(index, 8),
+                "managementStatus": "MANAGED" if index % 4 else "NOT_MANAGED",
+                "screenLockType": "BIOMETRIC",
+                "user": {"id": _okta_id("00u", user_index), "status": "ACTIVE"},
+            })
+        return device
+
+
+class RateLimitBucket:
+    """Fixed one-minute window, like Okta's per-endpoint org rate limits."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.window_start = math.floor(time.time())
+        self.remaining = limit
+
+    def take(self, now: float) -> bool:
+        if now >= self.window_start + 60:
+            self.window_start = math.floor(now)
+            self.remaining = self.limit
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    @property
+    def reset(self) -> int:
+        return int(self.window_start + 60)
+
+
+class FakeOktaAPI:
+    """aiohttp application wrapping a FakeTenant with Okta's paging, rate-limit and error behavior."""
+
+    # (family, pattern) - the family is both the rate-limit bucket and the /__stats key
+    ROUTES = (
+        ("users", re.compile(r"^/api/v1/users$")),
+        ("user_groups", re.compile(r"^/api/v1/users/(?P<id>[^/]+)/groups$")),
+        ("user_factors", re.compile(r"^/api/v1/users/(?P<id>[^/]+)/factors$")),
+        ("groups", re.compile(r"^/api/v1/groups$")),
+        ("group_users", re.compile(r"^/api/v1/groups/(?P<id>[^/]+)/users$")),
+        ("apps", re.compile(r"^/api/v1/apps$")),
+        ("app_users", re.compile(r"^/api/v1/apps/(?P<id>[^/]+)/users$")),
+        ("policies", re.compile(r"^/api/v1/policies$")),
+        ("authenticators", re.compile(r"^/api/v1/authenticators$")),
+        ("devices", re.compile(r"^/api/v1/devices$")),
+        ("logs", re.compile(r"^/api/v1/logs$")),
+    )
+    DEFAULT_LIMITS = {"users": 200, "groups": 200, "group_users": 1000, "apps": 200, "app_users": 200,
+                      "policies": 200, "devices": 200, "user_groups": 200, "logs": 1000}
+
+    def __init__(
+        self,
+        tenant: FakeTenant,
+        rate_limit: int,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        storm_every: float = 0.0,
+        storm_duration: float = 0.0,
+        storm_ratio: float = 1.0,
+    ):
+        self.tenant = tenant
+        self.rate_limit = rate_limit
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.storm_every = storm_every
+        self.storm_duration = storm_duration
+        self.storm_ratio = storm_ratio
+        self.rng = random.Random(7)
+        self.started_at = time.time()
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "items": 0, "rate_limited": 0})
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/__stats", self.handle_stats)
+        app.router.add_post("/__stats/reset", self.handle_stats_reset)
+        app.router.add_get("/{tail:.*}", self.handle_api)
+        return app
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "tenant": {
+                "users": self.tenant.user_count,
+                "groups": self.tenant.group_count,
+                "apps": self.tenant.app_count,
+                "devices": self.tenant.device_count,
+            },
+            "families": self.stats,
+            "max_in_flight": self.max_in_flight,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+        })
+
+    async def handle_stats_reset(self, request: web.Request) -> web.Response:
+        self.reset_stats()
+        return web.json_response({"reset": True})
+
+    def _in_storm(self, now: float) -> Optional[int]:
+        """Epoch second the current 429 storm ends, or None outside a storm."""
+        if not self.storm_every or not self.storm_duration:
+            return None
+        elapsed = now - self.started_at
+        cycle_start = math.floor(elapsed / self.storm_every) * self.storm_every
+        if cycle_start > 0 and elapsed - cycle_start < self.storm_duration:
+            return math.ceil(self.started_at + cycle_start + self.storm_duration)
+        return None
+
+    @staticmethod
+    def _error(status: int, code: str, summary: str, headers: Dict[str, str]) -> web.Response:
+        body = {"errorCode": code, "errorSummary": summary, "errorLink": code,
+                "errorId": f"oae{int(time.time() * 1000)}", "errorCauses": []}
+        return web.json_response(body, status=status, headers=headers)
+
+    async def handle_api(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self._dispatch(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _dispatch(self, request: web.Request) -> web.Response:
+        if not request.headers.get("Authorization", "").startswith(("SSWS ", "Bearer ")):
+            return self._error(401, "E0000011", "Invalid token provided", {})
+
+        if self.latency_ms or self.jitter_ms:
+            delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+
+        # The SDK requests collection paths with a trailing slash
+        path = request.path.rstrip("/")
+        for family, pattern in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return self._error(404, "E0000007", f"Not found: Resource not found: {request.path} (GET)", {})
+
+        stats = self.stats[family]
+        stats["calls"] += 1
+        now = time.time()
+        bucket = self.buckets.setdefault(family, RateLimitBucket(self.rate_limit))
+        storm_reset = self._in_storm(now)
+        if storm_reset and self.rng.random() < self.storm_ratio:
+            stats["rate_limited"] += 1
+            headers = {"X-Rate-Limit-Limit": str(bucket.limit), "X-Rate-Limit-Remaining": "0",
+                       "X-Rate-Limit-Reset": str(storm_reset)}
+            return self._error(429, "E0000047", "API call exceeded rate limit due to too many requests.", headers)
+        if not bucket.take(now):
+            stats["rate_limited"] += 1
+            headers = {"X-Rate-Limit-Limit": str(bucket.limit), "X-Rate-Limit-Remaining": "0",
+                       "X-Rate-Limit-Reset": str(bucket.reset)}
+            return self._error(429, "E0000047", "API call exceeded rate limit due to too many requests.", headers)
+        rate_headers = {"X-Rate-Limit-Limit": str(bucket.limit), "X-Rate-Limit-Remaining": str(bucket.remaining),
+                        "X-Rate-Limit-Reset": str(bucket.reset)}
+
+        try:
+            items = self._resolve(family, match.groupdict().get("id"), request)
+        except LookupError:
+            return self._error(404, "E0000007", f"Not found: Resource not found: {request.path} (GET)", rate_headers)
+        if items is None:
+            # Unpaged endpoint returning a list of entities
+            items_page, next_cursor = self._collection(family, path), None
+        else:
+            items_page, next_cursor = self._page(family, items, request)
+
+        stats["items"] += len(items_page)
+        response = web.json_response(items_page, headers=rate_headers)
+        base = f"{request.scheme}://{request.host}{request.path}"
+        response.headers.add("Link", f'<{base}?{request.query_string}>; rel="self"')
+        if next_cursor is not None:
+            query = {key: value for key, value in request.query.items()}
+            query["after"] = str(next_cursor)
+            next_url = request.url.with_query(query)
+            response.headers.add("Link", f'<{base}?{next_url.query_string}>; rel="next"')
+        return response
+
+    def _resolve(self, family: str, entity_id: Optional[str], request: web.Request) -> Optional[List[Any]]:
+        """
+        Index list for a paged family (entities are built per page), or None for unpaged ones.
+        Raises LookupError for unknown parent IDs.
+        """
+        tenant = self.tenant
+        query_text = " ".join(filter(None, (request.query.get("search"), request.query.get("filter"))))
+        since_match = _LAST_UPDATED_FILTER.search(query_text)
+        if since_match:
+            since = datetime.fromisoformat(since_match.group(1).replace("Z", "+00:00"))
+            if since >= BASE_TIME:
+                # Nothing in the generated tenant changed after BASE_TIME
+                return []
+
+        parent_index = None
+        if entity_id is not None:
+            try:
+                parent_index = _index_of(entity_id)
+            except ValueError:
+                raise LookupError(entity_id)
+
+        if family == "users":
+            # Okta only returns deprovisioned users when a search/filter asks for them
+            return tenant.all_users if "DEPROVISIONED" in query_text else tenant.active_users
+        if family == "groups":
+            return list(range(tenant.group_count))
+        if family == "group_users":
+            if parent_index >= tenant.group_count:
+                raise LookupError(entity_id)
+            return tenant.group_members.get(parent_index, [])
+        if family == "user_groups":
+            if parent_index >= tenant.user_count:
+                raise LookupError(entity_id)
+            return tenant.user_groups.get(parent_index, [])
+        if family == "apps":
+            return list(range(tenant.app_count))
+        if family == "app_users":
+            if parent_index >= tenant.app_count:
+                raise LookupError(entity_id)
+            return tenant.app_users[parent_index]
+        if family == "policies":
+            policy_type = request.query.get("type")
+            if policy_type not in POLICY_TYPES:
+                return []
+            offset = POLICY_TYPES.index(policy_type) * POLICIES_PER_TYPE
+            return list(range(offset, offset + POLICIES_PER_TYPE))
+        if family == "devices":
+            return list(range(tenant.device_count))
+        if family == "logs":
+            return []
+        if family == "user_factors":
+            if parent_index >= tenant.user_count or parent_index in tenant.deprovisioned:
+                raise LookupError(entity_id)
+            return None
+        return None
+
+    def _collection(self, family: str, path: str) -> List[Dict[str, Any]]:
+        if family == "authenticators":
+            return [self.tenant.authenticator(index) for index in range(len(AUTHENTICATORS))]
+        if family == "user_factors":
+            user_index = _index_of(path.split("/")[4])
+            return self.tenant.factors(user_index)
+        return []
+
+    def _page(self, family: str, items: List[Any], request: web.Request) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        limit = int(request.query.get("limit", self.DEFAULT_LIMITS.get(family, 200)))
+        offset = int(request.query.get("after", 0) or 0)
+        page = items[offset:offset + limit]
+        next_cursor = offset + limit if offset + limit < len(items) else None
+
+        tenant = self.tenant
+        builders = {
+            "users": tenant.user,
+            "group_users": tenant.user,
+            "groups": tenant.group,
+            "user_groups": tenant.group,
+            "apps": tenant.app,
+            "policies": tenant.policy,
+            "devices": tenant.device,
+        }
+        if family == "app_users":
+            return [tenant.app_user(user_index, group_index) for user_index, group_index in page], next_cursor
+        builder = builders.get(family)
+        return ([builder(index) for index in page] if builder else list(page)), next_cursor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Okta API stand-in for sync benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8499)
+    parser.add_argument("--size", choices=sorted(TENANT_SIZES), default="small",
+                        help="Tenant size preset: small=1k, medium=10k, large=100k users")
+    parser.add_argument("--users", type=int, help="Exact user count (overrides --size)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the added latency")
+    parser.add_argument("--rate-limit", type=int, default=100000,
+                        help="Requests per minute per endpoint family before 429s (Okta orgs are typically 600-6000)")
+    parser.add_argument("--storm-every", type=float, default=0.0, help="Start a 429 storm every N seconds (0 = off)")
+    parser.add_argument("--storm-duration", type=float, default=0.0, help="Length of each 429 storm in seconds")
+    parser.add_argument("--storm-ratio", type=float, default=1.0, help="Share of requests rejected during a storm")
+    args = parser.parse_args()
+
+    users = args.users or TENANT_SIZES[args.size]
+    started = time.time()
+    tenant = FakeTenant(users)
+    api = FakeOktaAPI(
+        tenant,
+        rate_limit=args.rate_limit,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        storm_every=args.storm_every,
+        storm_duration=args.storm_duration,
+        storm_ratio=args.storm_ratio,
+    )
+    print(
+        f"Fake Okta tenant: {tenant.user_count} users, {tenant.group_count} groups, {tenant.app_count} apps, "
+        f"{tenant.device_count} devices (generated in {time.time() - started:.1f}s)",
+        flush=True,
+    )
+    web.run_app(api.build_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
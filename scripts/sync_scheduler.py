@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant sync scheduler for Okta AI Agent.
+
+Keeps several Okta orgs in sync from one long-running process. Tenants are listed in
+SYNC_TENANTS_FILE (or --tenants); each sync runs in its own worker process with the
+tenant's token, rate budget and database file, up to SYNC_SCHEDULER_WORKERS at a time.
+
+Usage:
+    python scripts/sync_scheduler.py                          # run the cron schedules forever
+    python scripts/sync_scheduler.py --once                   # sync every tenant once, then exit
+    python scripts/sync_scheduler.py --run-now acme --run-now globex
+    python scripts/sync_scheduler.py --tenants sync_tenants.json --workers 4
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# Setup project paths
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+# Load environment variables (tenant token variables can live in .env too)
+from dotenv import load_dotenv
+load_dotenv(project_root / ".env")
+
+from src.core.okta.sync.scheduler import SyncScheduler, load_tenant_configs
+from src.utils.logging import get_logger
+
+logger = get_logger("sync_scheduler")
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        tenants = load_tenant_configs(args.tenants)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    scheduler = SyncScheduler(tenants, max_workers=args.workers)
+    for tenant_id in args.run_now or []:
+        if tenant_id not in scheduler.tenants:
+            print(f"Error: unknown tenant {tenant_id} (known: {', '.join(scheduler.tenants)})")
+            return 1
+        scheduler.enqueue(tenant_id, reason="manual")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    await scheduler.run(once=args.once)
+
+    results = scheduler.status()['results']
+    if results:
+        print("\n📊 Sync results:")
+        for tenant_id, result in results.items():
+            print(f"  • {tenant_id}: {result.get('status')} in {result.get('duration_seconds')}s"
+                  + (f" - {result['error']}" if result.get('error') else ""))
+    failed = [tenant_id for tenant_id, result in results.items() if result.get('status') == 'failed']
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scheduled Okta syncs for multiple tenants")
+    parser.add_argument("--tenants", help="Tenants JSON file (defaults to SYNC_TENANTS_FILE)")
+    parser.add_argument("--workers", type=int, help="Concurrent sync workers (defaults to SYNC_SCHEDULER_WORKERS)")
+    parser.add_argument("--once", action="store_true", help="Sync every tenant once by priority, then exit")
+    parser.add_argument("--run-now", action="append", metavar="TENANT_ID", help="Queue a sync for this tenant right away")
+    try:
+        sys.exit(asyncio.run(main(parser.parse_args())))
+    except KeyboardInterrupt:
+        print("\n⚠️  Scheduler interrupted by user.")
+        sys.exit(1)
@@ -11,6 +11,8 @@ from .routers import auth, sync, react_stream, history
 from src.utils.logging import logger
 from src.core.okta.sync.operations import DatabaseOperations
 from src.core.okta.sync.models import AuthUser
+from src.utils.sqlite_reader_pool import close_reader_pools, get_reader_pool
+from src.utils.script_worker_pool import close_script_worker_pool, get_script_worker_pool
 from sqlalchemy import inspect, create_engine
 from src.config.settings import settings
 
@@ -87,6 +89,25 @@ async def lifespan(app: FastAPI):
     
     await db.init_db()
     
+    # Open the read-only connections agent SQL queries and status checks share
+    try:
+        await asyncio.to_thread(get_reader_pool(settings.SQLITE_PATH).warm_up)
+    except Exception as e:
+        logger.warning(f"Could not open SQLite reader pool: {str(e)}")
+    
+    # Start the warm workers generated scripts run on
+    if settings.SCRIPT_WORKER_POOL_ENABLED:
+        try:
+            await get_script_worker_pool().start()
+        except Exception as e:
+            logger.warning(f"Could not start script worker pool: {str(e)}")
+    
+    # Syncs that were running when the server last stopped would block new ones forever
+    try:
+        await db.mark_interrupted_syncs(settings.tenant_id)
+    except Exception as e:
+        logger.warning(f"Could not check for interrupted syncs: {str(e)}")
+    
     logger.info(
         f"Conversation runtime storage: {settings.CHAT_SESSIONS_DIR} (created automatically if missing)"
     )
@@ -137,6 +158,8 @@ async def lifespan(app: FastAPI):
     if _socket_task and not _socket_task.done():
         _socket_task.cancel()
         logger.info("Slack Socket Mode task cancelled")
+    close_reader_pools()
+    await close_script_worker_pool()
     logger.info("Shutting down Okta AI Agent API")
 
 # Create FastAPI app with lifespan manager
@@ -41,6 +41,8 @@ from src.core.security.dependencies import get_current_user
 from src.core.okta.sync.models import AuthUser, QueryHistory
 from src.core.okta.sync.operations import DatabaseOperations
 from src.core.agents.orchestrator import execute_multi_agent_query, OrchestratorResult
+from src.core.agents.plan_cache import discard_failed_plan, store_executed_plan
+from src.core.agents.sql_discovery_agent import find_sqlite_db_path
 from src.core.okta.client import OktaClient
 from src.data.schemas.runtime_storage import (
     RuntimeTurnPaths,
@@ -54,7 +56,10 @@ from src.data.schemas.artifact_manifest import append_artifacts_with_result_sets
 # Track background tasks to prevent memory leaks
 background_tasks: set = set()
 from src.utils.logging import get_logger, set_correlation_id
+from src.utils.script_results_stream import ScriptResultsStream
+from src.utils.script_worker_pool import get_script_worker_pool, python_executable
 from src.utils.security_config import validate_generated_code
+from src.utils.sql_result_cache import open_cached_script_run
 
 # Load environment variables
 load_dotenv()
@@ -70,6 +75,9 @@ router = APIRouter(prefix="/react", tags=["react-agent"])
 # --- Process Tracking ---
 active_processes: Dict[str, Any] = {}
 
+# Script events (progress, row batches) buffered ahead of a slow SSE client
+SCRIPT_EVENT_QUEUE_SIZE = 8
+
 
 # ============================================================================
 # Request/Response Models
@@ -323,10 +331,6 @@ async def _execute_script(
     orchestrator_result: 'OrchestratorResult' = None,
 ) -> AsyncGenerator[Dict[str, Any], None]:
     """Execute script and stream results"""
-    # Get Python executable
-    venv_python = Path("venv/Scripts/python.exe")
-    python_exe = str(venv_python) if venv_python.exists() else "python"
-    
     project_root = Path(__file__).parent.parent.parent.parent.resolve()
     temp_dir = (project_root / "generated_scripts").resolve()
     script_path_obj = _resolve_path_within_directory(
@@ -339,98 +343,154 @@ async def _execute_script(
     # COMMENTED: Reduces log noise during script execution
     # logger.debug(f"[{process_id}] Starting subprocess: {python_exe} -u {script_filename}")
     # logger.debug(f"[{process_id}] CWD: {script_dir}")
-    proc = await asyncio.create_subprocess_exec(
-        python_exe,
-        "-u",
-        str(script_path_obj),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        cwd=str(project_root),
-        limit=1024*1024
+    # SQL-only scripts already run since the last sync replay their recorded output
+    replay, recorder = await open_cached_script_run(
+        find_sqlite_db_path(), script_path_obj.read_text(encoding="utf-8")
     )
+    if replay is not None:
+        logger.info(f"[{process_id}] Script output served from result cache")
+        proc = replay
+    elif settings.SCRIPT_WORKER_POOL_ENABLED:
+        # Warm worker with the imports already loaded (same stdout/stderr/wait/kill interface)
+        proc = await get_script_worker_pool().submit(str(script_path_obj))
+    else:
+        proc = await asyncio.create_subprocess_exec(
+            python_executable(),
+            "-u",
+            str(script_path_obj),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(project_root),
+            limit=1024*1024
+        )
     # logger.debug(f"[{process_id}] Subprocess created with PID: {proc.pid}")
     
-    stdout_lines = []
+    stdout_stream = ScriptResultsStream(settings.SCRIPT_RESULT_BATCH_ROWS)
     stderr_lines = []
+    stdout_line_count = 0
+    # Progress events and row batches from both pipes. Bounded, so a slow client stops the
+    # readers, the pipes fill up and the script waits instead of piling rows up in memory.
+    execution_events: asyncio.Queue = asyncio.Queue(maxsize=SCRIPT_EVENT_QUEUE_SIZE)
     
-    # Read stdout
+    # Read stdout, handing out row batches as soon as they are parsed
     async def read_stdout():
-        # COMMENTED: Reduces log noise
-        # logger.debug(f"[{process_id}] Starting stdout reader")
-        if proc.stdout:
-            line_count = 0
-            while True:
-                line = await proc.stdout.readline()
-                if not line:
-                    # logger.debug(f"[{process_id}] Stdout reader: no more lines, read {line_count} total")
-                    break
-                line_str = line.decode('utf-8', errors='replace').rstrip()
-                stdout_lines.append(line_str)
-                line_count += 1
-                # COMMENTED: Reduces log noise during script execution
-                # logger.debug(f"[{process_id}] Stdout line {line_count}: {line_str[:100]}")
-        else:
-            logger.warning(f"[{process_id}] proc.stdout is None!")
+        nonlocal stdout_line_count
+        try:
+            if proc.stdout:
+                while True:
+                    line = await proc.stdout.readline()
+                    if not line:
+                        break
+                    if recorder:
+                        recorder.stdout(line)
+                    stdout_line_count += 1
+                    line_str = line.decode('utf-8', errors='replace').rstrip()
+                    for batch in stdout_stream.feed_line(line_str):
+                        await execution_events.put(("rows", batch))
+            else:
+                logger.warning(f"[{process_id}] proc.stdout is None!")
+        finally:
+            await execution_events.put(("eof", None))
     
-    # Stream stderr events
-    async def read_stderr_and_yield():
-        if proc.stderr:
-            while True:
-                line = await proc.stderr.readline()
-                if not line:
-                    break
-                line_str = line.decode('utf-8', errors='replace').rstrip()
-                stderr_lines.append(line_str)
-                
-                # Check for progress events
-                if line_str.startswith("__PROGRESS__"):
-                    try:
-                        progress_json = line_str.replace("__PROGRESS__", "").strip()
-                        progress_data = json.loads(progress_json)
-                        yield {
-                            "type": "STEP-PROGRESS",
-                            **progress_data,
-                            "timestamp": time.time()
-                        }
-                    except json.JSONDecodeError:
-                        pass
+    # Collect stderr, turning progress lines into events
+    async def read_stderr():
+        try:
+            if proc.stderr:
+                while True:
+                    line = await proc.stderr.readline()
+                    if not line:
+                        break
+                    if recorder:
+                        recorder.stderr(line)
+                    line_str = line.decode('utf-8', errors='replace').rstrip()
+                    stderr_lines.append(line_str)
+                    
+                    # Check for progress events
+                    if line_str.startswith("__PROGRESS__"):
+                        try:
+                            progress_json = line_str.replace("__PROGRESS__", "").strip()
+                            progress_data = json.loads(progress_json)
+                            await execution_events.put(("event", {
+                                "type": "STEP-PROGRESS",
+                                **progress_data,
+                                "timestamp": time.time()
+                            }))
+                        except json.JSONDecodeError:
+                            pass
+        finally:
+            await execution_events.put(("eof", None))
+    
+    batch_number = 0
+    
+    def row_batch_events(batch: List[Any]) -> List[Dict[str, Any]]:
+        nonlocal batch_number
+        events = []
+        if batch_number == 0:
+            # Known before the rows when the script prints them first (display_type, maybe headers)
+            events.append({
+                "type": "RESULT-METADATA",
+                "display_type": stdout_stream.fields.get("display_type", "table"),
+                "headers": stdout_stream.fields.get("headers"),
+                "total_records": stdout_stream.fields.get("count"),
+                "timestamp": time.time()
+            })
+        batch_number += 1
+        events.append({
+            "type": "RESULT-BATCH",
+            "results": batch,
+            "batch_number": batch_number,
+            "is_final": False,
+            "timestamp": time.time()
+        })
+        return events
     
-    # Start stdout reader
-    stdout_task = asyncio.create_task(read_stdout())
+    readers = [asyncio.create_task(read_stdout()), asyncio.create_task(read_stderr())]
     
     try:
-        # Stream stderr events
-        async for event in read_stderr_and_yield():
+        # Relay events until both pipes are closed
+        open_readers = len(readers)
+        while open_readers:
+            kind, payload = await execution_events.get()
+            if kind == "eof":
+                open_readers -= 1
+                continue
             if check_cancelled():
                 proc.kill()
                 break
-            yield event
+            if kind == "rows":
+                for event in row_batch_events(payload):
+                    yield event
+            else:
+                yield payload
         
-        # Wait for stdout to complete
-        # COMMENTED: Reduces log noise
-        # logger.debug(f"[{process_id}] Waiting for stdout task...")
-        await stdout_task
-        # logger.debug(f"[{process_id}] Stdout task complete")
+        # Surface reader errors (e.g. an over-long output line)
+        for reader in readers:
+            if reader.done():
+                reader.result()
         
         # Wait for process
-        # logger.debug(f"[{process_id}] Waiting for process to exit...")
         await proc.wait()
-        # logger.debug(f"[{process_id}] Process exited with returncode: {proc.returncode}")
         
         # Check for errors
         if proc.returncode != 0:
             error_msg = '\n'.join(stderr_lines[-10:]) if stderr_lines else "Script failed"
+            discard_failed_plan(orchestrator_result)
             raise Exception(f"Script execution failed: {error_msg}")
+        if recorder:
+            recorder.store()
+        if orchestrator_result is not None:
+            store_executed_plan(orchestrator_result)
         
-        # Parse results from stdout
-        stdout = '\n'.join(stdout_lines)
-        logger.debug(f"[{process_id}] Captured {len(stdout_lines)} lines of stdout ({len(stdout)} chars)")
-        if len(stdout) < 2000:
-            logger.debug(f"[{process_id}] Full stdout:\n{stdout}")
-        else:
-            logger.debug(f"[{process_id}] First 1000 chars of stdout:\n{stdout[:1000]}")
-        
-        results_data = _parse_script_output(stdout)
+        results_data = stdout_stream.finish()
+        logger.debug(
+            f"[{process_id}] Captured {stdout_line_count} lines of stdout "
+            f"({stdout_stream.rows_streamed} rows streamed so far)"
+        )
+        if stdout_stream.output_lines:
+            logger.debug(f"[{process_id}] Script output:\n" + '\n'.join(stdout_stream.output_lines[-50:]))
+        for batch in stdout_stream.final_batches():
+            for event in row_batch_events(batch):
+                yield event
         logger.debug(f"[{process_id}] Parse result: {results_data is not None}")
         outcome_payload = orchestrator_result.outcome_metadata() if orchestrator_result else {}
         
@@ -447,7 +507,7 @@ async def _execute_script(
                     "timestamp": time.time()
                 }
             # Check if results are empty (no data found)
-            elif results_data.get("count", 0) == 0:
+            elif results_data.get("count", 0) == 0 and not stdout_stream.streaming:
                 logger.info(f"[{process_id}] Script returned zero results - sending empty results message")
                 script_empty_payload = {**outcome_payload, "outcome": "empty", "result_mode": "empty"}
                 # Send markdown message instead of empty table
@@ -476,21 +536,30 @@ async def _execute_script(
                         logger.info(f"[{process_id}] Metadata: {metadata}")
                     metadata.update(outcome_payload)
                 
-                yield {
+                complete_event = {
                     "type": "COMPLETE",
                     "success": True,
                     "display_type": results_data.get("display_type", "table"),
-                    "results": results_data.get("data", []),
                     "headers": results_data.get("headers", []),
                     "count": result_count,
                     "metadata": metadata,
                     "timestamp": time.time()
                 }
+                if stdout_stream.streaming:
+                    # Rows already went out as RESULT-BATCH events
+                    logger.info(f"[{process_id}] Streamed {stdout_stream.rows_streamed} rows in {batch_number} batches")
+                    complete_event["streamed"] = True
+                    complete_event["rows_streamed"] = stdout_stream.rows_streamed
+                else:
+                    complete_event["results"] = results_data.get("data", [])
+                yield complete_event
     
     finally:
         # Ensure process is terminated
         if proc.returncode is None:
             proc.kill()
+        for reader in readers:
+            reader.cancel()
         try:
             if script_path_obj.exists():
                 script_path_obj.unlink()
@@ -500,46 +569,6 @@ async def _execute_script(
             logger.debug(f"[{process_id}] Failed to clean up temp script: {script_path_obj}")
 
 
-def _parse_script_output(stdout: str) -> Dict[str, Any]:
-    """Parse JSON results from script output"""
-    try:
-        # Look for JSON between the markers (same logic as one_react_agent_executor.py)
-        lines = stdout.split('\n')
-        json_lines = []
-        in_json = False
-        
-        for line in lines:
-            if line.strip() == "QUERY RESULTS":
-                in_json = True
-                continue
-            elif line.strip().startswith("====") and in_json and json_lines:
-                # End of JSON block
-                break
-            elif in_json and line.strip() and not line.strip().startswith("===="):
-                json_lines.append(line)
-        
-        if json_lines:
-            json_text = '\n'.join(json_lines)
-            parsed_output = json.loads(json_text)
-            
-            # Support both old format (array) and new format (object with data/headers)
-            if isinstance(parsed_output, list):
-                return {
-                    "display_type": "table",
-                    "data": parsed_output,
-                    "count": len(parsed_output)
-                }
-            elif isinstance(parsed_output, dict):
-                # Already has the right structure
-                return parsed_output
-            
-    except Exception as e:
-        logger.warning(f"Failed to parse script output: {e}")
-        return {"raw_output": stdout, "count": 0}
-    
-    return None
-
-
 # UNUSED: Cleanup disabled for debugging purposes - scripts are kept in generated_scripts/
 # def _cleanup_temp_script(script_path: str):
 #     """Clean up temporary script file"""
@@ -1116,14 +1145,33 @@ async def stream_react_updates(
             # Execute and stream results
             execution_succeeded = False
             final_execution_event = None
+            streamed_rows: List[Any] = []
+            artifact_truncated = False
             
             async for execution_event in _execute_script(process_id, script_path, check_cancelled, result):
                 yield f"data: {json.dumps(execution_event)}\n\n"
                 
+                # The turn output artifact keeps the first streamed rows only (bounded memory)
+                if execution_event.get("type") == "RESULT-BATCH":
+                    room = settings.SCRIPT_RESULT_ARTIFACT_MAX_ROWS - len(streamed_rows)
+                    batch_rows = execution_event.get("results", [])
+                    if len(batch_rows) > room:
+                        artifact_truncated = True
+                    streamed_rows.extend(batch_rows[:max(0, room)])
+                
                 # Track final completion event for history save
                 if execution_event.get("type") == "COMPLETE" and execution_event.get("success"):
                     execution_succeeded = True
                     final_execution_event = execution_event
+                    if execution_event.get("streamed"):
+                        final_execution_event = {**execution_event, "results": streamed_rows}
+                        if artifact_truncated:
+                            metadata = execution_event.get("metadata")
+                            final_execution_event["metadata"] = {
+                                **(metadata if isinstance(metadata, dict) else {}),
+                                "artifact_truncated": True,
+                                "artifact_row_count": len(streamed_rows),
+                            }
 
                 if execution_event.get("type") == "ERROR":
                     final_execution_event = execution_event
@@ -5,9 +5,10 @@ Provides endpoints to:
 - Check sync status
 - Cancel running sync
 - Get sync history
+- Get the per-phase timeline of a sync (JSON) and its metrics (Prometheus text format)
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Dict, Optional, List, Any
 import asyncio
@@ -21,6 +22,10 @@ from src.config.settings import settings
 from src.core.security.dependencies import get_current_user
 from src.core.okta.sync.models import SyncHistory, SyncStatus
 from src.core.okta.sync.operations import DatabaseOperations
+from src.core.okta.sync.metrics import active_sync_metrics, classify_phase, render_prometheus
+from src.core.agents.plan_cache import render_plan_cache_prometheus
+from src.utils.sql_result_cache import render_sql_result_cache_prometheus
+from src.utils.sqlite_reader_pool import render_reader_pool_prometheus
 from src.core.okta.client.client import OktaClientWrapper
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.security.dependencies import get_db_session
@@ -52,6 +57,19 @@ class SyncResponse(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     error_details: Optional[str] = None
+    database: Optional[Dict[str, Any]] = None
+    checkpoint: Optional[Dict[str, Any]] = None  # Resume point of an unfinished sync
+
+class SyncTimelineResponse(BaseModel):
+    sync_id: int
+    status: str
+    sync_mode: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    phases: List[Dict[str, Any]] = []
+    # Longest phase and what bounded it (api, rate_limit or db)
+    slowest_phase: Optional[str] = None
+    bound: Optional[str] = None
 
 # Get tenant ID from the application settings
 def get_tenant_id():
@@ -325,6 +343,13 @@ async def get_sync_status(
     tenant_id = get_tenant_id()
     db = await get_db_ops()
     
+    # SQLite pragmas, WAL size and last checkpoint/optimize
+    try:
+        database_status = await db.get_sqlite_status()
+    except Exception as e:
+        sync_logger.warning(f"Could not read SQLite status: {str(e)}")
+        database_status = None
+    
     # First check for active sync
     # Fix: Pass session and tenant_id explicitly 
     active_sync = await db.get_active_sync(session, tenant_id)
@@ -343,7 +368,9 @@ async def get_sync_status(
                 "devices": active_sync.devices_count or 0
             },
             start_time=active_sync.start_time,
-            error_details=active_sync.error_details
+            error_details=active_sync.error_details,
+            database=database_status,
+            checkpoint=active_sync.checkpoint
         )
     
     # If no active sync, get last completed sync
@@ -365,12 +392,15 @@ async def get_sync_status(
             },
             start_time=last_sync.start_time,
             end_time=last_sync.end_time,
-            error_details=last_sync.error_details
+            error_details=last_sync.error_details,
+            database=database_status,
+            checkpoint=last_sync.checkpoint
         )
     
     return SyncResponse(
         status="none",
-        message="No sync history available"
+        message="No sync history available",
+        database=database_status
     )
 
 @router.post("/cancel", response_model=SyncResponse)
@@ -444,4 +474,118 @@ async def get_sync_history(
             end_time=entry.end_time
         )
         for entry in history
-    ]
\ No newline at end of file
+    ]
+
+
+async def _select_sync(session: AsyncSession, db: DatabaseOperations, tenant_id: str, sync_id: Optional[int]) -> Optional[SyncHistory]:
+    """The requested sync, else the running one, else the most recent one."""
+    if sync_id is not None:
+        result = await session.execute(
+            select(SyncHistory).where(and_(SyncHistory.id == sync_id, SyncHistory.tenant_id == tenant_id))
+        )
+        return result.scalars().first()
+    active_sync = await db.get_active_sync(session, tenant_id)
+    if active_sync:
+        return active_sync
+    history = await db.get_sync_history(session, tenant_id, 1)
+    return history[0] if history else None
+
+
+async def _build_sync_timeline(session: AsyncSession, db: DatabaseOperations, tenant_id: str, sync: SyncHistory) -> SyncTimelineResponse:
+    """Merge the sync's node timeline with stored and live phase telemetry."""
+    metrics_by_phase: Dict[str, Dict[str, Any]] = {}
+    for row in await db.get_sync_phase_metrics(session, tenant_id, sync.id):
+        metrics_by_phase[row.phase] = {
+            'api_calls': row.api_calls,
+            'api_errors': row.api_errors,
+            'rate_limited': row.rate_limited,
+            'rate_limit_wait_seconds': row.rate_limit_wait_seconds,
+            'pages': row.pages,
+            'records': row.records,
+            'db_write_seconds': row.db_write_seconds,
+            'db_lock_wait_seconds': row.db_lock_wait_seconds,
+            'queue_depth_max': row.queue_depth_max,
+            'histograms': row.histograms,
+        }
+    
+    # Phases still running in this process have no stored row yet
+    live = active_sync_metrics(tenant_id)
+    if live and live.sync_id == sync.id:
+        for name, phase in list(live.running.items()):
+            data = phase.to_dict()
+            data.pop('phase')
+            data['duration_seconds'] = round((get_utc_now() - phase.started_at).total_seconds(), 3)
+            metrics_by_phase[name] = data
+    
+    phases = []
+    for entry in sync.timeline or []:
+        phase = {
+            'phase': entry.get('node'),
+            'status': entry.get('status'),
+            'depends_on': entry.get('depends_on', []),
+            'started_at': entry.get('started_at'),
+            'finished_at': entry.get('finished_at'),
+            'duration_seconds': entry.get('duration_seconds'),
+        }
+        metrics = metrics_by_phase.get(phase['phase'])
+        if metrics:
+            phase.update(metrics)
+            if phase['duration_seconds'] is None:
+                phase['duration_seconds'] = metrics.get('duration_seconds')
+            phase.update(classify_phase(metrics, phase['duration_seconds']))
+        phases.append(phase)
+    
+    timed = [phase for phase in phases if phase.get('duration_seconds')]
+    slowest = max(timed, key=lambda phase: phase['duration_seconds']) if timed else None
+    return SyncTimelineResponse(
+        sync_id=sync.id,
+        status=sync.status.value,
+        sync_mode=sync.sync_mode,
+        start_time=sync.start_time,
+        end_time=sync.end_time,
+        phases=phases,
+        slowest_phase=slowest['phase'] if slowest else None,
+        bound=slowest.get('bound') if slowest else None
+    )
+
+
+@router.get("/timeline", response_model=SyncTimelineResponse)
+async def get_sync_timeline(
+    sync_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_db_session),
+    current_user: Any = Depends(get_current_user)  # Keep for auth check
+):
+    """
+    Per-phase timeline and telemetry of a sync (default: the running or latest sync).
+    Each phase reports API calls, 429s and rate-limit wait, pages, records, DB write
+    latency and prefetch queue depth, plus whether it was API, rate-limit or DB bound.
+    """
+    tenant_id = get_tenant_id()
+    db = await get_db_ops()
+    
+    sync = await _select_sync(session, db, tenant_id, sync_id)
+    if not sync:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sync not found")
+    return await _build_sync_timeline(session, db, tenant_id, sync)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_sync_metrics(
+    session: AsyncSession = Depends(get_db_session),
+    current_user: Any = Depends(get_current_user)  # Keep for auth check
+):
+    """Phase telemetry of the running or latest sync (plus SQLite reader pool, result cache and plan cache counters) in the Prometheus text exposition format."""
+    tenant_id = get_tenant_id()
+    db = await get_db_ops()
+    
+    sync = await _select_sync(session, db, tenant_id, None)
+    if sync:
+        timeline = await _build_sync_timeline(session, db, tenant_id, sync)
+        sync_info = {'sync_id': timeline.sync_id, 'status': timeline.status, 'sync_mode': timeline.sync_mode}
+        body = render_prometheus(tenant_id, sync_info, timeline.phases)
+    else:
+        body = render_prometheus(tenant_id, None, [])
+    body += render_reader_pool_prometheus()
+    body += render_sql_result_cache_prometheus()
+    body += render_plan_cache_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -35,7 +35,94 @@ class Settings(BaseSettings):
     
     # device syncing
     SYNC_OKTA_DEVICES: bool = os.getenv("SYNC_OKTA_DEVICES", "false").lower() == "true"
-    
+
+    # Rows per multi-row INSERT ... ON CONFLICT statement during entity upserts
+    # (automatically capped so a single statement stays under SQLite's bound-parameter limit)
+    SYNC_UPSERT_CHUNK_SIZE: int = int(os.getenv("SYNC_UPSERT_CHUNK_SIZE", "500"))
+    # Relationship rows (memberships, factors, assignments) per executemany call; one commit per page
+    SYNC_RELATIONSHIP_CHUNK_SIZE: int = int(os.getenv("SYNC_RELATIONSHIP_CHUNK_SIZE", "5000"))
+    # Apps with more user assignments than this stream them to the database page by page
+    # instead of buffering them until the app's page is written (bounds memory for mega-apps)
+    APP_ASSIGNMENT_STREAM_THRESHOLD: int = int(os.getenv("APP_ASSIGNMENT_STREAM_THRESHOLD", "5000"))
+
+    # Pages downloaded ahead while the current page is transformed and persisted (0 = sequential)
+    SYNC_PAGE_PREFETCH_DEPTH: int = int(os.getenv("SYNC_PAGE_PREFETCH_DEPTH", "2"))
+
+    # How user→group memberships are collected: "auto", "per_user" (/users/{id}/groups) or "per_group" (/groups/{id}/users)
+    SYNC_MEMBERSHIP_STRATEGY: str = os.getenv("SYNC_MEMBERSHIP_STRATEGY", "auto").lower()
+
+    # Sync mode: "full" (wipe and reload every run) or "incremental" (only entities changed since the last sync)
+    SYNC_MODE: str = os.getenv("SYNC_MODE", "full").lower()
+    # In incremental mode, run a full reconcile (soft-deletes removed records) when the last one is older than this.
+    # Users, groups and devices deleted in Okta stay visible until then (or the next CDC pass with SYNC_SYSTEM_LOG_CDC)
+    SYNC_FULL_RECONCILE_HOURS: int = int(os.getenv("SYNC_FULL_RECONCILE_HOURS", "24"))
+    # Apply System Log membership/assignment/factor events after each sync (needs okta.logs.read)
+    SYNC_SYSTEM_LOG_CDC: bool = os.getenv("SYNC_SYSTEM_LOG_CDC", "false").lower() == "true"
+    # Independent sync steps (e.g. users and policies) run concurrently up to this many (1 = sequential)
+    SYNC_MAX_PARALLEL_NODES: int = int(os.getenv("SYNC_MAX_PARALLEL_NODES", "3"))
+    # Full syncs load into a staging database and swap the tenant's rows in atomically at the end
+    SYNC_SHADOW_TABLES: bool = os.getenv("SYNC_SHADOW_TABLES", "true").lower() == "true"
+    # Checkpoint sync progress and resume an interrupted/cancelled sync from its last committed page
+    SYNC_RESUME: bool = os.getenv("SYNC_RESUME", "true").lower() == "true"
+    # Checkpoints older than this are discarded and the next sync starts over
+    SYNC_RESUME_MAX_AGE_HOURS: int = int(os.getenv("SYNC_RESUME_MAX_AGE_HOURS", "24"))
+    # Drop secondary indexes while a full sync writes the live tables (in-place load or shadow-table swap) and rebuild them in bulk after
+    SYNC_DEFERRED_INDEXES: bool = os.getenv("SYNC_DEFERRED_INDEXES", "true").lower() == "true"
+    # Tables receiving fewer rows than this keep their indexes (incremental maintenance is cheaper)
+    SYNC_DEFERRED_INDEX_MIN_ROWS: int = int(os.getenv("SYNC_DEFERRED_INDEX_MIN_ROWS", "10000"))
+    # Refresh query planner statistics (ANALYZE / PRAGMA optimize) after each successful sync
+    SYNC_SQLITE_OPTIMIZE: bool = os.getenv("SYNC_SQLITE_OPTIMIZE", "true").lower() == "true"
+    # Export synced entity/relationship tables to Parquet after each sync (requires pyarrow)
+    SYNC_SNAPSHOT_EXPORT: bool = os.getenv("SYNC_SNAPSHOT_EXPORT", "false").lower() == "true"
+    # Defaults to <DB_DIR>/snapshots; one sub-directory per tenant
+    SYNC_SNAPSHOT_DIR: str = os.getenv("SYNC_SNAPSHOT_DIR", "")
+    SYNC_SNAPSHOT_COMPRESSION: str = os.getenv("SYNC_SNAPSHOT_COMPRESSION", "zstd").lower()
+    # Multi-tenant scheduler (scripts/sync_scheduler.py): JSON list of orgs to sync; empty = the .env org only
+    SYNC_TENANTS_FILE: str = os.getenv("SYNC_TENANTS_FILE", "")
+    # Worker processes syncing different tenants at the same time
+    SYNC_SCHEDULER_WORKERS: int = int(os.getenv("SYNC_SCHEDULER_WORKERS", "2"))
+    # Cron schedule (UTC) of tenants that don't set their own
+    SYNC_SCHEDULE: str = os.getenv("SYNC_SCHEDULE", "0 */6 * * *")
+
+    # SQLite per-connection tuning (see src/utils/sqlite_profile.py)
+    SQLITE_CACHE_SIZE_MB: int = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+    # Where temporary tables and sort spills live: "memory", "file" or "default"
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "memory").lower()
+    # WAL file is truncated back to this size after checkpoints
+    SQLITE_JOURNAL_SIZE_LIMIT_MB: int = int(os.getenv("SQLITE_JOURNAL_SIZE_LIMIT_MB", "64"))
+    SQLITE_WAL_AUTOCHECKPOINT_PAGES: int = int(os.getenv("SQLITE_WAL_AUTOCHECKPOINT_PAGES", "1000"))
+    # Pre-opened read-only connections (and threads) shared by agent SQL queries and status checks
+    SQLITE_READER_POOL_SIZE: int = int(os.getenv("SQLITE_READER_POOL_SIZE", "4"))
+    # Compiled statements cached per reader connection
+    SQLITE_READER_STATEMENT_CACHE: int = int(os.getenv("SQLITE_READER_STATEMENT_CACHE", "256"))
+    # Results of read-only queries kept until the next sync changes the data (MB, 0 = no cache)
+    SQL_RESULT_CACHE_MB: float = float(os.getenv("SQL_RESULT_CACHE_MB", "64"))
+    # Larger results are not cached
+    SQL_RESULT_CACHE_MAX_ENTRY_MB: float = float(os.getenv("SQL_RESULT_CACHE_MAX_ENTRY_MB", "16"))
+
+    # Generated scripts run on pre-started Python workers with their imports already loaded
+    SCRIPT_WORKER_POOL_ENABLED: bool = os.getenv("SCRIPT_WORKER_POOL_ENABLED", "true").lower() == "true"
+    # Warm workers kept ready (busier moments get extra cold workers)
+    SCRIPT_WORKER_POOL_SIZE: int = int(os.getenv("SCRIPT_WORKER_POOL_SIZE", "2"))
+    # A worker is replaced after this many scripts
+    SCRIPT_WORKER_MAX_JOBS: int = int(os.getenv("SCRIPT_WORKER_MAX_JOBS", "50"))
+    # Scripts running longer are killed together with their worker (0 = no limit)
+    SCRIPT_WORKER_JOB_TIMEOUT_SECONDS: float = float(os.getenv("SCRIPT_WORKER_JOB_TIMEOUT_SECONDS", "1800"))
+    # Address-space limit of each worker in MB (Linux/macOS only, 0 = no limit)
+    SCRIPT_WORKER_MEMORY_LIMIT_MB: int = int(os.getenv("SCRIPT_WORKER_MEMORY_LIMIT_MB", "4096"))
+    # Results with more rows than this are streamed to the browser in batches of this size
+    SCRIPT_RESULT_BATCH_ROWS: int = int(os.getenv("SCRIPT_RESULT_BATCH_ROWS", "500"))
+    # Streamed results keep at most this many rows for the turn output artifact
+    SCRIPT_RESULT_ARTIFACT_MAX_ROWS: int = int(os.getenv("SCRIPT_RESULT_ARTIFACT_MAX_ROWS", "10000"))
+
+    # Repeated questions reuse the final script of an earlier answer, skipping discovery and synthesis
+    PLAN_CACHE_ENABLED: bool = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_MAX_ENTRIES: int = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "500"))
+    # Cached plans older than this are generated again
+    PLAN_CACHE_TTL_HOURS: float = float(os.getenv("PLAN_CACHE_TTL_HOURS", "24"))
+
     # JWT Settings
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "CHANGE-THIS-KEY-IN-PRODUCTION-ENVIRONMENTS")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
@@ -53,6 +140,8 @@ class Settings(BaseSettings):
     # Default is 18 (recommended for Free/Integrator accounts at 50% rate limit slider - the default)
     # Users should adjust based on their plan and rate limit percentage (see README table)
     OKTA_CONCURRENT_LIMIT: int = int(os.environ.get("OKTA_CONCURRENT_LIMIT", "18"))
+    # Share of each endpoint's X-Rate-Limit-Limit kept in reserve; below it requests are paced until the reset
+    OKTA_RATE_LIMIT_RESERVE_PERCENT: float = float(os.environ.get("OKTA_RATE_LIMIT_RESERVE_PERCENT", "10"))
 
     
     # AI Provider
@@ -44,6 +44,7 @@ from src.core.agents.synthesis_agent import (
     SynthesisDeps,
     SynthesisResult
 )
+from src.core.agents.plan_cache import get_plan_cache
 from src.core.agents.special_tools_handler import (
     get_special_tool_capability_summary,
     handle_special_query,
@@ -109,6 +110,12 @@ class OrchestratorResult:
         self.total_tokens: int = 0
         self.total_requests: int = 0
 
+        # Final script reused from the plan cache (discovery and synthesis skipped)
+        self.plan_cache_hit: bool = False
+        # Set when the final script may be cached once it has run successfully
+        self.plan_cache_query: Optional[str] = None
+        self.pipeline_seconds: float = 0.0
+
     def outcome_metadata(self) -> Dict[str, Any]:
         metadata: Dict[str, Any] = {
             "outcome": self.outcome,
@@ -1907,7 +1914,7 @@ async def _run_synthesis_phase(
         result.data_source_type = "special"
 
     if result.data_source_type in ["sql", "hybrid"]:
-        result.last_sync_time = get_last_sync_timestamp()
+        result.last_sync_time = await get_last_sync_timestamp()
 
     logger.info("Multi-agent workflow complete")
     logger.info(f"Phases executed: {', '.join(result.phases_executed)}")
@@ -1924,6 +1931,54 @@ async def _run_synthesis_phase(
         )
 
 
+async def _run_cached_plan(
+    *,
+    result: OrchestratorResult,
+    user_query: str,
+    correlation_id: str,
+    db_runtime_summary: Dict[str, Any],
+    aggregator: EventAggregator,
+    started: float,
+) -> bool:
+    """Use a cached final script for this question; returns False on a miss."""
+    plan_cache = get_plan_cache()
+    plan = plan_cache.lookup(user_query)
+    if plan is None:
+        return False
+    if plan.data_source_type in ["sql", "hybrid"] and not db_runtime_summary.get("usable_for_sql"):
+        logger.info(f"[{correlation_id}] Plan cache hit ignored: database not usable for SQL")
+        return False
+
+    result.success = True
+    result.plan_cache_hit = True
+    result.plan_cache_query = user_query
+    result.script_code = plan.script_code
+    result.display_type = plan.display_type
+    result.data_source_type = plan.data_source_type
+    result.phases_executed.append('plan_cache')
+    _set_result_outcome(
+        result,
+        "success",
+        reason="Reused the final script of an earlier answer to the same question.",
+    )
+    if result.data_source_type in ["sql", "hybrid"]:
+        result.last_sync_time = await get_last_sync_timestamp()
+
+    seconds_saved = max(0.0, plan.seconds_saved - (time.perf_counter() - started))
+    plan_cache.record_saved_time(seconds_saved)
+    logger.info(
+        f"[{correlation_id}] Plan cache hit ({'parameterized' if plan.parameterized else 'exact'}, "
+        f"{plan.data_source_type}): skipped discovery and synthesis, ~{seconds_saved:.1f}s "
+        f"and {plan.tokens_saved:,} tokens saved"
+    )
+    await aggregator.progress({
+        "message": "♻️ Reusing the script from an earlier answer to this question",
+        "details": f"Skipped discovery and synthesis (~{seconds_saved:.0f}s saved)",
+        "timestamp": time.time()
+    })
+    return True
+
+
 # ============================================================================
 # Main Orchestrator Function
 # ============================================================================
@@ -1968,6 +2023,7 @@ async def execute_multi_agent_query(
     logger.info(f"Query: {user_query}")
     
     result = OrchestratorResult()
+    started = time.perf_counter()
     
     # Initialize global tool call limits from environment
     max_tool_calls = int(os.getenv('MAX_TOOL_CALLS', '30'))
@@ -1976,7 +2032,7 @@ async def execute_multi_agent_query(
     
     endpoints_list = _load_api_endpoints()
 
-    db_runtime_summary = get_database_runtime_summary()
+    db_runtime_summary = await get_database_runtime_summary()
     special_tool_capabilities = get_special_tool_capability_summary()
     
     # Event aggregator for streaming
@@ -1997,6 +2053,18 @@ async def execute_multi_agent_query(
                 f"[{correlation_id}] Hydrated {hydrated_session_result_sets} prior session result-set refs for follow-up resolution"
             )
 
+        # Follow-ups depend on earlier answers in the session, so only fresh questions use the plan cache
+        use_plan_cache = get_plan_cache().enabled and not hydrated_session_result_sets
+        if use_plan_cache and await _run_cached_plan(
+            result=result,
+            user_query=user_query,
+            correlation_id=correlation_id,
+            db_runtime_summary=db_runtime_summary,
+            aggregator=aggregator,
+            started=started,
+        ):
+            return result
+
         # ====================================================================
         # PHASE 0: Supervisor Decision (Control Plane)
         # ====================================================================
@@ -2111,6 +2179,10 @@ async def execute_multi_agent_query(
             post_processing_succeeded=validation.post_processing_succeeded,
             cli_mode=cli_mode,
         )
+        if use_plan_cache:
+            # Stored by the executor once the script has run successfully
+            result.plan_cache_query = user_query
+            result.pipeline_seconds = time.perf_counter() - started
         
         return result
         
@@ -0,0 +1,390 @@
+"""
+Plan Cache - Reuse final scripts for repeated questions
+
+Every turn normally runs supervisor → SQL/API discovery → synthesis, even when the same
+question was answered a few minutes earlier. The synthesized script is what matters in the
+end (history re-runs and Slack's "run query" already replay stored scripts), so successful
+plans are kept in memory and a repeated question goes straight to execution.
+
+Fingerprint:
+- Question lowercased, punctuation and whitespace normalized, leading courtesy words dropped
+- Entity literals (emails, Okta IDs, quoted names) replaced by typed slots:
+    "Show groups for john@acme.com" → "show groups for <email>"
+
+Stored scripts:
+- SQL-only scripts that contain each literal verbatim (and no other hardcoded Okta IDs or
+  dates) get parameter slots, so "...for jane@acme.com" reuses the plan with the new email
+- Other scripts (API, hybrid, derived values) are reused for the exact same literals only
+- Only non-degraded sql/api/hybrid results whose script passed security validation and
+  then ran successfully are stored (store_executed_plan, called by the executors); a cached
+  script that fails is discarded so the next ask regenerates it
+- Scripts with hardcoded dates the question doesn't mention (computed from "last 7 days"
+  and the like) are never stored, they'd go stale
+- Entries expire after PLAN_CACHE_TTL_HOURS, least recently used beyond
+  PLAN_CACHE_MAX_ENTRIES are dropped
+
+The cache is skipped for follow-up turns (prior result sets in the session), since those
+questions depend on earlier answers.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.utils.logging import get_logger
+from src.utils.security_config import validate_generated_code
+
+logger = get_logger("okta_ai_agent")
+
+
+# ============================================================================
+# Fingerprinting
+# ============================================================================
+
+# Typed entity literals; quoted text only between straight/curly double quotes or
+# single quotes that aren't apostrophes
+_LITERAL_PATTERNS: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("email", re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")),
+    ("id", re.compile(r"\b0[0-9a-zA-Z]{19}\b")),
+    ("text", re.compile(r"\"([^\"\n]{2,200})\"|“([^”\n]{2,200})”|(?<![\w'])'([^'\n]{2,200})'(?![\w'])")),
+)
+
+_COURTESY_PREFIX = re.compile(r"^(?:please|kindly|can you|could you|would you|will you|hey)\b[\s,]*")
+_PUNCTUATION = re.compile(r"[?!.,;:]+(?=\s|$)")
+
+# Slot values are pasted into Python/SQL string literals: nothing that could close one
+_SAFE_SLOT_VALUE = re.compile(r"^[^'\"\\`{}\n\r%]{2,200}$")
+
+_OKTA_ID = re.compile(r"\b0[0-9a-zA-Z]{19}\b")
+_DATE_LITERAL = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+_SLOT_MARKER = "__PLAN_SLOT_{}__"
+
+
+@dataclass
+class QueryFingerprint:
+    """Normalized question text with its entity literals pulled out."""
+    template: str
+    slot_types: Tuple[str, ...]
+    values: Tuple[str, ...]
+
+
+def fingerprint_query(user_query: str) -> QueryFingerprint:
+    """Normalize a question and replace its entity literals with typed slots."""
+    found: List[Tuple[int, int, str, str]] = []
+    for slot_type, pattern in _LITERAL_PATTERNS:
+        for match in pattern.finditer(user_query):
+            start, end = match.span()
+            if any(start < other_end and other_start < end for other_start, other_end, _, _ in found):
+                continue  # e.g. an email inside quotes
+            value = next((group for group in match.groups() if group), None) if match.groups() else match.group(0)
+            found.append((start, end, slot_type, value or match.group(0)))
+    found.sort()
+
+    parts: List[str] = []
+    position = 0
+    for start, end, slot_type, _ in found:
+        parts.append(user_query[position:start].lower())
+        parts.append(f"<{slot_type}>")
+        position = end
+    parts.append(user_query[position:].lower())
+
+    template = " ".join("".join(parts).split())
+    template = _PUNCTUATION.sub("", template)
+    while True:
+        stripped = _COURTESY_PREFIX.sub("", template)
+        if stripped == template:
+            break
+        template = stripped
+    template = re.sub(r"\s+please$", "", template).strip()
+
+    return QueryFingerprint(
+        template=template,
+        slot_types=tuple(slot_type for _, _, slot_type, _ in found),
+        values=tuple(value for _, _, _, value in found),
+    )
+
+
+def _slot_pattern(value: str) -> re.Pattern:
+    return re.compile(r"(?<![\w.@-])" + re.escape(value) + r"(?![\w@-])")
+
+
+def _parameterize_script(script_code: str, fingerprint: QueryFingerprint) -> Optional[str]:
+    """
+    Script with the question's literals replaced by slot markers, or None when that isn't
+    safe (literal missing or also present in another form, derived IDs or dates hardcoded).
+    """
+    values = fingerprint.values
+    if not values or len(set(v.lower() for v in values)) != len(values):
+        return None
+    if any(not _SAFE_SLOT_VALUE.match(value) for value in values):
+        return None
+    if any(_SLOT_MARKER.format(index) in script_code for index in range(len(values))):
+        return None
+
+    template = script_code
+    for index, value in enumerate(values):
+        pattern = _slot_pattern(value)
+        if not pattern.search(template):
+            return None
+        template = pattern.sub(_SLOT_MARKER.format(index), template)
+        if value.lower() in template.lower():
+            return None  # Also used in another case/form we can't substitute
+
+    # Values discovered during discovery (IDs of related objects, computed dates) belong to
+    # the original literals, not to a new one
+    if _OKTA_ID.search(template) or _DATE_LITERAL.search(template):
+        return None
+    return template
+
+
+def _render_script(template: str, values: Tuple[str, ...]) -> Optional[str]:
+    if any(not _SAFE_SLOT_VALUE.match(value) for value in values):
+        return None
+    script_code = template
+    for index, value in enumerate(values):
+        script_code = script_code.replace(_SLOT_MARKER.format(index), value)
+    return script_code
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+@dataclass
+class CachedPlan:
+    """A stored final script and what the original run cost."""
+    script_code: str  # With slot markers when parameterized
+    parameterized: bool
+    display_type: str
+    data_source_type: str
+    pipeline_seconds: float
+    tokens: int
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+@dataclass
+class PlanCacheHit:
+    """Plan ready to execute for the current question."""
+    script_code: str
+    display_type: str
+    data_source_type: str
+    parameterized: bool
+    seconds_saved: float
+    tokens_saved: int
+
+
+class PlanCache:
+    """In-memory LRU of final scripts keyed by question fingerprint."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...], Optional[Tuple[str, ...]]], CachedPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'lookups': 0,
+            'hits': 0,
+            'parameterized_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'rejected': 0,
+            'expired': 0,
+            'evictions': 0,
+            'seconds_saved_total': 0.0,
+            'tokens_saved_total': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _keys(fingerprint: QueryFingerprint) -> Tuple[Tuple, Tuple]:
+        base = (fingerprint.template, fingerprint.slot_types)
+        return base + (None,), base + (tuple(fingerprint.values),)
+
+    def _get_entry(self, key: Tuple) -> Optional[CachedPlan]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl_seconds > 0 and time.time() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            self._stats['expired'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def lookup(self, user_query: str) -> Optional[PlanCacheHit]:
+        """Plan for this question (exact literals first, then a parameterized one)."""
+        fingerprint = fingerprint_query(user_query)
+        parameterized_key, exact_key = self._keys(fingerprint)
+        with self._lock:
+            self._stats['lookups'] += 1
+            entry = self._get_entry(exact_key)
+            values: Tuple[str, ...] = ()
+            if entry is None and fingerprint.values:
+                entry = self._get_entry(parameterized_key)
+                values = fingerprint.values
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            script_code = _render_script(entry.script_code, values) if entry.parameterized else entry.script_code
+            if script_code is None:
+                self._stats['misses'] += 1
+                return None
+            entry.hits += 1
+            self._stats['hits'] += 1
+            if entry.parameterized:
+                self._stats['parameterized_hits'] += 1
+            self._stats['tokens_saved_total'] += entry.tokens
+            return PlanCacheHit(
+                script_code=script_code,
+                display_type=entry.display_type,
+                data_source_type=entry.data_source_type,
+                parameterized=entry.parameterized,
+                seconds_saved=entry.pipeline_seconds,
+                tokens_saved=entry.tokens,
+            )
+
+    def record_saved_time(self, seconds: float) -> None:
+        with self._lock:
+            self._stats['seconds_saved_total'] += max(0.0, seconds)
+
+    def store(
+        self,
+        user_query: str,
+        script_code: str,
+        *,
+        display_type: str,
+        data_source_type: str,
+        pipeline_seconds: float,
+        tokens: int,
+    ) -> bool:
+        """Keep a validated final script for this question; returns whether it was stored."""
+        query_dates = set(_DATE_LITERAL.findall(user_query))
+        computed_dates = any(date not in query_dates for date in _DATE_LITERAL.findall(script_code))
+        if computed_dates or not validate_generated_code(script_code).is_valid:
+            with self._lock:
+                self._stats['rejected'] += 1
+            return False
+
+        fingerprint = fingerprint_query(user_query)
+        parameterized_key, exact_key = self._keys(fingerprint)
+        template = _parameterize_script(script_code, fingerprint) if data_source_type == "sql" else None
+        entry = CachedPlan(
+            script_code=template if template is not None else script_code,
+            parameterized=template is not None,
+            display_type=display_type,
+            data_source_type=data_source_type,
+            pipeline_seconds=pipeline_seconds,
+            tokens=tokens,
+        )
+        key = parameterized_key if template is not None else exact_key
+        with self._lock:
+            self._entries.pop(exact_key, None)  # Superseded by the new plan either way
+            self._entries[key] = entry
+            self._stats['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return True
+
+    def discard(self, user_query: str) -> bool:
+        """Drop the plans this question would hit (e.g. its cached script failed)."""
+        with self._lock:
+            removed = [self._entries.pop(key, None) for key in self._keys(fingerprint_query(user_query))]
+        return any(entry is not None for entry in removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters (hit rate, time and tokens saved) for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 4) if stats['lookups'] else 0.0
+        stats['seconds_saved_total'] = round(stats['seconds_saved_total'], 3)
+        return stats
+
+
+_plan_cache: Optional[PlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """Process-wide plan cache (created on first use)."""
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            max_entries = settings.PLAN_CACHE_MAX_ENTRIES if settings.PLAN_CACHE_ENABLED else 0
+            _plan_cache = PlanCache(max_entries, settings.PLAN_CACHE_TTL_HOURS * 3600)
+        return _plan_cache
+
+
+def store_executed_plan(result: Any) -> bool:
+    """
+    Cache an orchestrator result's final script after it ran successfully.
+
+    Only fresh (non-follow-up) clean sql/api/hybrid answers are eligible; the orchestrator
+    marks them with plan_cache_query.
+    """
+    if (
+        not result.plan_cache_query
+        or result.plan_cache_hit
+        or not result.success
+        or not result.script_code
+        or result.outcome != "success"
+        or result.is_special_tool
+        or result.no_data_found
+        or result.data_source_type not in ["sql", "api", "hybrid"]
+    ):
+        return False
+    try:
+        return get_plan_cache().store(
+            result.plan_cache_query,
+            result.script_code,
+            display_type=result.display_type,
+            data_source_type=result.data_source_type,
+            pipeline_seconds=result.pipeline_seconds,
+            tokens=result.total_tokens,
+        )
+    except Exception as e:
+        logger.warning(f"Could not store plan in cache: {e}")
+        return False
+
+
+def discard_failed_plan(result: Any) -> None:
+    """Evict a cached plan whose script failed, so the question is answered from scratch next time."""
+    if result is not None and result.plan_cache_hit and result.plan_cache_query:
+        if get_plan_cache().discard(result.plan_cache_query):
+            logger.info("Discarded cached plan after its script failed")
+
+
+def render_plan_cache_prometheus() -> str:
+    """Plan cache counters in the Prometheus text exposition format."""
+    stats = get_plan_cache().stats()
+    metrics = (
+        ("okta_plan_cache_lookups_total", "counter", "Questions looked up in the plan cache", 'lookups'),
+        ("okta_plan_cache_hits_total", "counter", "Questions answered with a cached script", 'hits'),
+        ("okta_plan_cache_parameterized_hits_total", "counter", "Hits that substituted new entity values", 'parameterized_hits'),
+        ("okta_plan_cache_stores_total", "counter", "Final scripts stored", 'stores'),
+        ("okta_plan_cache_seconds_saved_total", "counter", "Discovery and synthesis time skipped by hits", 'seconds_saved_total'),
+        ("okta_plan_cache_tokens_saved_total", "counter", "LLM tokens skipped by hits", 'tokens_saved_total'),
+        ("okta_plan_cache_entries", "gauge", "Cached plans", 'entries'),
+        ("okta_plan_cache_hit_rate", "gauge", "Hits per lookup since start", 'hit_rate'),
+    )
+    lines: List[str] = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {stats[key]}")
+    return "\n".join(lines) + "\n"
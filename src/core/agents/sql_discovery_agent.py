@@ -21,6 +21,8 @@ import sqlite3
 import asyncio
 
 from src.utils.logging import get_logger
+from src.utils.sql_result_cache import cached_fetchall, cached_read
+from src.utils.sqlite_reader_pool import get_reader_pool
 from src.core.security.sql_security_validator import validate_user_sql
 from src.core.agents import DEFAULT_LOCAL_TOOL_CALL_TIMEOUT_SECONDS, build_agent
 from src.core.models.model_picker import ModelType
@@ -122,40 +124,41 @@ def find_sqlite_db_path() -> Optional[Path]:
     return None
 
 
-def get_last_sync_timestamp() -> Optional[str]:
+def _read_last_sync_timestamp(conn: sqlite3.Connection) -> Optional[str]:
+    """Last successful sync end time, read on a pooled reader connection."""
+    if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sync_history'").fetchone():
+        return None
+
+    row = conn.execute("""
+        SELECT end_time
+        FROM sync_history
+        WHERE success = 1 AND end_time IS NOT NULL
+        ORDER BY end_time DESC
+        LIMIT 1
+    """).fetchone()
+    if not row or not row[0]:
+        return None
+
+    timestamp_str = row[0]
+    if "T" not in timestamp_str:
+        timestamp_str = timestamp_str.replace(" ", "T") + "Z"
+    return timestamp_str
+
+
+async def get_last_sync_timestamp() -> Optional[str]:
     """Get the last successful sync timestamp from the SQL database."""
     try:
         db_path = find_sqlite_db_path()
         if not db_path:
             return None
 
-        with sqlite3.connect(db_path, timeout=5) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sync_history'")
-            if not cursor.fetchone():
-                return None
-
-            cursor.execute("""
-                SELECT end_time
-                FROM sync_history
-                WHERE success = 1 AND end_time IS NOT NULL
-                ORDER BY end_time DESC
-                LIMIT 1
-            """)
-            row = cursor.fetchone()
-            if not row or not row[0]:
-                return None
-
-            timestamp_str = row[0]
-            if "T" not in timestamp_str:
-                timestamp_str = timestamp_str.replace(" ", "T") + "Z"
-            return timestamp_str
+        return await get_reader_pool(db_path).run(_read_last_sync_timestamp)
     except Exception as e:
         logger.debug(f"Could not retrieve last sync timestamp: {e}")
         return None
 
 
-def get_database_runtime_summary() -> Dict[str, Any]:
+async def get_database_runtime_summary() -> Dict[str, Any]:
     """Return compact DB availability and population details for supervisor routing."""
     summary: Dict[str, Any] = {
         "available": False,
@@ -176,6 +179,23 @@ def get_database_runtime_summary() -> Dict[str, Any]:
         "group_application_assignments",
     )
 
+    def read_summary(conn: sqlite3.Connection) -> Dict[str, Any]:
+        existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+        table_counts: Dict[str, int] = {}
+        missing_tables: List[str] = []
+        for table_name in key_tables:
+            if table_name not in existing_tables:
+                missing_tables.append(table_name)
+                continue
+            table_counts[table_name] = int(conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0])
+
+        return {
+            "table_counts": table_counts,
+            "missing_key_tables": missing_tables,
+            "last_sync_time": _read_last_sync_timestamp(conn),
+        }
+
     try:
         db_path = find_sqlite_db_path()
         if not db_path:
@@ -184,58 +204,44 @@ def get_database_runtime_summary() -> Dict[str, Any]:
 
         summary["available"] = True
         summary["db_path"] = str(db_path)
-        with sqlite3.connect(db_path, timeout=5) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            existing_tables = {row[0] for row in cursor.fetchall()}
-
-            table_counts: Dict[str, int] = {}
-            missing_tables: List[str] = []
-            for table_name in key_tables:
-                if table_name not in existing_tables:
-                    missing_tables.append(table_name)
-                    continue
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                table_counts[table_name] = int(cursor.fetchone()[0])
-
-            summary["table_counts"] = table_counts
-            summary["missing_key_tables"] = missing_tables
-            summary["usable_for_sql"] = table_counts.get("users", 0) > 0
-            summary["last_sync_time"] = get_last_sync_timestamp()
-            if not summary["usable_for_sql"]:
-                summary["reason"] = "Users table is missing or empty."
-            else:
-                summary["reason"] = "Database has populated local Okta entities."
+        summary.update(await cached_read(db_path, "runtime_summary", read_summary))
 
-            return summary
+        summary["usable_for_sql"] = summary["table_counts"].get("users", 0) > 0
+        if not summary["usable_for_sql"]:
+            summary["reason"] = "Users table is missing or empty."
+        else:
+            summary["reason"] = "Database has populated local Okta entities."
+
+        return summary
     except Exception as e:
         summary["reason"] = f"Database summary failed: {e}"
         return summary
 
 
-def check_database_health() -> bool:
+async def check_database_health() -> bool:
     """Return True when the local SQL database is usable for discovery."""
+
+    def count_users(conn: sqlite3.Connection) -> Optional[int]:
+        if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'").fetchone():
+            return None
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
     try:
         db_path = find_sqlite_db_path()
         if not db_path:
             logger.warning("Database file not found in any expected location - Skipping SQL phase")
             return False
 
-        with sqlite3.connect(db_path, timeout=5) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-            if not cursor.fetchone():
-                logger.warning("Users table not found in database - Skipping SQL phase")
-                return False
-
-            cursor.execute("SELECT COUNT(*) FROM users")
-            user_count = cursor.fetchone()[0]
-            if user_count < 1:
-                logger.warning("Database has no users - Skipping SQL phase")
-                return False
-
-            logger.info(f"Database health check passed: Found {user_count} users")
-            return True
+        user_count = await cached_read(db_path, "user_count", count_users)
+        if user_count is None:
+            logger.warning("Users table not found in database - Skipping SQL phase")
+            return False
+        if user_count < 1:
+            logger.warning("Database has no users - Skipping SQL phase")
+            return False
+
+        logger.info(f"Database health check passed: Found {user_count} users")
+        return True
     except Exception as e:
         logger.warning(f"Database health check failed: {e} - Skipping SQL phase")
         return False
@@ -512,9 +518,6 @@ def create_sql_toolset(deps: SQLDiscoveryDeps) -> FunctionToolset:
         
         # Execute query
         try:
-            import sqlite3
-            from pathlib import Path
-            
             db_path = find_sqlite_db_path()
 
             if not db_path:
@@ -524,24 +527,19 @@ def create_sql_toolset(deps: SQLDiscoveryDeps) -> FunctionToolset:
                     metadata={'success': False, 'db_error': True}
                 )
             
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            
+            # Runs on a pooled read-only connection, off the event loop; repeated queries
+            # are answered from the result cache until the next sync
             start_time = time.time()
-            cursor.execute(sql_query)
-            rows = cursor.fetchall()
+            columns, rows, cache_hit = await cached_fetchall(db_path, sql_query)
             execution_time_ms = int((time.time() - start_time) * 1000)
-            
-            # Get column names
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            if cache_hit:
+                logger.debug(f"[{deps.correlation_id}] SQL test query served from result cache")
             
             # Convert to dicts
             results = []
             for row in rows:
                 results.append(dict(zip(columns, row)))
             
-            conn.close()
-            
             # Truncate long text fields to reduce token usage
             truncated_results = truncate_sql_results(results, max_text_length=100)
             
@@ -562,7 +560,8 @@ def create_sql_toolset(deps: SQLDiscoveryDeps) -> FunctionToolset:
                     'success': True,
                     'row_count': len(results),
                     'columns': columns,
-                    'execution_time_ms': execution_time_ms
+                    'execution_time_ms': execution_time_ms,
+                    'cache_hit': cache_hit
                 }
             )
             
@@ -5,9 +5,9 @@ import aiohttp
 import re
 import logging
 import random
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from urllib.parse import urlencode
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import json  # NEW: for structured progress events
 import importlib
 
@@ -63,6 +63,175 @@ except ImportError:
 
 # Using self-contained logging instead to ensure logs go to stderr
 import logging
+import time
+import weakref
+from urllib.parse import urlparse
+
+
+class RateLimitGovernor:
+    """
+    Shared Okta rate-limit governor (one per event loop, see get_rate_limit_governor).
+    
+    Both OktaAPIClient and the sync OktaClientWrapper (via the SDK request executor)
+    go through the same governor, so agent queries and a running sync share one budget:
+    - Per-bucket token budget fed by X-Rate-Limit-Limit/Remaining/Reset. Once a bucket is
+      down to its reserve, requests are spaced out over the time left until the reset
+      instead of running into a 429.
+    - AIMD concurrency window: grows by 1/window per successful response up to
+      max_concurrency and is halved on every 429.
+    
+    Buckets are keyed by endpoint template (/api/v1/users/{id}/groups), which is how
+    Okta scopes its rate limits.
+    """
+    
+    # Never sleep longer than this for a single pacing step
+    MAX_WAIT_SECONDS = 60.0
+    
+    def __init__(self, max_concurrency: int, reserve_percent: float = 10.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.reserve_ratio = max(0.0, min(reserve_percent, 90.0)) / 100.0
+        self.window = float(self.max_concurrency)
+        self.in_flight = 0
+        self.throttled_seconds = 0.0
+        self.rate_limited_responses = 0
+        self._buckets: Dict[str, Dict[str, float]] = {}
+        self._pacing_locks: Dict[str, asyncio.Lock] = {}
+        self._condition = asyncio.Condition()
+    
+    @staticmethod
+    def bucket_for(url: str) -> str:
+        """Map a request URL to its rate-limit bucket (ID path segments become {id})."""
+        path = urlparse(url).path if '://' in url else url.split('?', 1)[0]
+        segments = [segment for segment in path.split('/') if segment]
+        if len(segments) >= 3 and segments[0] == 'api':
+            # /api/v1/<collection>/<id>/<sub-collection>/<id>...
+            segments = [
+                '{id}' if index >= 3 and index % 2 == 1 else segment
+                for index, segment in enumerate(segments)
+            ]
+        return '/' + '/'.join(segments)
+    
+    def _pacing_delay(self, bucket: Optional[Dict[str, float]]) -> float:
+        """Seconds to wait before the next request to this bucket (0 = go now)."""
+        if not bucket:
+            return 0.0
+        now = time.time()
+        time_to_reset = bucket['reset'] - now
+        if time_to_reset <= 0:
+            # Window has rolled over: the server-side budget is full again
+            bucket['remaining'] = bucket['limit']
+            return 0.0
+        reserve = bucket['limit'] * self.reserve_ratio
+        if bucket['remaining'] > reserve:
+            return 0.0
+        if bucket['remaining'] >= 1:
+            # Spread what is left of the reserve over the rest of the window
+            return min(time_to_reset / bucket['remaining'], self.MAX_WAIT_SECONDS)
+        return min(time_to_reset + 1, self.MAX_WAIT_SECONDS)
+    
+    async def acquire(self, url: str, on_wait: Optional[Any] = None) -> float:
+        """
+        Wait for a concurrency slot and for the URL's bucket budget.
+        
+        Args:
+            url: Request URL or endpoint path
+            on_wait: Optional callback(seconds) invoked before a pacing sleep
+        
+        Returns:
+            Total seconds spent pacing for the bucket budget
+        """
+        key = self.bucket_for(url)
+        waited = 0.0
+        # One pacing wait per bucket at a time: concurrent waiters would otherwise compute
+        # the same delay, wake together and all spend the single token it was paced for
+        async with self._pacing_locks.setdefault(key, asyncio.Lock()):
+            while True:
+                delay = self._pacing_delay(self._buckets.get(key))
+                if delay <= 0:
+                    break
+                if on_wait:
+                    on_wait(delay)
+                await asyncio.sleep(delay)
+                waited += delay
+                bucket = self._buckets.get(key)
+                if bucket and bucket['remaining'] >= 1:
+                    # The paced request spends one token of the remaining budget
+                    break
+            
+            # Reserve the token before the next waiter computes its delay
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket['remaining'] = max(0.0, bucket['remaining'] - 1)
+        
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, int(self.window)))
+            self.in_flight += 1
+        
+        self.throttled_seconds += waited
+        return waited
+    
+    def observe(self, url: str, status: Optional[int], headers: Optional[Any]) -> None:
+        """Update the bucket and the concurrency window from a response."""
+        key = self.bucket_for(url)
+        if headers is not None:
+            try:
+                limit = headers.get('X-Rate-Limit-Limit')
+                remaining = headers.get('X-Rate-Limit-Remaining')
+                reset = headers.get('X-Rate-Limit-Reset')
+                if limit is not None and remaining is not None and reset is not None and float(limit) > 0:
+                    bucket = self._buckets.get(key)
+                    # Ignore stale headers (e.g. SDK cache hits) from an older window
+                    if not bucket or float(reset) >= bucket['reset']:
+                        self._buckets[key] = {
+                            'limit': float(limit),
+                            'remaining': float(remaining),
+                            'reset': float(reset),
+                        }
+            except (TypeError, ValueError):
+                pass
+        
+        if status == 429:
+            self.rate_limited_responses += 1
+            self.window = max(1.0, self.window / 2)
+        elif status is not None and status < 400:
+            self.window = min(float(self.max_concurrency), self.window + 1.0 / self.window)
+    
+    async def release(self, url: str, status: Optional[int] = None, headers: Optional[Any] = None) -> None:
+        """Return the concurrency slot taken by acquire() and record the response."""
+        self.observe(url, status, headers)
+        async with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._condition.notify_all()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current window and per-bucket state (for logging/diagnostics)."""
+        return {
+            'window': round(self.window, 2),
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'throttled_seconds': round(self.throttled_seconds, 2),
+            'rate_limited_responses': self.rate_limited_responses,
+            'buckets': {key: dict(bucket) for key, bucket in self._buckets.items()},
+        }
+
+
+_rate_limit_governors = weakref.WeakKeyDictionary()
+
+
+def get_rate_limit_governor() -> RateLimitGovernor:
+    """Return the governor shared by every Okta client running on the current event loop."""
+    loop = asyncio.get_running_loop()
+    governor = _rate_limit_governors.get(loop)
+    if governor is None:
+        if settings:
+            max_concurrency = settings.OKTA_CONCURRENT_LIMIT
+            reserve_percent = settings.OKTA_RATE_LIMIT_RESERVE_PERCENT
+        else:
+            max_concurrency = int(os.getenv('OKTA_CONCURRENT_LIMIT', '10'))
+            reserve_percent = float(os.getenv('OKTA_RATE_LIMIT_RESERVE_PERCENT', '10'))
+        governor = RateLimitGovernor(max_concurrency, reserve_percent)
+        _rate_limit_governors[loop] = governor
+    return governor
 
 
 class OktaAPIClient:
@@ -70,11 +239,18 @@ class OktaAPIClient:
     Simplified Okta API client that automatically handles pagination based on Link headers.
     
     Usage:
-        client = OktaAPIClient()
-        result = await client.make_request("/api/v1/logs", params={"since": "2024-01-01T00:00:00.000Z"})
-        result = await client.make_request("/api/v1/users", method="POST", body={"profile": {...}})
+        async with OktaAPIClient() as client:
+            result = await client.make_request("/api/v1/logs", params={"since": "2024-01-01T00:00:00.000Z"})
+            result = await client.make_request("/api/v1/users", method="POST", body={"profile": {...}})
+    
+    Requests reuse one aiohttp session (keep-alive connection pool) per client. Without the
+    context manager, call `await client.close_session()` when done.
     """
     
+    # Connection pool tuning for the persistent session
+    KEEPALIVE_TIMEOUT = 30   # seconds an idle connection to the org is kept open
+    DNS_CACHE_TTL = 300      # seconds resolved org addresses are cached
+    
     def __init__(self, timeout: int = 300, max_pages: int = 100):
         """
         Initialize the API client.
@@ -108,6 +284,10 @@ class OktaAPIClient:
         # Progress tracking state (for throttling entity progress updates)
         self._entity_progress_state = {}
         
+        # Persistent HTTP session, created on first request (see _get_http_session)
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._http_session_loop = None
+        
         self._setup_config()
     
     def _setup_config(self):
@@ -212,10 +392,48 @@ class OktaAPIClient:
             # Return static headers for API token method
             return self.headers
 
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """
+        Return the client's persistent aiohttp session, creating it on first use.
+        
+        Pages and concurrent lookups reuse pooled keep-alive connections instead of paying
+        a TCP/TLS handshake per request. The pool allows concurrent_limit connections to
+        the org. A session is bound to its event loop, so a new one is created if the
+        client is reused from another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http_session is not None and not self._http_session.closed and self._http_session_loop is loop:
+            return self._http_session
+        
+        connector = aiohttp.TCPConnector(
+            limit=0,  # No global cap; the per-host limit and the rate-limit governor bound concurrency
+            limit_per_host=max(1, int(self.concurrent_limit)),
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+        )
+        self._http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._http_session_loop = loop
+        self.logger.debug(f"Opened persistent HTTP session (per-host connection limit: {self.concurrent_limit})")
+        return self._http_session
+
     async def close_session(self) -> None:
-        """Release any persistent authentication client state used by generated scripts."""
+        """Close the persistent HTTP session and any authentication client state used by generated scripts."""
+        if self._http_session is not None:
+            if not self._http_session.closed:
+                await self._http_session.close()
+            self._http_session = None
+            self._http_session_loop = None
         if self.oauth2_manager:
             await self.oauth2_manager.close()
+
+    async def __aenter__(self) -> "OktaAPIClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close_session()
     
     def _calculate_rate_limit_wait_time(self, rate_limit_reset: Optional[str], is_concurrent: bool = False) -> int:
         """
@@ -495,7 +713,11 @@ class OktaAPIClient:
             # Optimize parameters for better rate limit efficiency
             if method.upper() == "GET":
                 params = self._optimize_params(endpoint, params)
-                result = await self._handle_get_request(endpoint, params, max_results)
+                partitions = self._plan_partitions(endpoint, params, max_results)
+                if partitions:
+                    result = await self._handle_partitioned_get_request(endpoint, params, partitions, max_results)
+                else:
+                    result = await self._handle_get_request(endpoint, params, max_results)
             else:
                 result = await self._handle_single_request(endpoint, method, params, body)
             
@@ -536,6 +758,132 @@ class OktaAPIClient:
             
             return error_result
     
+    # ================================================================
+    # STREAMING PAGE ITERATORS
+    # ------------------------------------------------
+    # make_request() collects every page before returning. iter_pages()/
+    # iter_items() yield as pages arrive instead: the next page is only
+    # requested once the consumer asks for more (natural backpressure), and
+    # breaking out of the loop stops pagination, so memory stays at one page.
+    # ================================================================
+    def _emit_discovery_progress(self, event_type: str, label: str, current: int, total: int = 0,
+                                 status: Optional[str] = None, success: Optional[bool] = None,
+                                 errors: int = 0, message: Optional[str] = None):
+        """Emit a pagination progress event with the fixed discovery schema."""
+        self._emit_progress(event_type, {
+            "label": label,
+            "current": current,
+            "total": total,
+            "percent": 100.0 if event_type == "entity_complete" and success else None,
+            "operation_type": "discovery",
+            "status": status,
+            "success": success,
+            "errors": errors,
+            "wait_seconds": 0,
+            "message": message
+        })
+
+    async def iter_pages(self, endpoint: str, params: Optional[Dict] = None,
+                         max_results: Optional[int] = None):
+        """
+        Async generator yielding the items of a GET endpoint one page at a time.
+        
+        Args:
+            endpoint: API endpoint (e.g., "/api/v1/users")
+            params: Query parameters (limit is optimized like make_request)
+            max_results: Stop after this many items in total (the last page is trimmed)
+        
+        Yields:
+            List of items for each page
+        
+        Raises:
+            Exception: If a page request fails (the message includes the Okta error code)
+        
+        Usage:
+            async for page in client.iter_pages("/api/v1/users", params={"search": 'status eq "ACTIVE"'}):
+                write_rows(page)
+        """
+        if self.test_mode:
+            params = dict(params or {})
+            params['limit'] = 3
+            max_results = 3
+            self.logger.info(f"TEST MODE: Enforcing limit=3 for {endpoint}")
+        if max_results:
+            self._emit_progress("api_call_limit", {"max_results": max_results})
+        
+        params = self._optimize_params(endpoint, params)
+        endpoint_label = endpoint.strip('/').replace('/api/v1/', '').replace('/', '_')
+        pagination_label = f"paginate_{endpoint_label}"
+        
+        next_request = endpoint
+        next_params = params
+        page_count = 0
+        item_count = 0
+        status = "completed"
+        self._emit_discovery_progress("entity_start", pagination_label, 0)
+        try:
+            while next_request and page_count < self.max_pages:
+                page_count += 1
+                result = await self._single_request(next_request, "GET", next_params)
+                if result["status"] != "success":
+                    status = "terminated_with_error"
+                    error_code = result.get("error_code")
+                    self.logger.error(f"Failed to retrieve page {page_count} of {endpoint}: {result.get('error', 'Unknown error')}")
+                    sys.stderr.flush()
+                    raise Exception(f"{result.get('error', 'API request failed')} (Code: {error_code})")
+                
+                data = result.get("data")
+                page = data if isinstance(data, list) else ([data] if data else [])
+                if max_results and item_count + len(page) >= max_results:
+                    page = page[:max_results - item_count]
+                    next_request = None
+                    status = "completed_max_reached"
+                elif self.test_mode:
+                    next_request = None
+                else:
+                    next_request = self._extract_next_url(result.get("link_header", ""))
+                    next_params = None  # The next link already carries the cursor and params
+                
+                if page_count > 1 and not page:
+                    break
+                item_count += len(page)
+                self._emit_discovery_progress("entity_progress", pagination_label, item_count)
+                if page:
+                    yield page
+        except GeneratorExit:
+            # Consumer stopped early (break / aclose)
+            status = "completed_early"
+            raise
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            success = status != "terminated_with_error"
+            self._emit_discovery_progress(
+                "entity_complete", pagination_label, item_count,
+                total=item_count if success else 0,
+                status=status, success=success, errors=0 if success else 1,
+                message=f"Streamed {item_count} items across {page_count} pages"
+            )
+            self.logger.info(f"Streamed {item_count} items from {endpoint} across {page_count} pages ({status})")
+
+    async def iter_items(self, endpoint: str, params: Optional[Dict] = None,
+                         max_results: Optional[int] = None):
+        """
+        Async generator yielding the items of a GET endpoint one by one (see iter_pages).
+        
+        Usage:
+            async for user in client.iter_items("/api/v1/users"):
+                print(user["profile"]["login"])
+        """
+        pages = self.iter_pages(endpoint, params, max_results)
+        try:
+            async for page in pages:
+                for item in page:
+                    yield item
+        finally:
+            await pages.aclose()
+
     async def _handle_get_request(self, endpoint: str, params: Optional[Dict] = None, max_results: Optional[int] = None) -> Dict[str, Any]:
         """Handle GET request with automatic pagination detection."""
         
@@ -700,11 +1048,8 @@ class OktaAPIClient:
                     "limited_by_max_results": True
                 }
             
-            # Get next link for next iteration
+            # Get next link for next iteration (pacing is left to the rate-limit governor)
             current_link = page_result.get("link_header", "")
-            
-            # Small delay between requests
-            await asyncio.sleep(0.2)
 
         # Remove old pagination_complete event - replaced by entity_complete
         self.logger.info(f"Pagination complete for {endpoint}: {len(all_data)} total items across {page_count} pages")
@@ -730,6 +1075,294 @@ class OktaAPIClient:
             "total_items": len(all_data)
         }
     
+    # ================================================================
+    # PARALLEL PARTITIONED PAGINATION
+    # ------------------------------------------------
+    # Cursor pagination is strictly sequential, so large pulls are split
+    # into disjoint partitions that are paginated concurrently (within the
+    # rate-limit governor's budget) and merged back in order:
+    # - /api/v1/logs: the since/until range left after the first page is
+    #   cut into sub-windows
+    # - /api/v1/users: one search per user status
+    # Both first fetch one page: a request that one page answers (no next
+    # link) is never split. max_results and max_pages hold across all
+    # partitions together.
+    # Set API_PARALLEL_PARTITIONS=1 to disable.
+    # ================================================================
+    LOG_MIN_WINDOW_SECONDS = 60
+    # Statuses returned by an unfiltered user listing (Okta leaves out DEPROVISIONED)
+    USER_PARTITION_STATUSES = (
+        "ACTIVE", "PROVISIONED", "STAGED", "RECOVERY",
+        "PASSWORD_EXPIRED", "LOCKED_OUT", "SUSPENDED",
+    )
+
+    @staticmethod
+    def _parse_okta_time(value: Any) -> Optional[datetime]:
+        """Parse an ISO 8601 timestamp as used by Okta query parameters."""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _format_okta_time(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+    def _plan_partitions(self, endpoint: str, params: Dict, max_results: Optional[int] = None) -> Optional[list]:
+        """
+        Split a GET into disjoint parameter sets that can be paginated concurrently.
+        
+        Returns:
+            List of params dicts in merge order, or None to paginate normally
+        """
+        max_partitions = int(os.getenv('API_PARALLEL_PARTITIONS', '4'))
+        if self.test_mode or max_partitions <= 1 or endpoint.startswith('http'):
+            return None
+        if max_results and max_results <= int(params.get('limit') or 0):
+            # One page answers it
+            return None
+        path = endpoint.split('?', 1)[0].rstrip('/')
+        
+        if path == '/api/v1/logs':
+            if params.get('after'):
+                return None
+            return self._split_log_window(params, max_partitions)
+        
+        if path == '/api/v1/users':
+            # Only full listings: a caller's search (or q/filter) also matches DEPROVISIONED
+            # users and is usually small anyway
+            if params.get('search') or params.get('q') or params.get('filter') or params.get('after'):
+                return None
+            partitions = []
+            for status in self.USER_PARTITION_STATUSES:
+                partition = dict(params)
+                partition['search'] = f'status eq "{status}"'
+                partitions.append(partition)
+            return partitions
+        
+        return None
+
+    def _split_log_window(self, params: Dict, max_partitions: int) -> Optional[list]:
+        """
+        Cut the since/until range of a /logs query into up to max_partitions windows of at
+        least LOG_MIN_WINDOW_SECONDS, in merge order (newest first for DESCENDING).
+        
+        Returns:
+            List of params dicts, or None when the range is too short to split
+        """
+        since = self._parse_okta_time(params.get('since'))
+        if not since:
+            return None
+        until = self._parse_okta_time(params.get('until')) or datetime.now(timezone.utc)
+        span = (until - since).total_seconds()
+        count = min(max_partitions, int(span // self.LOG_MIN_WINDOW_SECONDS))
+        if count <= 1:
+            return None
+        step = (until - since) / count
+        boundaries = [since + step * i for i in range(count)] + [until]
+        partitions = []
+        for start, end in zip(boundaries, boundaries[1:]):
+            partition = dict(params)
+            partition['since'] = self._format_okta_time(start)
+            partition['until'] = self._format_okta_time(end)
+            partitions.append(partition)
+        if str(params.get('sortOrder', 'ASCENDING')).upper() == 'DESCENDING':
+            partitions.reverse()
+        return partitions
+
+    def _split_logs_after_probe(self, params: Dict, page: list, max_partitions: int) -> Optional[list]:
+        """
+        Windows for the part of a /logs query that its first page did not cover.
+        
+        The first page holds the oldest events (newest for DESCENDING), so the rest of the
+        range starts (ends) at the last event's published time. The boundary is inclusive:
+        events sharing that timestamp are fetched again and dropped as duplicates.
+        """
+        last_published = self._parse_okta_time(page[-1].get('published')) if isinstance(page[-1], dict) else None
+        if not last_published:
+            return None
+        remaining = dict(params)
+        if str(params.get('sortOrder', 'ASCENDING')).upper() == 'DESCENDING':
+            # until is exclusive
+            remaining['until'] = self._format_okta_time(last_published + timedelta(milliseconds=1))
+        else:
+            remaining['since'] = self._format_okta_time(last_published)
+        return self._split_log_window(remaining, max_partitions)
+
+    async def _handle_partitioned_get_request(self, endpoint: str, params: Dict, partitions: list,
+                                              max_results: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Paginate each partition concurrently and merge the results in partition order.
+        
+        max_results is one cutoff for the merged list: a partition stops once it and the
+        partitions merged before it hold max_results items. /logs windows are in time
+        order, so the items kept are the ones the unsplit request would have returned.
+        /users partitions are merged in status order, so max_results keeps the first users
+        by status, not the unsplit request's first max_results (Okta id order).
+        max_pages caps the pages of all partitions together. Records returned by two
+        partitions (e.g. an event on a window boundary) are kept once.
+        
+        Nothing is split before one page shows that more are needed:
+        - /logs first fetches a page of the unsplit query. Without a next link that page is
+          the answer (one request against the tight /logs rate limit instead of one per
+          window); otherwise it is kept and the rest of the range is split.
+        - /users first fetches one page of the first partition (ACTIVE): when it has no
+          next link the org is small and the other statuses are fetched with a single
+          search instead of one partition each. That page is kept as the start of the
+          partition.
+        """
+        endpoint_label = endpoint.strip('/').replace('/api/v1/', '').replace('/', '_')
+        pagination_label = f"paginate_{endpoint_label}"
+        path = endpoint.split('?', 1)[0].rstrip('/')
+        
+        probe = await self._single_request(endpoint, "GET", params if path == '/api/v1/logs' else partitions[0])
+        if probe["status"] != "success":
+            return probe
+        page_count = 1
+        data = probe.get("data")
+        page = data if isinstance(data, list) else ([data] if data else [])
+        next_link = self._extract_next_url(probe.get("link_header") or "")
+        
+        if path == '/api/v1/logs':
+            more_needed = next_link and page and not (max_results and len(page) >= max_results)
+            rest = (self._split_logs_after_probe(params, page, len(partitions)) if more_needed else None) or []
+            # Without a split, the probe's own cursor continues (if there is more at all)
+            partitions = [params] + rest
+            next_links: List[Optional[str]] = [None if rest else next_link] + [None] * len(rest)
+        else:
+            next_links = [next_link] + [None] * (len(partitions) - 1)
+            if not next_link:
+                rest_search = dict(partitions[1])
+                rest_search['search'] = " or ".join(partition['search'] for partition in partitions[1:])
+                partitions = [partitions[0], rest_search]
+                next_links = next_links[:2]
+        partition_items: List[list] = [page] + [[] for _ in partitions[1:]]
+        
+        total_partitions = len(partitions)
+        completed = 0
+        semaphore = asyncio.Semaphore(max(1, min(total_partitions, int(self.concurrent_limit))))
+        
+        def merge(partition_lists: List[list]) -> list:
+            """Concatenate partitions, keeping records returned by two of them once."""
+            merged = []
+            seen_ids = set()
+            for items in partition_lists:
+                for item in items:
+                    item_id = item.get("uuid") or item.get("id") if isinstance(item, dict) else None
+                    if item_id is not None:
+                        if item_id in seen_ids:
+                            continue
+                        seen_ids.add(item_id)
+                    merged.append(item)
+            return merged
+        
+        def cutoff_reached(index: int) -> bool:
+            return bool(max_results) and len(merge(partition_items[:index + 1])) >= max_results
+        
+        self.logger.info(f"Paginating {endpoint} in {total_partitions} parallel partitions...")
+        self._emit_progress("entity_start", {
+            "label": pagination_label,
+            "current": 0,
+            "total": total_partitions,
+            "percent": 0.0,
+            "operation_type": "discovery",
+            "status": None,
+            "success": None,
+            "errors": 0,
+            "wait_seconds": 0,
+            "message": f"Fetching {total_partitions} partitions in parallel"
+        })
+        
+        async def fetch_partition(index: int) -> Optional[Dict[str, Any]]:
+            """Paginate one partition into partition_items[index]; returns the failed page, if any."""
+            nonlocal completed, page_count
+            items = partition_items[index]
+            if index == 0:
+                # Continues after the probe page
+                next_request, next_params = next_links[index], None
+            else:
+                next_request, next_params = endpoint, partitions[index]
+            async with semaphore:
+                while next_request and page_count < self.max_pages and not cutoff_reached(index):
+                    page_count += 1
+                    page_result = await self._single_request(next_request, "GET", next_params)
+                    if page_result["status"] != "success":
+                        return page_result
+                    data = page_result.get("data")
+                    page = data if isinstance(data, list) else ([data] if data else [])
+                    if not page:
+                        break
+                    items.extend(page)
+                    next_request = self._extract_next_url(page_result.get("link_header") or "")
+                    next_params = None  # The next link already carries the cursor and params
+            completed += 1
+            self._emit_progress("entity_progress", {
+                "label": pagination_label,
+                "current": completed,
+                "total": total_partitions,
+                "percent": round(completed / total_partitions * 100, 2),
+                "operation_type": "discovery",
+                "status": None,
+                "success": None,
+                "errors": 0,
+                "wait_seconds": 0,
+                "message": f"{sum(len(items) for items in partition_items)} items so far"
+            })
+            return None
+        
+        failures = await asyncio.gather(*(fetch_partition(index) for index in range(total_partitions)))
+        
+        for failure in failures:
+            if failure is not None:
+                self.logger.error(f"Partitioned pagination of {endpoint} failed: {failure.get('error', 'Unknown error')}")
+                self._emit_progress("entity_complete", {
+                    "label": pagination_label,
+                    "current": completed,
+                    "total": total_partitions,
+                    "percent": None,
+                    "operation_type": "discovery",
+                    "status": "terminated_with_error",
+                    "success": False,
+                    "errors": 1,
+                    "wait_seconds": 0,
+                    "message": failure.get("error")
+                })
+                return failure
+        
+        all_data = merge(partition_items)
+        
+        limited = bool(max_results and len(all_data) >= max_results)
+        if limited:
+            all_data = all_data[:max_results]
+        
+        self.logger.info(f"Partitioned pagination complete for {endpoint}: {len(all_data)} total items across {page_count} pages")
+        self._emit_progress("entity_complete", {
+            "label": pagination_label,
+            "current": len(all_data),
+            "total": len(all_data),
+            "percent": 100.0,
+            "operation_type": "discovery",
+            "status": "completed_max_reached" if limited else "completed",
+            "success": True,
+            "errors": 0,
+            "wait_seconds": 0,
+            "message": f"Pagination completed: {len(all_data)} items across {total_partitions} partitions"
+        })
+        
+        result = {
+            "status": "success",
+            "data": all_data,
+            "pages": page_count,
+            "total_items": len(all_data),
+            "partitions": total_partitions
+        }
+        if limited:
+            result["limited_by_max_results"] = True
+        return result
+
     async def _handle_single_request(self, endpoint: str, method: str, 
                                    params: Optional[Dict] = None, 
                                    body: Optional[Dict] = None) -> Dict[str, Any]:
@@ -772,135 +1405,151 @@ class OktaAPIClient:
         # Rate limiting retry logic
         max_retries = 5  # Increased retries for rate limiting
         retry_count = 0
+        retry_wait = 0.0
         
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-            while retry_count < max_retries:
-                try:
-                    async with session.request(
-                        method=method.upper(),
-                        url=url,
-                        headers=request_headers,
-                        json=body if body else None
-                    ) as response:
-                        
-                        # Monitor rate limit headers from Okta
-                        rate_limit_limit = response.headers.get('X-Rate-Limit-Limit')
-                        rate_limit_remaining = response.headers.get('X-Rate-Limit-Remaining') 
-                        rate_limit_reset = response.headers.get('X-Rate-Limit-Reset')
-                        
-                        # Log rate limit info if headers are present
-                        if rate_limit_limit and rate_limit_remaining:
-                            remaining = int(rate_limit_remaining)
-                            limit = int(rate_limit_limit)
-                            
-                            self.logger.debug(f"Rate limit status: {remaining}/{limit} requests remaining (reset: {rate_limit_reset})")
-                            
-                            # Warning if we're getting close to rate limit - use debug for proactive warnings
-                            if remaining <= (limit * 0.1):  # Less than 10% remaining
-                                self.logger.debug(f"Rate limit critical: Only {remaining}/{limit} requests remaining until reset")
-                            elif remaining <= (limit * 0.25):  # Less than 25% remaining  
-                                self.logger.debug(f"Rate limit low: {remaining}/{limit} requests remaining until reset")
+        # Shared with every other Okta client on this event loop (including the sync)
+        governor = get_rate_limit_governor()
+        rate_limit_label = f"rate_limit_{endpoint.strip('/').replace('/api/v1/', '').replace('/', '_')}"
+        
+        def emit_rate_limit_wait(wait_seconds: float) -> None:
+            # Short pacing gaps are not worth a progress event
+            if wait_seconds < 1:
+                return
+            self.logger.info(f"Rate limit budget low for {governor.bucket_for(url)}: pacing request by {wait_seconds:.1f}s")
+            # Standardized rate_limit_wait event - fixed schema
+            self._emit_progress("rate_limit_wait", {
+                "label": rate_limit_label, 
+                "current": 0,
+                "total": 0,
+                "percent": None,
+                "operation_type": "rate_limit",
+                "status": "waiting",
+                "success": None,
+                "errors": 0,
+                "wait_seconds": round(wait_seconds, 2),
+                "message": "Waiting for org-wide rate limit..."
+            })
+        
+        session = await self._get_http_session()
+        while retry_count < max_retries:
+            if retry_wait:
+                await asyncio.sleep(retry_wait)
+                retry_wait = 0.0
+            
+            # Throttle before sending instead of waiting for a 429
+            await governor.acquire(url, on_wait=emit_rate_limit_wait)
+            response_status = None
+            response_headers = None
+            try:
+                async with session.request(
+                    method=method.upper(),
+                    url=url,
+                    headers=request_headers,
+                    json=body if body else None
+                ) as response:
+                    response_status = response.status
+                    response_headers = response.headers
+                    
+                    # Monitor rate limit headers from Okta
+                    rate_limit_limit = response.headers.get('X-Rate-Limit-Limit')
+                    rate_limit_remaining = response.headers.get('X-Rate-Limit-Remaining') 
+                    rate_limit_reset = response.headers.get('X-Rate-Limit-Reset')
+                    
+                    # Log rate limit info if headers are present
+                    if rate_limit_limit and rate_limit_remaining:
+                        remaining = int(rate_limit_remaining)
+                        limit = int(rate_limit_limit)
                         
-                        # Handle rate limiting (429)
-                        if response.status == 429:
-                            # Check if this is concurrent or org-wide rate limit
-                            is_concurrent = (rate_limit_limit == '0' and rate_limit_remaining == '0')
-                            
-                            # Calculate proper wait time using Okta's actual headers
-                            calculated_wait = self._calculate_rate_limit_wait_time(rate_limit_reset, is_concurrent)
-                            
-                            if is_concurrent:
-                                self.logger.warning(f"Concurrent rate limit exceeded on {endpoint}. Waiting {calculated_wait} seconds for retry {retry_count + 1}/{max_retries}")
-                            else:
-                                self.logger.warning(f"Org-wide rate limit exceeded on {endpoint}. Waiting {calculated_wait} seconds for retry {retry_count + 1}/{max_retries}")
-                                self.logger.info(f"Rate limit details: {rate_limit_remaining}/{rate_limit_limit} remaining, resets at epoch {rate_limit_reset}")
-                            
-                            if retry_count < max_retries - 1:  # Don't sleep on last retry
-                                # Use calculated wait time based on Okta's X-Rate-Limit-Reset header
-                                actual_wait = min(calculated_wait, 300)  # Max 5 min wait for safety
-                                
-                                # Add jitter to prevent retry storms for concurrent rate limits
-                                # Concurrent limits don't reset by time - they reset when requests complete
-                                # Stagger retries to avoid all requests hitting the same concurrent slots
-                                if is_concurrent:
-                                    jitter = random.uniform(0, 3)  # 0-3 second random delay for concurrent limits
-                                    actual_wait += jitter
-                                    self.logger.info(f"Concurrent rate limit: Waiting {actual_wait:.1f}s (base: {calculated_wait}s + jitter: {jitter:.1f}s)")
-                                else:
-                                    self.logger.info(f"Org-wide rate limit: Waiting {actual_wait} seconds until X-Rate-Limit-Reset time")
-                                
-                                # Standardized rate_limit_wait event - fixed schema
-                                self._emit_progress("rate_limit_wait", {
-                                    "label": f"rate_limit_{endpoint.strip('/').replace('/api/v1/', '').replace('/', '_')}", 
-                                    "current": 0,
-                                    "total": 0,
-                                    "percent": None,
-                                    "operation_type": "rate_limit",
-                                    "status": "waiting",
-                                    "success": None,
-                                    "errors": 0,
-                                    "wait_seconds": round(actual_wait, 2),
-                                    "message": f"Waiting for {'concurrent' if is_concurrent else 'org-wide'} rate limit..."
-                                })
-                                await asyncio.sleep(actual_wait)
-                                retry_count += 1
-                                continue
+                        self.logger.debug(f"Rate limit status: {remaining}/{limit} requests remaining (reset: {rate_limit_reset})")
                         
-                        # Process response with comprehensive error handling
-                        result = await self._process_response(response)
+                        # Warning if we're getting close to rate limit - use debug for proactive warnings
+                        if remaining <= (limit * 0.1):  # Less than 10% remaining
+                            self.logger.debug(f"Rate limit critical: Only {remaining}/{limit} requests remaining until reset")
+                        elif remaining <= (limit * 0.25):  # Less than 25% remaining  
+                            self.logger.debug(f"Rate limit low: {remaining}/{limit} requests remaining until reset")
+                    
+                    # Handle rate limiting (429)
+                    if response.status == 429:
+                        # Check if this is concurrent or org-wide rate limit
+                        is_concurrent = (rate_limit_limit == '0' and rate_limit_remaining == '0')
                         
-                        # Add Link header and rate limit info for pagination detection
-                        if result["status"] == "success":
-                            # Get ALL Link headers (Okta sends multiple Link headers)
-                            link_headers = response.headers.getall('Link', [])
-                            result["link_header"] = ', '.join(link_headers)
-                            
-                            # Include rate limit information in successful responses
-                            if rate_limit_limit and rate_limit_remaining:
-                                result["rate_limit_info"] = {
-                                    "limit": int(rate_limit_limit),
-                                    "remaining": int(rate_limit_remaining),
-                                    "reset_time": rate_limit_reset
-                                }
-                                self.logger.debug(f"Request successful with rate limit: {rate_limit_remaining}/{rate_limit_limit} remaining")
+                        if is_concurrent:
+                            self.logger.warning(f"Concurrent rate limit exceeded on {endpoint}. Concurrency window reduced for retry {retry_count + 1}/{max_retries}")
+                        else:
+                            self.logger.warning(f"Org-wide rate limit exceeded on {endpoint}. Retry {retry_count + 1}/{max_retries} after X-Rate-Limit-Reset")
+                            self.logger.info(f"Rate limit details: {rate_limit_remaining}/{rate_limit_limit} remaining, resets at epoch {rate_limit_reset}")
                         
-                        return result
+                        if retry_count < max_retries - 1:  # Don't sleep on last retry
+                            if is_concurrent:
+                                # Concurrent limits reset when requests complete: the governor halves
+                                # its window on release, a short jittered pause staggers the retries
+                                retry_wait = random.uniform(1, 3)
+                                self.logger.info(f"Concurrent rate limit: Waiting {retry_wait:.1f}s before retry")
+                            elif not rate_limit_reset:
+                                # Without a reset header the governor cannot pace this bucket
+                                retry_wait = self._calculate_rate_limit_wait_time(rate_limit_reset)
+                                self.logger.info(f"Org-wide rate limit: Waiting {retry_wait} seconds")
+                            # Org-wide limits: the next acquire() waits for the bucket reset
+                            retry_count += 1
+                            continue
+                    
+                    # Process response with comprehensive error handling
+                    result = await self._process_response(response)
+                    
+                    # Add Link header and rate limit info for pagination detection
+                    if result["status"] == "success":
+                        # Get ALL Link headers (Okta sends multiple Link headers)
+                        link_headers = response.headers.getall('Link', [])
+                        result["link_header"] = ', '.join(link_headers)
                         
-                except asyncio.TimeoutError:
-                    self.logger.error(f"Request timeout after {self.timeout} seconds for {endpoint}")
-                    sys.stderr.flush()  # Flush error logs immediately
-                    return {
-                        "status": "error",
-                        "error": f"Request timeout after {self.timeout} seconds",
-                        "error_code": "TIMEOUT"
-                    }
-                except aiohttp.ClientError as e:
-                    self.logger.error(f"Network error for {endpoint}: {str(e)}")
-                    sys.stderr.flush()  # Flush error logs immediately
-                    return {
-                        "status": "error", 
-                        "error": f"Network error: {str(e)}",
-                        "error_code": "NETWORK_ERROR"
-                    }
-                except Exception as e:
-                    self.logger.error(f"Unexpected error for {endpoint}: {str(e)}")
-                    sys.stderr.flush()  # Flush error logs immediately
-                    return {
-                        "status": "error",
-                        "error": f"Unexpected error: {str(e)}",
-                        "error_code": "UNEXPECTED_ERROR"
-                    }
-            
-            # All retries exhausted
-            self.logger.error(f"All {max_retries} retries exhausted for {endpoint} due to rate limiting")
-            sys.stderr.flush()  # Flush error logs immediately
-            return {
-                "status": "error",
-                "error": f"Request failed after {max_retries} retries due to rate limiting",
-                "error_code": "E0000047",
-                "rate_limit_exceeded": True
-            }
-    
+                        # Include rate limit information in successful responses
+                        if rate_limit_limit and rate_limit_remaining:
+                            result["rate_limit_info"] = {
+                                "limit": int(rate_limit_limit),
+                                "remaining": int(rate_limit_remaining),
+                                "reset_time": rate_limit_reset
+                            }
+                            self.logger.debug(f"Request successful with rate limit: {rate_limit_remaining}/{rate_limit_limit} remaining")
+                    
+                    return result
+                    
+            except asyncio.TimeoutError:
+                self.logger.error(f"Request timeout after {self.timeout} seconds for {endpoint}")
+                sys.stderr.flush()  # Flush error logs immediately
+                return {
+                    "status": "error",
+                    "error": f"Request timeout after {self.timeout} seconds",
+                    "error_code": "TIMEOUT"
+                }
+            except aiohttp.ClientError as e:
+                self.logger.error(f"Network error for {endpoint}: {str(e)}")
+                sys.stderr.flush()  # Flush error logs immediately
+                return {
+                    "status": "error", 
+                    "error": f"Network error: {str(e)}",
+                    "error_code": "NETWORK_ERROR"
+                }
+            except Exception as e:
+                self.logger.error(f"Unexpected error for {endpoint}: {str(e)}")
+                sys.stderr.flush()  # Flush error logs immediately
+                return {
+                    "status": "error",
+                    "error": f"Unexpected error: {str(e)}",
+                    "error_code": "UNEXPECTED_ERROR"
+                }
+            finally:
+                await governor.release(url, response_status, response_headers)
+        
+        # All retries exhausted
+        self.logger.error(f"All {max_retries} retries exhausted for {endpoint} due to rate limiting")
+        sys.stderr.flush()  # Flush error logs immediately
+        return {
+            "status": "error",
+            "error": f"Request failed after {max_retries} retries due to rate limiting",
+            "error_code": "E0000047",
+            "rate_limit_exceeded": True
+        }
+
     def _extract_next_url(self, link_header: str) -> Optional[str]:
         """Extract next URL from Link header."""
         if not link_header or 'rel="next"' not in link_header:
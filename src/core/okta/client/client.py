@@ -21,12 +21,14 @@ from urllib.parse import urlparse
 import time, logging, re
 from okta.client import Client as OktaClient
 from datetime import datetime
-from typing import List, Any, Optional, Tuple, TypeVar, Type, Dict, Final, Callable, Union
+from typing import List, Any, AsyncIterator, Awaitable, Optional, Tuple, TypeVar, Type, Dict, Final, Callable, Union
 from src.config.settings import settings
 from src.utils.logging import logger    
 from okta.models import User, Group, Policy, Application
 from datetime import timezone
 from src.utils.pagination_limits import _paginate_direct_api
+from src.core.okta.client.base_okta_api_client import get_rate_limit_governor
+from src.core.okta.sync.metrics import record_api_call, record_rate_limit_wait, record_queue_depth
 
 
 T = TypeVar('T')
@@ -195,6 +197,7 @@ class OktaClientWrapper:
     - Data transformation to match database models
     - Error handling and logging
     - Global API request rate limiting with semaphore
+    - Header-driven pacing shared with OktaAPIClient (RateLimitGovernor)
     - Cancellation support
     """
     
@@ -202,10 +205,13 @@ class OktaClientWrapper:
     USER_PAGE_SIZE: Final[int] = 200
     GROUP_PAGE_SIZE: Final[int] = 1000
     APP_PAGE_SIZE: Final[int] = 100
+    APP_USERS_PAGE_SIZE: Final[int] = 200
     POLICY_PAGE_SIZE: Final[int] = 200
     AUTH_PAGE_SIZE: Final[int] = 100
     FACTOR_PAGE_SIZE: Final[int] = 50
     DEVICE_PAGE_SIZE: Final[int] = 200
+    GROUP_MEMBER_PAGE_SIZE: Final[int] = 1000
+    LOG_PAGE_SIZE: Final[int] = 1000
   
     # Rate limit delay between requests (minimal delay to yield to event loop)
     RATE_LIMIT_DELAY: Final[float] = 0.01
@@ -268,16 +274,101 @@ class OktaClientWrapper:
         # Track authentication errors
         self.auth_errors = []
         
+        # When True, memberships are harvested per group and users skip get_user_groups
+        self.harvest_group_memberships = False
+        
+        # Pages that failed mid-pagination; a list that stopped early must not drive deletions
+        self.pagination_errors = 0
+        
+        # Resuming an interrupted sync: Okta `after` cursor each listing (entity_name) starts from
+        self.resume_after: Dict[str, str] = {}
+        # Next-page link of the page being handed to processor_func, per listing (None on the last
+        # page), so the caller can checkpoint the position once the page is committed
+        self.next_page_links: Dict[str, Optional[str]] = {}
+        
+        # Shared Okta rate-limit governor, attached to the SDK client in __aenter__
+        self.rate_limit_governor = None
+        
+        # Writer for assignments of apps too large to buffer (APP_ASSIGNMENT_STREAM_THRESHOLD),
+        # called as sink(app_data, assignments, first_chunk); None buffers every app in memory
+        self.app_assignment_sink: Optional[Callable[[Dict, List[Dict], bool], Awaitable[None]]] = None
+        
 
     async def __aenter__(self):
         self.client = OktaClient(self.config)
+        self._install_rate_limit_governor()
         logger.info(f"Okta concurrent limit: {settings.OKTA_CONCURRENT_LIMIT}, "
                f"max concurrent users: {settings.MAX_CONCURRENT_USERS}")        
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.rate_limit_governor:
+            logger.info(f"Okta rate limit governor: {self.rate_limit_governor.snapshot()}")
         self.client = None
 
+    def _install_rate_limit_governor(self) -> None:
+        """
+        Route every SDK HTTP request through the shared RateLimitGovernor.
+        
+        The SDK has no request hook, so the request executor's fire_request is wrapped:
+        the governor paces the request before it is sent and learns from the
+        X-Rate-Limit-* headers and status of the response (including pagination calls).
+        
+        The HTTP client's send_request (once per attempt, SDK 429 retries included) and
+        the SDK's 429 backoff are wrapped as well, for the sync phase telemetry.
+        """
+        self.rate_limit_governor = get_rate_limit_governor()
+        governor = self.rate_limit_governor
+        request_executor = self.client.get_request_executor()
+        fire_request = request_executor.fire_request
+
+        async def governed_fire_request(request):
+            url = request.get("url", "") if isinstance(request, dict) else ""
+            record_rate_limit_wait(await governor.acquire(url))
+            status = None
+            headers = None
+            try:
+                result = await fire_request(request)
+                res_details = result[1] if isinstance(result, tuple) and len(result) > 1 else None
+                if res_details is not None:
+                    status = getattr(res_details, 'status', None)
+                    headers = getattr(res_details, 'headers', None)
+                return result
+            finally:
+                await governor.release(url, status, headers)
+
+        request_executor.fire_request = governed_fire_request
+
+        http_client = getattr(request_executor, '_http_client', None)
+        if http_client is not None:
+            send_request = http_client.send_request
+
+            async def timed_send_request(request):
+                started = time.perf_counter()
+                result = await send_request(request)
+                res_details = result[1] if isinstance(result, tuple) and len(result) > 1 else None
+                record_api_call(getattr(res_details, 'status', None), time.perf_counter() - started)
+                return result
+
+            http_client.send_request = timed_send_request
+
+        pause_for_backoff = request_executor.pause_for_backoff
+
+        async def timed_pause_for_backoff(backoff_time):
+            record_rate_limit_wait(float(backoff_time))
+            await pause_for_backoff(backoff_time)
+
+        request_executor.pause_for_backoff = timed_pause_for_backoff
+
+    def _record_api_call(self, status: Optional[int], seconds: float) -> None:
+        """Count a request made outside the SDK (direct API pagination) in the sync telemetry."""
+        record_api_call(status, seconds)
+
+    def _note_pagination_error(self, entity_name: str) -> None:
+        """Record that a listing of entity_name stopped before its last page."""
+        self.pagination_errors += 1
+        logger.warning(f"{entity_name} listing is incomplete ({self.pagination_errors} pagination errors so far)")
+
     async def _execute_with_semaphore(self, api_func, *args, **kwargs):
         """
         Execute an API call with semaphore control to respect rate limits.
@@ -314,6 +405,99 @@ class OktaClientWrapper:
             logger.error(f"Error executing API call with semaphore: {str(e)}")
             raise
 
+    async def _transform_page(
+        self,
+        items,
+        transform_batch_func,
+        batch_size=None,
+        concurrent_transform=False
+    ) -> List[Dict]:
+        """
+        Transform one page of API items.
+        
+        Args:
+            items: Raw items returned by the API for a page
+            transform_batch_func: Function to transform items (per item if concurrent, else per batch)
+            batch_size: Max concurrent per-item transforms
+            concurrent_transform: If True, transform items in parallel
+            
+        Returns:
+            List of transformed items
+        """
+        if batch_size and concurrent_transform:
+            # Continuous pipelining: Use semaphore to limit concurrency without rigid batching
+            # This eliminates the "straggler problem" where fast items wait for slow ones
+            semaphore = asyncio.Semaphore(batch_size)
+            
+            async def process_with_limit(item):
+                # Check for cancellation
+                if self.cancellation_flag and self.cancellation_flag.is_set():
+                    return None
+                
+                async with semaphore:
+                    if asyncio.iscoroutinefunction(transform_batch_func):
+                        return await transform_batch_func(item)
+                    else:
+                        return await asyncio.to_thread(transform_batch_func, item)
+            
+            # Launch all tasks (semaphore controls concurrency)
+            all_tasks = [process_with_limit(item) for item in items]
+            results = await asyncio.gather(*all_tasks, return_exceptions=True)
+            
+            # Filter successful results
+            return [r for r in results if r is not None and not isinstance(r, Exception)]
+        
+        # Simple transformation for the whole batch
+        if asyncio.iscoroutinefunction(transform_batch_func):
+            return await transform_batch_func(items)
+        return transform_batch_func(items)
+
+    async def _prefetch_pages(self, response, page_queue: asyncio.Queue, entity_name: str) -> None:
+        """
+        Producer for pipelined pagination: download pages ahead of the consumer.
+        
+        Pages are put on a bounded queue as (page_num, items, next_link) tuples, so at
+        most the queue size of pages wait in memory while the current page is persisted.
+        A final None marks the end of pagination (normal, error or cancellation).
+        """
+        page_num = 1
+        try:
+            while response and hasattr(response, 'has_next') and response.has_next():
+                # Check for cancellation before fetching next page
+                if self.cancellation_flag and self.cancellation_flag.is_set():
+                    logger.info(f"Cancellation requested, stopping {entity_name} prefetch")
+                    break
+                
+                page_num += 1
+                logger.info(f"Prefetching page {page_num} of {entity_name}")
+                
+                # Get next page
+                async with self.api_semaphore:
+                    next_response = await response.next()
+                    await asyncio.sleep(self.RATE_LIMIT_DELAY)
+                
+                items, error = normalize_okta_response(next_response)
+                
+                if error:
+                    logger.error(f"Error retrieving page {page_num} of {entity_name}: {error}")
+                    self._note_pagination_error(entity_name)
+                    break
+                
+                if not items:
+                    logger.info(f"Page {page_num} contained no {entity_name}")
+                    continue
+                
+                await page_queue.put((page_num, items, getattr(response, '_next', None)))
+        except StopAsyncIteration:
+            logger.info(f"Pagination complete after {page_num - 1} pages")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error prefetching page {page_num} of {entity_name}: {str(e)}")
+            self._note_pagination_error(entity_name)
+        
+        await page_queue.put(None)
+
     async def _paginate(
         self,
         api_method,
@@ -329,6 +513,10 @@ class OktaClientWrapper:
         """
         Common pagination function for all Okta API methods.
         
+        When a processor_func is given and SYNC_PAGE_PREFETCH_DEPTH > 0, pagination is
+        pipelined: a producer task downloads up to that many pages ahead through a
+        bounded queue while the current page is transformed and persisted.
+        
         Args:
             api_method: Okta API method to call
             query_params: Query parameters for API call
@@ -351,6 +539,11 @@ class OktaClientWrapper:
             total_processed = 0
             all_items = []
             
+            resume_after = self.resume_after.pop(entity_name, None)
+            if resume_after:
+                logger.info(f"Resuming {entity_name} listing after cursor {resume_after}")
+                query_params = {**(query_params or {}), 'after': resume_after}
+            
             # Initial API call
             api_response = await self._execute_with_semaphore(
                 api_method, *args, query_params=query_params, **kwargs
@@ -365,56 +558,32 @@ class OktaClientWrapper:
                 # Track auth errors (401, invalid_client, E0000011, etc.)
                 if any(auth_err in error_str for auth_err in ['401', 'E0000011', 'invalid_client', 'Invalid token', 'invalid_token']):
                     self.auth_errors.append(f"{entity_name}: {error_str}")
+                self._note_pagination_error(entity_name)
                 return [] if not processor_func else 0
             
             # Get response object for pagination
             response = api_response[1] if isinstance(api_response, tuple) and len(api_response) > 1 else None
             
+            prefetch_depth = settings.SYNC_PAGE_PREFETCH_DEPTH if processor_func else 0
+            if prefetch_depth > 0:
+                return await self._paginate_pipelined(
+                    response, items, transform_batch_func, processor_func,
+                    entity_name, batch_size, concurrent_transform, prefetch_depth
+                )
+            
             # Process first page
             if items:
-                if batch_size and concurrent_transform:
-                    # Continuous pipelining: Use semaphore to limit concurrency without rigid batching
-                    # This eliminates the "straggler problem" where fast items wait for slow ones
-                    semaphore = asyncio.Semaphore(batch_size)
-                    
-                    async def process_with_limit(item):
-                        # Check for cancellation
-                        if self.cancellation_flag and self.cancellation_flag.is_set():
-                            return None
-                        
-                        async with semaphore:
-                            if asyncio.iscoroutinefunction(transform_batch_func):
-                                return await transform_batch_func(item)
-                            else:
-                                return await asyncio.to_thread(transform_batch_func, item)
-                    
-                    # Launch all tasks (semaphore controls concurrency)
-                    all_tasks = [process_with_limit(item) for item in items]
-                    results = await asyncio.gather(*all_tasks, return_exceptions=True)
-                    
-                    # Filter successful results
-                    transformed_batch = [r for r in results if r is not None and not isinstance(r, Exception)]
-                    
-                    # Process or collect the transformed batch
-                    if processor_func and transformed_batch:
-                        await processor_func(transformed_batch)
-                        total_processed += len(transformed_batch)
-                        logger.info(f"Processed {len(transformed_batch)} {entity_name}, total: {total_processed}")
-                    elif transformed_batch:
-                        all_items.extend(transformed_batch)
-                else:
-                    # Simple transformation for the whole batch
-                    if asyncio.iscoroutinefunction(transform_batch_func):
-                        transformed_batch = await transform_batch_func(items)
-                    else:
-                        transformed_batch = transform_batch_func(items)
-                    
-                    if processor_func and transformed_batch:
-                        await processor_func(transformed_batch)
-                        total_processed += len(transformed_batch)
-                        logger.info(f"Processed {len(transformed_batch)} {entity_name}, total: {total_processed}")
-                    elif transformed_batch:
-                        all_items.extend(transformed_batch)
+                transformed_batch = await self._transform_page(
+                    items, transform_batch_func, batch_size, concurrent_transform
+                )
+                
+                if processor_func and transformed_batch:
+                    self.next_page_links[entity_name] = getattr(response, '_next', None)
+                    await processor_func(transformed_batch)
+                    total_processed += len(transformed_batch)
+                    logger.info(f"Processed {len(transformed_batch)} {entity_name}, total: {total_processed}")
+                elif transformed_batch:
+                    all_items.extend(transformed_batch)
             
             # Process remaining pages
             page_num = 1
@@ -438,6 +607,7 @@ class OktaClientWrapper:
                     
                     if error:
                         logger.error(f"Error retrieving page {page_num} of {entity_name}: {error}")
+                        self._note_pagination_error(entity_name)
                         break
                         
                     if not items:
@@ -445,54 +615,24 @@ class OktaClientWrapper:
                         continue
                     
                     # Process items using the same logic as the first page
-                    if batch_size and concurrent_transform:
-                        # Continuous pipelining: Use semaphore to limit concurrency
-                        semaphore = asyncio.Semaphore(batch_size)
-                        
-                        async def process_with_limit(item):
-                            # Check for cancellation
-                            if self.cancellation_flag and self.cancellation_flag.is_set():
-                                return None
-                            
-                            async with semaphore:
-                                if asyncio.iscoroutinefunction(transform_batch_func):
-                                    return await transform_batch_func(item)
-                                else:
-                                    return await asyncio.to_thread(transform_batch_func, item)
-                        
-                        # Launch all tasks (semaphore controls concurrency)
-                        all_tasks = [process_with_limit(item) for item in items]
-                        results = await asyncio.gather(*all_tasks, return_exceptions=True)
-                        
-                        # Filter successful results
-                        transformed_batch = [r for r in results if r is not None and not isinstance(r, Exception)]
-                        
-                        # Process or collect the transformed batch
-                        if processor_func and transformed_batch:
-                            await processor_func(transformed_batch)
-                            total_processed += len(transformed_batch)
-                            logger.info(f"Processed {len(transformed_batch)} {entity_name} from page {page_num}, total: {total_processed}")
-                        elif transformed_batch:
-                            all_items.extend(transformed_batch)
-                    else:
-                        # Simple transformation for the whole batch
-                        if asyncio.iscoroutinefunction(transform_batch_func):
-                            transformed_batch = await transform_batch_func(items)
-                        else:
-                            transformed_batch = transform_batch_func(items)
-                        
-                        if processor_func and transformed_batch:
-                            await processor_func(transformed_batch)
-                            total_processed += len(transformed_batch)
-                            logger.info(f"Processed {len(transformed_batch)} {entity_name} from page {page_num}, total: {total_processed}")
-                        elif transformed_batch:
-                            all_items.extend(transformed_batch)
+                    transformed_batch = await self._transform_page(
+                        items, transform_batch_func, batch_size, concurrent_transform
+                    )
+                    
+                    if processor_func and transformed_batch:
+                        self.next_page_links[entity_name] = getattr(response, '_next', None)
+                        await processor_func(transformed_batch)
+                        total_processed += len(transformed_batch)
+                        logger.info(f"Processed {len(transformed_batch)} {entity_name} from page {page_num}, total: {total_processed}")
+                    elif transformed_batch:
+                        all_items.extend(transformed_batch)
                     
                 except StopAsyncIteration:
                     logger.info(f"Pagination complete after {page_num - 1} pages")
                     break
                 except Exception as e:
                     logger.error(f"Error processing page {page_num} of {entity_name}: {str(e)}")
+                    self._note_pagination_error(entity_name)
                     break
             
             # Return appropriate result
@@ -509,6 +649,86 @@ class OktaClientWrapper:
         except Exception as e:
             logger.error(f"Error in pagination for {entity_name}: {str(e)}")
             raise
+
+    async def _paginate_pipelined(
+        self,
+        response,
+        first_items,
+        transform_batch_func,
+        processor_func,
+        entity_name,
+        batch_size,
+        concurrent_transform,
+        prefetch_depth: int
+    ) -> int:
+        """
+        Consume pages from a prefetching producer so page downloads overlap DB writes.
+        
+        Args:
+            response: SDK response object of the first page (drives pagination)
+            first_items: Items of the already-fetched first page
+            transform_batch_func: Function to transform items
+            processor_func: Function to persist each transformed page
+            entity_name: Entity name for logging
+            batch_size: Max concurrent per-item transforms
+            concurrent_transform: If True, transform items in parallel
+            prefetch_depth: Max pages downloaded ahead of the consumer
+            
+        Returns:
+            Count of processed records
+        """
+        total_processed = 0
+        # Read before the producer advances the response to later pages
+        next_link = getattr(response, '_next', None)
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch_depth)
+        producer_task = asyncio.create_task(self._prefetch_pages(response, page_queue, entity_name))
+        logger.debug(f"Started {entity_name} page prefetch with depth {prefetch_depth}")
+        
+        try:
+            page_num, items = 1, first_items
+            while True:
+                if items:
+                    try:
+                        transformed_batch = await self._transform_page(
+                            items, transform_batch_func, batch_size, concurrent_transform
+                        )
+                        
+                        if transformed_batch:
+                            self.next_page_links[entity_name] = next_link
+                            await processor_func(transformed_batch)
+                            total_processed += len(transformed_batch)
+                            logger.info(
+                                f"Processed {len(transformed_batch)} {entity_name} from page {page_num}, "
+                                f"total: {total_processed} (prefetched pages waiting: {page_queue.qsize()})"
+                            )
+                    except Exception as e:
+                        # A failed transform or DB write must fail the sync, not end it with
+                        # partial data (the finally block stops the producer)
+                        logger.error(f"Error processing page {page_num} of {entity_name}: {str(e)}")
+                        raise
+                
+                # Check for cancellation before taking the next page
+                if self.cancellation_flag and self.cancellation_flag.is_set():
+                    logger.info(f"Cancellation requested, stopping {entity_name} pagination")
+                    break
+                
+                # Full queue: the writer is the bottleneck; empty: the API is
+                # (a finished producer has queued its end-of-pages marker)
+                record_queue_depth(page_queue.qsize() - (1 if producer_task.done() else 0))
+                next_page = await page_queue.get()
+                if next_page is None:
+                    break
+                page_num, items, next_link = next_page
+        finally:
+            if not producer_task.done():
+                producer_task.cancel()
+            try:
+                await producer_task
+            except asyncio.CancelledError:
+                pass
+        
+        logger.info(f"Completed processing all {total_processed} {entity_name}")
+        return total_processed
         
     async def list_groups(
         self, 
@@ -532,9 +752,12 @@ class OktaClientWrapper:
             query_params = {"limit": self.GROUP_PAGE_SIZE}
             
             # Add filter for incremental sync if needed
+            # (membership changes only move lastMembershipUpdated, not lastUpdated)
             if since:
                 since_str = since.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-                query_params["filter"] = f"lastUpdated gt \"{since_str}\""
+                query_params["filter"] = (
+                    f"lastUpdated gt \"{since_str}\" or lastMembershipUpdated gt \"{since_str}\""
+                )
             
             # Use common pagination function
             return await self._paginate(
@@ -586,7 +809,8 @@ class OktaClientWrapper:
         This runs after groups are already in the database.
         
         Args:
-            since: Optional timestamp for incremental sync
+            since: Not used - /api/v1/apps has no lastUpdated filter, so incremental
+                syncs list the (small) application set in full
             processor_func: Function to process batches immediately
             
         Returns:
@@ -597,11 +821,6 @@ class OktaClientWrapper:
             # Set up query parameters
             query_params = {"limit": self.APP_PAGE_SIZE}
             
-            # Add filter for incremental sync if needed
-            if since:
-                since_str = since.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-                query_params["filter"] = f"lastUpdated gt \"{since_str}\""
-            
             # Use common pagination function with parallel processing
             return await self._paginate(
                 api_method=self.client.list_applications,
@@ -720,7 +939,17 @@ class OktaClientWrapper:
             factors = []
             
             # Only fetch relationships for non-deprovisioned users
-            if user_status != 'DEPROVISIONED':
+            if user_status != 'DEPROVISIONED' and self.harvest_group_memberships:
+                # Memberships were already harvested per group - only factors are per user
+                results = await asyncio.gather(
+                    self.list_user_factors([user_okta_id]),
+                    return_exceptions=True
+                )
+                factors = results[0] if not isinstance(results[0], Exception) else []
+                
+                if isinstance(results[0], Exception):
+                    logger.warning(f"Partial data failure for user {user_okta_id}")
+            elif user_status != 'DEPROVISIONED':
                 # PARALLEL EXECUTION: Fire both requests simultaneously
                 # This reduces wait time from sequential to parallel
                 results = await asyncio.gather(
@@ -789,9 +1018,12 @@ class OktaClientWrapper:
         """
         Transform application with ALL user assignments (direct + group).
         
-        Note: Fetches all user assignments for the app in memory.
-        For most apps (<1000 users), this is fine (~50KB).
-        For apps with 10,000+ users, consider streaming implementation.
+        Assignments are buffered on app_data['user_assignments'] and written with the
+        application's page. Once an app has more than APP_ASSIGNMENT_STREAM_THRESHOLD
+        assignments and an app_assignment_sink is set, the buffer and every following page
+        go to the sink instead and app_data['user_assignments_streamed'] is set, so memory
+        per app stays at one threshold plus one page however large the app is.
+        Small apps keep being fetched concurrently (MAX_CONCURRENT_APPS per batch).
         """
         try:
             # Extract app ID
@@ -805,12 +1037,25 @@ class OktaClientWrapper:
             if not app_data:
                 return None
             
-            # Get ALL user assignments for this app (replaces group-only fetching)
-            # Pagination is handled internally by get_app_users()
-            user_assignments = await self.get_app_users(okta_id)
+            threshold = max(0, settings.APP_ASSIGNMENT_STREAM_THRESHOLD)
+            user_assignments = []
+            streamed = 0
+            async for page in self.iter_app_user_pages(okta_id):
+                if not streamed and (self.app_assignment_sink is None or len(user_assignments) + len(page) <= threshold):
+                    user_assignments.extend(page)
+                    continue
+                
+                # Too large to buffer: hand over what we have and stream the rest page by page
+                chunk = user_assignments + page if not streamed else page
+                await self.app_assignment_sink(app_data, chunk, streamed == 0)
+                streamed += len(chunk)
+                user_assignments = []
             await asyncio.sleep(0.1)
             
-            if user_assignments:
+            if streamed:
+                app_data['user_assignments_streamed'] = True
+                logger.info(f"App {okta_id}: streamed {streamed} user assignments")
+            elif user_assignments:
                 app_data['user_assignments'] = user_assignments
                 logger.debug(f"App {okta_id} has {len(user_assignments)} user assignments")
             
@@ -885,7 +1130,8 @@ class OktaClientWrapper:
         List policies with optional API-to-DB streaming support.
         
         Args:
-            since: Optional timestamp filter
+            since: Not used - /api/v1/policies has no lastUpdated filter, so incremental
+                syncs list the (small) policy set in full
             processor_func: Function to process batches immediately
             
         Returns:
@@ -916,10 +1162,6 @@ class OktaClientWrapper:
                     "limit": self.POLICY_PAGE_SIZE
                 }
                 
-                if since:
-                    since_str = since.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-                    query_params["filter"] = f"lastUpdated gt \"{since_str}\""
-                
                 try:
                     # Use common pagination function for each policy type
                     # Create a transform function specifically for this policy type
@@ -1326,6 +1568,115 @@ class OktaClientWrapper:
             logger.error(f"Error getting groups for user {user_okta_id}: {str(e)}")
             return []
 
+    async def get_group_members(self, group_okta_id: str) -> List[Dict]:
+        """
+        Get users that are members of a group (user→group membership rows).
+        
+        Raises on API errors instead of returning a partial list, so a failed group
+        can't be mistaken for an empty one.
+        """
+        try:
+            # Check for cancellation
+            if self.cancellation_flag and self.cancellation_flag.is_set():
+                logger.info(f"Cancellation requested, skipping members for group {group_okta_id}")
+                return []
+            
+            # Use SDK's method with semaphore
+            api_response = await self._execute_with_semaphore(
+                self.client.list_group_users,
+                group_okta_id,
+                query_params={"limit": self.GROUP_MEMBER_PAGE_SIZE}
+            )
+            
+            # Process response using normalize_okta_response
+            users, error = normalize_okta_response(api_response)
+            
+            # Get response object for pagination
+            response = api_response[1] if isinstance(api_response, tuple) and len(api_response) > 1 else None
+            
+            if error:
+                raise RuntimeError(f"Error getting members for group {group_okta_id}: {error}")
+            
+            memberships = []
+            page_num = 1
+            while True:
+                for user in users or []:
+                    user_id = user.id if hasattr(user, 'id') else user.get('id')
+                    if user_id:
+                        memberships.append({
+                            'user_okta_id': user_id,
+                            'group_okta_id': group_okta_id
+                        })
+                
+                if not (response and hasattr(response, 'has_next') and response.has_next()):
+                    break
+                
+                # Check for cancellation
+                if self.cancellation_flag and self.cancellation_flag.is_set():
+                    logger.info(f"Cancellation requested, stopping members pagination for group {group_okta_id}")
+                    break
+                
+                page_num += 1
+                
+                try:
+                    # Get next page with semaphore protection
+                    async with self.api_semaphore:
+                        next_response = await response.next()
+                        await asyncio.sleep(self.RATE_LIMIT_DELAY)
+                except StopAsyncIteration:
+                    break
+                
+                users, error = normalize_okta_response(next_response)
+                if error:
+                    raise RuntimeError(f"Error on page {page_num} for group {group_okta_id} members: {error}")
+            
+            return memberships
+            
+        except Exception as e:
+            logger.error(f"Error getting members for group {group_okta_id}: {str(e)}")
+            raise
+
+    async def list_group_memberships(self, group_okta_ids: List[str]) -> List[Dict]:
+        """
+        Harvest user→group memberships tenant-wide by listing the members of each group.
+        
+        Costs roughly one request per group (plus one per extra page of members)
+        instead of one get_user_groups request per user.
+        
+        Args:
+            group_okta_ids: Okta IDs of the groups to harvest
+            
+        Returns:
+            List of {'user_okta_id', 'group_okta_id'} dictionaries
+            
+        Raises:
+            RuntimeError: When any group could not be listed completely; the caller
+            falls back to per-user lookups rather than dropping that group's members
+        """
+        semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_GROUPS)
+        
+        async def harvest_group(group_okta_id):
+            async with semaphore:
+                return await self.get_group_members(group_okta_id)
+        
+        results = await asyncio.gather(
+            *(harvest_group(group_okta_id) for group_okta_id in group_okta_ids),
+            return_exceptions=True
+        )
+        
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            raise RuntimeError(
+                f"Membership harvest failed for {len(failures)} of {len(group_okta_ids)} groups: {str(failures[0])}"
+            )
+        
+        memberships = []
+        for result in results:
+            memberships.extend(result)
+        
+        logger.info(f"Harvested {len(memberships)} group memberships from {len(group_okta_ids)} groups")
+        return memberships
+
     async def get_app_groups(self, app_okta_id: str) -> List[Dict]:
         """Get groups assigned to an application with pagination"""
         try:
@@ -1415,13 +1766,47 @@ class OktaClientWrapper:
             logger.error(f"Error getting groups for app {app_okta_id}: {str(e)}")
             return []
 
-    async def get_app_users(self, app_okta_id: str) -> List[Dict]:
+    def _transform_app_user_assignment(self, app_okta_id: str, user_assignment) -> Optional[Dict]:
+        """Transform one /apps/{appId}/users entry into an assignment record (None without a user id)."""
+        user_dict = user_assignment if isinstance(user_assignment, dict) else user_assignment.as_dict()
+        
+        user_id = user_dict.get('id')
+        if not user_id:
+            return None
+        scope = user_dict.get('scope', 'USER')
+        assignment_type = 'DIRECT' if scope == 'USER' else 'GROUP'
+        
+        # Extract group info from _links if scope=GROUP
+        links = user_dict.get('_links', {})
+        group_info = links.get('group', {})
+        group_name = group_info.get('name') if scope == 'GROUP' else None
+        group_okta_id = None
+        if scope == 'GROUP' and group_info.get('href'):
+            group_okta_id = group_info['href'].split('/')[-1]
+        
+        return {
+            'user_okta_id': user_id,
+            'application_okta_id': app_okta_id,
+            'assignment_id': user_id,
+            'scope': scope,
+            'assignment_type': assignment_type,
+            'group_name': group_name,
+            'group_okta_id': group_okta_id,
+            'created_at': parse_timestamp(user_dict.get('created')),
+            'last_updated_at': parse_timestamp(user_dict.get('lastUpdated')),
+            'status': user_dict.get('status', 'ACTIVE'),
+            'credentials_setup': False,  # Not available in this endpoint
+            'hidden': False              # Not available in this endpoint
+        }
+
+    async def iter_app_user_pages(self, app_okta_id: str) -> AsyncIterator[List[Dict]]:
         """
-        Fetch ALL user assignments for an application.
+        Yield the user assignments of an application one API page at a time.
         Uses /api/v1/apps/{appId}/users endpoint.
-        Handles pagination for apps with 100s of users.
         
-        Returns assignments with scope information (USER vs GROUP).
+        Only the current page is held in memory, so apps with 100k+ assignments can be
+        written as they are fetched. Assignments carry scope information (USER vs GROUP).
+        Errors end the iteration early (logged), like a short listing.
         """
         try:
             logger.debug(f"Fetching users for application {app_okta_id}")
@@ -1429,10 +1814,10 @@ class OktaClientWrapper:
             # Check for cancellation
             if self.cancellation_flag and self.cancellation_flag.is_set():
                 logger.info(f"Cancellation requested, skipping users for app {app_okta_id}")
-                return []
+                return
                 
             # Set pagination parameters - apps can have 100s of users
-            query_params = {"limit": 200}
+            query_params = {"limit": self.APP_USERS_PAGE_SIZE}
             
             # Initial API call
             api_response = await self._execute_with_semaphore(
@@ -1447,105 +1832,63 @@ class OktaClientWrapper:
             
             if error:
                 logger.error(f"Error getting users for app {app_okta_id}: {error}")
-                return []
+                return
+        except Exception as e:
+            logger.error(f"Error getting users for app {app_okta_id}: {str(e)}")
+            return
+        
+        page = [a for a in (self._transform_app_user_assignment(app_okta_id, u) for u in users) if a]
+        del users
+        yield page
+        
+        # Handle pagination
+        page_num = 1
+        while response and hasattr(response, 'has_next') and response.has_next():
+            if self.cancellation_flag and self.cancellation_flag.is_set():
+                logger.info(f"Cancellation requested, stopping users pagination")
+                break
             
-            # Process first page
-            all_users = []
-            for user_assignment in users:
-                user_dict = user_assignment if isinstance(user_assignment, dict) else user_assignment.as_dict()
-                
-                user_id = user_dict.get('id')
-                scope = user_dict.get('scope', 'USER')
-                assignment_type = 'DIRECT' if scope == 'USER' else 'GROUP'
-                
-                # Extract group info from _links if scope=GROUP
-                links = user_dict.get('_links', {})
-                group_info = links.get('group', {})
-                group_name = group_info.get('name') if scope == 'GROUP' else None
-                group_okta_id = None
-                if scope == 'GROUP' and group_info.get('href'):
-                    group_okta_id = group_info['href'].split('/')[-1]
-                
-                if user_id:
-                    all_users.append({
-                        'user_okta_id': user_id,
-                        'application_okta_id': app_okta_id,
-                        'assignment_id': user_id,
-                        'scope': scope,
-                        'assignment_type': assignment_type,
-                        'group_name': group_name,
-                        'group_okta_id': group_okta_id,
-                        'created_at': parse_timestamp(user_dict.get('created')),
-                        'last_updated_at': parse_timestamp(user_dict.get('lastUpdated')),
-                        'status': user_dict.get('status', 'ACTIVE'),
-                        'credentials_setup': False,  # Not available in this endpoint
-                        'hidden': False              # Not available in this endpoint
-                    })
+            page_num += 1
+            logger.debug(f"Fetching page {page_num} of users for app {app_okta_id}")
             
-            # Handle pagination
-            page_num = 1
-            while response and hasattr(response, 'has_next') and response.has_next():
-                if self.cancellation_flag and self.cancellation_flag.is_set():
-                    logger.info(f"Cancellation requested, stopping users pagination")
-                    break
-                
-                page_num += 1
-                logger.debug(f"Fetching page {page_num} of users for app {app_okta_id}")
+            try:
+                async with self.api_semaphore:
+                    next_response = await response.next()
+                    await asyncio.sleep(self.RATE_LIMIT_DELAY)
                 
-                try:
-                    async with self.api_semaphore:
-                        next_response = await response.next()
-                        await asyncio.sleep(self.RATE_LIMIT_DELAY)
-                    
-                    users, error = normalize_okta_response(next_response)
-                    
-                    if error:
-                        logger.error(f"Error on page {page_num}: {error}")
-                        break
-                        
-                    # Process this page
-                    for user_assignment in users:
-                        user_dict = user_assignment if isinstance(user_assignment, dict) else user_assignment.as_dict()
-                        user_id = user_dict.get('id')
-                        scope = user_dict.get('scope', 'USER')
-                        assignment_type = 'DIRECT' if scope == 'USER' else 'GROUP'
-                        
-                        links = user_dict.get('_links', {})
-                        group_info = links.get('group', {})
-                        group_name = group_info.get('name') if scope == 'GROUP' else None
-                        group_okta_id = None
-                        if scope == 'GROUP' and group_info.get('href'):
-                            group_okta_id = group_info['href'].split('/')[-1]
-                        
-                        if user_id:
-                            all_users.append({
-                                'user_okta_id': user_id,
-                                'application_okta_id': app_okta_id,
-                                'assignment_id': user_id,
-                                'scope': scope,
-                                'assignment_type': assignment_type,
-                                'group_name': group_name,
-                                'group_okta_id': group_okta_id,
-                                'created_at': parse_timestamp(user_dict.get('created')),
-                                'last_updated_at': parse_timestamp(user_dict.get('lastUpdated')),
-                                'status': user_dict.get('status', 'ACTIVE'),
-                                'credentials_setup': False,
-                                'hidden': False
-                            })
+                users, error = normalize_okta_response(next_response)
                 
-                except StopAsyncIteration:
-                    logger.info(f"Pagination complete after {page_num} pages")
-                    break
-                except Exception as e:
-                    logger.error(f"Error processing page {page_num}: {str(e)}")
+                if error:
+                    logger.error(f"Error on page {page_num}: {error}")
                     break
+                
+                page = [a for a in (self._transform_app_user_assignment(app_okta_id, u) for u in users) if a]
+                del users
             
-            logger.debug(f"Retrieved {len(all_users)} users for app {app_okta_id}")
-            return all_users
+            except StopAsyncIteration:
+                logger.info(f"Pagination complete after {page_num} pages")
+                break
+            except Exception as e:
+                logger.error(f"Error processing page {page_num}: {str(e)}")
+                break
             
-        except Exception as e:
-            logger.error(f"Error getting users for app {app_okta_id}: {str(e)}")
-            return []
+            yield page
+
+    async def get_app_users(self, app_okta_id: str) -> List[Dict]:
+        """
+        Fetch ALL user assignments for an application.
+        Uses /api/v1/apps/{appId}/users endpoint.
+        Handles pagination for apps with 100s of users.
+        
+        Returns assignments with scope information (USER vs GROUP).
+        For very large apps prefer iter_app_user_pages(), which doesn't hold every page.
+        """
+        all_users = []
+        async for page in self.iter_app_user_pages(app_okta_id):
+            all_users.extend(page)
+        
+        logger.debug(f"Retrieved {len(all_users)} users for app {app_okta_id}")
+        return all_users
 
     async def get_group_apps(self, group_okta_id: str) -> List[Dict]:
         """Get applications assigned to a group using SDK's list_group_assigned_applications"""
@@ -1629,6 +1972,76 @@ class OktaClientWrapper:
             logger.error(f"Error getting apps for group {group_okta_id}: {str(e)}")
             return []
         
+    #### SYSTEM LOG SYNC ####
+    
+    async def list_system_log_events(
+        self,
+        since: datetime,
+        until: datetime,
+        event_types: List[str],
+        processor_func: Optional[Callable] = None
+    ) -> Union[List[Dict], int]:
+        """
+        Read System Log events of the given types in ascending published order.
+        
+        A bounded since/until window is always used: without `until` an ascending
+        /logs query is a polling request whose next link never runs out.
+        
+        Args:
+            since: Window start (inclusive)
+            until: Window end (exclusive)
+            event_types: eventType values to include
+            processor_func: Function to process batches immediately
+            
+        Returns:
+            If processor_func is provided: Count of processed events
+            Otherwise: List of transformed event dictionaries
+        """
+        try:
+            query_params = {
+                "since": since.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+                "until": until.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+                "sortOrder": "ASCENDING",
+                "limit": self.LOG_PAGE_SIZE,
+                "filter": " or ".join(f'eventType eq "{event_type}"' for event_type in event_types)
+            }
+            
+            return await self._paginate(
+                api_method=self.client.get_logs,
+                query_params=query_params,
+                transform_batch_func=self._transform_log_events_batch,
+                processor_func=processor_func,
+                page_size=self.LOG_PAGE_SIZE,
+                entity_name="system log events"
+            )
+            
+        except Exception as e:
+            logger.error(f"Error listing system log events: {str(e)}")
+            raise
+
+    def _transform_log_events_batch(self, events) -> List[Dict]:
+        """Transform a batch of System Log events to the fields the CDC stage needs"""
+        transformed = []
+        for event in events:
+            event_dict = event.as_dict() if hasattr(event, 'as_dict') else event
+            actor = event_dict.get('actor') or {}
+            transformed.append({
+                'uuid': event_dict.get('uuid'),
+                'event_type': event_dict.get('eventType'),
+                'published': event_dict.get('published'),
+                'outcome': (event_dict.get('outcome') or {}).get('result'),
+                'actor': {'id': actor.get('id'), 'type': actor.get('type')},
+                'targets': [
+                    {
+                        'id': target.get('id'),
+                        'type': target.get('type'),
+                        'display_name': target.get('displayName')
+                    }
+                    for target in (event_dict.get('target') or [])
+                ]
+            })
+        return transformed
+
     #### DEVICES SYNC ####
     
     async def list_devices(
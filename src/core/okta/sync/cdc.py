@@ -0,0 +1,396 @@
+"""
+System Log change-data-capture (CDC) for Okta sync
+
+Tails /api/v1/logs from a persisted cursor and applies targeted writes for
+changes that never move an entity's lastUpdated:
+- Group membership add/remove -> user_group_memberships
+- App assignment add/remove -> user_application_assignments, group_application_assignments
+- MFA factor changes -> user_factors (refetched for the affected users)
+- User, group and app deletions -> soft delete plus relationship cleanup
+
+Event types are taken from the catalog in src/data/schemas/Okta_eventTypes.json.
+"""
+
+import json
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.okta.client.client import OktaClientWrapper, parse_timestamp
+from src.core.okta.sync.models import User
+from src.utils.logging import logger
+
+if TYPE_CHECKING:
+    from src.core.okta.sync.engine import SyncOrchestrator
+
+EVENT_TYPES_PATH = Path(__file__).resolve().parents[3] / "data" / "schemas" / "Okta_eventTypes.json"
+
+# Catalog categories the CDC stage reads event types from
+CDC_EVENT_CATEGORIES = (
+    "group-membership-management",
+    "application-assignment-and-access",
+    "user-mfa-factor-management",
+    "user-lifecycle-management",
+    "group-lifecycle-and-management",
+    "application-lifecycle",
+)
+
+MEMBERSHIP_ADD_EVENTS = {"group.user_membership.add"}
+MEMBERSHIP_REMOVE_EVENTS = {"group.user_membership.remove"}
+APP_USER_ADD_EVENTS = {
+    "application.user_membership.add",
+    "application.user_membership.update",
+    "application.user_membership.restore",
+}
+APP_USER_REMOVE_EVENTS = {"application.user_membership.remove"}
+GROUP_APP_ADD_EVENTS = {"group.application_assignment.add"}
+GROUP_APP_REMOVE_EVENTS = {"group.application_assignment.remove"}
+FACTOR_EVENTS = {
+    "user.mfa.factor.activate",
+    "user.mfa.factor.deactivate",
+    "user.mfa.factor.update",
+    "user.mfa.factor.reset_all",
+    "user.mfa.factor.suspend",
+    "user.mfa.factor.unsuspend",
+}
+# Events after which an empty factor list is a real "no factors left"
+FACTOR_REMOVAL_EVENTS = {"user.mfa.factor.deactivate", "user.mfa.factor.reset_all"}
+USER_DELETE_EVENTS = {"user.lifecycle.delete.completed"}
+GROUP_DELETE_EVENTS = {"group.lifecycle.delete"}
+APP_DELETE_EVENTS = {"application.lifecycle.delete"}
+
+HANDLED_EVENT_TYPES = (
+    MEMBERSHIP_ADD_EVENTS | MEMBERSHIP_REMOVE_EVENTS
+    | APP_USER_ADD_EVENTS | APP_USER_REMOVE_EVENTS
+    | GROUP_APP_ADD_EVENTS | GROUP_APP_REMOVE_EVENTS
+    | FACTOR_EVENTS
+    | USER_DELETE_EVENTS | GROUP_DELETE_EVENTS | APP_DELETE_EVENTS
+)
+
+
+def load_cdc_event_types() -> List[str]:
+    """Return the handled event types that the Okta event type catalog knows about."""
+    try:
+        with open(EVENT_TYPES_PATH, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.warning(f"Event type catalog unavailable ({e}) - using built-in CDC event types")
+        return sorted(HANDLED_EVENT_TYPES)
+
+    cataloged = set()
+    for category in CDC_EVENT_CATEGORIES:
+        cataloged.update(catalog.get(category, []))
+    if not cataloged:
+        cataloged = {event_type for event_types in catalog.values() for event_type in event_types}
+
+    event_types = sorted(HANDLED_EVENT_TYPES & cataloged)
+    missing = HANDLED_EVENT_TYPES - cataloged
+    if missing:
+        logger.debug(f"CDC event types not in catalog (skipped): {sorted(missing)}")
+    return event_types
+
+
+def _target_id(event: Dict, target_type: str) -> Optional[str]:
+    """Return the id of the first event target of the given type."""
+    for target in event.get('targets', []):
+        if target.get('type') == target_type and target.get('id'):
+            return target['id']
+    return None
+
+
+def _format_log_time(value: datetime) -> str:
+    """Format a datetime as a System Log timestamp (ISO 8601, milliseconds, Z)."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class SystemLogCDC:
+    """
+    Applies System Log events to the local mirror from a persisted cursor.
+
+    The cursor is the published time up to which events have been applied. Every
+    write is idempotent, so replaying the event at the cursor is harmless.
+    """
+
+    CURSOR_NAME = "system_log"
+
+    # Events can show up in /logs a little after their published time
+    INGESTION_LAG = timedelta(seconds=60)
+
+    def __init__(self, orchestrator: "SyncOrchestrator", okta: OktaClientWrapper):
+        self.orchestrator = orchestrator
+        self.okta = okta
+        self.tenant_id = orchestrator.tenant_id
+        self.db = orchestrator.db
+        self.event_types = load_cdc_event_types()
+        self._last_published: Optional[str] = None
+        self._events_applied = 0
+
+    async def run(self, default_since: datetime, reset: bool = False) -> int:
+        """
+        Apply all events between the persisted cursor and now.
+
+        Args:
+            default_since: Start of the window when no cursor has been stored yet
+            reset: Ignore the stored cursor and start at default_since (after a full
+                   sync or reconcile, only events since that snapshot began matter)
+
+        Returns:
+            Number of events applied
+        """
+        since = None
+        if not reset:
+            async with self.db.get_session() as session:
+                sync_cursor = await self.db.get_sync_cursor(session, self.tenant_id, self.CURSOR_NAME)
+            since = parse_timestamp(sync_cursor.cursor) if sync_cursor and sync_cursor.cursor else None
+        if since is None:
+            since = default_since
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        until = datetime.now(timezone.utc) - self.INGESTION_LAG
+
+        if since >= until:
+            logger.info("System Log CDC is up to date")
+            return 0
+
+        logger.info(f"System Log CDC: applying events from {_format_log_time(since)} to {_format_log_time(until)}")
+        self._last_published = None
+        self._events_applied = 0
+        pagination_errors_before = self.okta.pagination_errors
+
+        await self.okta.list_system_log_events(
+            since=since,
+            until=until,
+            event_types=self.event_types,
+            processor_func=self._apply_events
+        )
+
+        cancelled = self.orchestrator.cancellation_flag and self.orchestrator.cancellation_flag.is_set()
+        if cancelled or self.okta.pagination_errors > pagination_errors_before:
+            # Resume from the last applied event next time
+            new_cursor = self._last_published or _format_log_time(since)
+            logger.warning(f"System Log CDC stopped early - cursor kept at {new_cursor}")
+        else:
+            new_cursor = _format_log_time(until)
+
+        async with self.db.get_session() as session:
+            await self.db.set_sync_cursor(
+                session, self.tenant_id, self.CURSOR_NAME, new_cursor, self._events_applied
+            )
+
+        logger.info(f"System Log CDC applied {self._events_applied} events, cursor at {new_cursor}")
+        return self._events_applied
+
+    async def _apply_events(self, events: List[Dict]) -> None:
+        """Apply one page of events (processor_func for list_system_log_events)."""
+        factor_users: Set[str] = set()
+        factor_removal_users: Set[str] = set()
+        applicable = []
+        for event in events:
+            if event.get('outcome') not in (None, 'SUCCESS'):
+                continue
+            applicable.append(event)
+            if event.get('event_type') in FACTOR_EVENTS:
+                user_okta_id = _target_id(event, 'User')
+                if not user_okta_id and (event.get('actor') or {}).get('type') == 'User':
+                    user_okta_id = event['actor'].get('id')
+                if user_okta_id:
+                    factor_users.add(user_okta_id)
+                    if event.get('event_type') in FACTOR_REMOVAL_EVENTS:
+                        factor_removal_users.add(user_okta_id)
+
+        # Factors are fetched before the write session opens, so no write lock is
+        # held while waiting on Okta
+        factors_by_user = await self._fetch_user_factors(factor_users) if factor_users else {}
+
+        async with self.db.get_session() as session:
+            for event in applicable:
+                if event.get('event_type') not in FACTOR_EVENTS:
+                    await self._apply_event(session, event.get('event_type'), event)
+                self._events_applied += 1
+
+            if factors_by_user:
+                await self._replace_user_factors(session, factors_by_user, factor_removal_users)
+
+            await session.commit()
+
+        if events:
+            self._last_published = events[-1].get('published') or self._last_published
+
+    async def _apply_event(self, session: AsyncSession, event_type: str, event: Dict) -> None:
+        """Translate a single relationship or lifecycle event into SQL."""
+        now = datetime.now(timezone.utc)
+        user_okta_id = _target_id(event, 'User')
+        group_okta_id = _target_id(event, 'UserGroup')
+        app_okta_id = _target_id(event, 'AppInstance')
+        params = {
+            'tenant_id': self.tenant_id,
+            'user_okta_id': user_okta_id,
+            'group_okta_id': group_okta_id,
+            'application_okta_id': app_okta_id,
+            'now': now,
+        }
+
+        if event_type in MEMBERSHIP_ADD_EVENTS and user_okta_id and group_okta_id:
+            await session.execute(text("""
+                INSERT INTO user_group_memberships
+                (tenant_id, user_okta_id, group_okta_id, created_at, updated_at)
+                SELECT :tenant_id, :user_okta_id, :group_okta_id, :now, :now
+                WHERE EXISTS (
+                    SELECT 1 FROM users
+                    WHERE okta_id = :user_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                AND EXISTS (
+                    SELECT 1 FROM groups
+                    WHERE okta_id = :group_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                ON CONFLICT (tenant_id, user_okta_id, group_okta_id)
+                DO UPDATE SET updated_at = excluded.updated_at
+            """), params)
+
+        elif event_type in MEMBERSHIP_REMOVE_EVENTS and user_okta_id and group_okta_id:
+            await session.execute(text("""
+                DELETE FROM user_group_memberships
+                WHERE tenant_id = :tenant_id
+                AND user_okta_id = :user_okta_id
+                AND group_okta_id = :group_okta_id
+            """), params)
+
+        elif event_type in APP_USER_ADD_EVENTS and user_okta_id and app_okta_id:
+            # App user ids equal the user id; existing rows keep their assignment type/group
+            await session.execute(text("""
+                INSERT INTO user_application_assignments
+                (tenant_id, user_okta_id, application_okta_id, assignment_id,
+                 assignment_type, assignment_status, credentials_setup, hidden, created_at, updated_at)
+                SELECT :tenant_id, :user_okta_id, :application_okta_id, :user_okta_id,
+                       'DIRECT', 'ACTIVE', 0, 0, :now, :now
+                WHERE EXISTS (
+                    SELECT 1 FROM users
+                    WHERE okta_id = :user_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                AND EXISTS (
+                    SELECT 1 FROM applications
+                    WHERE okta_id = :application_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                ON CONFLICT (tenant_id, user_okta_id, application_okta_id)
+                DO UPDATE SET
+                    assignment_status = 'ACTIVE',
+                    updated_at = excluded.updated_at
+            """), params)
+
+        elif event_type in APP_USER_REMOVE_EVENTS and user_okta_id and app_okta_id:
+            await session.execute(text("""
+                DELETE FROM user_application_assignments
+                WHERE tenant_id = :tenant_id
+                AND user_okta_id = :user_okta_id
+                AND application_okta_id = :application_okta_id
+            """), params)
+
+        elif event_type in GROUP_APP_ADD_EVENTS and group_okta_id and app_okta_id:
+            await session.execute(text("""
+                INSERT INTO group_application_assignments
+                (tenant_id, group_okta_id, application_okta_id, assignment_id, created_at, updated_at)
+                SELECT :tenant_id, :group_okta_id, :application_okta_id, :group_okta_id, :now, :now
+                WHERE EXISTS (
+                    SELECT 1 FROM groups
+                    WHERE okta_id = :group_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                AND EXISTS (
+                    SELECT 1 FROM applications
+                    WHERE okta_id = :application_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                ON CONFLICT (tenant_id, group_okta_id, application_okta_id)
+                DO UPDATE SET updated_at = excluded.updated_at
+            """), params)
+
+        elif event_type in GROUP_APP_REMOVE_EVENTS and group_okta_id and app_okta_id:
+            await session.execute(text("""
+                DELETE FROM group_application_assignments
+                WHERE tenant_id = :tenant_id
+                AND group_okta_id = :group_okta_id
+                AND application_okta_id = :application_okta_id
+            """), params)
+
+        elif event_type in USER_DELETE_EVENTS and user_okta_id:
+            for table in ('user_factors', 'user_group_memberships', 'user_application_assignments'):
+                await session.execute(text(f"""
+                    DELETE FROM {table}
+                    WHERE tenant_id = :tenant_id AND user_okta_id = :user_okta_id
+                """), params)
+            await session.execute(text("""
+                UPDATE users SET is_deleted = 1, updated_at = :now
+                WHERE tenant_id = :tenant_id AND okta_id = :user_okta_id
+            """), params)
+
+        elif event_type in GROUP_DELETE_EVENTS and group_okta_id:
+            for table in ('user_group_memberships', 'group_application_assignments'):
+                await session.execute(text(f"""
+                    DELETE FROM {table}
+                    WHERE tenant_id = :tenant_id AND group_okta_id = :group_okta_id
+                """), params)
+            await session.execute(text("""
+                UPDATE groups SET is_deleted = 1, updated_at = :now
+                WHERE tenant_id = :tenant_id AND okta_id = :group_okta_id
+            """), params)
+
+        elif event_type in APP_DELETE_EVENTS and app_okta_id:
+            for table in ('user_application_assignments', 'group_application_assignments'):
+                await session.execute(text(f"""
+                    DELETE FROM {table}
+                    WHERE tenant_id = :tenant_id AND application_okta_id = :application_okta_id
+                """), params)
+            await session.execute(text("""
+                UPDATE applications SET is_deleted = 1, updated_at = :now
+                WHERE tenant_id = :tenant_id AND okta_id = :application_okta_id
+            """), params)
+
+        else:
+            logger.debug(f"Skipping {event_type} event {event.get('uuid')}: no usable targets")
+
+    async def _fetch_user_factors(self, user_okta_ids: Set[str]) -> Dict[str, List[Dict]]:
+        """Re-read the factors of the users with factor events that are in the database."""
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                select(User.okta_id).where(
+                    User.tenant_id == self.tenant_id,
+                    User.is_deleted == False,
+                    User.okta_id.in_(user_okta_ids)
+                )
+            )
+            known_users = result.scalars().all()
+
+        return {
+            user_okta_id: await self.okta.list_user_factors([user_okta_id])
+            for user_okta_id in known_users
+        }
+
+    async def _replace_user_factors(
+        self,
+        session: AsyncSession,
+        factors_by_user: Dict[str, List[Dict]],
+        factor_removal_users: Set[str]
+    ) -> None:
+        """Replace the factor rows of users whose factors were re-read."""
+        for user_okta_id, factors in factors_by_user.items():
+            if not factors and user_okta_id not in factor_removal_users:
+                # An empty list may be a failed call - keep what we have
+                continue
+
+            user_exists = await session.execute(
+                text("SELECT 1 FROM users WHERE tenant_id = :tenant_id AND okta_id = :user_okta_id AND is_deleted = 0"),
+                {'tenant_id': self.tenant_id, 'user_okta_id': user_okta_id}
+            )
+            if user_exists.first() is None:
+                # Deleted by an event on this page
+                continue
+
+            await session.execute(text("""
+                DELETE FROM user_factors
+                WHERE tenant_id = :tenant_id AND user_okta_id = :user_okta_id
+            """), {'tenant_id': self.tenant_id, 'user_okta_id': user_okta_id})
+            if factors:
+                await self.orchestrator._upsert_user_factors(session, user_okta_id, factors)
+
+        logger.debug(f"Refreshed factors for {len(factors_by_user)} users from System Log events")
@@ -0,0 +1,292 @@
+"""
+Sync checkpoints for resuming interrupted syncs
+
+While a sync runs, its SyncHistory.checkpoint records:
+- Which sync graph nodes have completed
+- For the long listings (groups, users, applications, devices), the Okta `after`
+  cursor of the last page whose rows were committed
+- The sync mode, `since` and whether a staging database is being loaded
+
+Relationship data the orchestrator stages in memory until both sides exist
+(group→app links, app→policy links, harvested group memberships) is kept in
+sync_checkpoint_payloads and only rewritten when it changes.
+
+When a sync is cancelled, fails or its process dies, the next sync (SYNC_RESUME)
+takes the checkpoint over: completed nodes are skipped, listings continue after
+their last committed page without wiping what was loaded, and a shadow-table
+sync keeps loading into the same staging database. Every write is an idempotent
+upsert, so a page committed just before the crash but not yet checkpointed is
+simply fetched and written again.
+"""
+
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from sqlalchemy import update
+
+from src.config.settings import settings
+from src.core.okta.sync.models import SyncHistory, SyncStatus
+from src.core.okta.sync.operations import DatabaseOperations, StagingDatabase
+from src.utils.logging import logger
+from src.utils.pagination_limits import after_cursor
+
+if TYPE_CHECKING:
+    from src.core.okta.client.client import OktaClientWrapper
+    from src.core.okta.sync.engine import SyncOrchestrator
+
+CHECKPOINT_VERSION = 1
+
+# Model name -> OktaClientWrapper listing (entity_name) that can continue from a page cursor
+RESUMABLE_LISTINGS = {
+    'Group': 'groups',
+    'User': 'users',
+    'Application': 'applications',
+    'Device': 'devices',
+}
+
+# Orchestrator attributes holding relationship data staged until both sides exist
+STAGED_PAYLOADS = (
+    '_pending_group_relationships',
+    '_pending_application_policy_links',
+    '_pending_group_memberships',
+    '_harvested_group_ids',
+)
+
+# Counters carried over from the interrupted sync (completed nodes don't recount)
+ENTITY_COUNTERS = ('users_count', 'groups_count', 'apps_count', 'policies_count', 'devices_count')
+
+
+class SyncCheckpoint:
+    """
+    Resume point of one sync, stored on its sync history record.
+
+    State layout:
+        {"version", "sync_mode", "since", "shadow", "updated_at",
+         "nodes": {node_name: "completed"},
+         "listings": {entity_name: {"after", "records", "complete", "cutoff"}},
+         "flags": {"memberships_by_group": bool},
+         "swap_started": bool}  # Set by swap_in_staging with the swap's commit
+
+    Callers serialize writes (the orchestrator holds its DB write lock).
+    """
+
+    def __init__(
+        self,
+        db: DatabaseOperations,
+        tenant_id: str,
+        sync_id: int,
+        state: Dict[str, Any],
+        resumed_from: Optional[int] = None
+    ):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.sync_id = sync_id
+        self.state = state
+        self.resumed_from = resumed_from
+        # Entry count of each payload as last persisted (None = unknown, write it)
+        self._payload_sizes: Dict[str, Optional[int]] = {}
+
+    @classmethod
+    async def begin(
+        cls,
+        db: DatabaseOperations,
+        tenant_id: str,
+        sync_id: int,
+        sync_mode: str,
+        since: Optional[datetime],
+        shadow: bool
+    ) -> "SyncCheckpoint":
+        """Start checkpointing a fresh sync (stale checkpoints of the tenant are dropped)."""
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'sync_mode': sync_mode,
+            'since': since.isoformat() if since else None,
+            'shadow': shadow,
+            'nodes': {},
+            'listings': {},
+            'flags': {},
+        }
+        async with db.get_session() as session:
+            await db.clear_sync_checkpoints(session, tenant_id)
+        checkpoint = cls(db, tenant_id, sync_id, state)
+        checkpoint._payload_sizes = {name: 0 for name in STAGED_PAYLOADS}
+        await checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    async def claim(cls, db: DatabaseOperations, tenant_id: str, sync_id: int) -> Optional["SyncCheckpoint"]:
+        """
+        Take over the checkpoint of the tenant's latest interrupted sync.
+
+        The interrupted record is marked failed if it still looks running, its entity
+        counters are copied to the new record and the checkpoint moves along with them.
+
+        Returns:
+            The checkpoint to resume from, or None when there is nothing usable
+        """
+        async with db.get_session() as session:
+            previous = await db.get_checkpointed_sync(session, tenant_id, exclude_id=sync_id)
+            if previous is None:
+                return None
+
+            state = previous.checkpoint or {}
+            reason = cls._unusable_reason(state, tenant_id)
+            if reason:
+                logger.info(f"Not resuming sync {previous.id}: {reason}")
+                await db.clear_sync_checkpoints(session, tenant_id)
+                return None
+
+            if previous.status in (SyncStatus.RUNNING, SyncStatus.IDLE):
+                previous.status = SyncStatus.FAILED
+                previous.success = False
+                previous.end_time = datetime.now(timezone.utc)
+                previous.error_details = f"Sync was interrupted - resumed by sync {sync_id}"
+            previous.checkpoint = None
+            # The resumed sync stages again; the interrupted swap (if any) is already live
+            state.pop('swap_started', None)
+
+            current = await session.get(SyncHistory, sync_id)
+            if current is None:
+                logger.error(f"Sync history with ID {sync_id} not found for tenant {tenant_id}")
+                return None
+            for counter in ENTITY_COUNTERS:
+                setattr(current, counter, getattr(previous, counter) or 0)
+            current.checkpoint = state
+            await session.commit()
+            resumed_from = previous.id
+
+        completed = [name for name, status in state.get('nodes', {}).items() if status == 'completed']
+        logger.info(
+            f"Resuming interrupted sync {resumed_from} ({state['sync_mode']} mode, "
+            f"completed: {', '.join(completed) or 'none'})"
+        )
+        return cls(db, tenant_id, sync_id, state, resumed_from=resumed_from)
+
+    @staticmethod
+    def _unusable_reason(state: Dict[str, Any], tenant_id: str) -> Optional[str]:
+        """Why a stored checkpoint can't be resumed, or None if it can."""
+        if state.get('version') != CHECKPOINT_VERSION:
+            return "checkpoint format changed"
+        try:
+            updated_at = datetime.fromisoformat(state['updated_at'])
+        except (KeyError, TypeError, ValueError):
+            return "checkpoint has no timestamp"
+        max_age = timedelta(hours=max(0, settings.SYNC_RESUME_MAX_AGE_HOURS))
+        if datetime.now(timezone.utc) - updated_at > max_age:
+            return f"checkpoint is older than {settings.SYNC_RESUME_MAX_AGE_HOURS} hours"
+        nodes = state.get('nodes', {})
+        if state.get('shadow') and 'swap_in' not in nodes and not StagingDatabase.for_tenant(tenant_id).exists():
+            return "staging database is gone"
+        return None
+
+    @property
+    def sync_mode(self) -> str:
+        return self.state['sync_mode']
+
+    @property
+    def since(self) -> Optional[datetime]:
+        return datetime.fromisoformat(self.state['since']) if self.state.get('since') else None
+
+    @property
+    def shadow(self) -> bool:
+        """Whether the sync loads into a staging database that still has to be swapped in."""
+        return bool(self.state.get('shadow')) and not self.node_completed('swap_in')
+
+    @property
+    def staging_swapped_in(self) -> bool:
+        return bool(self.state.get('shadow')) and self.node_completed('swap_in')
+
+    def node_completed(self, name: str) -> bool:
+        return self.state['nodes'].get(name) == 'completed'
+
+    def completed_nodes(self) -> List[str]:
+        return [name for name in self.state['nodes'] if self.node_completed(name)]
+
+    def listing(self, name: str) -> Optional[Dict[str, Any]]:
+        """Progress of a listing from the interrupted sync, if it committed any page."""
+        return self.state['listings'].get(name)
+
+    def start_listing(self, name: str, cutoff: datetime) -> Dict[str, Any]:
+        """Track a new listing (persisted with its first committed page)."""
+        listing = {'after': None, 'records': 0, 'complete': False, 'cutoff': cutoff.isoformat()}
+        self.state['listings'][name] = listing
+        return listing
+
+    async def page_committed(
+        self,
+        name: str,
+        next_link: Optional[str],
+        records: int,
+        orchestrator: "SyncOrchestrator"
+    ) -> None:
+        """
+        Record a committed page of a listing.
+
+        Args:
+            name: Listing (OktaClientWrapper entity_name)
+            next_link: Next-page link of the committed page (None on the last page)
+            records: Records committed by the listing so far
+            orchestrator: Holder of the staged relationship payloads
+        """
+        listing = self.state['listings'][name]
+        cursor = after_cursor(next_link)
+        # Without a cursor the listing restarts from the last known one (rewrites are idempotent)
+        if cursor:
+            listing['after'] = cursor
+        listing['records'] = records
+        # Payloads first: a checkpoint must never point past the data it relies on
+        await self.save_payloads(orchestrator)
+        await self.save()
+
+    async def listing_completed(self, name: str, records: int) -> None:
+        listing = self.state['listings'][name]
+        listing['complete'] = True
+        listing['records'] = records
+        await self.save()
+
+    async def node_finished(self, name: str, orchestrator: "SyncOrchestrator") -> None:
+        """Record a completed graph node along with the payloads it staged or consumed."""
+        self.state['nodes'][name] = 'completed'
+        self.state['flags']['memberships_by_group'] = bool(orchestrator._memberships_by_group)
+        await self.save_payloads(orchestrator)
+        await self.save()
+
+    async def save_payloads(self, orchestrator: "SyncOrchestrator") -> None:
+        """Persist staged payloads whose size changed since they were last written."""
+        for name in STAGED_PAYLOADS:
+            payload = getattr(orchestrator, name)
+            if self._payload_sizes.get(name) == len(payload):
+                continue
+            async with self.db.get_session() as session:
+                await self.db.set_checkpoint_payload(session, self.tenant_id, name, payload, item_count=len(payload))
+            self._payload_sizes[name] = len(payload)
+
+    async def restore(self, orchestrator: "SyncOrchestrator", okta: "OktaClientWrapper") -> None:
+        """Load the interrupted sync's staged payloads and flags into a new run."""
+        async with self.db.get_session() as session:
+            payloads = await self.db.get_checkpoint_payloads(session, self.tenant_id)
+        for name in STAGED_PAYLOADS:
+            payload = list(payloads.get(name) or [])
+            setattr(orchestrator, name, payload)
+            self._payload_sizes[name] = len(payload)
+        memberships_by_group = bool(self.state['flags'].get('memberships_by_group'))
+        orchestrator._memberships_by_group = memberships_by_group
+        okta.harvest_group_memberships = memberships_by_group
+        logger.info(
+            "Restored staged sync data: " +
+            ", ".join(f"{name.strip('_')}={self._payload_sizes[name]}" for name in STAGED_PAYLOADS)
+        )
+
+    async def save(self) -> None:
+        """Write the checkpoint to the sync history record."""
+        self.state['updated_at'] = datetime.now(timezone.utc).isoformat()
+        async with self.db.get_session() as session:
+            await session.execute(
+                update(SyncHistory).where(SyncHistory.id == self.sync_id).values(checkpoint=self.state)
+            )
+            await session.commit()
+
+    async def clear(self) -> None:
+        """Drop the checkpoint and staged payloads once the sync graph has finished."""
+        async with self.db.get_session() as session:
+            await self.db.clear_sync_checkpoints(session, self.tenant_id)
@@ -14,11 +14,17 @@ Core Components:
 - Relationship Processing: Handles entity relationships
 """
 
-from typing import List, Optional, Type, TypeVar, Any, Dict, Callable
-from datetime import datetime, timezone
+from typing import List, Optional, Set, Type, TypeVar, Any, Dict, Callable, Tuple, Awaitable
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.okta.client.client import OktaClientWrapper
-from src.core.okta.sync.operations import DatabaseOperations
+from src.core.okta.sync.operations import DatabaseOperations, StagingDatabase, SHADOW_SYNC_TABLES
+from src.core.okta.sync.cdc import SystemLogCDC
+from src.core.okta.sync.checkpoint import SyncCheckpoint, RESUMABLE_LISTINGS
+from src.core.okta.sync.metrics import SyncMetrics, PhaseMetrics, bind_phase, unbind_phase, current_phase
+from src.core.okta.sync.relationships import RelationshipWriter
+from src.core.okta.sync.snapshot import SnapshotExporter
 from src.core.okta.sync.models import (
     User, Group, Authenticator, Application, Policy, Base, 
     SyncHistory, SyncStatus, UserFactor, Device,
@@ -33,6 +39,18 @@ import time
 
 ModelType = TypeVar('ModelType', bound=Base)
 
+# No lastUpdated filter in the API: listed in full on incremental runs too, so
+# records not seen are soft-deleted every run instead of waiting for a reconcile
+FULLY_LISTED_MODELS = (Application, Policy)
+
+
+@dataclass(frozen=True)
+class SyncNode:
+    """One step of the sync dependency graph."""
+    name: str
+    run: Callable[[], Awaitable[None]]
+    depends_on: Tuple[str, ...] = ()
+
 
 def format_duration(seconds: float) -> str:
     """Format duration in seconds to human-readable string."""
@@ -57,13 +75,34 @@ class SyncOrchestrator:
     - Sync history tracking
     - Error recovery
     """    
+    # Per-group harvesting is chosen when users outnumber groups by at least this factor
+    GROUP_HARVEST_COST_FACTOR = 2
+
     def __init__(self, tenant_id: str, db: DatabaseOperations = None, cancellation_flag=None):
         self.tenant_id = tenant_id
         self.db = db or DatabaseOperations()
+        # Where entity rows are written: the live database, or a StagingDatabase during a
+        # shadow-table full sync (sync history, cursors and CDC always use self.db)
+        self.entity_db: DatabaseOperations = self.db
+        self._staging: Optional[StagingDatabase] = None
         self._initialized = False
         self.cancellation_flag = cancellation_flag
         self._pending_group_relationships: List[Dict[str, Any]] = []
         self._pending_application_policy_links: List[Dict[str, str]] = []
+        self._pending_group_memberships: List[Dict[str, str]] = []
+        self._harvested_group_ids: List[str] = []
+        self._memberships_by_group = False
+        # Serializes DB writes of concurrently running graph nodes (SQLite has one writer)
+        self._db_write_lock = asyncio.Lock()
+        self._sync_timeline: List[Dict[str, Any]] = []
+        # "full" (clean and reload), "incremental" (changes since last sync) or "reconcile"
+        self._sync_mode = 'full'
+        # Resume point of this run (SYNC_RESUME); None once the sync graph has finished
+        self._checkpoint: Optional[SyncCheckpoint] = None
+        # Per-node telemetry of this run, stored in sync_phase_metrics
+        self._metrics: Optional[SyncMetrics] = None
+        # Secondary indexes dropped while a full sync loads the live tables in place
+        self._deferred_indexes: List[Any] = []
 
     async def _initialize(self) -> None:
         if not self._initialized:
@@ -114,6 +153,81 @@ class SyncOrchestrator:
             sync_history.error_message = error_message
         await session.commit()
 
+    async def _resolve_sync_mode(self) -> Tuple[str, Optional[datetime]]:
+        """
+        Pick the sync mode for this run.
+        
+        Returns:
+            (mode, since): "full" when SYNC_MODE=full; otherwise "incremental" with the
+            start time of the last successful sync, or "reconcile" (full listing without
+            wiping, removed records soft-deleted) when no full sync or reconcile finished
+            within SYNC_FULL_RECONCILE_HOURS.
+        """
+        from src.config.settings import settings
+        if settings.SYNC_MODE != 'incremental':
+            return 'full', None
+        
+        async with self.db.get_session() as session:
+            last_sync = await self.db.get_last_sync_time(session, User, self.tenant_id)
+            last_full_sync = await self.db.get_last_sync_time(session, User, self.tenant_id, full_only=True)
+        
+        if not last_sync or not last_full_sync:
+            logger.info("No previous successful sync found - running full reconcile")
+            return 'reconcile', None
+        
+        if last_full_sync.tzinfo is None:
+            last_full_sync = last_full_sync.replace(tzinfo=timezone.utc)
+        if last_sync.tzinfo is None:
+            last_sync = last_sync.replace(tzinfo=timezone.utc)
+        
+        if datetime.now(timezone.utc) - last_full_sync >= timedelta(hours=settings.SYNC_FULL_RECONCILE_HOURS):
+            logger.info(
+                f"Last full reconcile was at {last_full_sync.isoformat()} "
+                f"(older than {settings.SYNC_FULL_RECONCILE_HOURS}h) - running full reconcile"
+            )
+            return 'reconcile', None
+        
+        return 'incremental', last_sync
+
+    async def _record_sync_mode(self, sync_mode: str) -> None:
+        """Store the resolved sync mode on the active sync history record."""
+        async with self.db.get_session() as session:
+            active_sync = await self.db.get_active_sync(session, self.tenant_id)
+            if active_sync:
+                active_sync.sync_mode = sync_mode
+                await session.commit()
+
+    async def _purge_deleted_user_relationships(self, session: AsyncSession) -> None:
+        """Drop relationship rows of soft-deleted users."""
+        for table in ('user_factors', 'user_group_memberships', 'user_application_assignments'):
+            await session.execute(text(f"""
+                DELETE FROM {table}
+                WHERE tenant_id = :tenant_id
+                AND user_okta_id IN (
+                    SELECT okta_id FROM users
+                    WHERE tenant_id = :tenant_id AND is_deleted = 1
+                )
+            """), {'tenant_id': self.tenant_id})
+
+    async def _mark_deprovisioned_users_deleted(self, session: AsyncSession, batch: List[Dict]) -> Set[str]:
+        """
+        Soft delete users an incremental sync sees deactivated, when deprovisioned users are not synced.
+        
+        A full sync leaves them out, so the incremental run treats the status change as a
+        removal instead of upserting a DEPROVISIONED row. Returns the removed Okta IDs.
+        """
+        from src.config.settings import settings
+        if self._sync_mode != 'incremental' or settings.SYNC_DEPROVISIONED_USERS:
+            return set()
+        removed = {record['okta_id'] for record in batch if record.get('status') == 'DEPROVISIONED'}
+        if removed:
+            deleted_count = await self.entity_db.mark_deleted(
+                session, User, None, self.tenant_id, removed_okta_ids=sorted(removed)
+            )
+            if deleted_count:
+                await self._purge_deleted_user_relationships(session)
+        return removed
+
     def _get_authenticator_name(self, factor_type: str, provider: str) -> str:
         """
         Map factor type and provider to authenticator name.
@@ -139,146 +253,77 @@ class SyncOrchestrator:
         mapping_key = (factor_type, provider)
         return authenticator_mappings.get(mapping_key, f"Unknown ({factor_type}, {provider})")
 
-    async def _process_user_relationships(
-        self,
-        session: AsyncSession,
-        user_data: Dict,
-    ) -> None:
-        """Process all user relationships with upsert handling"""
-        try:
-            user_okta_id = user_data['okta_id']
-            logger.debug(f"Starting relationship sync for user {user_okta_id}")
-    
-            # Handle group memberships with upsert
-            group_memberships = user_data.pop('group_memberships', [])
-            if group_memberships:
-                for membership in group_memberships:
-                    stmt = text("""
-                        INSERT INTO user_group_memberships 
-                        (tenant_id, user_okta_id, group_okta_id, created_at, updated_at)
-                        VALUES (:tenant_id, :user_okta_id, :group_okta_id, :created_at, :updated_at)
-                        ON CONFLICT (tenant_id, user_okta_id, group_okta_id) 
-                        DO UPDATE SET
-                            updated_at = excluded.updated_at
-                    """)
-                    
-                    now = datetime.now(timezone.utc)
-                    await session.execute(stmt, {
-                        'tenant_id': self.tenant_id,
-                        'user_okta_id': user_okta_id,
-                        'group_okta_id': membership['group_okta_id'],
-                        'created_at': now,
-                        'updated_at': now
-                    })
-    
-            # Handle factors with upsert
-            factors = user_data.pop('factors', [])
-            if factors:
-                for factor in factors:
-                    authenticator_name = self._get_authenticator_name(
-                        factor.get('factor_type'), 
-                        factor.get('provider')
-                    )                    
-                    stmt = text("""
-                        INSERT INTO user_factors
-                        (tenant_id, user_okta_id, okta_id, factor_type, provider, status,
-                        authenticator_name, email, phone_number, device_type, device_name, platform,
-                        created_at, last_updated_at, updated_at)
-                        VALUES (
-                            :tenant_id, :user_okta_id, :okta_id, :factor_type, :provider, :status,
-                            :authenticator_name, :email, :phone_number, :device_type, :device_name, :platform,
-                            :created_at, :last_updated_at, :updated_at
-                        )
-                        ON CONFLICT (tenant_id, user_okta_id, okta_id) 
-                        DO UPDATE SET
-                            factor_type = excluded.factor_type,
-                            provider = excluded.provider,
-                            status = excluded.status,
-                            authenticator_name = excluded.authenticator_name,
-                            email = excluded.email,
-                            phone_number = excluded.phone_number,
-                            device_type = excluded.device_type,
-                            device_name = excluded.device_name,
-                            platform = excluded.platform,
-                            last_updated_at = excluded.last_updated_at,
-                            updated_at = excluded.updated_at
-                    """)
-                    
-                    now = datetime.now(timezone.utc)
-                    await session.execute(stmt, {
-                        'tenant_id': self.tenant_id,
-                        'user_okta_id': user_okta_id,
-                        'okta_id': factor['okta_id'],
-                        'factor_type': factor['factor_type'],
-                        'provider': factor['provider'],
-                        'status': factor['status'],
-                        'authenticator_name': authenticator_name,
-                        'email': factor.get('email'),
-                        'phone_number': factor.get('phone_number'),
-                        'device_type': factor.get('device_type'),
-                        'device_name': factor.get('device_name'),
-                        'platform': factor.get('platform'),
-                        'created_at': factor.get('created_at'),
-                        'last_updated_at': factor.get('last_updated_at'),
-                        'updated_at': now
-                    })
-    
-            await session.commit()
-            logger.debug(f"Completed relationship sync for user {user_okta_id}")
-                
-        except Exception as e:
-            logger.error(f"Error processing user relationships for {user_okta_id}: {str(e)}")
-            raise
+    def _stage_user_relationships(self, writer: RelationshipWriter, user_data: Dict) -> None:
+        """Buffer a user's group memberships and factors on the page's relationship writer."""
+        user_okta_id = user_data['okta_id']
+        
+        # Tables are not cleaned outside full mode, so replace this user's rows
+        if self._sync_mode != 'full':
+            writer.replace('user_factors', 'user_okta_id', user_okta_id)
+            # Harvested memberships are replaced per group in _flush_group_memberships
+            if not self._memberships_by_group:
+                writer.replace('user_group_memberships', 'user_okta_id', user_okta_id)
+
+        now = datetime.now(timezone.utc)
+        for membership in user_data.pop('group_memberships', None) or []:
+            writer.add('user_group_memberships', {
+                'user_okta_id': user_okta_id,
+                'group_okta_id': membership['group_okta_id'],
+                'created_at': now,
+                'updated_at': now
+            })
+
+        self._stage_user_factors(writer, user_okta_id, user_data.pop('factors', None) or [])
 
-    async def _process_group_relationships(
+    def _stage_user_factors(self, writer: RelationshipWriter, user_okta_id: str, factors: List[Dict]) -> None:
+        """Buffer a user's MFA factors for upsert."""
+        now = datetime.now(timezone.utc)
+        for factor in factors:
+            writer.add('user_factors', {
+                'user_okta_id': user_okta_id,
+                'okta_id': factor['okta_id'],
+                'factor_type': factor['factor_type'],
+                'provider': factor['provider'],
+                'status': factor['status'],
+                'authenticator_name': self._get_authenticator_name(
+                    factor.get('factor_type'),
+                    factor.get('provider')
+                ),
+                'email': factor.get('email'),
+                'phone_number': factor.get('phone_number'),
+                'device_type': factor.get('device_type'),
+                'device_name': factor.get('device_name'),
+                'platform': factor.get('platform'),
+                'created_at': factor.get('created_at'),
+                'last_updated_at': factor.get('last_updated_at'),
+                'updated_at': now
+            })
+
+    async def _upsert_user_factors(
         self,
         session: AsyncSession,
-        group_data: Dict,
+        user_okta_id: str,
+        factors: List[Dict],
     ) -> None:
-        """Process group relationships with cleanup of removed assignments"""
-        try:
-            # Get current assignments from Okta response
-            current_app_assignments = group_data.pop('applications', [])
-            current_app_ids = [str(a['application_okta_id']) for a in current_app_assignments]
-            group_okta_id = str(group_data['okta_id'])
-    
-            # Delete all existing assignments for this group first
-            delete_all_stmt = text("""
-                DELETE FROM group_application_assignments 
-                WHERE tenant_id = :tenant_id 
-                AND group_okta_id = :group_okta_id
-            """)
-            
-            await session.execute(delete_all_stmt, {
-                'tenant_id': str(self.tenant_id),
-                'group_okta_id': group_okta_id
+        """Upsert a user's MFA factors (caller commits)."""
+        writer = RelationshipWriter(session, self.tenant_id)
+        self._stage_user_factors(writer, user_okta_id, factors)
+        await writer.flush()
+
+    def _stage_group_relationships(self, writer: RelationshipWriter, group_data: Dict) -> None:
+        """Buffer a group's application assignments, replacing the ones stored for it."""
+        group_okta_id = str(group_data['okta_id'])
+        writer.replace('group_application_assignments', 'group_okta_id', group_okta_id)
+
+        now = datetime.now(timezone.utc)
+        for assignment in group_data.pop('applications', None) or []:
+            writer.add('group_application_assignments', {
+                'group_okta_id': str(assignment['group_okta_id']),
+                'application_okta_id': str(assignment['application_okta_id']),
+                'assignment_id': str(assignment['assignment_id']),
+                'created_at': now,
+                'updated_at': now
             })
-    
-            # Insert current assignments
-            if current_app_assignments:
-                for assignment in current_app_assignments:
-                    insert_stmt = text("""
-                        INSERT INTO group_application_assignments 
-                        (tenant_id, group_okta_id, application_okta_id, assignment_id, created_at, updated_at)
-                        VALUES (:tenant_id, :group_okta_id, :application_okta_id, :assignment_id, :created_at, :updated_at)
-                    """)
-                    
-                    now = datetime.now(timezone.utc)
-                    await session.execute(insert_stmt, {
-                        'tenant_id': str(self.tenant_id),
-                        'group_okta_id': str(assignment['group_okta_id']),
-                        'application_okta_id': str(assignment['application_okta_id']),
-                        'assignment_id': str(assignment['assignment_id']),
-                        'created_at': now,
-                        'updated_at': now
-                    })
-    
-            await session.commit()
-            logger.debug(f"Processed {len(current_app_assignments)} assignments for group {group_okta_id}")
-            
-        except Exception as e:
-            logger.error(f"Error processing group relationships: {str(e)}")
-            raise
 
     async def _flush_group_relationships(self) -> None:
         """Replay staged group-to-application assignments after applications exist."""
@@ -286,25 +331,160 @@ class SyncOrchestrator:
             return
 
         try:
-            async with self.db.get_session() as session:
+            async with self.entity_db.get_session() as session:
+                writer = RelationshipWriter(session, self.tenant_id)
                 for relationship_payload in self._pending_group_relationships:
-                    await self._process_group_relationships(session, relationship_payload)
+                    self._stage_group_relationships(writer, relationship_payload)
+                written = await writer.flush()
+                await session.commit()
 
             logger.debug(
-                f"Processed staged application assignments for {len(self._pending_group_relationships)} groups"
+                f"Processed {written.get('group_application_assignments', 0)} staged application assignments "
+                f"for {len(self._pending_group_relationships)} groups"
             )
             self._pending_group_relationships = []
         except Exception:
             self._pending_group_relationships = []
             raise
 
+    async def _choose_membership_strategy(self, group_count: int) -> str:
+        """
+        Decide how user→group memberships are collected for this sync.
+        
+        per_user costs one get_user_groups call per user, per_group costs about one
+        /groups/{id}/users call per group. In auto mode the group count of this sync is
+        compared with the user count from the previous sync (users still in the DB).
+        """
+        from src.config.settings import settings
+        strategy = settings.SYNC_MEMBERSHIP_STRATEGY
+        if strategy in ('per_user', 'per_group'):
+            return strategy
+        
+        async with self.db.get_session() as session:
+            result = await session.execute(
+                text("SELECT COUNT(*) FROM users WHERE tenant_id = :tenant_id AND is_deleted = 0"),
+                {'tenant_id': self.tenant_id}
+            )
+            user_count = result.scalar() or 0
+        
+        if not user_count:
+            logger.info("No user statistics from a previous sync - harvesting memberships per user")
+            return 'per_user'
+        
+        # Large groups need extra member pages, so require a clear margin before switching
+        if group_count * self.GROUP_HARVEST_COST_FACTOR <= user_count:
+            strategy = 'per_group'
+        else:
+            strategy = 'per_user'
+        logger.info(f"Membership strategy: {strategy} ({group_count} groups vs ~{user_count} users)")
+        return strategy
+
+    async def _harvest_group_memberships(self, okta: OktaClientWrapper) -> None:
+        """Collect memberships per group during the Group step when that is cheaper than per user."""
+        okta.harvest_group_memberships = False
+        self._memberships_by_group = False
+        self._pending_group_memberships = []
+        self._harvested_group_ids = []
+        
+        group_okta_ids = [payload['okta_id'] for payload in self._pending_group_relationships]
+        if self._sync_mode == 'incremental':
+            # Membership changes don't touch the user's lastUpdated, only the group's
+            # lastMembershipUpdated - so the changed groups are the source of truth
+            strategy = 'per_group'
+        elif not group_okta_ids:
+            return
+        else:
+            strategy = await self._choose_membership_strategy(len(group_okta_ids))
+        
+        if strategy != 'per_group':
+            return
+        
+        try:
+            start_time = time.time()
+            if group_okta_ids:
+                self._pending_group_memberships = await okta.list_group_memberships(group_okta_ids)
+            okta.harvest_group_memberships = True
+            self._memberships_by_group = True
+            self._harvested_group_ids = group_okta_ids
+            logger.info(
+                f"Harvested memberships of {len(group_okta_ids)} groups in "
+                f"{format_duration(time.time() - start_time)}"
+            )
+        except Exception as e:
+            # Fall back to per-user membership lookups
+            logger.error(f"Group membership harvest failed, falling back to per-user lookups: {str(e)}")
+            self._pending_group_memberships = []
+
+    async def _flush_group_memberships(self) -> None:
+        """Replay harvested user→group memberships after users exist."""
+        if not self._memberships_by_group:
+            return
+
+        try:
+            now = datetime.now(timezone.utc)
+            params = [
+                {
+                    'tenant_id': self.tenant_id,
+                    'user_okta_id': membership['user_okta_id'],
+                    'group_okta_id': membership['group_okta_id'],
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                for membership in self._pending_group_memberships
+            ]
+            
+            # Members that were not synced as users (e.g. excluded deprovisioned users) are skipped
+            stmt = text("""
+                INSERT INTO user_group_memberships 
+                (tenant_id, user_okta_id, group_okta_id, created_at, updated_at)
+                SELECT :tenant_id, :user_okta_id, :group_okta_id, :created_at, :updated_at
+                WHERE EXISTS (
+                    SELECT 1 FROM users
+                    WHERE okta_id = :user_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+                )
+                ON CONFLICT (tenant_id, user_okta_id, group_okta_id) 
+                DO UPDATE SET
+                    updated_at = excluded.updated_at
+            """)
+            
+            async with self.entity_db.get_session() as session:
+                BATCH_SIZE = 5000
+                
+                # Outside full mode the table was not cleaned: replace the harvested groups' rows
+                if self._sync_mode != 'full':
+                    delete_stmt = text("""
+                        DELETE FROM user_group_memberships 
+                        WHERE tenant_id = :tenant_id 
+                        AND group_okta_id = :group_okta_id
+                    """)
+                    delete_params = [
+                        {'tenant_id': self.tenant_id, 'group_okta_id': group_okta_id}
+                        for group_okta_id in self._harvested_group_ids
+                    ]
+                    for i in range(0, len(delete_params), BATCH_SIZE):
+                        await session.execute(delete_stmt, delete_params[i:i + BATCH_SIZE])
+                
+                for i in range(0, len(params), BATCH_SIZE):
+                    await session.execute(stmt, params[i:i + BATCH_SIZE])
+                await session.commit()
+
+            logger.info(
+                f"Processed {len(params)} harvested group memberships for {len(self._harvested_group_ids)} groups"
+            )
+            self._pending_group_memberships = []
+            self._harvested_group_ids = []
+        except Exception:
+            self._pending_group_memberships = []
+            self._harvested_group_ids = []
+            raise
+
     async def _flush_application_policy_links(self) -> None:
         """Replay staged application-to-policy links after policies exist."""
         if not self._pending_application_policy_links:
             return
 
         try:
-            async with self.db.get_session() as session:
+            async with self.entity_db.get_session() as session:
                 for policy_link in self._pending_application_policy_links:
                     result = await session.execute(
                         text("""
@@ -345,87 +525,71 @@ class SyncOrchestrator:
             self._pending_application_policy_links = []
             raise
 
-    async def _process_app_relationships(
-        self,
-        session: AsyncSession,
-        app_data: Dict,
-    ) -> None:
+    def _stage_app_relationships(self, writer: RelationshipWriter, app_data: Dict) -> None:
+        """Buffer an application's user assignments, replacing the ones stored for it."""
+        app_okta_id = str(app_data['okta_id'])
+        writer.replace('user_application_assignments', 'application_okta_id', app_okta_id)
+        self._stage_app_assignments(writer, app_okta_id, app_data.pop('user_assignments', None) or [])
+
+    def _stage_app_assignments(self, writer: RelationshipWriter, app_okta_id: str, assignments: List[Dict]) -> None:
+        """Buffer user assignment rows of an application (without replacing stored ones)."""
+        now = datetime.now(timezone.utc)
+        for assignment in assignments:
+            writer.add('user_application_assignments', {
+                'user_okta_id': str(assignment['user_okta_id']),
+                'application_okta_id': app_okta_id,
+                'assignment_id': str(assignment['assignment_id']),
+                'assignment_type': str(assignment['assignment_type']),
+                'group_name': assignment.get('group_name'),
+                'group_okta_id': assignment.get('group_okta_id'),
+                'assignment_status': str(assignment['status']),
+                'credentials_setup': assignment.get('credentials_setup', False),
+                'hidden': assignment.get('hidden', False),
+                'created_at': assignment.get('created_at', now),
+                'updated_at': now
+            })
+        
+    async def _write_streamed_app_assignments(self, app_data: Dict, assignments: List[Dict], first_chunk: bool) -> None:
         """
-        Process application user assignments with scope awareness.
-        Uses batched INSERTs for performance with large apps (10K+ users).
+        Write one chunk of a large application's user assignments (OktaClientWrapper.app_assignment_sink).
+        
+        The first chunk upserts the application row (the assignments' FK target) and replaces
+        the assignments stored for the app; later chunks only append. Each chunk is its own
+        short transaction under the DB write lock, so other nodes keep writing in between.
+        
+        Args:
+            app_data: Transformed application (as returned before its page is written)
+            assignments: Assignments of the chunk (from OktaClientWrapper.iter_app_user_pages)
+            first_chunk: True for the first chunk of the application
         """
-        try:
-            # Get current assignments from Okta response
-            user_assignments = app_data.pop('user_assignments', [])
-            app_okta_id = str(app_data['okta_id'])
-            
-            # DELETE all existing assignments for this app first
-            delete_stmt = text("""
-                DELETE FROM user_application_assignments 
-                WHERE tenant_id = :tenant_id 
-                AND application_okta_id = :app_okta_id
-            """)
-            
-            await session.execute(delete_stmt, {
-                'tenant_id': str(self.tenant_id),
-                'app_okta_id': app_okta_id
-            })
-            
-            # INSERT current assignments with batched execution for performance
-            if user_assignments:
-                BATCH_SIZE = 1000
-                now = datetime.now(timezone.utc)
-                
-                # Prepare INSERT statement (reuse for all batches)
-                insert_stmt = text("""
-                    INSERT INTO user_application_assignments 
-                    (tenant_id, user_okta_id, application_okta_id, 
-                     assignment_id, assignment_type, group_name, group_okta_id,
-                     assignment_status, credentials_setup, hidden,
-                     created_at, updated_at)
-                    VALUES (:tenant_id, :user_okta_id, :application_okta_id,
-                            :assignment_id, :assignment_type, :group_name, :group_okta_id,
-                            :assignment_status, :credentials_setup, :hidden,
-                            :created_at, :updated_at)
-                """)
+        import time
+        app_okta_id = str(app_data['okta_id'])
+        lock_requested = time.perf_counter()
+        async with self._db_write_lock:
+            write_started = time.perf_counter()
+            async with self.entity_db.get_session() as session:
+                if first_chunk:
+                    # policy_id is linked once policies exist, assignments go through the writer
+                    app_row = {
+                        key: value for key, value in app_data.items()
+                        if key not in ('policy_id', 'user_assignments', 'user_assignments_streamed')
+                    }
+                    await self.entity_db.bulk_upsert(session, Application, [app_row], self.tenant_id)
+                    await session.flush()
                 
-                # Process in batches of 1000 for optimal performance
-                total_inserted = 0
-                for i in range(0, len(user_assignments), BATCH_SIZE):
-                    batch = user_assignments[i:i + BATCH_SIZE]
-                    
-                    # Prepare batch parameters
-                    batch_params = []
-                    for assignment in batch:
-                        batch_params.append({
-                            'tenant_id': str(self.tenant_id),
-                            'user_okta_id': str(assignment['user_okta_id']),
-                            'application_okta_id': app_okta_id,
-                            'assignment_id': str(assignment['assignment_id']),
-                            'assignment_type': str(assignment['assignment_type']),
-                            'group_name': assignment.get('group_name'),
-                            'group_okta_id': assignment.get('group_okta_id'),
-                            'assignment_status': str(assignment['status']),
-                            'credentials_setup': assignment.get('credentials_setup', False),
-                            'hidden': assignment.get('hidden', False),
-                            'created_at': assignment.get('created_at', now),
-                            'updated_at': now
-                        })
-                    
-                    # Execute batch insert
-                    await session.execute(insert_stmt, batch_params)
-                    total_inserted += len(batch)
-                    
-                    if len(user_assignments) > BATCH_SIZE:
-                        logger.debug(f"Inserted batch {i//BATCH_SIZE + 1}: {len(batch)} assignments for app {app_okta_id}")
-            
-            await session.commit()
-            logger.debug(f"Processed {len(user_assignments)} assignments for app {app_okta_id}")
+                writer = RelationshipWriter(session, self.tenant_id)
+                if first_chunk:
+                    self._stage_app_relationships(writer, {'okta_id': app_okta_id, 'user_assignments': assignments})
+                else:
+                    self._stage_app_assignments(writer, app_okta_id, assignments)
+                await writer.flush()
+                await session.commit()
             
-        except Exception as e:
-            logger.error(f"Error processing app relationships: {str(e)}")
-            raise
-        
+            phase = current_phase()
+            if phase is not None:
+                phase.observe_db_write(time.perf_counter() - write_started, write_started - lock_requested)
+        logger.debug(f"Streamed {len(assignments)} user assignments for app {app_okta_id}")
+
     async def _clean_entity_data(self, session: AsyncSession, model: Type[ModelType]) -> None:
         """Clean existing data for entity type"""
         try:
@@ -491,42 +655,98 @@ class SyncOrchestrator:
             raise 
         
         
-    async def sync_model_streaming(self, model: Type[ModelType], list_method: Callable, batch_size: int = 100) -> None:
-        """Sync model with direct API-to-DB streaming (no memory accumulation)."""
+    async def _get_active_sync_id(self) -> Optional[int]:
+        """ID of the tenant's running sync history record, if any."""
+        async with self.db.get_session() as session:
+            stmt = select(SyncHistory.id).where(
+                and_(
+                    SyncHistory.tenant_id == self.tenant_id,
+                    SyncHistory.status.in_([SyncStatus.RUNNING, SyncStatus.IDLE])
+                )
+            ).order_by(SyncHistory.start_time.desc()).limit(1)
+            result = await session.execute(stmt)
+            return result.scalar()
+
+    async def _set_entity_count(self, session: AsyncSession, sync_id: int, model: Type[ModelType], total_records: int) -> None:
+        """Set the entity counter matching model on the sync history record (caller commits)."""
+        sync_history = await session.get(SyncHistory, sync_id)
+        if sync_history:
+            # Update the appropriate counter based on model type
+            if model.__name__ == 'User':
+                sync_history.users_count = total_records
+            elif model.__name__ == 'Group':
+                sync_history.groups_count = total_records
+            elif model.__name__ == 'Application':
+                sync_history.apps_count = total_records
+            elif model.__name__ == 'Policy':
+                sync_history.policies_count = total_records
+            elif model.__name__ == 'Device': 
+                sync_history.devices_count = total_records
+
+    async def sync_model_streaming(
+        self,
+        model: Type[ModelType],
+        list_method: Callable,
+        batch_size: int = 100,
+        since: Optional[datetime] = None,
+        okta: Optional[OktaClientWrapper] = None
+    ) -> None:
+        """
+        Sync model with direct API-to-DB streaming (no memory accumulation).
+        
+        In full mode existing rows are cleaned first. Otherwise rows are upserted in
+        place: with `since` only entities changed after it are listed, without it
+        (reconcile) everything is listed and records not seen are soft-deleted.
+        Applications and policies are always listed in full, so incremental runs
+        soft-delete the unseen ones as well.
+        
+        Resumable listings checkpoint their page cursor after every committed page; when
+        resuming, the listing continues from there and the clean is skipped.
+        """
         import time
         start_time = time.time()
         logger.info(f"Starting sync for {model.__name__}")
+        reconcile_cutoff = datetime.utcnow()
         try:
             # Make sure the database operations object has the tenant_id set
             self.db.tenant_id = self.tenant_id
+            self.entity_db.tenant_id = self.tenant_id
+            self.entity_db.reset_upsert_stats(model)
             
             # Get sync history ID for updates
-            async with self.db.get_session() as session:
-                # Find active sync
-                from src.core.okta.sync.models import SyncHistory, SyncStatus
-                stmt = select(SyncHistory).where(
-                    and_(
-                        SyncHistory.tenant_id == self.tenant_id,
-                        SyncHistory.status.in_([SyncStatus.RUNNING, SyncStatus.IDLE])
-                    )
-                ).order_by(SyncHistory.start_time.desc()).limit(1)
-                
-                result = await session.execute(stmt)
-                active_sync = result.scalars().first()
-                
-                if not active_sync:
-                    logger.error("No active sync record found for updates")
-                    return
-                    
-                sync_id = active_sync.id
-                
+            sync_id = await self._get_active_sync_id()
+            if sync_id is None:
+                logger.error("No active sync record found for updates")
+                return
+            
+            listing_name = RESUMABLE_LISTINGS.get(model.__name__) if self._checkpoint else None
+            listing = self._checkpoint.listing(listing_name) if listing_name else None
+            if listing and listing.get('cutoff'):
+                # Rows committed before the interruption count as seen by this reconcile
+                reconcile_cutoff = datetime.fromisoformat(listing['cutoff'])
+            
+            async with self.entity_db.get_session() as session:
                 try:
-                    # Clean existing data first
-                    await self._clean_entity_data(session, model)
-                    logger.info(f"Cleaned existing {model.__name__} data")
+                    if listing:
+                        logger.info(
+                            f"Resuming {model.__name__} sync after {listing['records']} committed records"
+                            + (" (listing already complete)" if listing['complete'] else "")
+                        )
+                    elif self._sync_mode == 'full':
+                        # Clean existing data first
+                        async with self._db_write_lock:
+                            await self._clean_entity_data(session, model)
+                        logger.info(f"Cleaned existing {model.__name__} data")
+                    elif since:
+                        logger.info(f"Incremental {model.__name__} sync: changes since {since.isoformat()}")
+                    else:
+                        logger.info(f"Reconciling all {model.__name__} records")
+                    pagination_errors_before = okta.pagination_errors if okta else 0
                     
                     # Create processor function for handling batches directly from API to DB
-                    total_records = 0
+                    total_records = listing['records'] if listing else 0
+                    if listing_name and listing is None:
+                        listing = self._checkpoint.start_listing(listing_name, reconcile_cutoff)
                     
                     async def process_batch_directly(batch_data):
                         nonlocal total_records
@@ -534,36 +754,89 @@ class SyncOrchestrator:
                         if not batch_data:
                             return
                         
-                        # Process this batch immediately to DB
-                        batch_count = await self._process_batch_to_db(session, model, batch_data)
+                        lock_requested = time.perf_counter()
+                        async with self._db_write_lock:
+                            write_started = time.perf_counter()
+                            # Process this batch immediately to DB
+                            batch_count = await self._process_batch_to_db(session, model, batch_data)
+                            
+                            # Update total count
+                            total_records += batch_count
+                            
+                            # Update entity count in the sync history record
+                            if self.entity_db is self.db:
+                                await self._set_entity_count(session, sync_id, model, total_records)
+                                await session.commit()
+                            else:
+                                # Rows go to the staging database, progress to the live one
+                                await session.commit()
+                                async with self.db.get_session() as history_session:
+                                    await self._set_entity_count(history_session, sync_id, model, total_records)
+                            
+                            phase = current_phase()
+                            if phase is not None:
+                                phase.observe_page_write(
+                                    batch_count, time.perf_counter() - write_started, write_started - lock_requested
+                                )
+                            
+                            # A page cut short by cancellation is fetched again on resume
+                            if listing is not None and not self._is_cancelled():
+                                next_link = okta.next_page_links.get(listing_name) if okta else None
+                                await self._save_checkpoint(
+                                    f"{model.__name__} page",
+                                    lambda: self._checkpoint.page_committed(listing_name, next_link, total_records, self)
+                                )
                         
-                        # Update total count
-                        total_records += batch_count
+                        logger.info(f"Processed {batch_count} {model.__name__} records, total: {total_records}")
+                    
+                    # A listing finished before the interruption isn't fetched again
+                    if listing is None or not listing['complete']:
+                        if listing is not None and listing['after'] and okta:
+                            okta.resume_after[listing_name] = listing['after']
                         
-                        # Update entity count in the sync history record
-                        sync_history = await session.get(SyncHistory, sync_id)
-                        if sync_history:
-                            # Update the appropriate counter based on model type
-                            if model.__name__ == 'User':
-                                sync_history.users_count = total_records
-                            elif model.__name__ == 'Group':
-                                sync_history.groups_count = total_records
-                            elif model.__name__ == 'Application':
-                                sync_history.apps_count = total_records
-                            elif model.__name__ == 'Policy':
-                                sync_history.policies_count = total_records
-                            elif model.__name__ == 'Device': 
-                                sync_history.devices_count = total_records
-                                
-                            await session.commit()
+                        # Call list method with direct processor function 
+                        if since:
+                            await list_method(processor_func=process_batch_directly, since=since)
+                        else:
+                            await list_method(processor_func=process_batch_directly)
                         
-                        logger.info(f"Processed {batch_count} {model.__name__} records, total: {total_records}")
+                        listing_finished = (
+                            okta is not None and okta.pagination_errors == pagination_errors_before
+                            and not self._is_cancelled()
+                        )
+                        if listing is not None and listing_finished:
+                            async with self._db_write_lock:
+                                await self._save_checkpoint(
+                                    f"{model.__name__} listing",
+                                    lambda: self._checkpoint.listing_completed(listing_name, total_records)
+                                )
+
                     
-                    # Call list method with direct processor function 
-                    await list_method(processor_func=process_batch_directly)
+                    if self._sync_mode == 'reconcile' or (
+                        self._sync_mode == 'incremental' and model in FULLY_LISTED_MODELS
+                    ):
+                        cancelled = self.cancellation_flag and self.cancellation_flag.is_set()
+                        incomplete = okta is None or okta.pagination_errors > pagination_errors_before
+                        if cancelled or incomplete:
+                            logger.warning(f"Skipping {model.__name__} deletion reconcile: listing did not complete")
+                        else:
+                            async with self._db_write_lock:
+                                deleted_count = await self.entity_db.mark_deleted(
+                                    session, model, None, self.tenant_id, synced_before=reconcile_cutoff
+                                )
+                                if model == User and deleted_count:
+                                    await self._purge_deleted_user_relationships(session)
+                                await session.commit()
                     
                     duration = time.time() - start_time
                     logger.info(f"Processed {total_records} {model.__name__} records in {format_duration(duration)}")
+
+                    upsert_stats = self.entity_db.get_upsert_stats(model)
+                    if upsert_stats["rows"]:
+                        logger.info(
+                            f"{model.__name__} upsert throughput: {upsert_stats['rows']} rows in "
+                            f"{format_duration(upsert_stats['seconds'])} ({upsert_stats['rows_per_second']:.0f} rows/sec)"
+                        )
                     
                 except Exception as e:
                     logger.error(f"Error during {model.__name__} sync: {str(e)}")
@@ -573,100 +846,399 @@ class SyncOrchestrator:
             logger.error(f"Sync error for {model.__name__}: {str(e)}")
             raise      
 
+    def _is_cancelled(self) -> bool:
+        """True when the cancellation flag (asyncio.Event) has been set."""
+        return bool(self.cancellation_flag and hasattr(self.cancellation_flag, 'is_set') and self.cancellation_flag.is_set())
+
+    def _build_sync_graph(self, okta: OktaClientWrapper, since: Optional[datetime], sync_started_at: datetime) -> List[SyncNode]:
+        """
+        Describe the sync as a dependency graph.
+        
+        Edges follow the FK constraints and staged links:
+        - users need groups (memberships; per-group harvesting happens in the groups node)
+        - applications need users (user_application_assignments FK on users.okta_id)
+        - devices need users (device-user links are only written for known users)
+        - group→app links are flushed once groups and applications exist
+        - app→policy links are flushed once applications and policies exist
+        - authenticators and policies have no dependencies
+        - swap_in (shadow-table full sync) waits for all of the above
+        """
+        from src.config.settings import settings
+
+        async def sync_groups():
+            await self.sync_model_streaming(Group, okta.list_groups, since=since, okta=okta)
+            await self._harvest_group_memberships(okta)
+
+        async def sync_users():
+            await self.sync_model_streaming(User, okta.list_users, since=since, okta=okta)
+            async with self._db_write_lock:
+                await self._flush_group_memberships()
+
+        async def flush_group_app_links():
+            async with self._db_write_lock:
+                await self._flush_group_relationships()
+
+        async def flush_app_policy_links():
+            async with self._db_write_lock:
+                await self._flush_application_policy_links()
+
+        async def swap_in_staging():
+            async with self._db_write_lock:
+                await self.db.swap_in_staging(self._staging, self._full_sync_table_names(), self.tenant_id)
+                # The swap writes the whole tenant through the WAL; fold it back in right away
+                await self.db.checkpoint_wal("TRUNCATE")
+            self.entity_db = self.db
+
+        async def apply_system_log():
+            cdc = SystemLogCDC(self, okta)
+            await cdc.run(
+                default_since=since or sync_started_at,
+                reset=self._sync_mode != 'incremental'
+            )
+
+        # Apps too large to buffer write their assignments while they are fetched
+        okta.app_assignment_sink = self._write_streamed_app_assignments
+
+        nodes = [
+            SyncNode('groups', sync_groups),
+            SyncNode('users', sync_users, ('groups',)),
+            SyncNode('applications', lambda: self.sync_model_streaming(Application, okta.list_applications, since=since, okta=okta), ('users',)),
+            SyncNode('group_app_links', flush_group_app_links, ('groups', 'applications')),
+            SyncNode('authenticators', lambda: self.sync_model_streaming(Authenticator, okta.list_authenticators, okta=okta)),
+            SyncNode('policies', lambda: self.sync_model_streaming(Policy, okta.list_policies, since=since, okta=okta)),
+            SyncNode('app_policy_links', flush_app_policy_links, ('applications', 'policies')),
+        ]
+        if settings.SYNC_OKTA_DEVICES:
+            nodes.append(SyncNode('devices', lambda: self.sync_model_streaming(Device, okta.list_devices, since=since, okta=okta), ('users',)))
+        else:
+            logger.info("Skipping Devices (SYNC_OKTA_DEVICES=false)")
+        if self._staging:
+            # Shadow-table full sync: publish all entities at once when every node has loaded
+            nodes.append(SyncNode('swap_in', swap_in_staging, tuple(node.name for node in nodes)))
+        if settings.SYNC_SYSTEM_LOG_CDC:
+            # Runs last so events are applied on top of the finished snapshot
+            nodes.append(SyncNode('system_log', apply_system_log, tuple(node.name for node in nodes)))
+        return nodes
+
+    def _full_sync_table_names(self) -> List[str]:
+        """Entity and relationship tables a full sync reloads."""
+        from src.config.settings import settings
+        return [
+            name for name in SHADOW_SYNC_TABLES
+            if settings.SYNC_OKTA_DEVICES or name not in ('devices', 'user_devices')
+        ]
+
+    async def _rebuild_deferred_indexes(self) -> None:
+        """Rebuild the secondary indexes dropped for an in-place full sync, once its load is over."""
+        indexes, self._deferred_indexes = self._deferred_indexes, []
+        if indexes:
+            async with self._db_write_lock:
+                await self.db.rebuild_indexes(indexes)
+
+    async def _run_sync_graph(self, nodes: List[SyncNode]) -> bool:
+        """
+        Run graph nodes as soon as their dependencies finish.
+        
+        Concurrency is capped by SYNC_MAX_PARALLEL_NODES (1 = one node at a time in
+        dependency order). All nodes share the OktaClientWrapper, so its API semaphore is
+        the shared request budget. Database writes are serialized by _db_write_lock.
+        
+        Returns:
+            False if the sync was cancelled before all nodes ran
+        """
+        from src.config.settings import settings
+        node_by_name = {node.name: node for node in nodes}
+        for node in nodes:
+            missing = [dep for dep in node.depends_on if dep not in node_by_name]
+            if missing:
+                raise ValueError(f"Sync node {node.name} depends on unknown nodes: {missing}")
+
+        max_parallel = max(1, settings.SYNC_MAX_PARALLEL_NODES)
+        pending = list(nodes)
+        done = set()
+        running: Dict[asyncio.Task, SyncNode] = {}
+        self._sync_timeline = []
+
+        if self._checkpoint:
+            # Nodes the interrupted sync already completed
+            for node in nodes:
+                if self._checkpoint.node_completed(node.name):
+                    pending.remove(node)
+                    done.add(node.name)
+                    self._sync_timeline.append({
+                        'node': node.name,
+                        'depends_on': list(node.depends_on),
+                        'started_at': None,
+                        'finished_at': None,
+                        'duration_seconds': None,
+                        'status': 'skipped',
+                        'resumed_from': self._checkpoint.resumed_from,
+                    })
+
+        try:
+            while pending or running:
+                if self._is_cancelled():
+                    logger.info(f"Sync cancelled - skipping {[node.name for node in pending]}")
+                    pending = []
+                    if not running:
+                        return False
+
+                # Start every ready node (in declaration order) while there is room
+                for node in list(pending):
+                    if len(running) >= max_parallel:
+                        break
+                    if all(dep in done for dep in node.depends_on):
+                        pending.remove(node)
+                        running[asyncio.create_task(self._run_sync_node(node))] = node
+
+                if not running:
+                    unresolved = {node.name: list(node.depends_on) for node in pending}
+                    raise RuntimeError(f"Sync graph has unsatisfiable dependencies: {unresolved}")
+
+                finished, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    node = running.pop(task)
+                    # Re-raise the first node failure (remaining nodes are cancelled below)
+                    task.result()
+                    done.add(node.name)
+
+            return not self._is_cancelled()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+    async def _run_sync_node(self, node: SyncNode) -> None:
+        """Run one graph node and record its timeline entry."""
+        entry = {
+            'node': node.name,
+            'depends_on': list(node.depends_on),
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'finished_at': None,
+            'duration_seconds': None,
+            'status': 'running',
+        }
+        self._sync_timeline.append(entry)
+        started = time.time()
+        phase = self._metrics.start_phase(node.name) if self._metrics else None
+        phase_token = bind_phase(phase)
+        logger.info(f"Sync node started: {node.name}")
+        try:
+            await node.run()
+            entry['status'] = 'cancelled' if self._is_cancelled() else 'completed'
+            if entry['status'] == 'completed':
+                await self._checkpoint_after_node(node)
+                if self._checkpoint:
+                    async with self._db_write_lock:
+                        await self._save_checkpoint(
+                            f"{node.name} node", lambda: self._checkpoint.node_finished(node.name, self)
+                        )
+        except asyncio.CancelledError:
+            entry['status'] = 'cancelled'
+            raise
+        except Exception as e:
+            entry['status'] = 'failed'
+            entry['error'] = str(e)
+            raise
+        finally:
+            entry['finished_at'] = datetime.now(timezone.utc).isoformat()
+            entry['duration_seconds'] = round(time.time() - started, 3)
+            logger.info(f"Sync node {node.name} {entry['status']} in {format_duration(entry['duration_seconds'])}")
+            try:
+                await self._record_sync_timeline()
+            except Exception as e:
+                logger.warning(f"Could not record sync timeline: {str(e)}")
+            unbind_phase(phase_token)
+            if phase is not None:
+                await self._record_phase_metrics(entry, phase)
+
+    async def _record_phase_metrics(self, entry: Dict[str, Any], phase: PhaseMetrics) -> None:
+        """Store a finished node's telemetry (failures don't fail the sync)."""
+        self._metrics.finish_phase(phase.phase)
+        if self._metrics.sync_id is None:
+            return
+        data = phase.to_dict()
+        data.update({
+            'status': entry['status'],
+            'started_at': phase.started_at,
+            'finished_at': datetime.now(timezone.utc),
+            'duration_seconds': entry['duration_seconds'],
+        })
+        try:
+            async with self._db_write_lock:
+                async with self.db.get_session() as session:
+                    await self.db.add_sync_phase_metrics(session, self.tenant_id, self._metrics.sync_id, data)
+        except Exception as e:
+            logger.warning(f"Could not record {phase.phase} phase metrics: {str(e)}")
+
+    async def _checkpoint_after_node(self, node: SyncNode) -> None:
+        """PASSIVE WAL checkpoint between nodes so the WAL doesn't grow across the whole sync."""
+        try:
+            async with self._db_write_lock:
+                await self.entity_db.checkpoint_wal("PASSIVE")
+        except Exception as e:
+            logger.warning(f"WAL checkpoint after {node.name} failed: {str(e)}")
+
+    async def _save_checkpoint(self, what: str, save: Callable[[], Awaitable[None]]) -> None:
+        """Write resume progress; a failed write only costs resumability, not the sync."""
+        try:
+            await save()
+        except Exception as e:
+            logger.warning(f"Could not checkpoint {what}: {str(e)}")
+
+    async def _open_checkpoint(self, sync_id: Optional[int]) -> Optional[SyncCheckpoint]:
+        """Take over an interrupted sync's checkpoint (SYNC_RESUME), if there is a usable one."""
+        from src.config.settings import settings
+        if not settings.SYNC_RESUME or sync_id is None:
+            return None
+        try:
+            return await SyncCheckpoint.claim(self.db, self.tenant_id, sync_id)
+        except Exception as e:
+            logger.warning(f"Could not load sync checkpoint, starting over: {str(e)}")
+            return None
+
+    async def _post_sync_maintenance(self) -> None:
+        """Truncate the WAL and refresh planner statistics after a successful sync."""
+        from src.config.settings import settings
+        try:
+            async with self._db_write_lock:
+                await self.db.checkpoint_wal("TRUNCATE")
+                if settings.SYNC_SQLITE_OPTIMIZE:
+                    # A full reload replaces most rows, so re-analyze everything
+                    await self.db.optimize(analyze=self._sync_mode == 'full')
+        except Exception as e:
+            logger.warning(f"Post-sync SQLite maintenance failed: {str(e)}")
+
+    async def _export_snapshot(self) -> None:
+        """Write the columnar snapshot of the synced tables (failures don't fail the sync)."""
+        try:
+            exporter = SnapshotExporter(self.tenant_id)
+            await exporter.export(sync_id=await self._get_active_sync_id())
+        except Exception as e:
+            logger.warning(f"Snapshot export failed: {str(e)}")
+
+    async def _record_sync_timeline(self) -> None:
+        """Store the per-node timeline on the active sync history record."""
+        async with self._db_write_lock:
+            async with self.db.get_session() as session:
+                active_sync = await self.db.get_active_sync(session, self.tenant_id)
+                if active_sync:
+                    active_sync.timeline = [dict(entry) for entry in self._sync_timeline]
+                    await session.commit()
+
     async def run_sync(self) -> None:
         """
-        Run entity syncs in sequential order to manage dependencies.
+        Run entity syncs as a dependency graph (see _build_sync_graph).
         
-        Flow:
-        1. Groups first (no dependencies)
-        2. Users second (depends on groups for memberships)
-        3. Applications third (depends on users for FK constraint on user_application_assignments)
-        4. Authenticators fourth (no dependencies)
-        5. Devices fifth (conditional sync, no dependencies) 
-        6. Policies last (depends on apps)
+        Independent nodes run concurrently:
+        - groups → users → applications (FK: user_application_assignments needs users)
+        - users → devices (when SYNC_OKTA_DEVICES is enabled)
+        - authenticators and policies have no dependencies
+        - staged group→app and app→policy links flush once both sides exist
+        - System Log CDC (optional) runs after everything else
         
-        CRITICAL: Users MUST be synced before Applications because _process_app_relationships()
-        inserts into user_application_assignments table which has FK constraint on users.okta_id.
+        Full syncs with SYNC_SHADOW_TABLES load into a staging database and swap the
+        tenant's rows in at the end, so queries never see half-loaded tables. Without
+        shadow tables, SYNC_DEFERRED_INDEXES drops the live secondary indexes for the
+        load and rebuilds them once it is over.
+        
+        Per-node start/finish times are stored in SyncHistory.timeline, per-node telemetry
+        (API calls, 429s, pages, DB write latency, prefetch queue depth) in
+        sync_phase_metrics (see metrics.py).
+        
+        With SYNC_RESUME, progress is checkpointed on the sync history record (see
+        checkpoint.py). A sync that was cancelled, failed or interrupted is resumed by the
+        next run: completed nodes are skipped and listings continue from their last
+        committed page, in the original sync mode and staging database.
+        
+        The WAL is checkpointed between nodes and truncated at the end, followed by
+        ANALYZE / PRAGMA optimize (SYNC_SQLITE_OPTIMIZE). With SYNC_SNAPSHOT_EXPORT the
+        synced tables are then exported to Parquet (see snapshot.py).
         
         Supports cancellation via cancellation_flag attribute.
         """
         try:
             import time
             overall_start_time = time.time()
+            sync_started_at = datetime.now(timezone.utc)
             await self._initialize()
             self._pending_group_relationships = []
             self._pending_application_policy_links = []
+            self._pending_group_memberships = []
+            self._harvested_group_ids = []
+            
+            from src.config.settings import settings
+            sync_id = await self._get_active_sync_id()
+            self._metrics = SyncMetrics(self.tenant_id, sync_id)
+            self._metrics.activate()
+            self._checkpoint = await self._open_checkpoint(sync_id)
+            if self._checkpoint:
+                self._sync_mode, since = self._checkpoint.sync_mode, self._checkpoint.since
+                shadow = self._checkpoint.shadow
+            else:
+                self._sync_mode, since = await self._resolve_sync_mode()
+                shadow = self._sync_mode == 'full' and settings.SYNC_SHADOW_TABLES
+            await self._record_sync_mode(self._sync_mode)
+            logger.info(f"Sync mode: {self._sync_mode}" + (f" (changes since {since.isoformat()})" if since else ""))
+            
+            if shadow:
+                # Load into staging tables; live tables keep serving queries until the swap
+                self._staging = StagingDatabase.for_tenant(self.tenant_id)
+                if self._checkpoint:
+                    logger.info(f"Continuing to load staging database {self._staging.path}")
+                else:
+                    await self._staging.init_db()
+                self.entity_db = self._staging
+            elif self._checkpoint and self._checkpoint.staging_swapped_in:
+                # Interrupted after the swap: the kept staging file is no longer needed
+                await StagingDatabase.for_tenant(self.tenant_id).discard()
+            elif self._sync_mode == 'full' and settings.SYNC_DEFERRED_INDEXES:
+                # Loading the live tables in place: build secondary indexes once, after the load
+                self._deferred_indexes = await self.db.drop_secondary_indexes(self._full_sync_table_names())
+            
+            if self._checkpoint is None and settings.SYNC_RESUME and sync_id is not None:
+                try:
+                    self._checkpoint = await SyncCheckpoint.begin(
+                        self.db, self.tenant_id, sync_id, self._sync_mode, since, shadow
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not start sync checkpoint, this sync won't be resumable: {str(e)}")
             
             # Pass the cancellation flag to the OktaClientWrapper
             async with OktaClientWrapper(self.tenant_id, self.cancellation_flag) as okta:
-                logger.info(f"Starting sync in dependency order for tenant {self.tenant_id}")
+                logger.info(f"Starting sync graph for tenant {self.tenant_id}")
                 
-                # Check cancellation before each major step
-                # 1. Groups first (no dependencies)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    logger.info("Step 1: Syncing Groups")
-                    await self.sync_model_streaming(Group, okta.list_groups)
-                else:
-                    logger.info("Sync cancelled - skipping Groups")
-                    return
-                    
-                # 2. Users second (depends on groups, must be before apps for FK constraint)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    logger.info("Step 2: Syncing Users")
-                    await self.sync_model_streaming(User, okta.list_users)
-                else:
-                    logger.info("Sync cancelled - skipping remaining steps")
-                    return
-    
-                # 3. Applications third (depends on users for user_application_assignments FK)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    logger.info("Step 3: Syncing Applications")
-                    await self.sync_model_streaming(Application, okta.list_applications)
-                    await self._flush_group_relationships()
-                else:
-                    logger.info("Sync cancelled - skipping remaining steps")
+                if self._is_cancelled():
+                    logger.info("Sync cancelled - skipping all steps")
                     return
                 
-                # 4. Authenticators fourth (no dependencies)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    logger.info("Step 4: Syncing Authenticators")
-                    await self.sync_model_streaming(Authenticator, okta.list_authenticators)
-                else:
-                    logger.info("Sync cancelled - skipping remaining steps")
-                    return                
+                if self._checkpoint and self._checkpoint.resumed_from:
+                    await self._checkpoint.restore(self, okta)
                 
-                # 5. Devices fifth (conditional sync)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    # Check if device sync is enabled
-                    from src.config.settings import settings
-                    if settings.SYNC_OKTA_DEVICES:
-                        logger.info("Step 5: Syncing Devices")
-                        await self.sync_model_streaming(Device, okta.list_devices)
-                    else:
-                        logger.info("Step 5: Skipping Devices (SYNC_OKTA_DEVICES=false)")
-                else:
-                    logger.info("Sync cancelled - skipping remaining steps")
-                    return                
-    
-    
-                # 6. Policies last (depends on apps)
-                if not self.cancellation_flag or (hasattr(self.cancellation_flag, 'is_set') and not self.cancellation_flag.is_set()):
-                    logger.info("Step 6: Syncing Policies")
-                    await self.sync_model_streaming(Policy, okta.list_policies)
-                    await self._flush_application_policy_links()
-                    
-                    # Check if there were authentication errors
-                    if okta.auth_errors:
-                        error_msg = "Okta authentication failed: " + "; ".join(okta.auth_errors[:3])  # Limit to first 3 errors
-                        logger.error(f"Sync completed with auth errors: {error_msg}")
-                        raise Exception(error_msg)
-                    
-                    # Log total duration
-                    total_duration = time.time() - overall_start_time
-                    logger.info(f"Sync completed for tenant {self.tenant_id} in {format_duration(total_duration)}")
-                else:
-                    logger.info("Sync cancelled - skipping remaining steps")
+                completed = await self._run_sync_graph(self._build_sync_graph(okta, since, sync_started_at))
+                if not completed:
                     return
+                await self._rebuild_deferred_indexes()
+                
+                # Every node ran: nothing left to resume, even if the sync fails below
+                if self._checkpoint:
+                    await self._save_checkpoint("sync completion", self._checkpoint.clear)
+                    self._checkpoint = None
+                
+                # Check if there were authentication errors
+                if okta.auth_errors:
+                    error_msg = "Okta authentication failed: " + "; ".join(okta.auth_errors[:3])  # Limit to first 3 errors
+                    logger.error(f"Sync completed with auth errors: {error_msg}")
+                    raise Exception(error_msg)
+                
+                await self._post_sync_maintenance()
+                if settings.SYNC_SNAPSHOT_EXPORT:
+                    await self._export_snapshot()
+                
+                # Log total duration
+                total_duration = time.time() - overall_start_time
+                logger.info(f"Sync completed for tenant {self.tenant_id} in {format_duration(total_duration)}")
                 
         except asyncio.CancelledError:
             duration = time.time() - overall_start_time
@@ -675,6 +1247,25 @@ class SyncOrchestrator:
         except Exception as e:
             logger.error(f"Sync orchestration error: {str(e)}")
             raise
+        finally:
+            if self._metrics:
+                self._metrics.deactivate()
+            if self._deferred_indexes:
+                # Cancelled or failed mid-load: queries need the indexes back either way
+                try:
+                    await self._rebuild_deferred_indexes()
+                except Exception as e:
+                    logger.error(f"Rebuilding deferred indexes failed (restored on next startup): {str(e)}")
+            if self._staging:
+                if self._checkpoint:
+                    # Interrupted: the next sync resumes loading into the same file
+                    logger.info(f"Keeping staging database {self._staging.path} for resuming the sync")
+                    await self._staging.close()
+                else:
+                    # Swapped in or abandoned (failure/cancel leaves the live tables untouched)
+                    await self._staging.discard()
+                self._staging = None
+                self.entity_db = self.db
     
 
     async def _process_batch_to_db(self, session: AsyncSession, model: Type[ModelType], batch: List[Dict]) -> int:
@@ -694,6 +1285,12 @@ class SyncOrchestrator:
             
         try:
             if model == User:
+                removed = await self._mark_deprovisioned_users_deleted(session, batch)
+                if removed:
+                    batch = [record for record in batch if record['okta_id'] not in removed]
+                    if not batch:
+                        return len(removed)
+
                 relationship_payloads = []
                 for record in batch:
                     relationship_payloads.append({
@@ -702,13 +1299,20 @@ class SyncOrchestrator:
                         'factors': record.pop('factors', []),
                     })
 
-                await self.db.bulk_upsert(session, model, batch, self.tenant_id)
+                await self.entity_db.bulk_upsert(session, model, batch, self.tenant_id)
                 await session.flush()
 
+                # Edges of the whole page go out in a few executemany calls; the caller commits
+                writer = RelationshipWriter(session, self.tenant_id)
                 for relationship_payload in relationship_payloads:
-                    await self._process_user_relationships(session, relationship_payload)
+                    self._stage_user_relationships(writer, relationship_payload)
+                written = await writer.flush()
+                logger.debug(
+                    f"Wrote {written.get('user_group_memberships', 0)} memberships and "
+                    f"{written.get('user_factors', 0)} factors for {len(batch)} users"
+                )
 
-                return len(batch)
+                return len(batch) + len(removed)
 
             if model == Group:
                 for record in batch:
@@ -717,7 +1321,7 @@ class SyncOrchestrator:
                         'applications': record.pop('applications', []),
                     })
 
-                await self.db.bulk_upsert(session, model, batch, self.tenant_id)
+                await self.entity_db.bulk_upsert(session, model, batch, self.tenant_id)
                 return len(batch)
 
             if model == Application:
@@ -730,26 +1334,30 @@ class SyncOrchestrator:
                             'policy_id': str(policy_id),
                         })
 
+                    # Streamed apps already replaced their assignments while they were fetched
+                    if record.pop('user_assignments_streamed', False):
+                        continue
                     relationship_payloads.append({
                         'okta_id': record['okta_id'],
                         'user_assignments': record.pop('user_assignments', []),
                     })
 
-                await self.db.bulk_upsert(session, model, batch, self.tenant_id)
+                await self.entity_db.bulk_upsert(session, model, batch, self.tenant_id)
                 await session.flush()
 
+                writer = RelationshipWriter(session, self.tenant_id)
                 for relationship_payload in relationship_payloads:
-                    await self._process_app_relationships(session, relationship_payload)
+                    self._stage_app_relationships(writer, relationship_payload)
+                written = await writer.flush()
+                logger.debug(
+                    f"Wrote {written.get('user_application_assignments', 0)} user assignments "
+                    f"for {len(batch)} applications"
+                )
 
                 return len(batch)
-
-            # Process relationships for users and groups
-            for record in batch:
-                if model == Application:
-                    await self._process_app_relationships(session, record)                    
     
             # Process main records
-            await self.db.bulk_upsert(session, model, batch, self.tenant_id)
+            await self.entity_db.bulk_upsert(session, model, batch, self.tenant_id)
             
             # Return batch count
             return len(batch)
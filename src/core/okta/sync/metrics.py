@@ -0,0 +1,271 @@
+"""
+Per-phase sync telemetry
+
+Every sync graph node is a phase. While it runs, its PhaseMetrics collects:
+- Okta API calls (one per HTTP attempt, SDK retries included), error responses and latency
+- 429 responses and time spent waiting on rate limits (governor pacing and SDK backoff)
+- Pages and records persisted
+- DB write latency per page and time spent waiting for the DB write lock
+- Prefetched pages waiting in the pagination queue when the writer asks for the next page
+
+The running phase travels in a context variable set by the node's task, so tasks it spawns
+(page prefetchers, per-user transforms) report into the same phase. Finished phases are
+stored in sync_phase_metrics and served by /sync/timeline and /sync/metrics.
+"""
+
+import math
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus client default buckets (seconds)
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pages waiting in the prefetch queue (bounded by SYNC_PAGE_PREFETCH_DEPTH)
+QUEUE_DEPTH_BUCKETS: Tuple[float, ...] = (0, 1, 2, 4, 8, 16)
+
+_current_phase: ContextVar[Optional["PhaseMetrics"]] = ContextVar("sync_phase_metrics", default=None)
+
+# Collectors of the syncs running in this process, by tenant (read by the API for live phases)
+_active_syncs: Dict[str, "SyncMetrics"] = {}
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus layout (cumulative buckets, sum, count)."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            cumulative += count
+            buckets.append(["+Inf" if bound == math.inf else bound, cumulative])
+        return {'buckets': buckets, 'sum': round(self.sum, 6), 'count': self.count}
+
+
+@dataclass
+class PhaseMetrics:
+    """Counters of one sync phase (graph node)."""
+    phase: str
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    api_calls: int = 0
+    api_errors: int = 0
+    rate_limited: int = 0
+    rate_limit_wait_seconds: float = 0.0
+    pages: int = 0
+    records: int = 0
+    db_write_seconds: float = 0.0
+    db_lock_wait_seconds: float = 0.0
+    queue_depth_max: int = 0
+    api_latency: Histogram = field(default_factory=Histogram)
+    db_write: Histogram = field(default_factory=Histogram)
+    queue_depth: Histogram = field(default_factory=lambda: Histogram(QUEUE_DEPTH_BUCKETS))
+
+    def observe_api_call(self, status: Optional[int], seconds: float) -> None:
+        self.api_calls += 1
+        self.api_latency.observe(seconds)
+        if status == 429:
+            self.rate_limited += 1
+        elif status is None or status >= 400:
+            self.api_errors += 1
+
+    def observe_page_write(self, records: int, write_seconds: float, lock_wait_seconds: float) -> None:
+        self.pages += 1
+        self.records += records
+        self.observe_db_write(write_seconds, lock_wait_seconds)
+
+    def observe_db_write(self, write_seconds: float, lock_wait_seconds: float) -> None:
+        """DB write outside the page writer (e.g. streamed app assignments)."""
+        self.db_write_seconds += write_seconds
+        self.db_lock_wait_seconds += lock_wait_seconds
+        self.db_write.observe(write_seconds)
+
+    def observe_queue_depth(self, depth: int) -> None:
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+        self.queue_depth.observe(depth)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Column values of a sync_phase_metrics row (without ids and timing)."""
+        return {
+            'phase': self.phase,
+            'api_calls': self.api_calls,
+            'api_errors': self.api_errors,
+            'rate_limited': self.rate_limited,
+            'rate_limit_wait_seconds': round(self.rate_limit_wait_seconds, 3),
+            'pages': self.pages,
+            'records': self.records,
+            'db_write_seconds': round(self.db_write_seconds, 3),
+            'db_lock_wait_seconds': round(self.db_lock_wait_seconds, 3),
+            'queue_depth_max': self.queue_depth_max,
+            'histograms': {
+                'api_latency_seconds': self.api_latency.to_dict(),
+                'db_write_seconds': self.db_write.to_dict(),
+                'queue_depth': self.queue_depth.to_dict(),
+            },
+        }
+
+
+class SyncMetrics:
+    """Phase metrics of one sync run."""
+
+    def __init__(self, tenant_id: str, sync_id: Optional[int]):
+        self.tenant_id = tenant_id
+        self.sync_id = sync_id
+        self.phases: Dict[str, PhaseMetrics] = {}
+        self.running: Dict[str, PhaseMetrics] = {}
+
+    def start_phase(self, name: str) -> PhaseMetrics:
+        phase = PhaseMetrics(name)
+        self.phases[name] = phase
+        self.running[name] = phase
+        return phase
+
+    def finish_phase(self, name: str) -> None:
+        self.running.pop(name, None)
+
+    def activate(self) -> None:
+        _active_syncs[self.tenant_id] = self
+
+    def deactivate(self) -> None:
+        if _active_syncs.get(self.tenant_id) is self:
+            del _active_syncs[self.tenant_id]
+
+
+def active_sync_metrics(tenant_id: str) -> Optional[SyncMetrics]:
+    """Collector of the tenant's sync running in this process, if any."""
+    return _active_syncs.get(tenant_id)
+
+
+def bind_phase(phase: Optional[PhaseMetrics]) -> Token:
+    """Make phase the current one for this task and the tasks it creates."""
+    return _current_phase.set(phase)
+
+
+def unbind_phase(token: Token) -> None:
+    _current_phase.reset(token)
+
+
+def current_phase() -> Optional[PhaseMetrics]:
+    return _current_phase.get()
+
+
+def record_api_call(status: Optional[int], seconds: float) -> None:
+    """Count one HTTP attempt against the current phase (no-op outside a sync)."""
+    phase = _current_phase.get()
+    if phase is not None:
+        phase.observe_api_call(status, seconds)
+
+
+def record_rate_limit_wait(seconds: float) -> None:
+    """Add time spent waiting on Okta rate limits to the current phase."""
+    phase = _current_phase.get()
+    if phase is not None and seconds > 0:
+        phase.rate_limit_wait_seconds += seconds
+
+
+def record_queue_depth(depth: int) -> None:
+    """Sample the prefetch queue when the page writer is ready for the next page."""
+    phase = _current_phase.get()
+    if phase is not None:
+        phase.observe_queue_depth(depth)
+
+
+def classify_phase(metrics: Dict[str, Any], duration_seconds: Optional[float]) -> Dict[str, Any]:
+    """
+    Estimate what bounded a phase from the share of its wall time spent on each.
+
+    - db: writing pages plus waiting for the DB write lock
+    - rate_limit: waiting on Okta rate limits (summed over concurrent requests, capped at 1)
+    - api: the rest, i.e. waiting for Okta responses
+
+    A pipelined listing whose prefetch queue is usually full is waiting on the writer, which
+    shows up as a high db share; an empty queue means the writer waits for the API.
+    """
+    if not duration_seconds or duration_seconds <= 0:
+        return {'bound': None, 'shares': {}}
+    db_share = min(1.0, (metrics.get('db_write_seconds', 0) + metrics.get('db_lock_wait_seconds', 0)) / duration_seconds)
+    rate_limit_share = min(1.0, metrics.get('rate_limit_wait_seconds', 0) / duration_seconds)
+    api_share = max(0.0, 1.0 - db_share - rate_limit_share) if metrics.get('api_calls') else 0.0
+    shares = {'api': round(api_share, 3), 'rate_limit': round(rate_limit_share, 3), 'db': round(db_share, 3)}
+    bound = max(shares, key=shares.get) if any(shares.values()) else None
+    return {'bound': bound, 'shares': shares}
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(tenant_id: str, sync: Optional[Dict[str, Any]], phases: List[Dict[str, Any]]) -> str:
+    """
+    Render the phases of one sync in the Prometheus text exposition format.
+
+    Args:
+        tenant_id: Tenant label value
+        sync: id, status and sync_mode of the sync the phases belong to
+        phases: Phase dicts as returned by the timeline endpoint (metrics plus duration)
+    """
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    metric("okta_sync_info", "gauge", "Sync the phase metrics belong to (value is always 1)")
+    if sync:
+        lines.append(
+            f"okta_sync_info{_labels(tenant=tenant_id, sync_id=sync.get('sync_id'), status=sync.get('status'), mode=sync.get('sync_mode') or '')} 1"
+        )
+
+    counters = (
+        ("okta_sync_phase_duration_seconds", "gauge", "Wall time of the phase", 'duration_seconds'),
+        ("okta_sync_phase_api_calls_total", "counter", "Okta API HTTP attempts (retries included)", 'api_calls'),
+        ("okta_sync_phase_api_errors_total", "counter", "Okta API error responses other than 429", 'api_errors'),
+        ("okta_sync_phase_rate_limited_total", "counter", "Okta API 429 responses", 'rate_limited'),
+        ("okta_sync_phase_rate_limit_wait_seconds_total", "counter", "Time spent waiting on Okta rate limits", 'rate_limit_wait_seconds'),
+        ("okta_sync_phase_pages_total", "counter", "Pages written to the database", 'pages'),
+        ("okta_sync_phase_records_total", "counter", "Records transformed and written", 'records'),
+        ("okta_sync_phase_db_lock_wait_seconds_total", "counter", "Time spent waiting for the DB write lock", 'db_lock_wait_seconds'),
+        ("okta_sync_phase_queue_depth_max", "gauge", "Most prefetched pages waiting for the writer", 'queue_depth_max'),
+    )
+    for name, kind, help_text, key in counters:
+        metric(name, kind, help_text)
+        for phase in phases:
+            value = phase.get(key)
+            if value is not None:
+                lines.append(f"{name}{_labels(tenant=tenant_id, phase=phase['phase'])} {value}")
+
+    histograms = (
+        ("okta_sync_phase_api_latency_seconds", "Okta API response latency", 'api_latency_seconds'),
+        ("okta_sync_phase_db_write_seconds", "Database write time per page (including commit)", 'db_write_seconds'),
+        ("okta_sync_phase_queue_depth", "Prefetched pages waiting when the writer takes the next page", 'queue_depth'),
+    )
+    for name, help_text, key in histograms:
+        metric(name, "histogram", help_text)
+        for phase in phases:
+            histogram = (phase.get('histograms') or {}).get(key)
+            if not histogram:
+                continue
+            for bound, count in histogram['buckets']:
+                lines.append(f"{name}_bucket{_labels(tenant=tenant_id, phase=phase['phase'], le=bound)} {count}")
+            lines.append(f"{name}_sum{_labels(tenant=tenant_id, phase=phase['phase'])} {histogram['sum']}")
+            lines.append(f"{name}_count{_labels(tenant=tenant_id, phase=phase['phase'])} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Table, Index, UniqueConstraint, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Float, Table, Index, UniqueConstraint, Text, JSON, Enum as SQLEnum
 from sqlalchemy.sql import func, text, functions
 from datetime import datetime, timezone
 import enum
@@ -158,6 +158,7 @@ class User(BaseModel):
         Index('idx_user_status_filter', 'tenant_id', 'status', 'is_deleted'),
         Index('idx_user_status_changed', 'tenant_id', 'status_changed_at'),
         UniqueConstraint('okta_id', name='uix_users_okta_id'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_users_tenant_okta_id'),
         {'extend_existing': True}
     )
 
@@ -177,6 +178,7 @@ class Group(BaseModel):
     __table_args__ = (
         Index('idx_group_tenant_name', 'tenant_id', 'name'),
         UniqueConstraint('okta_id', name='uix_groups_okta_id'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_groups_tenant_okta_id'),
         {'extend_existing': True}
     )
 
@@ -191,6 +193,7 @@ class Authenticator(BaseModel):
 
     __table_args__ = (
         Index('idx_auth_tenant_name', 'tenant_id', 'name'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_authenticators_tenant_okta_id'),
         {'extend_existing': True}
     )
 
@@ -255,6 +258,7 @@ class Application(BaseModel):
         Index('idx_app_label', 'label'),
         Index('idx_app_attrs', 'attribute_statements', sqlite_where=text("json_valid(attribute_statements)")),
         UniqueConstraint('okta_id', name='uix_applications_okta_id'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_applications_tenant_okta_id'),
         {'extend_existing': True}
     )
      
@@ -291,6 +295,7 @@ class Policy(BaseModel):
         Index('idx_policy_okta_id', 'okta_id'),
         Index('idx_policy_type', 'type'),
         UniqueConstraint('okta_id', name='uix_policies_okta_id'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_policies_tenant_okta_id'),
         {'extend_existing': True}
     )
     
@@ -371,6 +376,11 @@ class SyncHistory(Base):
     success = Column(Boolean, default=False)
     error_details = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)  # Add alias for error_details
+    sync_mode = Column(String, nullable=True)  # full, incremental or reconcile
+    timeline = Column(JSON, nullable=True)  # Per-node start/finish times of the sync graph
+    # Resume point while the sync is unfinished (see checkpoint.py); none_as_null so a cleared
+    # checkpoint is SQL NULL rather than JSON 'null'
+    checkpoint = Column(JSON(none_as_null=True), nullable=True)
     
     # Entity counts
     users_count = Column(Integer, default=0)
@@ -398,6 +408,72 @@ class SyncHistory(Base):
     def SUCCESS(self):
         return SyncStatus.COMPLETED 
 
+class SyncCursor(Base):
+    """Persisted read position of a change feed (e.g. the System Log CDC stage)"""
+    __tablename__ = "sync_cursors"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    name = Column(String, nullable=False)  # Feed name, e.g. "system_log"
+    cursor = Column(String, nullable=True)  # Feed position (ISO 8601 published time for the System Log)
+    events_applied = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now)
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'name', name='uix_sync_cursor_tenant_name'),
+    )
+
+class SyncPhaseMetrics(Base):
+    """Telemetry of one sync graph node (phase) of a sync run (see metrics.py)"""
+    __tablename__ = "sync_phase_metrics"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    sync_id = Column(Integer, nullable=False)  # sync_history.id
+    phase = Column(String, nullable=False)  # Graph node name, e.g. "users"
+    status = Column(String, nullable=True)  # completed, failed or cancelled
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    
+    # Okta API
+    api_calls = Column(Integer, default=0)
+    api_errors = Column(Integer, default=0)
+    rate_limited = Column(Integer, default=0)  # 429 responses
+    rate_limit_wait_seconds = Column(Float, default=0.0)
+    
+    # Pages written to the database
+    pages = Column(Integer, default=0)
+    records = Column(Integer, default=0)
+    db_write_seconds = Column(Float, default=0.0)
+    db_lock_wait_seconds = Column(Float, default=0.0)
+    queue_depth_max = Column(Integer, default=0)
+    
+    # api_latency_seconds, db_write_seconds and queue_depth histograms (Prometheus layout)
+    histograms = Column(JSON, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_sync_phase_metrics_tenant_sync', 'tenant_id', 'sync_id'),
+    )
+
+class SyncCheckpointPayload(Base):
+    """Relationship data staged in memory by an unfinished sync, kept for resuming it.
+
+    Stored apart from SyncHistory so the per-page checkpoint updates don't rewrite large payloads.
+    """
+    __tablename__ = "sync_checkpoint_payloads"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    name = Column(String, nullable=False)  # Orchestrator attribute, e.g. "_pending_group_memberships"
+    payload = Column(JSON, nullable=True)
+    item_count = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now)
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'name', name='uix_sync_checkpoint_payload_tenant_name'),
+    )
+
 class Device(BaseModel):
     __tablename__ = 'devices'
     
@@ -428,6 +504,7 @@ class Device(BaseModel):
         Index('idx_device_serial', 'tenant_id', 'serial_number'),
         Index('idx_device_udid', 'tenant_id', 'udid'),
         UniqueConstraint('okta_id', name='uix_devices_okta_id'),
+        UniqueConstraint('tenant_id', 'okta_id', name='uix_devices_tenant_okta_id'),
         {'extend_existing': True}
     )
 
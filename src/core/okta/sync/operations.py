@@ -11,20 +11,25 @@ Key features:
 
 import json
 import shutil
+import time
 from pathlib import Path
 from types import SimpleNamespace
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy import select, and_, not_, or_, update, func, text, delete, desc, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.schema import CreateTable
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import List, Type, TypeVar, Optional, Dict, Any, AsyncGenerator, Union
 
-from .models import Base, User, UserFactor, group_application_assignments, AuthUser, UserRole, SyncHistory, SyncStatus, Device, UserDevice, QueryHistory, ConversationSession, ConversationTurn, ConversationResultSet, ConversationResultSetParent
+from .models import Base, User, Group, Application, Policy, Authenticator, AuthUser, UserRole, SyncHistory, SyncStatus, SyncCursor, SyncCheckpointPayload, SyncPhaseMetrics, Device, QueryHistory, ConversationSession, ConversationTurn, ConversationResultSet, ConversationResultSetParent
 from src.core.security.password_hasher import hash_password, verify_password, check_password_needs_rehash, calculate_lockout_time
 from src.config.settings import settings
+from src.core.okta.sync.relationships import RelationshipWriter
 from src.data.schemas.runtime_storage import RUNTIME_ROOT, sanitize_path_part
 from src.utils.logging import logger
+from src.utils.sqlite_profile import apply_sqlite_pragmas, STATUS_PRAGMAS, wal_file_sizes
 import asyncio
 
 
@@ -41,9 +46,33 @@ _SQLITE_OKTA_ID_UNIQUE_INDEXES = (
     ("policies", "uix_policies_okta_id"),
     ("devices", "uix_devices_okta_id"),
 )
+# Conflict target of the set-based upserts; one okta_id per tenant
+_SQLITE_TENANT_OKTA_ID_UNIQUE_INDEXES = (
+    ("users", "uix_users_tenant_okta_id"),
+    ("groups", "uix_groups_tenant_okta_id"),
+    ("applications", "uix_applications_tenant_okta_id"),
+    ("policies", "uix_policies_tenant_okta_id"),
+    ("devices", "uix_devices_tenant_okta_id"),
+    ("authenticators", "uix_authenticators_tenant_okta_id"),
+)
+# Entity models written with multi-row INSERT ... ON CONFLICT(tenant_id, okta_id) DO UPDATE
+_SET_BASED_UPSERT_MODELS = (User, Group, Application, Policy, Authenticator, Device)
+# Columns owned by the database or identifying the row; never overwritten on conflict
+_UPSERT_IMMUTABLE_COLUMNS = {"id", "tenant_id", "okta_id"}
+# SQLite compiled default for SQLITE_MAX_VARIABLE_NUMBER since 3.32
+_SQLITE_MAX_BOUND_PARAMETERS = 32766
+# Tables a full sync rebuilds; with shadow tables they are loaded into a staging database
+# and swapped in per tenant (see StagingDatabase and DatabaseOperations.swap_in_staging)
+SHADOW_SYNC_TABLES = (
+    "users", "user_factors", "user_group_memberships",
+    "groups", "group_application_assignments",
+    "applications", "user_application_assignments",
+    "policies", "authenticators",
+    "devices", "user_devices",
+)
 
 
-def _build_async_engine(database_url: str):
+def _build_async_engine(database_url: str, profile: str = "writer"):
     engine = create_async_engine(
         database_url,
         connect_args={
@@ -57,11 +86,8 @@ def _build_async_engine(database_url: str):
 
     @event.listens_for(engine.sync_engine, "connect")
     def _set_sqlite_pragmas(dbapi_connection, _connection_record):
-        cursor = dbapi_connection.cursor()
-        try:
-            cursor.execute("PRAGMA foreign_keys=ON")
-        finally:
-            cursor.close()
+        # Per-connection pragmas (cache, mmap, busy timeout, synchronous, ...)
+        apply_sqlite_pragmas(dbapi_connection, profile)
 
     return engine
 
@@ -90,6 +116,105 @@ async def _ensure_sqlite_okta_id_unique_indexes(conn) -> None:
             text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name}(okta_id)")
         )
 
+    # Authenticators were unique on okta_id alone, which let another tenant's row be overwritten
+    await conn.execute(text("DROP INDEX IF EXISTS uix_authenticators_okta_id"))
+    for table_name, index_name in _SQLITE_TENANT_OKTA_ID_UNIQUE_INDEXES:
+        duplicate_row = (
+            await conn.execute(
+                text(
+                    f"SELECT tenant_id, okta_id, COUNT(*) AS duplicate_count "
+                    f"FROM {table_name} "
+                    "WHERE okta_id IS NOT NULL "
+                    "GROUP BY tenant_id, okta_id "
+                    "HAVING COUNT(*) > 1 "
+                    "LIMIT 1"
+                )
+            )
+        ).first()
+        if duplicate_row:
+            raise RuntimeError(
+                f"Cannot enforce unique {table_name}(tenant_id, okta_id) because okta_id "
+                f"'{duplicate_row[1]}' exists {duplicate_row[2]} times for tenant '{duplicate_row[0]}'."
+            )
+
+        await conn.execute(
+            text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name}(tenant_id, okta_id)")
+        )
+
+
+def _create_missing_sync_indexes(connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        if table.name in SHADOW_SYNC_TABLES:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def _column_default_value(column) -> Any:
+    default = column.default
+    if default is None:
+        return None
+    if default.is_scalar:
+        value = default.arg
+        return value.copy() if isinstance(value, (dict, list)) else value
+    if default.is_callable:
+        return default.arg(None)
+    return None
+
+
+def _build_upsert_rows(
+    model: Type[Base],
+    records: List[dict],
+    tenant_id: str,
+    synced_at: datetime,
+) -> tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Normalize record dicts into rows sharing one column set for a multi-row VALUES clause.
+
+    The records must carry the same fields: a column only some of them provide would be
+    overwritten with its default on conflict for the others.
+
+    Returns the insert columns (record fields plus columns with defaults), the columns
+    to overwrite on conflict (record fields plus sync timestamps) and the rows.
+    """
+    table_columns = model.__table__.columns
+    record_columns = {"last_synced_at"}
+    for record in records:
+        record_columns.update(key for key in record if key in table_columns and key != "id")
+    if "updated_at" in table_columns:
+        record_columns.add("updated_at")
+    if "is_deleted" in table_columns:
+        # Every upserted record is live in Okta, so revive soft-deleted rows
+        record_columns.add("is_deleted")
+
+    insert_columns = [
+        column.name
+        for column in table_columns
+        if column.name == "tenant_id"
+        or column.name in record_columns
+        or (column.default is not None and column.name != "id")
+    ]
+    update_columns = [
+        name for name in insert_columns
+        if name in record_columns and name not in _UPSERT_IMMUTABLE_COLUMNS
+    ]
+    defaults = {name: _column_default_value(table_columns[name]) for name in insert_columns}
+
+    rows = []
+    for record in records:
+        row = {}
+        for name in insert_columns:
+            if name in record:
+                row[name] = record[name]
+            else:
+                default_value = defaults[name]
+                row[name] = default_value.copy() if isinstance(default_value, (dict, list)) else default_value
+        row["tenant_id"] = tenant_id
+        row["last_synced_at"] = synced_at
+        if "is_deleted" in record_columns:
+            row["is_deleted"] = False
+        rows.append(row)
+    return insert_columns, update_columns, rows
+
 
 def _load_json_file(path: Optional[Union[str, Path]], default: Any) -> Any:
     if not path:
@@ -480,6 +605,7 @@ class DatabaseOperations:
     _SessionLocal = None  # Shared session factory
     _retention_cleanup_tasks: set[asyncio.Task] = set()
     _retention_cleanup_inflight_keys: set[tuple[str, str]] = set()
+    _sqlite_maintenance: Dict[str, Dict[str, Any]] = {}  # Last checkpoint/optimize per database file
     
     def __init__(self):
         """Initialize async database engine with WAL mode (reuses existing engine if available)."""
@@ -494,6 +620,9 @@ class DatabaseOperations:
         self.engine = DatabaseOperations._engine
         self.SessionLocal = DatabaseOperations._SessionLocal
 
+        # Per-model upsert throughput (rows and seconds), reported in sync logs
+        self._upsert_stats: Dict[str, Dict[str, Any]] = {}
+
     def _discover_db_path(self) -> Optional[str]:
         """Find the existing database file in common locations"""
         try:
@@ -503,10 +632,12 @@ class DatabaseOperations:
             # Project root is 4 levels up from this file
             project_root = Path(__file__).parent.parent.parent.parent
             
+            # Same file name everywhere: per-tenant workers use their own DB_FILENAME
+            db_filename = settings.DB_FILENAME or "okta_sync.db"
             possible_paths = [
-                Path("/app/sqlite_db/okta_sync.db"),
-                project_root / "sqlite_db" / "okta_sync.db",
-                Path(os.getcwd()) / "sqlite_db" / "okta_sync.db",
+                Path("/app/sqlite_db") / db_filename,
+                project_root / "sqlite_db" / db_filename,
+                Path(os.getcwd()) / "sqlite_db" / db_filename,
                 Path(settings.SQLITE_PATH) if hasattr(settings, 'SQLITE_PATH') else None
             ]
             
@@ -522,14 +653,21 @@ class DatabaseOperations:
             logger.error(f"Error during DB discovery: {e}")
             return None
 
-    async def init_db(self):
-        """Initialize database with WAL mode and optimized settings (thread-safe)"""
+    async def init_db(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Initialize database with WAL mode and optimized settings (thread-safe)
+
+        db_path: use this database file instead of discovering an existing one
+        """
         async with DatabaseOperations._init_lock:
             if not DatabaseOperations._initialized:
-                # Try to discover existing DB before initializing
-                db_path = self._discover_db_path()
+                if db_path is not None:
+                    db_path = str(Path(db_path).resolve())
+                else:
+                    # Try to discover existing DB before initializing
+                    db_path = self._discover_db_path()
                 if db_path and settings.SQLITE_PATH != db_path:
-                    logger.info(f"Re-centering database to discovered path: {db_path}")
+                    logger.info(f"Re-centering database to path: {db_path}")
                     settings.SQLITE_PATH = db_path
                     settings.DATABASE_URL = f"sqlite+aiosqlite:///{db_path}"
                     
@@ -541,12 +679,13 @@ class DatabaseOperations:
             async with self.engine.begin() as conn:
                 # Enable WAL mode
                 await conn.execute(text("PRAGMA journal_mode=WAL"))
-                await conn.execute(text("PRAGMA foreign_keys=ON"))
-                # Set synchronous mode for better performance
-                await conn.execute(text("PRAGMA synchronous=NORMAL"))
+                # foreign_keys, synchronous and cache sizes are set per connection by the engine
                 # Create tables
                 await conn.run_sync(Base.metadata.create_all)
                 await _ensure_sqlite_okta_id_unique_indexes(conn)
+                # create_all skips indexes of existing tables; recreate any a full sync dropped
+                # (drop_secondary_indexes) and could not rebuild before the process ended
+                await conn.run_sync(_create_missing_sync_indexes)
                 
                 # Ensure query_history table exists (for existing databases)
                 from sqlalchemy import inspect
@@ -556,9 +695,23 @@ class DatabaseOperations:
                 
                 tables = await conn.run_sync(get_tables)
 
+                def get_sync_history_columns(connection):
+                    inspector = inspect(connection)
+                    return [c['name'] for c in inspector.get_columns('sync_history')]
+
+                sync_history_columns = await conn.run_sync(get_sync_history_columns)
+                if 'sync_mode' not in sync_history_columns:
+                    logger.info("Migrating sync_history: adding sync_mode column")
+                    await conn.execute(text("ALTER TABLE sync_history ADD COLUMN sync_mode VARCHAR"))
+                if 'timeline' not in sync_history_columns:
+                    logger.info("Migrating sync_history: adding timeline column")
+                    await conn.execute(text("ALTER TABLE sync_history ADD COLUMN timeline JSON"))
+                if 'checkpoint' not in sync_history_columns:
+                    logger.info("Migrating sync_history: adding checkpoint column")
+                    await conn.execute(text("ALTER TABLE sync_history ADD COLUMN checkpoint JSON"))
+
                 if 'query_history' not in tables:
                     logger.info("Creating query_history table...")
-                    from sqlalchemy.schema import CreateTable
                     await conn.execute(CreateTable(QueryHistory.__table__))
                     logger.info("Query history table created successfully")
                 else:
@@ -634,7 +787,8 @@ class DatabaseOperations:
         session: AsyncSession,
         model: Type[ModelType],
         records: List[dict],
-        tenant_id: str
+        tenant_id: str,
+        chunk_size: Optional[int] = None
     ) -> bool:
         """
         Bulk upsert records with support for nested relationships.
@@ -644,6 +798,7 @@ class DatabaseOperations:
             model: SQLAlchemy model class (User, Group etc)
             records: List of record dictionaries from Okta
             tenant_id: Tenant identifier
+            chunk_size: Rows per INSERT statement (defaults to SYNC_UPSERT_CHUNK_SIZE)
             
         Returns:
             bool: True if successful
@@ -652,141 +807,248 @@ class DatabaseOperations:
             Exception: On database errors
             
         Notes:
+            - Entity models use set-based multi-row INSERT ... ON CONFLICT DO UPDATE
             - Handles nested user factors for User model
-            - Updates existing records
-            - Creates new records
+            - Handles nested user_devices for Device model
             - Sets sync timestamps
-            - Handles custom_attributes JSON column for User model
+            - Records rows/sec per model (see get_upsert_stats)
         """
+        if not records:
+            return True
+
         try:
-            total_factors = 0
-            total_user_devices = 0
-            
+            start_time = time.perf_counter()
+            nested_factors: Dict[str, List[Dict[str, Any]]] = {}
+            nested_user_devices: Dict[str, List[Dict[str, Any]]] = {}
+
             for record in records:
                 # Extract factors if present (User model)
-                factors = record.pop('factors', []) if model == User else None
                 if model == User:
-                    total_factors += len(factors) if factors else 0
-                
-                # Extract user_devices if present (Device model) 
-                user_devices = record.pop('user_devices', []) if model == Device else None
+                    factors = record.pop('factors', None)
+                    if factors:
+                        nested_factors[record['okta_id']] = factors
+
+                # Extract user_devices if present (Device model)
                 if model == Device:
-                    total_user_devices += len(user_devices) if user_devices else 0
-                
-                # Process main record
-                stmt = select(model).where(
-                    and_(
-                        model.okta_id == record['okta_id'],
-                        model.tenant_id == tenant_id
-                    )
-                )
-                result = await session.execute(stmt)
-                existing = result.scalar_one_or_none()
-    
-                if existing:
-                    for key, value in record.items():
-                        if hasattr(existing, key):
-                            # Handle JSON column properly
-                            if key == 'custom_attributes' and isinstance(value, dict):
-                                setattr(existing, key, value)
-                            else:
-                                setattr(existing, key, value)
-                    existing.last_synced_at = datetime.utcnow()
-                else:
-                    record['tenant_id'] = tenant_id
-                    record['last_synced_at'] = datetime.utcnow()
-                    # Ensure custom_attributes is properly set for new records
-                    if model == User and 'custom_attributes' not in record:
-                        record['custom_attributes'] = {}
-                    existing = model(**record)
-                    session.add(existing)
-                
-                # Process factors if present
-                if factors:
-                    await self._process_user_factors(session, existing, factors, tenant_id)
-                    
-                # Process user-device relationships if present (Device model)
-                if user_devices:
-                    await self._process_device_user_relationships(session, existing, user_devices, tenant_id)                    
-    
+                    user_devices = record.pop('user_devices', None)
+                    if user_devices:
+                        nested_user_devices[record['okta_id']] = user_devices
+
+            if model in _SET_BASED_UPSERT_MODELS:
+                await self._set_based_upsert(session, model, records, tenant_id, chunk_size)
+            else:
+                await self._orm_upsert(session, model, records, tenant_id)
+
+            # Factors and user-device relationships of the whole batch go out in a few
+            # executemany calls once parent rows exist (the caller commits)
+            if nested_factors or nested_user_devices:
+                writer = RelationshipWriter(session, tenant_id)
+                for user_okta_id, factors in nested_factors.items():
+                    self._stage_user_factors(writer, user_okta_id, factors)
+                for device_okta_id, user_devices in nested_user_devices.items():
+                    self._stage_device_user_relationships(writer, device_okta_id, user_devices)
+                await writer.flush()
+
+            elapsed = time.perf_counter() - start_time
+            rows_per_second = self._record_upsert_stats(model, len(records), elapsed)
+
             # Logging
             if model == User:
-                logger.debug(f"Processed {len(records)} users with {total_factors} factors")
+                total_factors = sum(len(factors) for factors in nested_factors.values())
+                logger.debug(f"Processed {len(records)} users with {total_factors} factors ({rows_per_second:.0f} rows/sec)")
             elif model == Device:
-                logger.debug(f"Processed {len(records)} devices with {total_user_devices} user relationships")
+                total_user_devices = sum(len(user_devices) for user_devices in nested_user_devices.values())
+                logger.debug(f"Processed {len(records)} devices with {total_user_devices} user relationships ({rows_per_second:.0f} rows/sec)")
             else:
-                logger.info(f"Processed {len(records)} {model.__name__} records")
+                logger.info(f"Processed {len(records)} {model.__name__} records ({rows_per_second:.0f} rows/sec)")
             return True
         except Exception as e:
             logger.error(f"Bulk upsert error for {model.__name__}: {str(e)}")
             raise
+
+    async def _set_based_upsert(
+        self,
+        session: AsyncSession,
+        model: Type[ModelType],
+        records: List[dict],
+        tenant_id: str,
+        chunk_size: Optional[int] = None
+    ) -> None:
+        """
+        Write records with multi-row INSERT ... ON CONFLICT(tenant_id, okta_id) DO UPDATE statements.
+
+        The statement columns come from the model's table metadata, so one round trip
+        upserts a whole chunk instead of one SELECT plus one UPDATE/INSERT per record.
+        Records are grouped by the fields they carry, so a record without a field never
+        overwrites that column of the existing row with a default.
+        """
+        table = model.__table__
+        records_by_fields: Dict[frozenset, List[dict]] = {}
+        for record in records:
+            fields = frozenset(key for key in record if key in table.columns)
+            records_by_fields.setdefault(fields, []).append(record)
+
+        synced_at = datetime.utcnow()
+        requested_chunk_size = chunk_size or settings.SYNC_UPSERT_CHUNK_SIZE
+        for field_records in records_by_fields.values():
+            insert_columns, update_columns, rows = _build_upsert_rows(model, field_records, tenant_id, synced_at)
+
+            max_rows_per_statement = max(1, _SQLITE_MAX_BOUND_PARAMETERS // max(1, len(insert_columns)))
+            effective_chunk_size = max(1, min(requested_chunk_size, max_rows_per_statement))
+
+            for i in range(0, len(rows), effective_chunk_size):
+                chunk = rows[i:i + effective_chunk_size]
+                stmt = sqlite_insert(table).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['tenant_id', 'okta_id'],
+                    set_={name: stmt.excluded[name] for name in update_columns}
+                )
+                await session.execute(stmt)
+
+    async def _orm_upsert(
+        self,
+        session: AsyncSession,
+        model: Type[ModelType],
+        records: List[dict],
+        tenant_id: str
+    ) -> None:
+        """Row-by-row ORM upsert for models without an okta_id unique index."""
+        for record in records:
+            stmt = select(model).where(
+                and_(
+                    model.okta_id == record['okta_id'],
+                    model.tenant_id == tenant_id
+                )
+            )
+            result = await session.execute(stmt)
+            existing = result.scalar_one_or_none()
+
+            if existing:
+                for key, value in record.items():
+                    if hasattr(existing, key):
+                        setattr(existing, key, value)
+                existing.last_synced_at = datetime.utcnow()
+            else:
+                record['tenant_id'] = tenant_id
+                record['last_synced_at'] = datetime.utcnow()
+                session.add(model(**record))
+
+    def _record_upsert_stats(self, model: Type[ModelType], row_count: int, elapsed: float) -> float:
+        """Accumulate upsert throughput for a model and return this call's rows/sec."""
+        stats = self._upsert_stats.setdefault(model.__name__, {"rows": 0, "seconds": 0.0, "batches": 0})
+        stats["rows"] += row_count
+        stats["seconds"] += elapsed
+        stats["batches"] += 1
+        return row_count / elapsed if elapsed > 0 else float(row_count)
+
+    def get_upsert_stats(self, model: Type[ModelType]) -> Dict[str, Any]:
+        """
+        Get cumulative upsert throughput for a model since the last reset.
+
+        Returns:
+            Dict with rows, seconds, batches and rows_per_second
+        """
+        stats = dict(self._upsert_stats.get(model.__name__, {"rows": 0, "seconds": 0.0, "batches": 0}))
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    def reset_upsert_stats(self, model: Type[ModelType]) -> None:
+        """Clear accumulated upsert throughput for a model."""
+        self._upsert_stats.pop(model.__name__, None)
     
     async def mark_deleted(
         self,
         session: AsyncSession,
         model: Type[ModelType],
-        okta_ids: List[str],
-        tenant_id: str
-    ) -> bool:
+        okta_ids: Optional[List[str]],
+        tenant_id: str,
+        synced_before: Optional[datetime] = None,
+        removed_okta_ids: Optional[List[str]] = None
+    ) -> int:
         """
         Soft delete records not present in Okta anymore.
         
         Args:
             session: Active database session
             model: SQLAlchemy model class
-            okta_ids: List of active Okta IDs
+            okta_ids: List of active Okta IDs (ignored when synced_before is given)
             tenant_id: Tenant identifier
+            synced_before: Treat records not upserted since this (naive UTC) time as removed
+            removed_okta_ids: Soft delete exactly these records (removals seen by an
+                incremental sync); okta_ids and synced_before are then ignored
             
         Returns:
-            bool: True if successful
+            int: Number of records marked as deleted
             
         Notes:
-            Sets is_deleted=True for records not in okta_ids
+            Sets is_deleted=True for records not in okta_ids, or with last_synced_at
+            older than synced_before. The timestamp form is a single UPDATE and avoids
+            binding every live ID (full reconciles of large tenants exceed SQLite's
+            bound-parameter limit).
         """        
             
         try:
-            stmt = select(model).where(
-                and_(
-                    model.tenant_id == tenant_id,
-                    not_(model.okta_id.in_(okta_ids))
-                )
-            )
-            result = await session.execute(stmt)
-            records = result.scalars().all()
+            conditions = [model.tenant_id == tenant_id, model.is_deleted == False]
+            if removed_okta_ids is not None:
+                if not removed_okta_ids:
+                    return 0
+                conditions.append(model.okta_id.in_(removed_okta_ids))
+            elif synced_before is not None:
+                conditions.append(or_(model.last_synced_at.is_(None), model.last_synced_at < synced_before))
+            else:
+                conditions.append(not_(model.okta_id.in_(okta_ids or [])))
             
-            for record in records:
-                record.is_deleted = True
-                record.last_synced_at = datetime.utcnow()
+            stmt = update(model).where(and_(*conditions)).values(
+                is_deleted=True,
+                last_synced_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+            result = await session.execute(stmt)
             
-            return True
+            deleted_count = result.rowcount or 0
+            if deleted_count:
+                logger.info(f"Marked {deleted_count} {model.__name__} records as deleted")
+            return deleted_count
         except Exception as e:
             logger.error(f"Mark deleted error for {model.__name__}: {str(e)}")
             raise
 
-        # Fix the get_last_sync_time method to use end_time instead of sync_end_time
     async def get_last_sync_time(
         self,
         session: AsyncSession,
         model: Type[ModelType],
-        tenant_id: str
+        tenant_id: str,
+        full_only: bool = False
     ) -> Optional[datetime]:
         """
         Get timestamp of last successful sync for incremental updates.
+        
+        Returns the start time of the sync (not its end) so changes made in Okta
+        while that sync was running are picked up again by the next incremental run.
+        
+        Args:
+            session: Active database session
+            model: SQLAlchemy model class being synced
+            tenant_id: Tenant identifier
+            full_only: Only consider full syncs and full reconciles
         """
         try:
             from .models import SyncHistory, SyncStatus
             
-            # Handle both SUCCESS and COMPLETED status values
-            stmt = select(SyncHistory.end_time)\
-                .where(
-                    and_(
-                        SyncHistory.tenant_id == tenant_id,
-                        SyncHistory.entity_type == model.__name__,
-                        SyncHistory.status.in_([SyncStatus.SUCCESS, SyncStatus.COMPLETED]),
-                        SyncHistory.records_processed > 0
-                    )
-                )\
-                .order_by(SyncHistory.end_time.desc())
+            conditions = [
+                SyncHistory.tenant_id == tenant_id,
+                SyncHistory.status.in_([SyncStatus.SUCCESS, SyncStatus.COMPLETED]),
+                SyncHistory.success == True,
+                # Tenant-wide syncs leave entity_type empty
+                or_(SyncHistory.entity_type.is_(None), SyncHistory.entity_type == model.__name__)
+            ]
+            if full_only:
+                # Rows written before sync_mode existed were always full syncs
+                conditions.append(or_(SyncHistory.sync_mode.is_(None), SyncHistory.sync_mode.in_(['full', 'reconcile'])))
+            
+            stmt = select(SyncHistory.start_time)\
+                .where(and_(*conditions))\
+                .order_by(SyncHistory.start_time.desc())\
+                .limit(1)
                 
             result = await session.execute(stmt)
             return result.scalar()
@@ -794,243 +1056,285 @@ class DatabaseOperations:
         except Exception as e:
             logger.error(f"Get last sync time error for {model.__name__}: {str(e)}")
             return None
-        
-    async def _process_user_factors(
-        self,
-        session: AsyncSession,
-        user: User,
-        factors: List[Dict[str, Any]],
-        tenant_id: str
-    ) -> None:
+
+    async def swap_in_staging(self, staging: "StagingDatabase", table_names: List[str], tenant_id: str) -> Dict[str, int]:
         """
-        Process MFA factors for a user.
+        Replace the tenant's rows in table_names with the staging copies in one transaction.
         
-        Args:
-            session: Active database session
-            user: User model instance
-            factors: List of factor dictionaries from Okta
-            tenant_id: Tenant identifier
-            
-        Raises:
-            Exception: On database errors
-            
-        Notes:
-            - Creates/updates user factors
-            - Marks removed factors as deleted
-            - Maintains factor sync timestamps
-        """        
-        try:
-            logger.debug(f"Processing {len(factors)} factors for user {user.okta_id}")
-            factor_ids = []
-            logger.debug(f"factor data: {factors}")
-            for factor in factors:
-                # Add tenant context
-                factor['tenant_id'] = tenant_id
-                factor['user_okta_id'] = user.okta_id
-                
-                # Find existing factor
-                stmt = select(UserFactor).where(
-                    and_(
-                        UserFactor.okta_id == factor['okta_id'],
-                        UserFactor.tenant_id == tenant_id,
-                        UserFactor.user_okta_id == user.okta_id
+        The staging file is attached to a live connection, the tenant's rows are deleted
+        (children first) and re-inserted from staging (parents first) before a single
+        commit. Readers keep seeing the previous data until that commit (WAL snapshot).
+        Surrogate integer ids are not copied so they cannot clash with other tenants' rows.
+        The same commit sets swap_started on the running sync's checkpoint, so result
+        caches stop treating the sync as a staging load at the moment the data changes.
+        
+        With SYNC_DEFERRED_INDEXES, secondary (non-unique) indexes on tables receiving at
+        least SYNC_DEFERRED_INDEX_MIN_ROWS rows are dropped after the deletes and rebuilt
+        in bulk after the inserts, inside the same transaction. Unique indexes stay in
+        place for the okta_id foreign keys.
+        
+        Returns:
+            Rows copied per table
+        """
+        tables = [table for table in Base.metadata.sorted_tables if table.name in table_names]
+        copied: Dict[str, int] = {}
+        start_time = time.time()
+        async with self.engine.connect() as conn:
+            # ATTACH is not allowed inside a transaction, so it runs before the first write
+            await conn.exec_driver_sql("ATTACH DATABASE ? AS staging", (staging.path,))
+            try:
+                deferred_indexes = await self._deferrable_indexes(conn, tables) if settings.SYNC_DEFERRED_INDEXES else []
+                # Deletes run with every index in place: cascades look up child rows by FK
+                for table in reversed(tables):
+                    await conn.execute(
+                        text(f"DELETE FROM main.{table.name} WHERE tenant_id = :tenant_id"),
+                        {"tenant_id": tenant_id}
                     )
+                for index in deferred_indexes:
+                    await conn.execute(text(f"DROP INDEX IF EXISTS main.{index.name}"))
+                for table in tables:
+                    columns = ", ".join(
+                        column.name for column in table.columns
+                        if not (column.primary_key and column.name == "id")
+                    )
+                    result = await conn.execute(
+                        text(
+                            f"INSERT INTO main.{table.name} ({columns}) "
+                            f"SELECT {columns} FROM staging.{table.name} WHERE tenant_id = :tenant_id"
+                        ),
+                        {"tenant_id": tenant_id}
+                    )
+                    copied[table.name] = result.rowcount
+                if deferred_indexes:
+                    await self._rebuild_indexes(conn, deferred_indexes)
+                await conn.execute(
+                    text(
+                        "UPDATE main.sync_history "
+                        "SET checkpoint = json_set(checkpoint, '$.swap_started', json('true')) "
+                        "WHERE tenant_id = :tenant_id AND status IN ('RUNNING', 'STARTED', 'IDLE') "
+                        "AND json_extract(checkpoint, '$.shadow')"
+                    ),
+                    {"tenant_id": tenant_id}
                 )
-                result = await session.execute(stmt)
-                existing_factor = result.scalar_one_or_none()
-    
-                if existing_factor:
-                    # Update existing factor
-                    for key, value in factor.items():
-                        if hasattr(existing_factor, key):
-                            setattr(existing_factor, key, value)
-                    existing_factor.last_synced_at = datetime.utcnow()
-                else:
-                    # Create new factor
-                    new_factor = UserFactor(**factor)
-                    session.add(new_factor)
-                
-                factor_ids.append(factor['okta_id'])
-    
-            # Mark deleted factors
-            stmt = select(UserFactor).where(
-                and_(
-                    UserFactor.user_okta_id == user.okta_id,
-                    UserFactor.tenant_id == tenant_id,
-                    not_(UserFactor.okta_id.in_(factor_ids))
-                )
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Swapping in staged sync tables failed, live data left unchanged: {str(e)}")
+                raise
+            finally:
+                await conn.exec_driver_sql("DETACH DATABASE staging")
+                await conn.commit()
+        logger.info(
+            f"Swapped in {sum(copied.values())} staged rows across {len(copied)} tables "
+            f"in {time.time() - start_time:.2f}s"
+        )
+        return copied
+
+    async def drop_secondary_indexes(self, table_names: List[str]) -> List[Any]:
+        """
+        Drop secondary indexes before a full sync loads straight into the live tables.
+        
+        Used when shadow tables are off (a shadow sync loads into an index-free staging
+        database instead). Tables that held fewer than SYNC_DEFERRED_INDEX_MIN_ROWS rows
+        keep their indexes, and so do indexes led by a foreign key column: the full sync
+        deletes parent rows table by table and every cascade looks up children through them.
+        An interrupted sync that never rebuilt them is repaired by init_db.
+        
+        Returns:
+            The dropped indexes, for rebuild_indexes once the load is done
+        """
+        tables = [table for table in Base.metadata.sorted_tables if table.name in table_names]
+        async with self.engine.connect() as conn:
+            indexes = [
+                index for index in await self._deferrable_indexes(conn, tables, schema="main")
+                if not index.expressions[0].foreign_keys
+            ]
+            for index in indexes:
+                await conn.execute(text(f"DROP INDEX IF EXISTS main.{index.name}"))
+            await conn.commit()
+        if indexes:
+            logger.info(f"Dropped {len(indexes)} secondary indexes until the full sync has loaded")
+        return indexes
+
+    async def rebuild_indexes(self, indexes: List[Any]) -> Dict[str, float]:
+        """Rebuild indexes dropped by drop_secondary_indexes (timings as in _rebuild_indexes)."""
+        async with self.engine.connect() as conn:
+            timings = await self._rebuild_indexes(conn, indexes)
+            await conn.commit()
+        return timings
+
+    async def _deferrable_indexes(self, conn, tables: List[Any], schema: str = "staging") -> List[Any]:
+        """Non-unique indexes of the tables whose row count in schema makes a bulk rebuild worthwhile."""
+        indexes = []
+        for table in tables:
+            row_count = (
+                await conn.execute(text(f"SELECT COUNT(*) FROM {schema}.{table.name}"))
+            ).scalar() or 0
+            if row_count < settings.SYNC_DEFERRED_INDEX_MIN_ROWS:
+                continue
+            indexes.extend(
+                sorted((index for index in table.indexes if not index.unique), key=lambda index: index.name)
             )
-            result = await session.execute(stmt)
-            deleted_factors = result.scalars().all()
-            
-            for factor in deleted_factors:
-                factor.is_deleted = True
-                factor.last_synced_at = datetime.utcnow()
-    
-            await session.commit()
-    
-        except Exception as e:
-            logger.error(f"Error processing factors for user {user.okta_id}: {str(e)}")
-            raise  
-               
-    async def _process_group_relationships(
+        return indexes
+
+    async def _rebuild_indexes(self, conn, indexes: List[Any]) -> Dict[str, float]:
+        """Create each index in bulk, recording how long every build took."""
+        timings: Dict[str, float] = {}
+        start_time = time.time()
+        for index in indexes:
+            index_start = time.time()
+            await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+            timings[index.name] = round(time.time() - index_start, 3)
+            logger.debug(f"Rebuilt index {index.name} on {index.table.name} in {timings[index.name]:.3f}s")
+        total = round(time.time() - start_time, 3)
+        DatabaseOperations._sqlite_maintenance.setdefault(self._sqlite_file(), {})["last_index_rebuild"] = {
+            "indexes": timings,
+            "duration_seconds": total,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        logger.info(f"Rebuilt {len(timings)} deferred indexes in {total:.2f}s")
+        return timings
+
+    def _sqlite_file(self) -> str:
+        """Path of the SQLite file behind this engine."""
+        return settings.SQLITE_PATH
+
+    async def checkpoint_wal(self, mode: str = "TRUNCATE") -> Dict[str, Any]:
+        """
+        Run PRAGMA wal_checkpoint in the given mode (PASSIVE, FULL, RESTART or TRUNCATE).
+
+        PASSIVE copies what it can without waiting on readers; TRUNCATE waits (up to the
+        busy timeout) for readers to finish and resets the WAL file to zero bytes.
+
+        Returns:
+            Checkpoint result: busy flag, WAL frames and frames checkpointed
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid WAL checkpoint mode: {mode}")
+
+        start_time = time.time()
+        async with self.engine.connect() as conn:
+            row = (await conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})")).first()
+        result = {
+            "mode": mode,
+            "busy": bool(row[0]) if row else None,
+            "wal_frames": row[1] if row else None,
+            "checkpointed_frames": row[2] if row else None,
+            "duration_seconds": round(time.time() - start_time, 3),
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        DatabaseOperations._sqlite_maintenance.setdefault(self._sqlite_file(), {})["last_checkpoint"] = result
+        log = logger.warning if result["busy"] else logger.debug
+        log(
+            f"WAL checkpoint ({mode}) on {self._sqlite_file()}: {result['checkpointed_frames']}/"
+            f"{result['wal_frames']} frames{' (busy - readers still active)' if result['busy'] else ''}"
+        )
+        return result
+
+    async def optimize(self, analyze: bool = False) -> Dict[str, Any]:
+        """
+        Refresh query planner statistics.
+
+        Args:
+            analyze: Run a full (size-limited) ANALYZE, used after a full reload; otherwise
+                PRAGMA optimize only re-analyzes tables whose statistics look stale
+        """
+        start_time = time.time()
+        async with self.engine.connect() as conn:
+            # Bound the rows sampled per index so ANALYZE stays fast on large tenants
+            await conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+            await conn.exec_driver_sql("ANALYZE" if analyze else "PRAGMA optimize=0x10002")
+            await conn.commit()
+        result = {
+            "mode": "analyze" if analyze else "optimize",
+            "duration_seconds": round(time.time() - start_time, 3),
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        DatabaseOperations._sqlite_maintenance.setdefault(self._sqlite_file(), {})["last_optimize"] = result
+        logger.info(f"SQLite {result['mode']} completed in {result['duration_seconds']:.2f}s")
+        return result
+
+    async def get_sqlite_status(self) -> Dict[str, Any]:
+        """Effective connection pragmas, WAL/database file sizes and last maintenance runs."""
+        pragmas: Dict[str, Any] = {}
+        async with self.engine.connect() as conn:
+            for name in STATUS_PRAGMAS:
+                row = (await conn.exec_driver_sql(f"PRAGMA {name}")).first()
+                pragmas[name] = row[0] if row else None
+        return {
+            "path": self._sqlite_file(),
+            "pragmas": pragmas,
+            **wal_file_sizes(self._sqlite_file()),
+            **DatabaseOperations._sqlite_maintenance.get(self._sqlite_file(), {}),
+        }
+
+    def _stage_user_factors(
         self,
-        session: AsyncSession,
-        group_data: Dict,
-        tenant_id: str  # Added tenant_id parameter
+        writer: RelationshipWriter,
+        user_okta_id: str,
+        factors: List[Dict[str, Any]],
     ) -> None:
         """
-        Process group application assignments.
+        Buffer MFA factors for a user, replacing the ones stored for them.
         
         Args:
-            session: Active database session
-            group_data: Group data with relationships
-            tenant_id: Tenant identifier
-            
-        Raises:
-            Exception: On database errors
-            
-        Notes:
-            - Handles group-application assignments
-            - Updates assignment metadata
-            - Maintains sync timestamps
-        """ 
-        try:
-            # Process application assignments
-            app_assignments = group_data.pop('applications', [])
-            if app_assignments:
-                for assignment in app_assignments:
-                    stmt = group_application_assignments.insert().values(
-                        tenant_id=tenant_id,  # Using the passed tenant_id parameter
-                        group_okta_id=assignment['group_okta_id'],
-                        application_okta_id=assignment['application_okta_id'],
-                        assignment_id=assignment['assignment_id']
-                    ).on_conflict_do_update(
-                        index_elements=['tenant_id', 'group_okta_id', 'application_okta_id'],
-                        set_=dict(
-                            assignment_id=assignment['assignment_id'],
-                            updated_at=datetime.utcnow()
-                        )
-                    )
-                    await session.execute(stmt)
-            
-        except Exception as e:
-            logger.error(f"Error processing group relationships: {str(e)}")
-            raise     
-        
-    async def _process_device_user_relationships(
+            writer: Relationship writer of the current batch
+            user_okta_id: User Okta ID
+            factors: List of factor dictionaries (UserFactor columns)
+        """
+        logger.debug(f"Staging {len(factors)} factors for user {user_okta_id}")
+        writer.replace('user_factors', 'user_okta_id', user_okta_id)
+        now = datetime.now(timezone.utc)
+        for factor in factors:
+            writer.add('user_factors', {
+                'user_okta_id': user_okta_id,
+                'okta_id': factor['okta_id'],
+                'factor_type': factor.get('factor_type'),
+                'provider': factor.get('provider'),
+                'status': factor.get('status'),
+                'authenticator_name': factor.get('authenticator_name'),
+                'email': factor.get('email'),
+                'phone_number': factor.get('phone_number'),
+                'device_type': factor.get('device_type'),
+                'device_name': factor.get('device_name'),
+                'platform': factor.get('platform'),
+                'created_at': factor.get('created_at'),
+                'last_updated_at': factor.get('last_updated_at'),
+                'updated_at': now,
+            })
+
+    def _stage_device_user_relationships(
         self,
-        session: AsyncSession,
-        device: Device,
+        writer: RelationshipWriter,
+        device_okta_id: str,
         user_devices: List[Dict[str, Any]],
-        tenant_id: str
     ) -> None:
         """
-        Process user-device relationships for a device.
+        Buffer user-device relationships for a device, replacing the ones stored for it.
         
         Args:
-            session: Active database session
-            device: Device model instance
+            writer: Relationship writer of the current page
+            device_okta_id: Device Okta ID
             user_devices: List of user-device relationship dictionaries
-            tenant_id: Tenant identifier
-            
-        Raises:
-            Exception: On database errors
             
         Notes:
-            - Creates/updates user-device relationships
-            - Validates that users exist before creating relationships
-            - Marks removed relationships as deleted
-            - Maintains relationship sync timestamps
-        """        
-        try:
-            logger.debug(f"Processing {len(user_devices)} user relationships for device {device.okta_id}")
-            relationship_keys = []
-            
-            for user_device_data in user_devices:
-                user_okta_id = user_device_data['user_okta_id']
-                
-                # Validate that user exists before creating relationship
-                user_exists_stmt = select(User).where(
-                    and_(
-                        User.okta_id == user_okta_id,
-                        User.tenant_id == tenant_id,
-                        User.is_deleted == False
-                    )
-                )
-                user_result = await session.execute(user_exists_stmt)
-                if not user_result.scalar_one_or_none():
-                    logger.warning(f"Skipping device-user relationship: user {user_okta_id} not found for device {device.okta_id}")
-                    continue
-                
-                # Add context
-                user_device_data['tenant_id'] = tenant_id
-                user_device_data['device_okta_id'] = device.okta_id
-                
-                # Find existing relationship
-                stmt = select(UserDevice).where(
-                    and_(
-                        UserDevice.user_okta_id == user_okta_id,
-                        UserDevice.device_okta_id == device.okta_id,
-                        UserDevice.tenant_id == tenant_id
-                    )
-                )
-                result = await session.execute(stmt)
-                existing_relationship = result.scalar_one_or_none()
-    
-                if existing_relationship:
-                    # Update existing relationship
-                    for key, value in user_device_data.items():
-                        if hasattr(existing_relationship, key):
-                            setattr(existing_relationship, key, value)
-                    existing_relationship.last_synced_at = datetime.utcnow()
-                else:
-                    # Create new relationship
-                    new_relationship = UserDevice(**user_device_data)
-                    session.add(new_relationship)
-                
-                relationship_keys.append((user_okta_id, device.okta_id))
-    
-            # Mark deleted relationships (soft delete)
-            if relationship_keys:
-                # Build the condition for relationships that should remain active
-                active_conditions = [
-                    and_(
-                        UserDevice.user_okta_id == user_id,
-                        UserDevice.device_okta_id == device_id
-                    )
-                    for user_id, device_id in relationship_keys
-                ]
-                
-                # Find relationships to mark as deleted
-                stmt = select(UserDevice).where(
-                    and_(
-                        UserDevice.device_okta_id == device.okta_id,
-                        UserDevice.tenant_id == tenant_id,
-                        not_(or_(*active_conditions))
-                    )
-                )
-            else:
-                # No active relationships - mark all as deleted
-                stmt = select(UserDevice).where(
-                    and_(
-                        UserDevice.device_okta_id == device.okta_id,
-                        UserDevice.tenant_id == tenant_id
-                    )
-                )
-            
-            result = await session.execute(stmt)
-            deleted_relationships = result.scalars().all()
-            
-            for relationship in deleted_relationships:
-                relationship.is_deleted = True
-                relationship.last_synced_at = datetime.utcnow()
-    
-            await session.commit()
-    
-        except Exception as e:
-            logger.error(f"Error processing user relationships for device {device.okta_id}: {str(e)}")
-            raise                  
+            - Links to users that were not synced are skipped by the insert itself
+              (WHERE EXISTS on users) rather than a SELECT per pair
+        """
+        logger.debug(f"Staging {len(user_devices)} user relationships for device {device_okta_id}")
+        writer.replace('user_devices', 'device_okta_id', device_okta_id)
+        now = datetime.now(timezone.utc)
+        for user_device_data in user_devices:
+            writer.add('user_devices', {
+                'user_okta_id': user_device_data['user_okta_id'],
+                'device_okta_id': device_okta_id,
+                'management_status': user_device_data.get('management_status'),
+                'screen_lock_type': user_device_data.get('screen_lock_type'),
+                'user_device_created_at': user_device_data.get('user_device_created_at'),
+                'created_at': now,
+                'updated_at': now,
+            })
         
     #Authentication methods:
 
@@ -1234,6 +1538,219 @@ class DatabaseOperations:
         result = await session.execute(query)
         return result.scalars().all()        
     
+    async def get_sync_cursor(self, session: AsyncSession, tenant_id: str, name: str) -> Optional[SyncCursor]:
+        """
+        Get the persisted position of a change feed
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            name: Feed name (e.g. "system_log")
+        """
+        result = await session.execute(
+            select(SyncCursor).where(and_(SyncCursor.tenant_id == tenant_id, SyncCursor.name == name))
+        )
+        return result.scalars().first()
+
+    async def set_sync_cursor(
+        self,
+        session: AsyncSession,
+        tenant_id: str,
+        name: str,
+        cursor: str,
+        events_applied: int = 0
+    ) -> SyncCursor:
+        """
+        Persist the position of a change feed (creates the row on first use)
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            name: Feed name (e.g. "system_log")
+            cursor: New feed position
+            events_applied: Events applied since the previous position
+        """
+        try:
+            sync_cursor = await self.get_sync_cursor(session, tenant_id, name)
+            if sync_cursor is None:
+                sync_cursor = SyncCursor(tenant_id=tenant_id, name=name, events_applied=0)
+                session.add(sync_cursor)
+            sync_cursor.cursor = cursor
+            sync_cursor.events_applied = (sync_cursor.events_applied or 0) + events_applied
+            sync_cursor.updated_at = datetime.now(timezone.utc)
+            await session.commit()
+            return sync_cursor
+        except Exception as e:
+            logger.error(f"Error saving {name} sync cursor: {str(e)}")
+            await session.rollback()
+            raise
+
+    async def mark_interrupted_syncs(self, tenant_id: str, process_id_prefix: Optional[str] = None) -> int:
+        """
+        Fail API-started syncs left running by a previous server process (called at startup).
+        API syncs run inside the server, so none can still be running; CLI syncs (no
+        process_id) are left alone. Checkpoints are kept so the next sync can resume them.
+        
+        Args:
+            tenant_id: Tenant identifier
+            process_id_prefix: Only fail syncs whose process_id starts with this (e.g. scheduler
+                workers, which never run the same tenant twice)
+            
+        Returns:
+            Number of sync history entries marked as failed
+        """
+        conditions = [
+            SyncHistory.tenant_id == tenant_id,
+            SyncHistory.status.in_([SyncStatus.RUNNING, SyncStatus.IDLE]),
+            SyncHistory.process_id.isnot(None)
+        ]
+        if process_id_prefix:
+            conditions.append(SyncHistory.process_id.startswith(process_id_prefix, autoescape=True))
+        stopped = "its worker process" if process_id_prefix else "the server"
+        async with self.get_session() as session:
+            try:
+                result = await session.execute(
+                    update(SyncHistory)
+                    .where(and_(*conditions))
+                    .values(
+                        status=SyncStatus.FAILED,
+                        success=False,
+                        end_time=datetime.now(timezone.utc),
+                        error_details=f"Sync was interrupted ({stopped} stopped while it was running)"
+                    )
+                )
+                await session.commit()
+                if result.rowcount:
+                    logger.warning(f"Marked {result.rowcount} interrupted sync(s) as failed for tenant {tenant_id}")
+                return result.rowcount or 0
+            except Exception as e:
+                logger.error(f"Error marking interrupted syncs: {str(e)}")
+                await session.rollback()
+                raise
+
+    async def get_checkpointed_sync(self, session: AsyncSession, tenant_id: str, exclude_id: Optional[int] = None) -> Optional[SyncHistory]:
+        """
+        Get the most recent sync that still holds a resume checkpoint
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            exclude_id: Sync history entry to ignore (the sync looking for a checkpoint)
+        """
+        conditions = [SyncHistory.tenant_id == tenant_id, SyncHistory.checkpoint.isnot(None)]
+        if exclude_id is not None:
+            conditions.append(SyncHistory.id != exclude_id)
+        result = await session.execute(
+            select(SyncHistory).where(and_(*conditions)).order_by(SyncHistory.start_time.desc()).limit(1)
+        )
+        return result.scalars().first()
+
+    async def clear_sync_checkpoints(self, session: AsyncSession, tenant_id: str, keep_id: Optional[int] = None) -> None:
+        """
+        Drop resume checkpoints (and their staged payloads unless one is kept)
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            keep_id: Sync history entry whose checkpoint stays
+        """
+        conditions = [SyncHistory.tenant_id == tenant_id, SyncHistory.checkpoint.isnot(None)]
+        if keep_id is not None:
+            conditions.append(SyncHistory.id != keep_id)
+        try:
+            await session.execute(update(SyncHistory).where(and_(*conditions)).values(checkpoint=None))
+            if keep_id is None:
+                await session.execute(
+                    delete(SyncCheckpointPayload).where(SyncCheckpointPayload.tenant_id == tenant_id)
+                )
+            await session.commit()
+        except Exception as e:
+            logger.error(f"Error clearing sync checkpoints: {str(e)}")
+            await session.rollback()
+            raise
+
+    async def get_checkpoint_payloads(self, session: AsyncSession, tenant_id: str) -> Dict[str, Any]:
+        """
+        Get the relationship payloads staged by an unfinished sync, by name
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+        """
+        result = await session.execute(
+            select(SyncCheckpointPayload).where(SyncCheckpointPayload.tenant_id == tenant_id)
+        )
+        return {row.name: row.payload for row in result.scalars().all()}
+
+    async def set_checkpoint_payload(self, session: AsyncSession, tenant_id: str, name: str, payload: Any, item_count: int = 0) -> None:
+        """
+        Persist one staged relationship payload (creates the row on first use)
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            name: Payload name (orchestrator attribute)
+            payload: JSON-serializable payload
+            item_count: Number of entries in the payload
+        """
+        try:
+            stmt = sqlite_insert(SyncCheckpointPayload).values(
+                tenant_id=tenant_id,
+                name=name,
+                payload=payload,
+                item_count=item_count,
+                updated_at=datetime.now(timezone.utc)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['tenant_id', 'name'],
+                set_={'payload': stmt.excluded.payload, 'item_count': stmt.excluded.item_count, 'updated_at': stmt.excluded.updated_at}
+            )
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            logger.error(f"Error saving {name} checkpoint payload: {str(e)}")
+            await session.rollback()
+            raise
+
+    async def add_sync_phase_metrics(self, session: AsyncSession, tenant_id: str, sync_id: int, data: Dict[str, Any]) -> SyncPhaseMetrics:
+        """
+        Store the telemetry of one finished sync phase
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            sync_id: ID of the sync history entry
+            data: SyncPhaseMetrics column values
+        """
+        try:
+            phase_metrics = SyncPhaseMetrics(tenant_id=tenant_id, sync_id=sync_id)
+            for key, value in data.items():
+                if hasattr(phase_metrics, key):
+                    setattr(phase_metrics, key, value)
+            session.add(phase_metrics)
+            await session.commit()
+            return phase_metrics
+        except Exception as e:
+            logger.error(f"Error saving sync phase metrics: {str(e)}")
+            await session.rollback()
+            raise
+
+    async def get_sync_phase_metrics(self, session: AsyncSession, tenant_id: str, sync_id: int) -> List[SyncPhaseMetrics]:
+        """
+        Get the stored phase telemetry of a sync, in start order
+        
+        Args:
+            session: Active database session
+            tenant_id: Tenant identifier
+            sync_id: ID of the sync history entry
+        """
+        result = await session.execute(
+            select(SyncPhaseMetrics)
+            .where(and_(SyncPhaseMetrics.tenant_id == tenant_id, SyncPhaseMetrics.sync_id == sync_id))
+            .order_by(SyncPhaseMetrics.started_at, SyncPhaseMetrics.id)
+        )
+        return result.scalars().all()
+
     # Clean up sync history table
     async def cleanup_sync_history(self, tenant_id: str, keep_count: int = 30):
         """
@@ -1266,7 +1783,17 @@ class DatabaseOperations:
             # Get the cutoff date (oldest date we want to keep)
             cutoff_date = min(dates_to_keep)
             
-            # Delete all records older than the cutoff date
+            # Delete all records older than the cutoff date (and their phase telemetry)
+            expired_ids = select(SyncHistory.id).where(
+                SyncHistory.tenant_id == tenant_id,
+                func.date(SyncHistory.start_time) < cutoff_date
+            )
+            await session.execute(
+                delete(SyncPhaseMetrics).where(
+                    SyncPhaseMetrics.tenant_id == tenant_id,
+                    SyncPhaseMetrics.sync_id.in_(expired_ids)
+                )
+            )
             delete_stmt = delete(SyncHistory).where(
                 SyncHistory.tenant_id == tenant_id,
                 func.date(SyncHistory.start_time) < cutoff_date
@@ -2661,3 +3188,64 @@ class DatabaseOperations:
         except Exception as e:
             logger.error(f"Failed to toggle favorite for history {history_id}: {e}")
             return None
+
+
+class StagingDatabase(DatabaseOperations):
+    """
+    Throwaway SQLite database holding shadow copies of the entity tables during a full sync.
+    
+    The sync writes into this file instead of the live database, so agent queries never see
+    half-loaded tables and don't wait on the sync's writes. Once every entity is loaded,
+    DatabaseOperations.swap_in_staging copies the tenant's rows in atomically. The staging
+    tables get no secondary indexes: only their inline primary key and unique constraints
+    (the (tenant_id, okta_id) and relationship conflict targets of the upserts) are built.
+    
+    The file is deleted after the sync, except when an interrupted sync leaves a resume
+    checkpoint (SYNC_RESUME): the next sync then keeps loading into the same file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self.engine = _build_async_engine(f"sqlite+aiosqlite:///{self.path}", profile="staging")
+        self.SessionLocal = async_sessionmaker(self.engine, expire_on_commit=False)
+        self._upsert_stats: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def for_tenant(cls, tenant_id: str) -> "StagingDatabase":
+        """Staging database placed next to the live database file."""
+        live_path = Path(settings.SQLITE_PATH)
+        return cls(live_path.with_name(f"{live_path.stem}.staging-{sanitize_path_part(tenant_id)}.db"))
+
+    def _sqlite_file(self) -> str:
+        return self.path
+
+    def exists(self) -> bool:
+        """Whether a staging file (e.g. left by an interrupted sync) is on disk."""
+        return Path(self.path).is_file()
+
+    async def init_db(self):
+        """Create empty shadow tables (any leftover file from an aborted sync is replaced)."""
+        await self.discard()
+        self.engine = _build_async_engine(f"sqlite+aiosqlite:///{self.path}", profile="staging")
+        self.SessionLocal = async_sessionmaker(self.engine, expire_on_commit=False)
+        tables = [table for table in Base.metadata.sorted_tables if table.name in SHADOW_SYNC_TABLES]
+        async with self.engine.begin() as conn:
+            # synchronous comes from the staging profile (OFF unless the file must survive for resume)
+            await conn.execute(text("PRAGMA journal_mode=WAL"))
+
+            # CREATE TABLE only: table.create() would also emit every Index of the model,
+            # which the whole load would then maintain row by row
+            for table in tables:
+                await conn.execute(CreateTable(table))
+        logger.info(f"Created staging database for shadow-table sync at {self.path}")
+
+    async def discard(self) -> None:
+        """Close the staging engine and delete the staging file."""
+        await self.close()
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            try:
+                Path(self.path + suffix).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove staging file {self.path + suffix}: {str(e)}")
@@ -0,0 +1,160 @@
+"""
+Batched writer for sync relationship tables.
+
+Relationship rows (group memberships, factors, app assignments, device links) are
+buffered for a whole page of parent entities and written with executemany in large
+chunks, instead of one statement per edge. The caller commits once per page.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.utils.logging import logger
+
+# Insert statement per relationship table; flush() writes them in this order
+_EDGE_STATEMENTS = {
+    'user_group_memberships': text("""
+        INSERT INTO user_group_memberships
+        (tenant_id, user_okta_id, group_okta_id, created_at, updated_at)
+        VALUES (:tenant_id, :user_okta_id, :group_okta_id, :created_at, :updated_at)
+        ON CONFLICT (tenant_id, user_okta_id, group_okta_id)
+        DO UPDATE SET
+            updated_at = excluded.updated_at
+    """),
+    'user_factors': text("""
+        INSERT INTO user_factors
+        (tenant_id, user_okta_id, okta_id, factor_type, provider, status,
+        authenticator_name, email, phone_number, device_type, device_name, platform,
+        created_at, last_updated_at, updated_at)
+        VALUES (
+            :tenant_id, :user_okta_id, :okta_id, :factor_type, :provider, :status,
+            :authenticator_name, :email, :phone_number, :device_type, :device_name, :platform,
+            :created_at, :last_updated_at, :updated_at
+        )
+        ON CONFLICT (tenant_id, user_okta_id, okta_id)
+        DO UPDATE SET
+            factor_type = excluded.factor_type,
+            provider = excluded.provider,
+            status = excluded.status,
+            authenticator_name = excluded.authenticator_name,
+            email = excluded.email,
+            phone_number = excluded.phone_number,
+            device_type = excluded.device_type,
+            device_name = excluded.device_name,
+            platform = excluded.platform,
+            last_updated_at = excluded.last_updated_at,
+            updated_at = excluded.updated_at
+    """),
+    'user_application_assignments': text("""
+        INSERT INTO user_application_assignments
+        (tenant_id, user_okta_id, application_okta_id,
+         assignment_id, assignment_type, group_name, group_okta_id,
+         assignment_status, credentials_setup, hidden,
+         created_at, updated_at)
+        VALUES (:tenant_id, :user_okta_id, :application_okta_id,
+                :assignment_id, :assignment_type, :group_name, :group_okta_id,
+                :assignment_status, :credentials_setup, :hidden,
+                :created_at, :updated_at)
+    """),
+    'group_application_assignments': text("""
+        INSERT INTO group_application_assignments
+        (tenant_id, group_okta_id, application_okta_id, assignment_id, created_at, updated_at)
+        VALUES (:tenant_id, :group_okta_id, :application_okta_id, :assignment_id, :created_at, :updated_at)
+    """),
+    # Users that were not synced (e.g. excluded deprovisioned users) are skipped in-statement
+    # instead of with a SELECT per device-user pair
+    'user_devices': text("""
+        INSERT INTO user_devices
+        (tenant_id, user_okta_id, device_okta_id, management_status, screen_lock_type,
+         user_device_created_at, created_at, updated_at)
+        SELECT :tenant_id, :user_okta_id, :device_okta_id, :management_status, :screen_lock_type,
+               :user_device_created_at, :created_at, :updated_at
+        WHERE EXISTS (
+            SELECT 1 FROM users
+            WHERE okta_id = :user_okta_id AND tenant_id = :tenant_id AND is_deleted = 0
+        )
+        ON CONFLICT (tenant_id, user_okta_id, device_okta_id)
+        DO UPDATE SET
+            management_status = excluded.management_status,
+            screen_lock_type = excluded.screen_lock_type,
+            user_device_created_at = excluded.user_device_created_at,
+            updated_at = excluded.updated_at
+    """),
+}
+
+
+class RelationshipWriter:
+    """
+    Buffers relationship rows for a page of parent entities and writes them in chunks.
+
+    Usage:
+        writer = RelationshipWriter(session, tenant_id)
+        writer.replace('user_application_assignments', 'application_okta_id', app_okta_id)
+        writer.add('user_application_assignments', {...})
+        await writer.flush()
+        await session.commit()
+
+    Deletes queued with replace() run before any inserts, so a parent's rows are swapped
+    for the new set within the page's transaction.
+    """
+
+    def __init__(self, session: AsyncSession, tenant_id: str, chunk_size: Optional[int] = None):
+        self.session = session
+        self.tenant_id = str(tenant_id)
+        self.chunk_size = max(1, chunk_size or settings.SYNC_RELATIONSHIP_CHUNK_SIZE)
+        self._deletes: Dict[Tuple[str, str], List[str]] = {}
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    def replace(self, table_name: str, parent_column: str, parent_okta_id: str) -> None:
+        """Queue removal of the tenant's existing table_name rows for this parent."""
+        if table_name not in _EDGE_STATEMENTS:
+            raise ValueError(f"Unknown relationship table: {table_name}")
+        self._deletes.setdefault((table_name, parent_column), []).append(str(parent_okta_id))
+
+    def add(self, table_name: str, row: Dict[str, Any]) -> None:
+        """Buffer one relationship row (tenant_id is filled in)."""
+        if table_name not in _EDGE_STATEMENTS:
+            raise ValueError(f"Unknown relationship table: {table_name}")
+        row['tenant_id'] = self.tenant_id
+        self._rows.setdefault(table_name, []).append(row)
+
+    def pending(self, table_name: str) -> int:
+        """Number of buffered rows for a table."""
+        return len(self._rows.get(table_name, []))
+
+    async def flush(self) -> Dict[str, int]:
+        """
+        Run queued deletes, then write buffered rows with executemany (caller commits).
+
+        Returns:
+            Rows written per table (rows skipped by an in-statement filter are not counted)
+        """
+        written: Dict[str, int] = {}
+        try:
+            for (table_name, parent_column), parent_ids in self._deletes.items():
+                stmt = text(
+                    f"DELETE FROM {table_name} "
+                    f"WHERE tenant_id = :tenant_id AND {parent_column} = :parent_okta_id"
+                )
+                params = [{'tenant_id': self.tenant_id, 'parent_okta_id': parent_id} for parent_id in parent_ids]
+                for i in range(0, len(params), self.chunk_size):
+                    await self.session.execute(stmt, params[i:i + self.chunk_size])
+
+            for table_name, stmt in _EDGE_STATEMENTS.items():
+                rows = self._rows.get(table_name)
+                if not rows:
+                    continue
+                count = 0
+                for i in range(0, len(rows), self.chunk_size):
+                    result = await self.session.execute(stmt, rows[i:i + self.chunk_size])
+                    count += max(result.rowcount or 0, 0)
+                written[table_name] = count
+                if count < len(rows):
+                    logger.debug(f"Skipped {len(rows) - count} {table_name} rows whose parent was not synced")
+        finally:
+            self._deletes = {}
+            self._rows = {}
+        return written
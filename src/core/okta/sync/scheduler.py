@@ -0,0 +1,362 @@
+"""
+Multi-tenant sync scheduler
+
+Runs syncs for several Okta orgs from one process. Each sync runs in its own worker
+process (`python -m src.core.okta.sync.worker`), so every tenant gets:
+- Its own settings (org URL, token, OKTA_CONCURRENT_LIMIT / rate-limit reserve), hence its own
+  API semaphore and rate-limit governor: one org can't spend another org's budget
+- Its own SQLite database file and connections: a large org's writes never hold the
+  database lock another org's refresh is waiting for
+- Its own event loop and memory, released when the sync ends
+
+Tenants come from SYNC_TENANTS_FILE (JSON list, see load_tenant_configs) or, without one,
+the org configured in .env. Due tenants are queued by priority and started while fewer than
+SYNC_SCHEDULER_WORKERS syncs run; a tenant is never queued or run twice at the same time.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import re
+import signal
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from src.config.settings import settings, BASE_DIR
+from src.core.okta.sync.worker import WORKER_RESULT_PREFIX
+from src.utils.logging import logger
+
+# Longest worker output line relayed (same as the script runner); longer ones are dropped
+WORKER_OUTPUT_LINE_LIMIT = 1024 * 1024
+
+_CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week), evaluated in UTC.
+
+    Fields accept `*`, numbers, ranges (`1-5`), steps (`*/15`, `8-18/2`) and comma lists;
+    day-of-week runs 0-6 from Sunday (7 is Sunday too). As in cron, when both day fields are
+    restricted a day matching either one fires. @hourly, @daily, @weekly and @monthly work too.
+    """
+
+    _FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7))
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        parts = _CRON_ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        values = [self._parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {day % 7 for day in weekdays}
+        self._day_restricted = parts[2] != '*'
+        self._weekday_restricted = parts[4] != '*'
+
+    @staticmethod
+    def _parse_field(text: str, name: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in text.split(','):
+            base, _, step_text = item.partition('/')
+            step = int(step_text) if step_text else 1
+            if base == '*':
+                start, end = low, high
+            elif '-' in base:
+                start, end = (int(bound) for bound in base.split('-', 1))
+            else:
+                start = int(base)
+                end = high if step_text else start
+            if not (low <= start <= end <= high) or step < 1:
+                raise ValueError(f"Invalid cron {name} field: {text!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment (aware UTC datetime)."""
+        candidate = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                month_start = candidate.replace(day=1, hour=0, minute=0)
+                candidate = (month_start + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+@dataclass
+class TenantSyncConfig:
+    """One Okta org the scheduler keeps in sync."""
+    org_url: str
+    api_token_env: str = "OKTA_API_TOKEN"
+    schedule: Optional[str] = None
+    priority: int = 0
+    concurrent_limit: Optional[int] = None
+    rate_limit_reserve_percent: Optional[float] = None
+    db_filename: Optional[str] = None
+    env: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def tenant_id(self) -> str:
+        """Same derivation as Settings.tenant_id"""
+        return urlparse(self.org_url.rstrip('/')).netloc.split('.')[0]
+
+    def worker_env(self) -> Dict[str, str]:
+        """Environment of this tenant's worker process (settings are read from it)."""
+        token = os.getenv(self.api_token_env, "")
+        if not token:
+            raise ValueError(f"Tenant {self.tenant_id}: environment variable {self.api_token_env} is not set")
+        env = dict(os.environ)
+        env.update({key: str(value) for key, value in self.env.items()})
+        env['OKTA_CLIENT_ORGURL'] = self.org_url.rstrip('/')
+        env['OKTA_API_TOKEN'] = token
+        env['DB_FILENAME'] = self.db_filename or f"okta_sync_{re.sub(r'[^A-Za-z0-9_.-]', '_', self.tenant_id)}.db"
+        if self.concurrent_limit is not None:
+            env['OKTA_CONCURRENT_LIMIT'] = str(self.concurrent_limit)
+        if self.rate_limit_reserve_percent is not None:
+            env['OKTA_RATE_LIMIT_RESERVE_PERCENT'] = str(self.rate_limit_reserve_percent)
+        env['PYTHONUNBUFFERED'] = '1'
+        return env
+
+
+def load_tenant_configs(path: Optional[str] = None) -> List[TenantSyncConfig]:
+    """
+    Read the tenants to schedule.
+
+    The file holds a JSON list of objects with the TenantSyncConfig fields, e.g.
+        [{"org_url": "https://acme.okta.com", "api_token_env": "ACME_OKTA_API_TOKEN",
+          "schedule": "0 */4 * * *", "priority": 10, "concurrent_limit": 30,
+          "db_filename": "okta_sync_acme.db", "env": {"SYNC_OKTA_DEVICES": "true"}}]
+    Tokens are never stored in the file, only the name of the variable holding them.
+
+    Args:
+        path: Tenants file (defaults to SYNC_TENANTS_FILE); without one the .env org is used
+
+    Raises:
+        ValueError: On an invalid file, duplicate tenants or bad schedules
+    """
+    path = path or settings.SYNC_TENANTS_FILE
+    if not path:
+        return [TenantSyncConfig(org_url=settings.OKTA_CLIENT_ORGURL, db_filename=settings.DB_FILENAME)]
+
+    tenants_file = Path(path)
+    if not tenants_file.is_absolute():
+        tenants_file = BASE_DIR / tenants_file
+    try:
+        entries = json.loads(tenants_file.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Could not read tenants file {tenants_file}: {e}") from e
+    if not isinstance(entries, list):
+        raise ValueError(f"Tenants file {tenants_file} must contain a JSON list")
+
+    configs, seen = [], set()
+    for entry in entries:
+        try:
+            config = TenantSyncConfig(**entry)
+        except TypeError as e:
+            raise ValueError(f"Invalid tenant entry {entry!r}: {e}") from e
+        if config.tenant_id in seen:
+            raise ValueError(f"Tenant {config.tenant_id} is listed twice in {tenants_file}")
+        CronSchedule(config.schedule or settings.SYNC_SCHEDULE)  # validate early
+        seen.add(config.tenant_id)
+        configs.append(config)
+    return configs
+
+
+class SyncScheduler:
+    """
+    Queues tenant syncs by priority and runs them in a bounded pool of worker processes.
+
+    Higher priority starts first; equal priorities start in the order they were queued.
+    """
+
+    def __init__(self, tenants: List[TenantSyncConfig], max_workers: Optional[int] = None):
+        self.tenants = {tenant.tenant_id: tenant for tenant in tenants}
+        self.max_workers = max(1, max_workers or settings.SYNC_SCHEDULER_WORKERS)
+        self.schedules = {
+            tenant.tenant_id: CronSchedule(tenant.schedule or settings.SYNC_SCHEDULE) for tenant in tenants
+        }
+        self.next_runs: Dict[str, datetime] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._queue: List[Tuple[int, int, str, str]] = []
+        self._queued: Set[str] = set()
+        self._sequence = itertools.count()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def enqueue(self, tenant_id: str, priority: Optional[int] = None, reason: str = "manual") -> bool:
+        """
+        Queue a sync for a tenant.
+
+        Returns:
+            False when the tenant is unknown, already queued or running
+        """
+        tenant = self.tenants.get(tenant_id)
+        if tenant is None:
+            logger.warning(f"Not queueing sync for unknown tenant {tenant_id}")
+            return False
+        if tenant_id in self._queued or tenant_id in self._running:
+            logger.info(f"Sync for tenant {tenant_id} is already queued or running ({reason} request skipped)")
+            return False
+        priority = tenant.priority if priority is None else priority
+        heapq.heappush(self._queue, (-priority, next(self._sequence), tenant_id, reason))
+        self._queued.add(tenant_id)
+        logger.info(f"Queued {reason} sync for tenant {tenant_id} (priority {priority})")
+        self._wakeup.set()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Queue, running workers, next scheduled runs and last results."""
+        return {
+            'running': sorted(self._running),
+            'queued': [tenant_id for _, _, tenant_id, _ in sorted(self._queue)],
+            'next_runs': {tenant_id: run.isoformat() for tenant_id, run in self.next_runs.items()},
+            'results': self.results,
+        }
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Run the scheduler until stop() is called.
+
+        Args:
+            once: Sync every tenant a single time (by priority) and return when all finished
+        """
+        now = datetime.now(timezone.utc)
+        if once:
+            for tenant_id in self.tenants:
+                self.enqueue(tenant_id, reason="one-off")
+        else:
+            self.next_runs = {tenant_id: schedule.next_after(now) for tenant_id, schedule in self.schedules.items()}
+            for tenant_id, next_run in self.next_runs.items():
+                logger.info(f"Tenant {tenant_id}: next sync at {next_run.isoformat()} ({self.schedules[tenant_id].expression})")
+
+        logger.info(f"Sync scheduler started for {len(self.tenants)} tenant(s) with {self.max_workers} worker(s)")
+        try:
+            while not self._stopping:
+                now = datetime.now(timezone.utc)
+                for tenant_id, next_run in list(self.next_runs.items()):
+                    if next_run <= now:
+                        self.enqueue(tenant_id, reason="scheduled")
+                        self.next_runs[tenant_id] = self.schedules[tenant_id].next_after(now)
+                self._dispatch()
+
+                if once and not self._queue and not self._running:
+                    break
+                timeout = 60.0
+                if self.next_runs:
+                    timeout = max(0.0, min(timeout, (min(self.next_runs.values()) - now).total_seconds()))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._shutdown()
+
+    def stop(self) -> None:
+        """Stop scheduling; running workers are asked to cancel (their syncs stay resumable)."""
+        self._stopping = True
+        self._wakeup.set()
+
+    def _dispatch(self) -> None:
+        while self._queue and len(self._running) < self.max_workers and not self._stopping:
+            _, _, tenant_id, reason = heapq.heappop(self._queue)
+            self._queued.discard(tenant_id)
+            task = asyncio.create_task(self._run_worker(self.tenants[tenant_id], reason))
+            self._running[tenant_id] = task
+            task.add_done_callback(lambda _, tenant_id=tenant_id: self._worker_done(tenant_id))
+
+    def _worker_done(self, tenant_id: str) -> None:
+        self._running.pop(tenant_id, None)
+        self._wakeup.set()
+
+    async def _run_worker(self, tenant: TenantSyncConfig, reason: str) -> None:
+        """Run one tenant sync in a worker process and record its result."""
+        tenant_id = tenant.tenant_id
+        started = datetime.now(timezone.utc)
+        result: Dict[str, Any] = {'status': 'failed', 'error': 'worker exited without a result'}
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "src.core.okta.sync.worker",
+                cwd=str(BASE_DIR),
+                env=tenant.worker_env(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=WORKER_OUTPUT_LINE_LIMIT,
+            )
+            self._processes[tenant_id] = process
+            logger.info(f"Started {reason} sync for tenant {tenant_id} (worker pid {process.pid})")
+
+            # Relay the worker's console output, tagged with its tenant
+            while True:
+                try:
+                    raw_line = await process.stdout.readline()
+                except ValueError:
+                    # Over the line limit: the reader skips it, keep relaying
+                    logger.warning(f"Dropped an over-long output line from the tenant {tenant_id} worker")
+                    continue
+                if not raw_line:
+                    break
+                line = raw_line.decode('utf-8', errors='replace').rstrip()
+                if line.startswith(WORKER_RESULT_PREFIX):
+                    result = json.loads(line[len(WORKER_RESULT_PREFIX):])
+                elif line:
+                    print(f"[{tenant_id}] {line}", flush=True)
+            return_code = await process.wait()
+            if return_code and result.get('status') == 'completed':
+                result = {'status': 'failed', 'error': f"worker exited with code {return_code}"}
+        except Exception as e:
+            logger.error(f"Sync worker for tenant {tenant_id} failed: {str(e)}")
+            result = {'status': 'failed', 'error': str(e)}
+        finally:
+            self._processes.pop(tenant_id, None)
+
+        result.update({
+            'reason': reason,
+            'started_at': started.isoformat(),
+            'duration_seconds': round((datetime.now(timezone.utc) - started).total_seconds(), 1),
+        })
+        self.results[tenant_id] = result
+        log = logger.info if result.get('status') in ('completed', 'already_running') else logger.warning
+        log(f"Sync for tenant {tenant_id} finished: {result.get('status')} in {result['duration_seconds']}s"
+            + (f" ({result['error']})" if result.get('error') else ""))
+
+    async def _shutdown(self) -> None:
+        """Ask running workers to cancel and wait for them."""
+        for tenant_id, process in list(self._processes.items()):
+            if process.returncode is None:
+                logger.info(f"Cancelling sync worker for tenant {tenant_id}")
+                try:
+                    process.send_signal(signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
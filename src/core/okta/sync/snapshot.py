@@ -0,0 +1,219 @@
+"""
+Columnar (Parquet) snapshot export of the synced Okta entities and relationships.
+
+After a successful sync each entity and relationship table of the tenant is written to
+a compressed Parquet file under SYNC_SNAPSHOT_DIR (default: <DB_DIR>/snapshots/<tenant>),
+together with a manifest.json describing the files, their Arrow schema and the snapshot
+schema version. Tables whose contents have not changed since the previous export
+(same row count and latest update/sync timestamps) are skipped.
+
+The export reads through its own read-only SQLite connection in a worker thread, so it
+never holds the sync engine's writer connection. pyarrow is optional: without it the
+export is skipped with a warning.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Integer
+
+from src.config.settings import settings
+from src.core.okta.sync.models import Base
+from src.core.okta.sync.operations import SHADOW_SYNC_TABLES
+from src.data.schemas.runtime_storage import sanitize_path_part
+from src.utils.logging import logger
+from src.utils.sqlite_profile import connect_reader
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Bump when the file layout or column type mapping changes; older snapshots are re-exported
+SNAPSHOT_SCHEMA_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+_READ_BATCH_ROWS = 50000
+
+
+def snapshot_dir(tenant_id: str) -> Path:
+    """Directory holding the tenant's Parquet files and manifest."""
+    base_dir = Path(settings.SYNC_SNAPSHOT_DIR) if settings.SYNC_SNAPSHOT_DIR else Path(settings.DB_DIR) / "snapshots"
+    return base_dir / sanitize_path_part(tenant_id)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if parsed is not None and parsed.tzinfo is None:
+        # Naive values are stored as UTC
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class SnapshotExporter:
+    """Exports a tenant's synced tables to Parquet files with a manifest."""
+
+    def __init__(self, tenant_id: str, output_dir: Optional[Path] = None, db_path: Optional[str] = None):
+        self.tenant_id = tenant_id
+        self.output_dir = Path(output_dir) if output_dir else snapshot_dir(tenant_id)
+        self.db_path = db_path or settings.SQLITE_PATH
+        self.tables = [table for table in Base.metadata.sorted_tables if table.name in SHADOW_SYNC_TABLES]
+
+    async def export(self, sync_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Run the export in a worker thread; returns the manifest (None when pyarrow is missing)."""
+        if not PYARROW_AVAILABLE:
+            logger.warning("Skipping snapshot export: pyarrow is not installed (pip install pyarrow)")
+            return None
+        return await asyncio.to_thread(self.export_sync, sync_id)
+
+    def export_sync(self, sync_id: Optional[int] = None) -> Dict[str, Any]:
+        """Export changed tables and rewrite the manifest."""
+        start_time = time.time()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        previous = self._read_manifest()
+        previous_tables = previous.get("tables", {}) if previous.get("schema_version") == SNAPSHOT_SCHEMA_VERSION else {}
+
+        manifest: Dict[str, Any] = {
+            "schema_version": SNAPSHOT_SCHEMA_VERSION,
+            "tenant_id": self.tenant_id,
+            "sync_id": sync_id,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "compression": settings.SYNC_SNAPSHOT_COMPRESSION,
+            "tables": {},
+        }
+        exported, skipped = 0, 0
+        with contextlib.closing(connect_reader(self.db_path)) as conn:
+            existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            for table in self.tables:
+                if table.name not in existing_tables:
+                    continue
+                fingerprint = self._fingerprint(conn, table)
+                entry = previous_tables.get(table.name)
+                if (
+                    entry
+                    and entry.get("fingerprint") == fingerprint
+                    and (self.output_dir / entry["file"]).exists()
+                ):
+                    manifest["tables"][table.name] = entry
+                    skipped += 1
+                    continue
+                manifest["tables"][table.name] = self._export_table(conn, table, fingerprint)
+                exported += 1
+
+        manifest["duration_seconds"] = round(time.time() - start_time, 3)
+        self._write_manifest(manifest)
+        logger.info(
+            f"Snapshot export to {self.output_dir}: {exported} tables written, {skipped} unchanged "
+            f"in {manifest['duration_seconds']:.2f}s"
+        )
+        return manifest
+
+    def _fingerprint(self, conn, table) -> List[Any]:
+        """Cheap change detector: row count plus the latest update/sync timestamps."""
+        expressions = ["COUNT(*)"]
+        for column_name in ("updated_at", "last_synced_at"):
+            if column_name in table.columns:
+                expressions.append(f"MAX({column_name})")
+        if "is_deleted" in table.columns:
+            expressions.append("SUM(is_deleted)")
+        row = conn.execute(
+            f"SELECT {', '.join(expressions)} FROM {table.name} WHERE tenant_id = ?",
+            (self.tenant_id,)
+        ).fetchone()
+        return list(row)
+
+    def _arrow_schema(self, table) -> "pa.Schema":
+        fields = []
+        for column in table.columns:
+            if isinstance(column.type, Boolean):
+                arrow_type = pa.bool_()
+            elif isinstance(column.type, Integer):
+                arrow_type = pa.int64()
+            elif isinstance(column.type, DateTime):
+                arrow_type = pa.timestamp("us", tz="UTC")
+            else:
+                # Strings, text, enums and JSON (kept as its JSON text)
+                arrow_type = pa.string()
+            fields.append(pa.field(column.name, arrow_type))
+        return pa.schema(fields)
+
+    def _to_batch(self, schema: "pa.Schema", rows: List[tuple]) -> "pa.RecordBatch":
+        columns = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in rows]
+            if pa.types.is_timestamp(field.type):
+                values = [_parse_datetime(value) for value in values]
+            elif pa.types.is_boolean(field.type):
+                values = [None if value is None else bool(value) for value in values]
+            elif pa.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            columns.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+    def _export_table(self, conn, table, fingerprint: List[Any]) -> Dict[str, Any]:
+        """Write one table to <name>.parquet (via a temp file so readers never see a partial file)."""
+        start_time = time.time()
+        schema = self._arrow_schema(table)
+        file_name = f"{table.name}.parquet"
+        final_path = self.output_dir / file_name
+        temp_path = self.output_dir / f".{file_name}.tmp"
+        column_list = ", ".join(column.name for column in table.columns)
+        cursor = conn.execute(f"SELECT {column_list} FROM {table.name} WHERE tenant_id = ?", (self.tenant_id,))
+
+        row_count = 0
+        try:
+            with pq.ParquetWriter(temp_path, schema, compression=settings.SYNC_SNAPSHOT_COMPRESSION) as writer:
+                while True:
+                    rows = cursor.fetchmany(_READ_BATCH_ROWS)
+                    if not rows:
+                        break
+                    writer.write_batch(self._to_batch(schema, rows))
+                    row_count += len(rows)
+            os.replace(temp_path, final_path)
+        except Exception as e:
+            logger.error(f"Snapshot export of {table.name} failed: {str(e)}")
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        duration = round(time.time() - start_time, 3)
+        logger.debug(f"Exported {row_count} {table.name} rows to {final_path} in {duration:.2f}s")
+        return {
+            "file": file_name,
+            "rows": row_count,
+            "bytes": final_path.stat().st_size,
+            "columns": [{"name": field.name, "type": str(field.type)} for field in schema],
+            "fingerprint": fingerprint,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": duration,
+        }
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        manifest_path = self.output_dir / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return {}
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file_handle:
+                return json.load(file_handle)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable snapshot manifest {manifest_path}: {str(e)}")
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        manifest_path = self.output_dir / MANIFEST_FILENAME
+        temp_path = self.output_dir / f".{MANIFEST_FILENAME}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file_handle:
+            json.dump(manifest, file_handle, indent=2, default=str)
+        os.replace(temp_path, manifest_path)
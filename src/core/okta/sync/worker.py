@@ -0,0 +1,116 @@
+"""
+Sync worker process
+
+Runs a single sync for the tenant configured in its environment and exits:
+    python -m src.core.okta.sync.worker
+
+Started by the multi-tenant scheduler (src/core/okta/sync/scheduler.py), which gives every
+worker its own org URL, token, rate budget and database file through the environment. The
+result is printed as one JSON line prefixed with SYNC_WORKER_RESULT. SIGTERM cancels the
+sync gracefully, leaving a checkpoint the next run resumes from.
+
+Settings are read at import time, so nothing from src is imported at module level here.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+WORKER_RESULT_PREFIX = "SYNC_WORKER_RESULT "
+
+# process_id of scheduler-started syncs; the scheduler never runs a tenant twice, so a
+# running record with this prefix at worker start is left over from a killed worker
+WORKER_PROCESS_PREFIX = "worker:"
+
+
+async def run_worker_sync() -> Dict[str, Any]:
+    """Run one sync for the configured tenant and return its outcome."""
+    from datetime import datetime, timezone
+    from sqlalchemy import select, func, and_
+
+    from src.config.settings import settings
+    from src.core.okta.sync.engine import SyncOrchestrator
+    from src.core.okta.sync.models import SyncStatus, User, Group, Application, Policy, Device
+    from src.core.okta.sync.operations import DatabaseOperations
+    from src.utils.logging import logger
+
+    tenant_id = settings.tenant_id
+    db = DatabaseOperations()
+    # The scheduler assigns this tenant's database file; never fall back to a discovered shared one
+    await db.init_db(db_path=Path(settings.DB_DIR) / settings.DB_FILENAME)
+
+    cancellation_flag = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, cancellation_flag.set)
+    except (NotImplementedError, RuntimeError):
+        pass  # Windows: terminate() ends the worker, the checkpoint still allows a resume
+
+    sync_id = None
+    try:
+        await db.mark_interrupted_syncs(tenant_id, process_id_prefix=WORKER_PROCESS_PREFIX)
+        async with db.get_session() as session:
+            active_sync = await db.get_active_sync(session, tenant_id)
+            if active_sync:
+                logger.info(f"Sync {active_sync.id} is already running for tenant {tenant_id}, skipping")
+                return {'status': 'already_running', 'tenant_id': tenant_id, 'sync_id': active_sync.id}
+            sync_history = await db.create_sync_history(session, tenant_id)
+            sync_id = sync_history.id
+            await db.update_sync_history(session, sync_id, tenant_id, {
+                'status': SyncStatus.RUNNING,
+                'process_id': f"{WORKER_PROCESS_PREFIX}{os.getpid()}",
+            })
+
+        logger.info(f"Worker {os.getpid()} syncing tenant {tenant_id} into {settings.DB_FILENAME}")
+        orchestrator = SyncOrchestrator(tenant_id, db)
+        orchestrator.cancellation_flag = cancellation_flag
+        await orchestrator.run_sync()
+
+        counts = {}
+        async with db.get_session() as session:
+            for key, model in (('users_count', User), ('groups_count', Group), ('apps_count', Application),
+                               ('policies_count', Policy), ('devices_count', Device)):
+                counts[key] = (await session.execute(
+                    select(func.count()).select_from(model).where(
+                        and_(model.tenant_id == tenant_id, model.is_deleted == False)
+                    )
+                )).scalar() or 0
+
+            if cancellation_flag.is_set():
+                data = {'status': SyncStatus.CANCELED, 'success': False,
+                        'error_details': "Sync operation was cancelled: worker stopped"}
+            else:
+                data = {'status': SyncStatus.COMPLETED, 'success': True, 'progress_percentage': 100, **counts}
+            data['end_time'] = datetime.now(timezone.utc)
+            await db.update_sync_history(session, sync_id, tenant_id, data)
+        await db.cleanup_sync_history(tenant_id, keep_count=30)
+
+        return {'status': data['status'].value, 'tenant_id': tenant_id, 'sync_id': sync_id, **counts}
+
+    except Exception as e:
+        logger.error(f"Sync failed for tenant {tenant_id}: {str(e)}", exc_info=True)
+        if sync_id:
+            async with db.get_session() as session:
+                await db.update_sync_history(session, sync_id, tenant_id, {
+                    'status': SyncStatus.FAILED,
+                    'end_time': datetime.now(timezone.utc),
+                    'success': False,
+                    'error_details': str(e),
+                })
+        return {'status': 'failed', 'tenant_id': tenant_id, 'sync_id': sync_id, 'error': str(e)}
+    finally:
+        await db.close()
+
+
+def main() -> int:
+    result = asyncio.run(run_worker_sync())
+    print(WORKER_RESULT_PREFIX + json.dumps(result, default=str), flush=True)
+    return 0 if result['status'] in ('completed', 'canceled', 'already_running') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
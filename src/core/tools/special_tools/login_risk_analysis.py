@@ -102,6 +102,7 @@ async def main():
     Template parameters will be filled in by execution manager:
     - user_identifier: {user_identifier}
     """
+    client = None
     try:
         logger.info("Starting login risk analysis special tool...")
         logger.info(f"Parameters - user: '{user_identifier}'")
@@ -139,6 +140,10 @@ async def main():
         error_result = {{"status": "error", "error": f"Exception in main: {{str(e)}}", "tool": "login_risk_analysis"}}
         logger.error(f"Exception caught: {{str(e)}}")
         print(json.dumps(error_result))
+    finally:
+        # Close the client's persistent HTTP session
+        if client:
+            await client.close_session()
 
 if __name__ == "__main__":
     try:
@@ -114,6 +114,7 @@ async def main():
     - group_identifier: {group_identifier}
     - app_identifier: {app_identifier}
     """
+    client = None
     try:
         logger.info("Starting user access analysis special tool...")
         logger.info(f"Parameters - user: '{user_identifier}', app: '{app_identifier}', group: '{group_identifier}'")
@@ -154,6 +155,10 @@ async def main():
         error_result = {{"status": "error", "error": f"Exception in main: {{str(e)}}", "tool": "access_analysis"}}
         logger.error(f"Exception caught: {{str(e)}}")
         print(json.dumps(error_result))
+    finally:
+        # Close the client's persistent HTTP session
+        if client:
+            await client.close_session()
 
 if __name__ == "__main__":
     try:
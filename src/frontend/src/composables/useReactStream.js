@@ -535,9 +535,11 @@ export function useReactStream() {
             }
         }
         
-        // Append batch data to content
+        // Append batch data to content (in place - copying would get slow for large results)
         if (data.results && Array.isArray(data.results)) {
-            results.value.content = [...results.value.content, ...data.results]
+            for (const row of data.results) {
+                results.value.content.push(row)
+            }
             
             // Update progress
             if (results.value.metadata?.streamingProgress) {
@@ -618,7 +620,16 @@ export function useReactStream() {
             // Chunked response - just a completion signal, data already loaded via RESULT-BATCH events
             console.log('[useReactStream] Chunked response complete signal')
             if (results.value && results.value.metadata) {
-                results.value.metadata.isStreaming = false
+                results.value.metadata = {
+                    ...results.value.metadata,
+                    isStreaming: false,
+                    count: data.count ?? results.value.metadata.count,
+                    ...data.metadata  // Merge backend metadata (data_source_type, last_sync)
+                }
+            }
+            // Scripts usually print headers after the rows, so they arrive with COMPLETE
+            if (results.value && data.headers && data.headers.length > 0) {
+                results.value.headers = data.headers
             }
         }
         
@@ -9,7 +9,6 @@ All queries are processed asynchronously via the multi-agent orchestrator.
 """
 
 import asyncio
-import json
 import time
 import uuid
 from pathlib import Path
@@ -23,7 +22,8 @@ from src.core.agents.orchestrator import (
     execute_multi_agent_query,
     OrchestratorResult,
 )
-from src.core.agents.sql_discovery_agent import check_database_health, get_last_sync_timestamp
+from src.core.agents.plan_cache import discard_failed_plan, store_executed_plan
+from src.core.agents.sql_discovery_agent import check_database_health, find_sqlite_db_path, get_last_sync_timestamp
 from src.core.okta.client import OktaClient
 from src.core.okta.sync.operations import DatabaseOperations
 from src.api.routers.sync import run_sync_operation
@@ -43,10 +43,16 @@ from src.integrations.slack.formatters import (
     format_history_message,
 )
 from src.utils.logging import get_logger, set_correlation_id
+from src.utils.script_results_stream import parse_script_output
+from src.utils.script_worker_pool import get_script_worker_pool, python_executable
 from src.utils.security_config import validate_generated_code
+from src.utils.sql_result_cache import open_cached_script_run
 
 logger = get_logger("slack_bot")
 
+# Generated scripts run for Slack replies are stopped after this long
+SLACK_SCRIPT_TIMEOUT_SECONDS = 120
+
 # Track background tasks to prevent GC
 _background_tasks: set = set()
 
@@ -536,7 +542,7 @@ async def _process_query(
 
     try:
         # Pre-query database health check — warn but don't block
-        db_healthy = check_database_health()
+        db_healthy = await check_database_health()
         if not db_healthy:
             await client.chat_postMessage(
                 channel=channel_id,
@@ -742,8 +748,8 @@ async def _handle_status(
 ):
     """Handle /tako status — show DB health and last sync info."""
     try:
-        db_healthy = check_database_health()
-        last_sync = get_last_sync_timestamp()
+        db_healthy = await check_database_health()
+        last_sync = await get_last_sync_timestamp()
 
         # Check for active sync and get entity counts
         db_ops = DatabaseOperations()
@@ -1002,6 +1008,7 @@ async def _execute_script_for_slack(
 
     script_path = None
     temp_dir = None
+    proc = None
     try:
         project_root = Path(__file__).parent.parent.parent.parent.resolve()
         temp_dir = (project_root / "generated_scripts").resolve()
@@ -1027,22 +1034,27 @@ async def _execute_script_for_slack(
         with open(script_path, "w", encoding="utf-8", newline="\n") as f:
             f.write(modified_code)
 
-        # Detect Python executable
-        venv_python = Path("venv/Scripts/python.exe")
-        python_exe = str(venv_python) if venv_python.exists() else "python"
-
-        proc = await asyncio.create_subprocess_exec(
-            python_exe,
-            "-u",
-            str(script_path.resolve()),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(project_root),
-            limit=1024 * 1024,
-        )
+        replay, recorder = await open_cached_script_run(find_sqlite_db_path(), modified_code)
+        if replay is not None:
+            logger.info(f"[{correlation_id}] Slack script output served from result cache")
+            proc = replay
+        elif settings.SCRIPT_WORKER_POOL_ENABLED:
+            proc = await get_script_worker_pool().submit(
+                str(script_path.resolve()), timeout=SLACK_SCRIPT_TIMEOUT_SECONDS
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                python_executable(),
+                "-u",
+                str(script_path.resolve()),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=str(project_root),
+                limit=1024 * 1024,
+            )
 
         stdout_bytes, stderr_bytes = await asyncio.wait_for(
-            proc.communicate(), timeout=120
+            proc.communicate(), timeout=SLACK_SCRIPT_TIMEOUT_SECONDS
         )
         stdout_str = stdout_bytes.decode("utf-8", errors="replace")
         stderr_str = stderr_bytes.decode("utf-8", errors="replace")
@@ -1050,12 +1062,21 @@ async def _execute_script_for_slack(
         if proc.returncode != 0:
             error_msg = stderr_str[-500:]
             logger.error(f"[{correlation_id}] Slack script execution failed: {error_msg}")
+            discard_failed_plan(orchestrator_result)
             return None
+        if recorder:
+            recorder.stdout(stdout_bytes)
+            recorder.stderr(stderr_bytes)
+            recorder.store()
+        store_executed_plan(orchestrator_result)
 
-        results_data = _parse_script_output(stdout_str)
+        results_data = parse_script_output(stdout_str)
 
         if not results_data:
             return None
+        if "raw_output" in results_data:
+            logger.warning(f"[{correlation_id}] Failed to parse Slack script output")
+            return None
 
         # Build event_data in same format as react_stream.py COMPLETE events
         if results_data.get("display_type") == "markdown":
@@ -1095,6 +1116,12 @@ async def _execute_script_for_slack(
         logger.error(f"[{correlation_id}] Script execution error: {e}", exc_info=True)
         return None
     finally:
+        # A timed-out script must not keep running (or hold its pool worker)
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
         # Generated scripts are execution staging, not durable conversation memory.
         try:
             if script_path is not None and temp_dir is not None:
@@ -1112,42 +1139,6 @@ async def _execute_script_for_slack(
             pass
 
 
-def _parse_script_output(stdout: str) -> Optional[Dict[str, Any]]:
-    """Parse JSON results from script stdout (same logic as react_stream.py)."""
-    try:
-        lines = stdout.split("\n")
-        json_lines = []
-        in_json = False
-
-        for line in lines:
-            if line.strip() == "QUERY RESULTS":
-                in_json = True
-                continue
-            elif line.strip().startswith("====") and in_json and json_lines:
-                break
-            elif in_json and line.strip() and not line.strip().startswith("===="):
-                json_lines.append(line)
-
-        if json_lines:
-            json_text = "\n".join(json_lines)
-            parsed_output = json.loads(json_text)
-
-            if isinstance(parsed_output, list):
-                return {
-                    "display_type": "table",
-                    "data": parsed_output,
-                    "count": len(parsed_output),
-                }
-            elif isinstance(parsed_output, dict):
-                return parsed_output
-
-    except Exception as e:
-        logger.warning(f"Failed to parse Slack script output: {e}")
-        return None
-
-    return None
-
-
 async def _save_history(
     correlation_id: str,
     query: str,
@@ -6,6 +6,7 @@ import asyncio
 import logging
 import os
 import re
+import time
 import traceback
 import aiohttp
 import inspect
@@ -445,6 +446,22 @@ async def make_async_request(client, method: str, url: str, headers: Dict = None
         
         return {"status": "error", "error": f"Error making SDK request: {str(e)}"}   
     
+def after_cursor(next_link: Optional[str]) -> Optional[str]:
+    """
+    Extract the Okta `after` pagination cursor from a next-page link.
+    
+    Args:
+        next_link: Absolute or relative URL of the next page
+        
+    Returns:
+        The cursor, or None when there is no next page or the link has no `after` parameter
+    """
+    if not next_link:
+        return None
+    from urllib.parse import urlparse, parse_qs
+    values = parse_qs(urlparse(next_link).query).get('after')
+    return values[0] if values else None
+
 async def _paginate_direct_api(
     self,
     endpoint: str,
@@ -476,6 +493,10 @@ async def _paginate_direct_api(
         
         # Build initial URL
         current_url = endpoint
+        resume_after = getattr(self, 'resume_after', {}).pop(entity_name, None)
+        if resume_after:
+            logger.info(f"{log_prefix}Resuming {entity_name} listing after cursor {resume_after}")
+            query_params = {**(query_params or {}), 'after': resume_after}
         if query_params:
             from urllib.parse import urlencode
             current_url += f"?{urlencode(query_params)}"
@@ -551,10 +572,15 @@ async def _paginate_direct_api(
                 # Rate limiting with semaphore
                 semaphore = getattr(self, 'api_semaphore', _RATE_LIMIT_SEMAPHORE)
                 async with semaphore:
+                    request_started = time.perf_counter()
                     async with session.get(full_url, headers=headers) as response:
+                        if hasattr(self, '_record_api_call'):
+                            self._record_api_call(response.status, time.perf_counter() - request_started)
                         if response.status != 200:
                             error_text = await response.text()
                             logger.error(f"{log_prefix}HTTP {response.status} error for {entity_name}: {error_text}")
+                            if hasattr(self, '_note_pagination_error'):
+                                self._note_pagination_error(entity_name)
                             break
                         
                         # Get response data
@@ -566,6 +592,30 @@ async def _paginate_direct_api(
                             logger.info(f"{log_prefix}Final pagination stats: {page_count} pages, {len(all_items)} total items")
                             break
                         
+                        # Handle pagination using Link headers (before processing, so the
+                        # processor can checkpoint the next-page position)
+                        current_url = None
+                        all_link_headers = response.headers.getall('Link')
+                        logger.debug(f"{log_prefix}Page {page_count} Link headers: {all_link_headers}")
+                        
+                        # Check each Link header for rel="next"
+                        for link_header in all_link_headers:
+                            if 'rel="next"' in link_header:
+                                logger.debug(f"{log_prefix}Found next link in page {page_count}: {link_header}")
+                                
+                                # Extract URL from: <URL>; rel="next"
+                                next_match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+                                if next_match:
+                                    full_next_url = next_match.group(1)
+                                    logger.debug(f"{log_prefix}Extracted next URL: {full_next_url}")
+                                    
+                                    # Extract path and query
+                                    parsed_next = urlparse(full_next_url)
+                                    current_url = parsed_next.path
+                                    if parsed_next.query:
+                                        current_url += f"?{parsed_next.query}"
+                                    break
+                        
                         # Transform items if function provided
                         if transform_func:
                             try:
@@ -583,36 +633,17 @@ async def _paginate_direct_api(
                         # Process immediately or collect
                         if processor_func and transformed_items:
                             try:
+                                if hasattr(self, 'next_page_links'):
+                                    self.next_page_links[entity_name] = current_url
                                 await processor_func(transformed_items)
                                 logger.debug(f"{log_prefix}Processed {len(transformed_items)} {entity_name} from page {page_count}")
                             except Exception as e:
                                 logger.error(f"{log_prefix}Error processing {entity_name}: {str(e)}")
+                                if hasattr(self, '_note_pagination_error'):
+                                    self._note_pagination_error(entity_name)
                         elif transformed_items:
                             all_items.extend(transformed_items)
                         
-                        # Handle pagination using Link headers
-                        current_url = None
-                        all_link_headers = response.headers.getall('Link')
-                        logger.debug(f"{log_prefix}Page {page_count} Link headers: {all_link_headers}")
-                        
-                        # Check each Link header for rel="next"
-                        for link_header in all_link_headers:
-                            if 'rel="next"' in link_header:
-                                logger.debug(f"{log_prefix}Found next link in page {page_count}: {link_header}")
-                                
-                                # Extract URL from: <URL>; rel="next"
-                                next_match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
-                                if next_match:
-                                    full_next_url = next_match.group(1)
-                                    logger.debug(f"{log_prefix}Extracted next URL: {full_next_url}")
-                                    
-                                    # Extract path and query
-                                    parsed_next = urlparse(full_next_url)
-                                    current_url = parsed_next.path
-                                    if parsed_next.query:
-                                        current_url += f"?{parsed_next.query}"
-                                    break
-                        
                         if not current_url:
                             logger.info(f"{log_prefix}No more pages - {entity_name} pagination complete")
                             logger.info(f"{log_prefix}Final pagination stats: {page_count} pages, {len(all_items)} total items")
@@ -0,0 +1,232 @@
+"""
+Incremental parser for the results block of generated scripts.
+
+Generated scripts print their results at the end of stdout:
+
+    ================================================================================
+    QUERY RESULTS
+    ================================================================================
+    {"display_type": "table", "data": [{...}, {...}], "headers": [...], "count": 2}
+    ================================================================================
+
+(or a bare JSON array of rows). ScriptResultsStream consumes stdout line by line and hands
+out the rows of "data" in batches as soon as they are complete, so they can be sent to the
+browser as RESULT-BATCH events while the script is still printing. Small results (less than
+one batch) are not streamed and come back whole from finish(). parse_script_output reads
+the block of a script that has already exited (Slack) with the same parser.
+
+JSON tokens never span lines, so each value is decoded with json's C decoder once a line
+that can close it has arrived; any indentation (or none) works.
+"""
+
+import json
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+RESULTS_MARKER = "QUERY RESULTS"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _may_close_value(line: str) -> bool:
+    """Whether a line can end a multi-line object or array (otherwise don't try to decode yet)."""
+    return line.rstrip().rstrip(",").rstrip().endswith(("}", "]"))
+
+
+class ScriptResultsStream:
+    """Feed stdout lines in, get row batches out (see module docstring)."""
+
+    def __init__(self, batch_rows: int):
+        self.batch_rows = max(1, batch_rows)
+        self.output_lines: List[str] = []  # stdout outside the results block
+        self.fields: Dict[str, Any] = {}  # Top-level keys of the results object except the rows
+        self.streaming = False
+        self.rows_streamed = 0
+        self.failed = False
+        self._decoder = json.JSONDecoder()
+        self._state = "before_marker"
+        self._buffer = ""
+        self._pos = 0
+        self._key: Optional[str] = None
+        self._rows_key: Optional[str] = None  # "data" of the results object, None for a bare array
+        self._pending: List[Any] = []
+        self._raw_lines: List[str] = []  # Results block text, kept until streaming starts
+
+    @property
+    def found_results(self) -> bool:
+        return self._state != "before_marker"
+
+    def feed_line(self, line: str) -> List[List[Any]]:
+        """Consume one stdout line; returns the row batches that are ready to be sent."""
+        if self._state == "before_marker":
+            if line.strip() == RESULTS_MARKER:
+                self._state = "seek_start"
+            else:
+                self.output_lines.append(line)
+            return []
+        if self._state in ("done", "failed"):
+            return []
+        stripped = line.strip()
+        if self._state == "seek_start" and (not stripped or stripped.startswith("====")):
+            return []
+
+        if not self.streaming:
+            self._raw_lines.append(line)
+        # Only the unconsumed text is kept: at most the value being printed
+        incomplete = self._buffer[self._pos:]
+        self._buffer = incomplete + line + "\n"
+        self._pos = 0
+        if incomplete.strip() and not _may_close_value(line):
+            return []  # Still inside a multi-line object/array
+        self._parse()
+        return self._take_batches(final=False)
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        End of stdout. Returns the results object (None when the script printed no results
+        block, {"raw_output": ..., "count": 0} when it couldn't be parsed); when rows were
+        streamed, "data" is left out and the remaining rows come from final_batches().
+        """
+        if self._state == "before_marker":
+            return None
+        if self._state not in ("done", "failed"):
+            self.failed = True
+
+        if self.failed:
+            if self.streaming:
+                # Rows already went out; report what was sent rather than nothing
+                return {**self.fields, "count": self.fields.get("count", self.rows_streamed)}
+            return {"raw_output": "\n".join(self.output_lines + self._raw_lines), "count": 0}
+
+        if self.streaming:
+            result = dict(self.fields)
+            result.setdefault("display_type", "table")
+            result.setdefault("count", self.rows_streamed + len(self._pending))
+            return result
+
+        if self._rows_key is None and "_rows" in self.fields:
+            # Bare array (old format)
+            rows = self.fields.pop("_rows")
+            return {"display_type": "table", "data": rows, "count": len(rows)}
+        return dict(self.fields)
+
+    def final_batches(self) -> List[List[Any]]:
+        """Rows still held back once streaming has started (call after finish())."""
+        return self._take_batches(final=True) if self.streaming else []
+
+    # -- parsing -------------------------------------------------------------
+
+    def _skip_whitespace(self) -> bool:
+        """Move past whitespace; False when the buffer is used up."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _decode(self) -> Tuple[bool, Any]:
+        """Decode the value at the current position; (False, None) and stay put when it isn't complete."""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _parse(self) -> None:
+        buffer = self._buffer
+        while self._skip_whitespace():
+            char = buffer[self._pos]
+            if self._state == "seek_start":
+                if char == "{":
+                    self._state = "key"
+                elif char == "[":
+                    self._state = "row"
+                    self.fields["_rows"] = self._pending  # Bare array: all rows
+                else:
+                    self._fail()
+                    return
+                self._pos += 1
+
+            elif self._state == "key":
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    return
+                elif char == '"':
+                    start = self._pos
+                    found, key = self._decode()
+                    if not found:
+                        return
+                    self._skip_whitespace()
+                    if self._pos >= len(buffer):
+                        self._pos = start
+                        return
+                    if buffer[self._pos] != ":":
+                        self._fail()
+                        return
+                    self._pos += 1
+                    self._key = key
+                    self._state = "value"
+                else:
+                    self._fail()
+                    return
+
+            elif self._state == "value":
+                if self._key == "data" and char == "[" and self._rows_key is None:
+                    self._rows_key = "data"
+                    self._pos += 1
+                    self._state = "row"
+                    continue
+                found, value = self._decode()
+                if not found:
+                    return
+                self.fields[self._key] = value
+                self._state = "key"
+
+            elif self._state == "row":
+                if char == ",":
+                    self._pos += 1
+                elif char == "]":
+                    self._pos += 1
+                    if self._rows_key is None:
+                        self._state = "done"
+                        return
+                    if not self.streaming:
+                        self.fields[self._rows_key] = self._pending
+                    self._state = "key"
+                else:
+                    found, row = self._decode()
+                    if not found:
+                        return
+                    self._pending.append(row)
+
+    def _fail(self) -> None:
+        self.failed = True
+        self._state = "failed"
+
+    def _take_batches(self, final: bool) -> List[List[Any]]:
+        if not self.streaming:
+            if len(self._pending) < self.batch_rows or self._state == "failed":
+                return []
+            # Too many rows for one COMPLETE event: switch to batches
+            self.streaming = True
+            self._raw_lines = []
+            self.fields.pop("_rows", None)
+            self.fields.pop(self._rows_key or "data", None)
+
+        batches = []
+        while len(self._pending) >= self.batch_rows or (final and self._pending):
+            batch = self._pending[:self.batch_rows]
+            del self._pending[:self.batch_rows]
+            self.rows_streamed += len(batch)
+            batches.append(batch)
+        return batches
+
+
+def parse_script_output(stdout: str) -> Optional[Dict[str, Any]]:
+    """Results of a script that has already exited, without streaming (see finish())."""
+    stream = ScriptResultsStream(sys.maxsize)
+    for line in stdout.split("\n"):
+        stream.feed_line(line)
+    return stream.finish()
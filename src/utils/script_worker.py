@@ -0,0 +1,250 @@
+"""
+Warm worker process for generated scripts
+
+Started by the script worker pool (src/utils/script_worker_pool.py):
+    python -u -m src.utils.script_worker --memory-limit-mb 4096
+
+The worker imports what generated scripts need (asyncio, aiohttp, sqlite3 and the Okta API
+client, registered as the top-level base_okta_api_client module the scripts import) once,
+then runs jobs read from stdin one at a time. A job is one JSON line:
+    {"token": "<random>", "script": "<path to the generated script>"}
+
+The script runs as __main__ with its own globals and a freshly executed
+base_okta_api_client (module-level state set by one job is gone in the next), so its output
+is what a `python -u script.py` subprocess would print. When it finishes, the worker writes
+    __TAKO_JOB_END__ <token> <exit code> <recycle 0|1>
+to both stdout and stderr so the pool knows where the job's output ends. The working
+directory, environment, sys.path, sys.argv and logging handlers are restored between jobs,
+and aiohttp sessions (and event loops) the script left open are closed.
+
+Settings are read at import time, so nothing from src is imported at module level here.
+"""
+
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import io
+import json
+import logging
+import gc
+import os
+import sys
+import traceback
+import weakref
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+READY_MARKER = "__TAKO_WORKER_READY__"
+JOB_END_MARKER = "__TAKO_JOB_END__"
+
+# Imported before the first job (missing ones are skipped)
+PRELOAD_MODULES = ("asyncio", "json", "sqlite3", "ssl", "aiohttp", "pathlib", "datetime", "collections", "re")
+
+API_CLIENT_MODULE = "base_okta_api_client"
+
+# aiohttp sessions created while a job runs (see _track_client_sessions)
+_client_sessions: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _apply_memory_limit(limit_mb: int) -> bool:
+    """Cap the worker's address space; a job going over it gets a MemoryError."""
+    if limit_mb <= 0 or not RESOURCE_AVAILABLE:
+        return False
+    limit = limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return True
+
+
+def _api_client_path(project_root: Path) -> Path:
+    return project_root / "src" / "core" / "okta" / "client" / f"{API_CLIENT_MODULE}.py"
+
+
+def _load_api_client(client_path: Path) -> bool:
+    """(Re)execute the API client module; a fresh copy drops whatever the last job changed in it."""
+    if not client_path.exists():
+        return False
+    try:
+        spec = importlib.util.spec_from_file_location(API_CLIENT_MODULE, client_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[API_CLIENT_MODULE] = module
+        spec.loader.exec_module(module)
+        return True
+    except Exception:
+        # Leave it to the script to import the copy in generated_scripts/
+        sys.modules.pop(API_CLIENT_MODULE, None)
+        traceback.print_exc()
+        return False
+
+
+def _track_client_sessions() -> None:
+    """Register every aiohttp.ClientSession, so the ones a script never closed can be closed."""
+    try:
+        import aiohttp
+    except ImportError:
+        return
+    original_init = aiohttp.ClientSession.__init__
+
+    def tracking_init(session, *args, **kwargs):
+        original_init(session, *args, **kwargs)
+        _client_sessions.add(session)
+
+    aiohttp.ClientSession.__init__ = tracking_init
+
+
+def _close_client_sessions() -> None:
+    """Close sessions (and the event loops they run on) left open by the job."""
+    for session in list(_client_sessions):
+        _client_sessions.discard(session)
+        if session.closed:
+            continue
+        loop: Optional[asyncio.AbstractEventLoop] = getattr(session, "_loop", None)
+        try:
+            if loop is None or loop.is_closed():
+                # Its connections can't be shut down any more: drop them (GC closes the sockets)
+                asyncio.run(session.close())
+            elif not loop.is_running():
+                loop.run_until_complete(session.close())
+                loop.close()
+        except Exception:
+            traceback.print_exc()
+
+
+def _preload(project_root: Path) -> List[str]:
+    """Import the modules generated scripts use, so jobs don't pay for it."""
+    loaded = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError:
+            pass
+    _track_client_sessions()
+
+    # Scripts do `from base_okta_api_client import OktaAPIClient` (see prepare_runtime_script_code)
+    if _load_api_client(_api_client_path(project_root)):
+        loaded.append(API_CLIENT_MODULE)
+    return loaded
+
+
+def _run_script(script_path: str) -> Tuple[int, bool]:
+    """Run one script as __main__ and return (exit code, recycle worker)."""
+    import runpy
+
+    saved_cwd = os.getcwd()
+    saved_environ = dict(os.environ)
+    saved_path = list(sys.path)
+    saved_argv = list(sys.argv)
+    saved_stdin = sys.stdin
+    saved_modules = set(sys.modules)
+    saved_root_handlers = list(logging.root.handlers)
+    saved_root_level = logging.root.level
+
+    script_dir = str(Path(script_path).resolve().parent)
+    exit_code = 0
+    recycle = False
+    sys.argv = [script_path]
+    sys.path.insert(0, script_dir)  # As `python script.py` does: sibling modules are importable
+    sys.stdin = io.StringIO()  # Same as a subprocess with nothing on stdin
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except MemoryError:
+        # The heap may be fragmented or half-freed: finish the job, then retire the worker
+        recycle = True
+        exit_code = 1
+        print("MemoryError: script exceeded the worker memory limit", file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        sys.argv = saved_argv
+        sys.stdin = saved_stdin
+        sys.path[:] = saved_path
+        if os.environ != saved_environ:
+            os.environ.clear()
+            os.environ.update(saved_environ)
+        try:
+            os.chdir(saved_cwd)
+        except OSError:
+            recycle = True
+        logging.root.handlers[:] = saved_root_handlers
+        logging.root.setLevel(saved_root_level)
+        _close_client_sessions()
+        # A loop left open by run_until_complete() must not leak into the next job
+        asyncio.set_event_loop(None)
+        # Modules imported from the script's own folder are per-job, not shared
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules.get(name), "__file__", None) or ""
+            if module_file.startswith(script_dir):
+                sys.modules.pop(name, None)
+    return exit_code, recycle
+
+
+def _finish_job(token: str, exit_code: int, recycle: bool) -> None:
+    marker = f"{JOB_END_MARKER} {token} {exit_code} {int(recycle)}\n"
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+            stream.write(marker)
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Warm worker for generated scripts")
+    parser.add_argument("--memory-limit-mb", type=int, default=0)
+    args = parser.parse_args()
+
+    project_root = Path.cwd()
+    memory_limited = _apply_memory_limit(args.memory_limit_mb)
+    preloaded = _preload(project_root)
+
+    ready = json.dumps({"pid": os.getpid(), "preloaded": preloaded, "memory_limited": memory_limited})
+    print(f"{READY_MARKER} {ready}", flush=True)
+    print(READY_MARKER, file=sys.stderr, flush=True)
+
+    # Keep the job pipe away from the scripts (they get an empty stdin)
+    jobs = sys.stdin
+    while True:
+        line = jobs.readline()
+        if not line:
+            return 0  # Pool closed the pipe
+        try:
+            job = json.loads(line)
+            token = str(job["token"])
+            script_path = str(job["script"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        exit_code, recycle = _run_script(script_path)
+        _finish_job(token, exit_code, recycle)
+        if recycle:
+            return 0
+        # Reset between jobs, after the pool already has this job's result
+        if API_CLIENT_MODULE in preloaded:
+            _load_api_client(_api_client_path(project_root))
+        gc.collect()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,421 @@
+"""
+Pool of warm Python workers for generated scripts.
+
+Every query used to start a fresh `python -u script.py` subprocess, paying for interpreter
+start-up plus the aiohttp/sqlite3/Okta client imports (several hundred ms) before the script
+did any work. The pool keeps SCRIPT_WORKER_POOL_SIZE worker processes (src/utils/script_worker.py)
+that have already imported all of that; a job sends the script path down the worker's stdin
+and its output streams back as usual.
+
+Each worker runs one job at a time under an address-space limit (SCRIPT_WORKER_MEMORY_LIMIT_MB,
+POSIX only). A job running past its timeout is killed together with its worker; workers are
+also retired after SCRIPT_WORKER_MAX_JOBS jobs, a MemoryError or a crash, and replaced in the
+background. When every warm worker is busy the job gets a cold worker of its own.
+
+submit() returns a ScriptJob, which behaves like an asyncio subprocess (stdout/stderr readers,
+wait(), communicate(), kill(), returncode), so callers can run scripts either way:
+    proc = await get_script_worker_pool().submit(script_path, timeout=120)
+    stdout, stderr = await proc.communicate()
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.utils.logging import logger
+from src.utils.script_worker import JOB_END_MARKER, READY_MARKER
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.resolve()
+
+# Same per-line limit as the direct subprocess execution
+STREAM_LIMIT = 1024 * 1024
+
+# Output lines buffered per job stream ahead of its reader
+STREAM_QUEUE_LINES = 256
+
+# How long a new worker may take to import everything
+WORKER_START_TIMEOUT_SECONDS = 60.0
+
+_pool: Optional["ScriptWorkerPool"] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def python_executable() -> str:
+    """Python used for generated scripts (the project venv on Windows, else python on PATH)."""
+    venv_python = Path("venv/Scripts/python.exe")
+    return str(venv_python) if venv_python.exists() else "python"
+
+
+class _Worker:
+    """One warm worker process."""
+
+    def __init__(self, proc: asyncio.subprocess.Process, preloaded: List[str]):
+        self.proc = proc
+        self.preloaded = preloaded
+        self.jobs_run = 0
+        self.retired = False
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None and not self.retired
+
+    def kill(self) -> None:
+        self.retired = True
+        if self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Close the job pipe (the worker exits after its current job), kill it if it lingers."""
+        self.retired = True
+        if self.proc.returncode is not None:
+            return
+        try:
+            self.proc.stdin.close()
+        except (OSError, RuntimeError):
+            pass
+        try:
+            await asyncio.wait_for(self.proc.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            await self.proc.wait()
+
+
+class _JobStream:
+    """stdout or stderr of one job: readline() returns b'' once the job's output ended."""
+
+    def __init__(self):
+        # Bounded, so a reader that falls behind stops the pump and the script waits on its pipe
+        self._lines: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_LINES)
+        self._ended = False
+        self._discard = False
+
+    async def _put(self, line: bytes) -> None:
+        if not self._discard:
+            await self._lines.put(line)
+
+    async def _end(self) -> None:
+        self._discard = False
+        await self._lines.put(b"")
+
+    def _abandon(self) -> None:
+        """Nobody reads anymore (job killed): drop buffered and further output."""
+        self._discard = True
+        while not self._lines.empty():
+            self._lines.get_nowait()
+
+    async def readline(self) -> bytes:
+        if self._ended:
+            return b""
+        line = await self._lines.get()
+        if not line:
+            self._ended = True
+        return line
+
+    async def read(self) -> bytes:
+        chunks = []
+        while True:
+            line = await self.readline()
+            if not line:
+                return b"".join(chunks)
+            chunks.append(line)
+
+
+class ScriptJob:
+    """A script running on a pooled worker, with the asyncio subprocess interface."""
+
+    def __init__(self, pool: "ScriptWorkerPool", worker: _Worker, script_path: str, timeout: Optional[float]):
+        self.pool = pool
+        self.worker = worker
+        self.script_path = script_path
+        self.pid = worker.proc.pid
+        self.stdout = _JobStream()
+        self.stderr = _JobStream()
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+        self._token = secrets.token_hex(16)
+        self._exit: Optional[Tuple[int, bool]] = None
+        self._done = asyncio.Event()
+        self._timeout_handle = None
+        self._task: Optional[asyncio.Task] = None
+        self._started = time.perf_counter()
+        self._timeout = timeout
+
+    async def _start(self) -> None:
+        job = json.dumps({"token": self._token, "script": self.script_path}) + "\n"
+        self.worker.proc.stdin.write(job.encode("utf-8"))
+        await self.worker.proc.stdin.drain()
+        if self._timeout and self._timeout > 0:
+            self._timeout_handle = asyncio.get_running_loop().call_later(self._timeout, self._on_timeout)
+        self._task = asyncio.create_task(self._run())
+
+    async def _pump(self, source: asyncio.StreamReader, target: _JobStream, parse_exit: bool) -> None:
+        marker = f"{JOB_END_MARKER} {self._token} ".encode("ascii")
+        try:
+            while True:
+                line = await source.readline()
+                if not line:
+                    return  # Worker exited or was killed
+                index = line.find(marker)
+                if index < 0:
+                    await target._put(line)
+                    continue
+                if index > 0:
+                    await target._put(line[:index])  # Output without a trailing newline
+                if parse_exit:
+                    fields = line[index + len(marker):].split()
+                    try:
+                        self._exit = (int(fields[0]), fields[1] == b"1")
+                    except (IndexError, ValueError):
+                        self._exit = (1, True)
+                return
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            # The rest of the worker's output can't be told apart from the next job's
+            await target._put(f"Script output line too long: {e}\n".encode("utf-8"))
+            self.worker.kill()
+        finally:
+            if self.timed_out and not parse_exit:
+                await target._put(f"Script execution timed out after {self._timeout} seconds\n".encode("utf-8"))
+            await target._end()
+
+    async def _run(self) -> None:
+        proc = self.worker.proc
+        await asyncio.gather(
+            self._pump(proc.stdout, self.stdout, parse_exit=True),
+            self._pump(proc.stderr, self.stderr, parse_exit=False),
+        )
+        if self._timeout_handle:
+            self._timeout_handle.cancel()
+        if self._exit is not None and not self.timed_out:
+            self.returncode, recycle = self._exit
+        else:
+            # Killed (timeout, cancel, output error) or crashed mid-job
+            self.worker.kill()
+            await proc.wait()
+            self.returncode = proc.returncode if proc.returncode not in (None, 0) else 1
+            recycle = True
+        self._done.set()
+        self.pool._job_finished(self, recycle)
+
+    def _on_timeout(self) -> None:
+        if self._done.is_set():
+            return
+        self.timed_out = True
+        logger.warning(f"Script {Path(self.script_path).name} timed out after {self._timeout}s, killing worker {self.pid}")
+        self.worker.kill()
+
+    def kill(self) -> None:
+        """Stop the job (its worker is killed and replaced)."""
+        if not self._done.is_set():
+            self.worker.kill()
+            self.stdout._abandon()
+            self.stderr._abandon()
+
+    def terminate(self) -> None:
+        self.kill()
+
+    async def wait(self) -> int:
+        await self._done.wait()
+        return self.returncode
+
+    async def communicate(self) -> Tuple[bytes, bytes]:
+        stdout, stderr = await asyncio.gather(self.stdout.read(), self.stderr.read())
+        await self.wait()
+        return stdout, stderr
+
+    @property
+    def duration_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+
+class ScriptWorkerPool:
+    """Keeps warm script workers and hands out jobs (one event loop per pool)."""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+    ):
+        self.size = max(0, size if size is not None else settings.SCRIPT_WORKER_POOL_SIZE)
+        self.max_jobs = max(1, max_jobs or settings.SCRIPT_WORKER_MAX_JOBS)
+        self.job_timeout = job_timeout if job_timeout is not None else settings.SCRIPT_WORKER_JOB_TIMEOUT_SECONDS
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else settings.SCRIPT_WORKER_MEMORY_LIMIT_MB
+        self._idle: List[_Worker] = []
+        self._busy: Dict[int, _Worker] = {}
+        self._spawning = 0
+        self._closed = False
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {
+            'jobs': 0,
+            'warm_jobs': 0,
+            'cold_starts': 0,
+            'recycled': 0,
+            'timeouts': 0,
+            'failed_starts': 0,
+            'job_seconds_total': 0.0,
+        }
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            python_executable(),
+            "-u",
+            "-m",
+            "src.utils.script_worker",
+            "--memory-limit-mb",
+            str(self.memory_limit_mb),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(PROJECT_ROOT),
+            limit=STREAM_LIMIT,
+            # Ctrl+C on the server must not hit a running script; close() stops the workers
+            start_new_session=os.name != "nt",
+        )
+        try:
+            ready = await asyncio.wait_for(self._wait_ready(proc), timeout=WORKER_START_TIMEOUT_SECONDS)
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            raise
+        worker = _Worker(proc, ready.get("preloaded", []))
+        logger.debug(f"Script worker {proc.pid} ready (preloaded: {', '.join(worker.preloaded)})")
+        return worker
+
+    @staticmethod
+    async def _wait_ready(proc: asyncio.subprocess.Process) -> Dict[str, Any]:
+        ready: Dict[str, Any] = {}
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"Script worker exited during start-up (code {await proc.wait()})")
+            text = line.decode("utf-8", errors="replace").strip()
+            if text.startswith(READY_MARKER):
+                ready = json.loads(text[len(READY_MARKER):].strip() or "{}")
+                break
+        # Drop whatever the imports printed to stderr so it doesn't show up in the first job
+        while True:
+            line = await proc.stderr.readline()
+            if not line or line.strip() == READY_MARKER.encode("ascii"):
+                return ready
+
+    async def _replenish(self) -> None:
+        """Start workers until the pool is back to its warm size."""
+        while not self._closed and len(self._idle) + self._spawning < self.size:
+            self._spawning += 1
+            try:
+                worker = await self._spawn()
+            except Exception as e:
+                self._stats['failed_starts'] += 1
+                logger.warning(f"Could not start script worker: {str(e)}")
+                return
+            finally:
+                self._spawning -= 1
+            if self._closed:
+                await worker.stop()
+                return
+            self._idle.append(worker)
+
+    async def start(self) -> None:
+        """Start the warm workers (call at application start-up)."""
+        await asyncio.gather(*(self._replenish() for _ in range(self.size)))
+
+    async def submit(self, script_path: str, timeout: Optional[float] = None) -> ScriptJob:
+        """Run a script on a warm worker (or a cold one if all are busy) and return its job."""
+        if self._closed:
+            raise RuntimeError("Script worker pool is closed")
+        worker = None
+        while self._idle:
+            candidate = self._idle.pop()
+            if candidate.alive:
+                worker = candidate
+                break
+        if worker is not None:
+            self._stats['warm_jobs'] += 1
+        else:
+            self._stats['cold_starts'] += 1
+            worker = await self._spawn()
+
+        job = ScriptJob(self, worker, str(script_path), timeout if timeout is not None else self.job_timeout)
+        self._busy[id(job)] = worker
+        self._stats['jobs'] += 1
+        try:
+            await job._start()
+        except BaseException:
+            self._busy.pop(id(job), None)
+            worker.kill()
+            raise
+        return job
+
+    def _job_finished(self, job: ScriptJob, recycle: bool) -> None:
+        worker = self._busy.pop(id(job), None) or job.worker
+        worker.jobs_run += 1
+        self._stats['job_seconds_total'] += job.duration_seconds
+        if job.timed_out:
+            self._stats['timeouts'] += 1
+
+        if self._closed:
+            self._in_background(worker.stop())
+            return
+        if recycle or not worker.alive or worker.jobs_run >= self.max_jobs or len(self._idle) >= self.size:
+            if recycle or worker.jobs_run >= self.max_jobs:
+                self._stats['recycled'] += 1
+            self._in_background(worker.stop())
+            self._in_background(self._replenish())
+        else:
+            self._idle.append(worker)
+
+    def _in_background(self, coro) -> None:
+        """Run a stop/replenish task that close() waits for (no worker outlives the pool)."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters for monitoring."""
+        stats = dict(self._stats)
+        stats.update({
+            'size': self.size,
+            'idle': len(self._idle),
+            'busy': len(self._busy),
+            'job_seconds_total': round(stats['job_seconds_total'], 6),
+        })
+        return stats
+
+    async def close(self) -> None:
+        """Stop idle workers and kill running jobs (application shutdown)."""
+        self._closed = True
+        workers = self._idle + list(self._busy.values())
+        self._idle = []
+        for worker in self._busy.values():
+            worker.kill()
+        await asyncio.gather(*(worker.stop() for worker in workers), return_exceptions=True)
+        # Workers being replaced or started right now stop themselves once _closed is seen
+        await asyncio.gather(*list(self._background), return_exceptions=True)
+
+
+def get_script_worker_pool() -> ScriptWorkerPool:
+    """Shared script worker pool of the running event loop (created on first use)."""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool._closed or _pool_loop is not loop:
+        _pool = ScriptWorkerPool()
+        _pool_loop = loop
+    return _pool
+
+
+async def close_script_worker_pool() -> None:
+    """Stop the shared pool's workers (application shutdown)."""
+    global _pool, _pool_loop
+    pool, _pool, _pool_loop = _pool, None, None
+    if pool is not None:
+        await pool.close()
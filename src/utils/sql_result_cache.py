@@ -0,0 +1,469 @@
+"""
+Result cache for read-only SQL, tied to the sync generation.
+
+The synced tables only change when a sync writes them, yet the same queries run again and
+again: supervisor routing probes, the SQL agent's test queries and SQL-only generated scripts
+re-run from history or asked for by another user. Results are cached per database file under
+its sync generation (newest sync_history id and number of finished syncs, all tenants):
+
+- a sync finishing (or failing/cancelling after writing in place) moves the generation on, and
+  the first lookup that sees the new generation drops the database's older entries;
+- a full sync loading shadow tables leaves the live tables alone until its swap-in, so caching
+  continues; while any other sync is writing (or swapping into) the live tables nothing is
+  cached.
+
+Queries are keyed by their normalized text (comments, whitespace and keyword case don't
+matter) and parameters. Queries calling time or random functions are never cached. Entries
+are evicted least recently used first once SQL_RESULT_CACHE_MB is in use; results larger
+than SQL_RESULT_CACHE_MAX_ENTRY_MB are not kept.
+
+Generated scripts are cached by their exact code when they only read the database (no API
+client, no clock or randomness); a hit replays the script's recorded output through the same
+process interface as a real run (see ReplayedScriptRun).
+
+Special tools (src/core/tools/special_tools) are not cached: they read live Okta API data
+(System Log, users, apps, policies, factors), not the synced tables, so the sync generation
+says nothing about whether their results are still current.
+"""
+
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar, Union
+
+from src.config.settings import settings
+from src.utils.logging import logger
+from src.utils.sqlite_reader_pool import get_reader_pool
+
+T = TypeVar("T")
+
+# Sync statuses after which the live tables no longer change (SQLAlchemy stores enum names)
+FINISHED_SYNC_STATUSES = {"COMPLETED", "FAILED", "CANCELED"}
+
+# String literals, quoted identifiers and comments are kept apart when normalizing
+_SQL_TOKENS = re.compile(
+    r"""('(?:[^']|'')*')"""      # 'string literal'
+    r"""|("(?:[^"]|"")*")"""     # "quoted identifier"
+    r"""|(`[^`]*`|\[[^\]]*\])"""  # `identifier` / [identifier]
+    r"""|(--[^\n]*|/\*.*?\*/)""",  # comments
+    re.DOTALL,
+)
+
+# Results depend on when (or how often) these run
+_NONDETERMINISTIC_SQL = re.compile(
+    r"'now'|\bcurrent_(?:date|time|timestamp)\b|\brandom(?:blob)?\s*\(|\bchanges\s*\(|\blast_insert_rowid\s*\(",
+    re.IGNORECASE,
+)
+
+_NONDETERMINISTIC_SCRIPT = re.compile(
+    r"\bdatetime\.(?:now|utcnow|today)\b|\bdate\.today\b|\btime\.time\b|\bimport random\b|\bfrom random\b"
+    r"|\buuid\b|\bOktaAPIClient\b|\bbase_okta_api_client\b|\baiohttp\b|\bos\.environ\b|\bgetenv\b"
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """Query text as cache key: comments dropped, whitespace collapsed, keywords lowercased."""
+    parts: List[str] = []
+    position = 0
+    for match in _SQL_TOKENS.finditer(sql):
+        parts.append(" ".join(sql[position:match.start()].split()).lower())
+        if not match.group(4):  # Keep literals and quoted identifiers verbatim, drop comments
+            parts.append(match.group(0))
+        position = match.end()
+    parts.append(" ".join(sql[position:].split()).lower())
+    normalized = " ".join(part for part in parts if part)
+    return normalized.rstrip("; ").strip()
+
+
+def is_cacheable_sql(sql: str) -> bool:
+    """Whether a read-only query's result depends only on the database contents."""
+    return not _NONDETERMINISTIC_SQL.search(sql)
+
+
+def read_sync_generation(conn: sqlite3.Connection) -> Optional[str]:
+    """
+    Sync generation of the database on this connection, or None while a sync is writing
+    the live tables (results must not be cached then).
+
+    Every tenant's syncs count: the generation is the newest sync_history id plus the number
+    of finished syncs, and any unfinished sync other than a shadow sync still loading its
+    staging database bypasses the cache.
+    """
+    finished = ", ".join(f"'{status}'" for status in sorted(FINISHED_SYNC_STATUSES))
+    try:
+        latest_id, finished_count = conn.execute(
+            f"SELECT MAX(id), SUM(UPPER(status) IN ({finished})) FROM sync_history"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # No sync history: data only changes with a restart
+        return "none"
+    if latest_id is None:
+        return "none"
+
+    try:
+        active = conn.execute(f"""
+            SELECT json_extract(checkpoint, '$.shadow'),
+                   json_extract(checkpoint, '$.nodes.swap_in'),
+                   json_extract(checkpoint, '$.swap_started')
+            FROM sync_history
+            WHERE UPPER(status) NOT IN ({finished})
+        """).fetchall()
+    except sqlite3.OperationalError:
+        # No checkpoint column yet: can't tell shadow syncs apart
+        active = conn.execute(
+            f"SELECT NULL, NULL, NULL FROM sync_history WHERE UPPER(status) NOT IN ({finished})"
+        ).fetchall()
+
+    generation = f"{latest_id}:{finished_count or 0}"
+    for shadow, swap_in, swap_started in active:
+        if not shadow or swap_in == "completed" or swap_started:
+            return None  # Writing (or has written) the live tables
+    # Shadow syncs loading a staging database leave the live tables untouched; the swap
+    # marks swap_started in the same transaction that replaces the live rows
+    return f"{generation}:loading" if active else generation
+
+
+def _estimate_rows_bytes(rows: List[Any]) -> int:
+    size = 0
+    for row in rows:
+        size += 64
+        for value in (row.values() if isinstance(row, dict) else row):
+            size += len(value) + 8 if isinstance(value, (str, bytes)) else 16
+    return size
+
+
+class SQLResultCache:
+    """Byte-bounded LRU of query results, dropped per database when its sync generation moves on."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.max_entry_bytes = max(0, min(max_entry_bytes, self.max_bytes))
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], Tuple[Any, int]]" = OrderedDict()
+        self._generations: Dict[str, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'too_large': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def observe_generation(self, db_key: str, generation: Optional[str]) -> None:
+        """Record the database's current generation, dropping entries of older ones."""
+        if generation is None:
+            with self._lock:
+                self._stats['bypassed'] += 1
+            return
+        with self._lock:
+            previous = self._generations.get(db_key)
+            if previous == generation:
+                return
+            self._generations[db_key] = generation
+            if previous is None:
+                return
+            stale = [key for key in self._entries if key[0] == db_key and key[1] != generation]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self._stats['invalidations'] += 1
+        if stale:
+            logger.info(f"Sync generation of {db_key} changed to {generation}, dropped {len(stale)} cached results")
+
+    def get(self, db_key: str, generation: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((db_key, generation, key))
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end((db_key, generation, key))
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, db_key: str, generation: str, key: Hashable, value: Any, size: int) -> bool:
+        """Store a result; ignored when it's too large or its generation is no longer current."""
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._stats['too_large'] += 1
+                return False
+            if self._generations.get(db_key, generation) != generation:
+                return False  # A sync finished while this was computed
+            entry_key = (db_key, generation, key)
+            if entry_key in self._entries:
+                self._bytes -= self._entries.pop(entry_key)[1]
+            self._entries[entry_key] = (value, size)
+            self._bytes += size
+            self._stats['stores'] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            })
+        return stats
+
+
+_cache: Optional[SQLResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sql_result_cache() -> SQLResultCache:
+    """Process-wide result cache (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLResultCache(
+                int(settings.SQL_RESULT_CACHE_MB * 1024 * 1024),
+                int(settings.SQL_RESULT_CACHE_MAX_ENTRY_MB * 1024 * 1024),
+            )
+        return _cache
+
+
+def _db_key(db_path: Union[str, Path]) -> str:
+    return str(Path(db_path).resolve())
+
+
+def _current_generation(conn: sqlite3.Connection, db_key: str) -> Optional[str]:
+    """Sync generation qualified by the file's inode (a restored backup repeats sync ids)."""
+    generation = read_sync_generation(conn)
+    if generation is None:
+        return None
+    try:
+        inode = os.stat(db_key).st_ino
+    except OSError:
+        return None
+    return f"{inode}:{generation}"
+
+
+async def sync_generation(db_path: Union[str, Path]) -> Optional[str]:
+    """Current sync generation of a database (None while a sync writes its live tables)."""
+    cache = get_sql_result_cache()
+    db_key = _db_key(db_path)
+    generation = await get_reader_pool(db_path).run(lambda conn: _current_generation(conn, db_key))
+    cache.observe_generation(db_key, generation)
+    return generation
+
+
+async def cached_read(db_path: Union[str, Path], name: str, fn: Callable[[sqlite3.Connection], T], size: int = 1024) -> T:
+    """
+    Run fn(connection) on the reader pool, reusing its result until the next sync.
+
+    fn must be a pure read whose result only depends on the database contents; name
+    identifies it in the cache.
+    """
+    cache = get_sql_result_cache()
+    if not cache.enabled:
+        return await get_reader_pool(db_path).run(fn)
+    db_key = _db_key(db_path)
+
+    def read(conn: sqlite3.Connection) -> T:
+        # One snapshot for the generation and the data
+        conn.execute("BEGIN")
+        generation = _current_generation(conn, db_key)
+        cache.observe_generation(db_key, generation)
+        key = ("read", name)
+        if generation is not None:
+            cached = cache.get(db_key, generation, key)
+            if cached is not None:
+                return cached
+        value = fn(conn)
+        if generation is not None:
+            cache.put(db_key, generation, key, value, size)
+        return value
+
+    return await get_reader_pool(db_path).run(read)
+
+
+async def cached_fetchall(
+    db_path: Union[str, Path],
+    sql: str,
+    params: Union[tuple, Dict[str, Any]] = (),
+) -> Tuple[List[str], List[tuple], bool]:
+    """
+    Run one read-only query on the reader pool through the cache.
+
+    Returns (column names, rows, served from cache). Rows are shared with the cache, so
+    callers must not modify them.
+    """
+    cache = get_sql_result_cache()
+    if not cache.enabled or not is_cacheable_sql(sql):
+        columns, rows = await get_reader_pool(db_path).fetchall(sql, params)
+        return columns, rows, False
+    db_key = _db_key(db_path)
+    params_key = tuple(sorted(params.items())) if isinstance(params, dict) else tuple(params)
+    key = ("sql", normalize_sql(sql), params_key)
+
+    def query(conn: sqlite3.Connection) -> Tuple[List[str], List[tuple], bool]:
+        conn.execute("BEGIN")
+        generation = _current_generation(conn, db_key)
+        cache.observe_generation(db_key, generation)
+        if generation is not None:
+            cached = cache.get(db_key, generation, key)
+            if cached is not None:
+                return cached[0], cached[1], True
+        cursor = conn.execute(sql, params)
+        try:
+            rows = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        finally:
+            cursor.close()
+        if generation is not None:
+            size = len(key[1]) + _estimate_rows_bytes(rows)
+            cache.put(db_key, generation, key, (columns, rows), size)
+        return columns, rows, False
+
+    return await get_reader_pool(db_path).run(query)
+
+
+def render_sql_result_cache_prometheus() -> str:
+    """Result cache counters in the Prometheus text exposition format."""
+    stats = get_sql_result_cache().stats()
+    metrics = (
+        ("okta_sql_result_cache_hits_total", "counter", "Reads served from the result cache", 'hits'),
+        ("okta_sql_result_cache_misses_total", "counter", "Cacheable reads that ran against the database", 'misses'),
+        ("okta_sql_result_cache_bypassed_total", "counter", "Reads not cached because a sync was writing live tables", 'bypassed'),
+        ("okta_sql_result_cache_invalidations_total", "counter", "Sync generation changes that dropped cached results", 'invalidations'),
+        ("okta_sql_result_cache_evictions_total", "counter", "Results evicted to stay within SQL_RESULT_CACHE_MB", 'evictions'),
+        ("okta_sql_result_cache_entries", "gauge", "Cached results", 'entries'),
+        ("okta_sql_result_cache_bytes", "gauge", "Approximate size of the cached results", 'bytes'),
+    )
+    lines: List[str] = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {stats[key]}")
+    return "\n".join(lines) + "\n"
+
+
+# -- Generated scripts ---------------------------------------------------------
+
+def is_cacheable_script(code: str) -> bool:
+    """SQL-only scripts without clock, randomness or environment access."""
+    return "sqlite3" in code and not _NONDETERMINISTIC_SCRIPT.search(code) and is_cacheable_sql(code)
+
+
+def script_cache_key(code: str) -> Tuple[str, str]:
+    return ("script", hashlib.sha256(code.encode("utf-8")).hexdigest())
+
+
+class _ReplayStream:
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    async def readline(self) -> bytes:
+        return self._data.readline()
+
+    async def read(self) -> bytes:
+        return self._data.read()
+
+
+class ReplayedScriptRun:
+    """Cached output of a script, with the asyncio subprocess interface of a real run."""
+
+    pid = None
+
+    def __init__(self, stdout: bytes, stderr: bytes):
+        self.stdout = _ReplayStream(stdout)
+        self.stderr = _ReplayStream(stderr)
+        self.returncode = 0
+
+    async def wait(self) -> int:
+        return self.returncode
+
+    async def communicate(self) -> Tuple[bytes, bytes]:
+        return await self.stdout.read(), await self.stderr.read()
+
+    def kill(self) -> None:
+        pass
+
+
+class ScriptOutputRecorder:
+    """Collects a script run's output and caches it if the run succeeds."""
+
+    def __init__(self, db_path: Union[str, Path], generation: str, code: str):
+        self.db_key = _db_key(db_path)
+        self.generation = generation
+        self.key = script_cache_key(code)
+        self.cache = get_sql_result_cache()
+        self._stdout: List[bytes] = []
+        self._stderr: List[bytes] = []
+        self._size = 0
+        self._overflow = False
+
+    def _add(self, target: List[bytes], data: bytes) -> None:
+        if self._overflow:
+            return
+        self._size += len(data)
+        if self._size > self.cache.max_entry_bytes:
+            # Too big to cache: stop holding on to it
+            self._overflow = True
+            self._stdout, self._stderr = [], []
+            return
+        target.append(data)
+
+    def stdout(self, data: bytes) -> None:
+        self._add(self._stdout, data)
+
+    def stderr(self, data: bytes) -> None:
+        self._add(self._stderr, data)
+
+    def store(self) -> bool:
+        if self._overflow:
+            self.cache.put(self.db_key, self.generation, self.key, None, self._size)  # Counted as too large
+            return False
+        value = (b"".join(self._stdout), b"".join(self._stderr))
+        return self.cache.put(self.db_key, self.generation, self.key, value, self._size + 256)
+
+
+async def open_cached_script_run(
+    db_path: Optional[Union[str, Path]], code: str
+) -> Tuple[Optional[ReplayedScriptRun], Optional[ScriptOutputRecorder]]:
+    """
+    Cached run of a generated script: (replay, None) on a hit, (None, recorder) when the
+    run should be recorded, (None, None) when the script can't be cached.
+    """
+    cache = get_sql_result_cache()
+    if not cache.enabled or not db_path or not is_cacheable_script(code):
+        return None, None
+    try:
+        generation = await sync_generation(db_path)
+    except Exception as e:
+        logger.debug(f"Could not read sync generation of {db_path}: {str(e)}")
+        return None, None
+    if generation is None:
+        return None, None
+    cached = cache.get(_db_key(db_path), generation, script_cache_key(code))
+    if cached is not None:
+        return ReplayedScriptRun(*cached), None
+    return None, ScriptOutputRecorder(db_path, generation, code)
+
+
+def clear_sql_result_cache() -> None:
+    """Drop every cached result (e.g. after the database was restored from a backup)."""
+    get_sql_result_cache().clear()
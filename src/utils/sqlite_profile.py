@@ -0,0 +1,86 @@
+"""
+SQLite connection profiles for the local Okta sync database.
+
+SQLite pragmas such as cache_size, mmap_size and busy_timeout are per connection, so they
+are applied every time a connection is opened rather than once at database creation:
+
+- writer: sync engine / API connections (SQLAlchemy connect listener)
+- staging: shadow-table database; synchronous=OFF unless SYNC_RESUME keeps it for resuming
+- reader: read-only discovery queries (query_only, no fsync concerns)
+
+Sizes come from the SQLITE_* settings.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from src.config.settings import settings
+
+PROFILES = ("writer", "staging", "reader")
+
+_TEMP_STORE_VALUES = {"default": 0, "file": 1, "memory": 2}
+
+# Pragmas reported by the sync status endpoint
+STATUS_PRAGMAS = (
+    "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store",
+    "busy_timeout", "journal_size_limit", "wal_autocheckpoint", "page_size",
+    "page_count", "freelist_count",
+)
+
+
+def sqlite_pragmas(profile: str = "writer") -> List[Tuple[str, Any]]:
+    """Return the (pragma, value) pairs applied to a new connection for the given profile."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}' (expected one of {', '.join(PROFILES)})")
+
+    pragmas: List[Tuple[str, Any]] = [
+        ("busy_timeout", max(0, settings.SQLITE_BUSY_TIMEOUT_MS)),
+        # Negative cache_size is in KiB rather than pages
+        ("cache_size", -max(1, settings.SQLITE_CACHE_SIZE_MB) * 1024),
+        ("mmap_size", max(0, settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024),
+        ("temp_store", _TEMP_STORE_VALUES.get(settings.SQLITE_TEMP_STORE, 2)),
+    ]
+    if profile == "reader":
+        pragmas.append(("query_only", "ON"))
+        return pragmas
+
+    pragmas.extend([
+        ("foreign_keys", "ON"),
+        # A staging file only has to survive a crash when an interrupted sync can resume into it
+        ("synchronous", "OFF" if profile == "staging" and not settings.SYNC_RESUME else "NORMAL"),
+        # Caps the WAL file size left behind after a checkpoint
+        ("journal_size_limit", max(0, settings.SQLITE_JOURNAL_SIZE_LIMIT_MB) * 1024 * 1024),
+        ("wal_autocheckpoint", max(0, settings.SQLITE_WAL_AUTOCHECKPOINT_PAGES)),
+    ])
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, profile: str = "writer") -> None:
+    """Apply a connection profile to a DB-API connection (sqlite3 or the aiosqlite adapter)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas(profile):
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def connect_reader(db_path: Union[str, Path], timeout: float = 5) -> sqlite3.Connection:
+    """Open a read-only tuned connection for discovery queries."""
+    conn = sqlite3.connect(str(db_path), timeout=timeout)
+    try:
+        apply_sqlite_pragmas(conn, "reader")
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def wal_file_sizes(db_path: Union[str, Path]) -> Dict[str, int]:
+    """Size in bytes of the database file and its -wal / -shm companions (0 when absent)."""
+    sizes = {}
+    for key, suffix in (("db_bytes", ""), ("wal_bytes", "-wal"), ("shm_bytes", "-shm")):
+        path = Path(str(db_path) + suffix)
+        sizes[key] = path.stat().st_size if path.exists() else 0
+    return sizes
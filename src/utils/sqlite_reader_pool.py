@@ -0,0 +1,272 @@
+"""
+Shared pool of read-only SQLite connections for async code.
+
+Discovery queries, routing checks and status lookups used to open a fresh sqlite3 connection
+on the event loop for every call, blocking every other request (SSE streams included) while
+the file was opened, the pragmas applied and the query ran. The pool instead keeps a few
+pre-opened connections (URI mode=ro plus the reader profile, i.e. query_only) and runs each
+call on its own small thread pool, so the event loop only awaits.
+
+Each connection keeps sqlite3's compiled-statement cache (SQLITE_READER_STATEMENT_CACHE), so
+the recurring status and routing queries are prepared once per connection. When the database
+file is replaced (new inode), the connections are reopened on the next call.
+
+Usage:
+    pool = get_reader_pool(db_path)
+    rows = await pool.run(lambda conn: conn.execute("SELECT ...").fetchall())
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from src.config.settings import settings
+from src.utils.logging import logger
+from src.utils.sqlite_profile import apply_sqlite_pragmas
+
+T = TypeVar("T")
+
+_pools: Dict[str, "SQLiteReaderPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class SQLiteReaderPool:
+    """Fixed-size pool of read-only connections to one database file."""
+
+    def __init__(self, db_path: Union[str, Path], size: Optional[int] = None, statement_cache: Optional[int] = None):
+        self.db_path = Path(db_path).resolve()
+        self.size = max(1, size or settings.SQLITE_READER_POOL_SIZE)
+        self.statement_cache = max(0, statement_cache if statement_cache is not None else settings.SQLITE_READER_STATEMENT_CACHE)
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="sqlite-reader")
+        self._idle: List[sqlite3.Connection] = []
+        self._open_count = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        # Created per event loop (the API and a CLI script may each run their own)
+        self._available: Optional[asyncio.Semaphore] = None
+        self._available_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'queries': 0,
+            'errors': 0,
+            'waiting': 0,
+            'in_use': 0,
+            'max_waiting': 0,
+            'connections_opened': 0,
+            'reopens': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'query_seconds_total': 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"{self.db_path.as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            timeout=max(0, settings.SQLITE_BUSY_TIMEOUT_MS) / 1000,
+            check_same_thread=False,  # Used by one executor thread at a time
+            cached_statements=self.statement_cache,
+        )
+        try:
+            apply_sqlite_pragmas(conn, "reader")
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self._stats['connections_opened'] += 1
+        return conn
+
+    def _current_file_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle connection (or open one); runs on an executor thread."""
+        with self._lock:
+            file_id = self._current_file_id()
+            if file_id != self._file_id:
+                # Database file was replaced: idle connections still read the old one
+                if self._file_id is not None:
+                    self._stats['reopens'] += 1
+                    logger.info(f"SQLite database {self.db_path} changed on disk, reopening reader connections")
+                for conn in self._idle:
+                    conn.close()
+                    self._open_count -= 1
+                self._idle.clear()
+                self._file_id = file_id
+            if self._idle:
+                return self._idle.pop()
+            self._open_count += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._open_count -= 1
+            raise
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if self._closed or self._current_file_id() != self._file_id:
+                conn.close()
+                self._open_count -= 1
+            else:
+                self._idle.append(conn)
+
+    def _run_sync(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._checkout()
+        started = time.perf_counter()
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            return fn(conn)
+        finally:
+            with self._lock:
+                self._stats['query_seconds_total'] += time.perf_counter() - started
+            # A read left open would pin the WAL snapshot and block checkpoints
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                pass
+            self._checkin(conn)
+
+    def warm_up(self) -> None:
+        """Open every connection up front (call from a thread or at startup)."""
+        conns = [self._checkout() for _ in range(self.size)]
+        for conn in conns:
+            self._checkin(conn)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run fn(connection) on a pooled read-only connection without blocking the event loop.
+
+        fn must finish with the connection before returning (no cursors kept around).
+        Waits for a free connection when all of them are busy.
+        """
+        if self._closed:
+            raise RuntimeError("SQLite reader pool is closed")
+        loop = asyncio.get_running_loop()
+        if self._available_loop is not loop:
+            self._available = asyncio.Semaphore(self.size)
+            self._available_loop = loop
+
+        requested = time.perf_counter()
+        self._stats['waiting'] += 1
+        self._stats['max_waiting'] = max(self._stats['max_waiting'], self._stats['waiting'])
+        try:
+            await self._available.acquire()
+        finally:
+            self._stats['waiting'] -= 1
+        waited = time.perf_counter() - requested
+        self._stats['wait_seconds_total'] += waited
+        self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+
+        self._stats['in_use'] += 1
+        self._stats['queries'] += 1
+        try:
+            return await loop.run_in_executor(self._executor, self._run_sync, fn)
+        except Exception:
+            self._stats['errors'] += 1
+            raise
+        finally:
+            self._stats['in_use'] -= 1
+            self._available.release()
+
+    async def fetchall(self, sql: str, params: Union[tuple, Dict[str, Any]] = ()) -> Tuple[List[str], List[tuple]]:
+        """Run one query and return (column names, rows)."""
+        def query(conn: sqlite3.Connection) -> Tuple[List[str], List[tuple]]:
+            cursor = conn.execute(sql, params)
+            try:
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                return columns, rows
+            finally:
+                cursor.close()
+        return await self.run(query)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters (queries, waits, connection churn) for monitoring."""
+        with self._lock:
+            open_connections = self._open_count
+            idle = len(self._idle)
+        stats = dict(self._stats)
+        stats.update({
+            'db_path': str(self.db_path),
+            'size': self.size,
+            'open': open_connections,
+            'idle': idle,
+            'wait_seconds_total': round(stats['wait_seconds_total'], 6),
+            'wait_seconds_max': round(stats['wait_seconds_max'], 6),
+            'query_seconds_total': round(stats['query_seconds_total'], 6),
+        })
+        return stats
+
+    def close(self) -> None:
+        """Close idle connections; busy ones are closed when they are returned."""
+        with self._lock:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+                self._open_count -= 1
+            self._idle.clear()
+        self._executor.shutdown(wait=False)
+
+
+def get_reader_pool(db_path: Union[str, Path]) -> SQLiteReaderPool:
+    """Shared reader pool of a database file (created on first use)."""
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SQLiteReaderPool(key)
+            _pools[key] = pool
+        return pool
+
+
+def reader_pool_stats() -> List[Dict[str, Any]]:
+    """Stats of every open reader pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools if not pool._closed]
+
+
+def render_reader_pool_prometheus() -> str:
+    """Reader pool counters in the Prometheus text exposition format."""
+    metrics = (
+        ("okta_sqlite_reader_pool_size", "gauge", "Connections the pool may open", 'size'),
+        ("okta_sqlite_reader_pool_open", "gauge", "Open reader connections", 'open'),
+        ("okta_sqlite_reader_pool_in_use", "gauge", "Connections running a query", 'in_use'),
+        ("okta_sqlite_reader_pool_waiting", "gauge", "Callers waiting for a free connection", 'waiting'),
+        ("okta_sqlite_reader_pool_queries_total", "counter", "Calls served by the pool", 'queries'),
+        ("okta_sqlite_reader_pool_errors_total", "counter", "Calls that raised", 'errors'),
+        ("okta_sqlite_reader_pool_connections_opened_total", "counter", "Reader connections opened", 'connections_opened'),
+        ("okta_sqlite_reader_pool_wait_seconds_total", "counter", "Time spent waiting for a free connection", 'wait_seconds_total'),
+        ("okta_sqlite_reader_pool_query_seconds_total", "counter", "Time spent running calls on pooled connections", 'query_seconds_total'),
+    )
+    pools = reader_pool_stats()
+    lines: List[str] = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stats in pools:
+            db_label = stats['db_path'].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{name}{{db="{db_label}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def close_reader_pools() -> None:
+    """Close all reader pools (application shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,30 @@
+"""Test environment: settings are read at import time, so set them before src is imported."""
+
+import os
+import tempfile
+
+import pytest
+
+_test_dir = tempfile.mkdtemp(prefix="okta_ai_agent_tests_")
+
+os.environ.setdefault("OKTA_CLIENT_ORGURL", "https://example.okta.com")
+os.environ.setdefault("OKTA_API_TOKEN", "test-token")
+os.environ.setdefault("DB_DIR", os.path.join(_test_dir, "sqlite_db"))
+os.environ.setdefault("CHAT_SESSIONS_DIR", os.path.join(_test_dir, "chat_sessions"))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """DatabaseOperations on a fresh database file; call init_db(db_path) inside the test's event loop."""
+    from src.config.settings import settings
+    from src.core.okta.sync.operations import DatabaseOperations
+
+    db_path = tmp_path / "okta_sync.db"
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(db_path))
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+    monkeypatch.setattr(DatabaseOperations, "_engine", None)
+    monkeypatch.setattr(DatabaseOperations, "_SessionLocal", None)
+    monkeypatch.setattr(DatabaseOperations, "_initialized", False)
+    database = DatabaseOperations()
+    database.db_path = db_path
+    return database
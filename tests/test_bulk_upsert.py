@@ -0,0 +1,116 @@
+"""Tests for the set-based multi-row upserts of DatabaseOperations.bulk_upsert."""
+
+import asyncio
+
+from sqlalchemy import select, text
+
+from src.core.okta.sync.models import Authenticator, Group, User, UserFactor
+
+TENANT = "tenant-a"
+OTHER_TENANT = "tenant-b"
+
+
+def _run(database, scenario):
+    async def run():
+        await database.init_db(database.db_path)
+        try:
+            return await scenario()
+        finally:
+            await database.close()
+    return asyncio.run(run())
+
+
+async def _rows(database, model, *columns):
+    async with database.get_session() as session:
+        result = await session.execute(
+            select(*(getattr(model, column) for column in columns)).order_by(model.tenant_id, model.okta_id)
+        )
+        return [tuple(row) for row in result]
+
+
+def test_inserts_then_updates_rows(database):
+    async def scenario():
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, Group, [
+                {"okta_id": f"00g{index}", "name": f"Group {index}"} for index in range(5)
+            ], TENANT, chunk_size=2)
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, Group, [
+                {"okta_id": "00g1", "name": "Renamed", "description": "new"},
+            ], TENANT)
+        return await _rows(database, Group, "okta_id", "name", "description")
+
+    rows = _run(database, scenario)
+    assert len(rows) == 5
+    assert ("00g1", "Renamed", "new") in rows
+    assert ("00g2", "Group 2", None) in rows
+
+
+def test_missing_fields_keep_their_stored_values(database):
+    async def scenario():
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, User, [
+                {"okta_id": "00u1", "email": "one@example.com", "department": "Sales", "custom_attributes": {"a": 1}},
+            ], TENANT)
+        async with database.get_session() as session:
+            # One record with department and one without, upserted together
+            await database.bulk_upsert(session, User, [
+                {"okta_id": "00u1", "email": "one@example.org"},
+                {"okta_id": "00u2", "email": "two@example.com", "department": "IT"},
+            ], TENANT)
+        return await _rows(database, User, "okta_id", "email", "department", "custom_attributes")
+
+    assert _run(database, scenario) == [
+        ("00u1", "one@example.org", "Sales", {"a": 1}),
+        ("00u2", "two@example.com", "IT", {}),
+    ]
+
+
+def test_upsert_revives_soft_deleted_rows(database):
+    async def scenario():
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, Group, [{"okta_id": "00g1", "name": "Eng"}], TENANT)
+        async with database.get_session() as session:
+            await session.execute(text("UPDATE groups SET is_deleted = 1"))
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, Group, [{"okta_id": "00g1", "name": "Eng"}], TENANT)
+        return await _rows(database, Group, "okta_id", "is_deleted")
+
+    assert _run(database, scenario) == [("00g1", False)]
+
+
+def test_same_okta_id_in_two_tenants_is_not_overwritten(database):
+    async def scenario():
+        for tenant_id, name in ((TENANT, "Okta Verify"), (OTHER_TENANT, "Other Verify")):
+            async with database.get_session() as session:
+                await database.bulk_upsert(session, Authenticator, [
+                    {"okta_id": "aut1", "name": name, "status": "ACTIVE"},
+                ], tenant_id)
+        return await _rows(database, Authenticator, "tenant_id", "okta_id", "name")
+
+    assert _run(database, scenario) == [
+        (TENANT, "aut1", "Okta Verify"),
+        (OTHER_TENANT, "aut1", "Other Verify"),
+    ]
+
+
+def test_nested_factors_replace_the_users_stored_factors(database):
+    def user(okta_id, *factor_ids):
+        return {"okta_id": okta_id, "email": f"{okta_id}@example.com", "factors": [
+            {"okta_id": factor_id, "factor_type": "push", "provider": "OKTA", "status": "ACTIVE"}
+            for factor_id in factor_ids
+        ]}
+
+    async def scenario():
+        async with database.get_session() as session:
+            await database.bulk_upsert(session, User, [user("00u1", "f1", "f2"), user("00u2", "f3")], TENANT)
+        async with database.get_session() as session:
+            # f2 was removed in Okta; 00u2 comes without a factors list and keeps f3
+            await database.bulk_upsert(session, User, [user("00u1", "f1", "f4"), {"okta_id": "00u2"}], TENANT)
+        async with database.get_session() as session:
+            result = await session.execute(
+                select(UserFactor.user_okta_id, UserFactor.okta_id).order_by(UserFactor.okta_id)
+            )
+            return [tuple(row) for row in result]
+
+    assert _run(database, scenario) == [("00u1", "f1"), ("00u2", "f3"), ("00u1", "f4")]
@@ -0,0 +1,79 @@
+"""Tests for the System Log CDC stage."""
+
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from src.core.okta.sync.cdc import SystemLogCDC
+from src.core.okta.sync.models import Group, User
+
+TENANT = "tenant-a"
+USER_ID = "00u1111111111111"
+GROUP_ID = "00g1111111111111"
+
+
+def _event(event_type, *targets):
+    return {
+        "event_type": event_type,
+        "outcome": "SUCCESS",
+        "published": "2026-10-01T00:00:00.000Z",
+        "actor": {"id": "00uadmin", "type": "User"},
+        "targets": [{"id": okta_id, "type": target_type} for target_type, okta_id in targets],
+    }
+
+
+class FakeOkta:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.write_lock_free = []
+
+    async def list_user_factors(self, user_ids):
+        # BEGIN IMMEDIATE fails at once while another connection holds the write lock
+        connection = sqlite3.connect(self.db_path, timeout=0)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.rollback()
+            self.write_lock_free.append(True)
+        except sqlite3.OperationalError:
+            self.write_lock_free.append(False)
+        finally:
+            connection.close()
+        return [{"okta_id": "mfa1", "user_okta_id": user_ids[0]}]
+
+
+def test_factors_are_fetched_without_holding_the_write_lock(database):
+    upserted = []
+
+    async def upsert_user_factors(session, user_okta_id, factors):
+        upserted.append((user_okta_id, factors))
+
+    async def scenario():
+        await database.init_db(database.db_path)
+        async with database.get_session() as session:
+            session.add(User(tenant_id=TENANT, okta_id=USER_ID, email="a@example.com"))
+            session.add(Group(tenant_id=TENANT, okta_id=GROUP_ID, name="Engineering"))
+
+        okta = FakeOkta(database.db_path)
+        orchestrator = SimpleNamespace(tenant_id=TENANT, db=database, _upsert_user_factors=upsert_user_factors)
+        cdc = SystemLogCDC(orchestrator, okta)
+        await cdc._apply_events([
+            _event("group.user_membership.add", ("User", USER_ID), ("UserGroup", GROUP_ID)),
+            _event("user.mfa.factor.activate", ("User", USER_ID)),
+            _event("user.mfa.factor.activate", ("User", "00uunknown000000")),
+        ])
+
+        async with database.get_session() as session:
+            memberships = (await session.execute(text(
+                "SELECT user_okta_id, group_okta_id FROM user_group_memberships WHERE tenant_id = :tenant_id"
+            ), {"tenant_id": TENANT})).all()
+        await database.close()
+        return okta, cdc, memberships
+
+    okta, cdc, memberships = asyncio.run(scenario())
+
+    assert okta.write_lock_free == [True]  # Unknown users are not fetched
+    assert upserted == [(USER_ID, [{"okta_id": "mfa1", "user_okta_id": USER_ID}])]
+    assert memberships == [(USER_ID, GROUP_ID)]
+    assert cdc._events_applied == 3
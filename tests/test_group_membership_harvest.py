@@ -0,0 +1,40 @@
+"""Tests for replaying harvested group memberships."""
+
+import asyncio
+
+from sqlalchemy import text
+
+from src.core.okta.sync.engine import SyncOrchestrator
+from src.core.okta.sync.models import Group, User
+
+TENANT = "tenant-a"
+OTHER_TENANT = "tenant-b"
+GROUP_ID = "00g1111111111111"
+
+
+def test_memberships_need_a_live_user_of_the_same_tenant(database):
+    async def scenario():
+        await database.init_db(database.db_path)
+        async with database.get_session() as session:
+            session.add(Group(tenant_id=TENANT, okta_id=GROUP_ID, name="Engineering"))
+            session.add(User(tenant_id=TENANT, okta_id="00ulive", email="live@example.com"))
+            session.add(User(tenant_id=TENANT, okta_id="00udeleted", email="gone@example.com", is_deleted=True))
+            session.add(User(tenant_id=OTHER_TENANT, okta_id="00uother", email="other@example.com"))
+
+        orchestrator = SyncOrchestrator(TENANT, db=database)
+        orchestrator._memberships_by_group = True
+        orchestrator._harvested_group_ids = [GROUP_ID]
+        orchestrator._pending_group_memberships = [
+            {"user_okta_id": user_okta_id, "group_okta_id": GROUP_ID}
+            for user_okta_id in ("00ulive", "00udeleted", "00uother", "00umissing")
+        ]
+        await orchestrator._flush_group_memberships()
+
+        async with database.get_session() as session:
+            rows = (await session.execute(text(
+                "SELECT tenant_id, user_okta_id FROM user_group_memberships"
+            ))).all()
+        await database.close()
+        return rows
+
+    assert asyncio.run(scenario()) == [(TENANT, "00ulive")]
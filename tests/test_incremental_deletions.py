@@ -0,0 +1,98 @@
+"""Tests for soft deletes during incremental syncs."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from src.config.settings import settings
+from src.core.okta.sync.engine import SyncOrchestrator
+from src.core.okta.sync.models import Application, SyncHistory, SyncStatus, User, UserFactor
+
+TENANT = "tenant-a"
+
+
+async def _deleted_flags(database, model):
+    async with database.get_session() as session:
+        rows = (await session.execute(
+            select(model.okta_id, model.is_deleted).where(model.tenant_id == TENANT).order_by(model.okta_id)
+        )).all()
+    return [tuple(row) for row in rows]
+
+
+def _incremental_users(database):
+    async def scenario():
+        await database.init_db(database.db_path)
+        async with database.get_session() as session:
+            session.add(User(tenant_id=TENANT, okta_id="00uactive", email="active@example.com", status="ACTIVE"))
+            session.add(User(tenant_id=TENANT, okta_id="00ugone", email="gone@example.com", status="ACTIVE"))
+            session.add(UserFactor(tenant_id=TENANT, okta_id="mfa1", user_okta_id="00ugone", factor_type="push"))
+            await session.commit()
+
+        orchestrator = SyncOrchestrator(TENANT, db=database)
+        orchestrator._sync_mode = 'incremental'
+        batch = [
+            {"okta_id": "00uactive", "email": "active@example.com", "status": "ACTIVE"},
+            {"okta_id": "00ugone", "email": "gone@example.com", "status": "DEPROVISIONED"},
+        ]
+        async with database.get_session() as session:
+            count = await orchestrator._process_batch_to_db(session, User, batch)
+            await session.commit()
+
+        async with database.get_session() as session:
+            statuses = dict((await session.execute(select(User.okta_id, User.status))).all())
+            factors = (await session.execute(select(UserFactor.okta_id))).scalars().all()
+        flags = await _deleted_flags(database, User)
+        await database.close()
+        return count, flags, statuses, factors
+
+    return asyncio.run(scenario())
+
+
+def test_deactivated_users_are_soft_deleted_when_deprovisioned_users_are_not_synced(database, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_DEPROVISIONED_USERS", False)
+
+    count, flags, statuses, factors = _incremental_users(database)
+
+    assert count == 2
+    assert flags == [("00uactive", False), ("00ugone", True)]
+    assert statuses["00ugone"] == "ACTIVE"  # Not upserted as a live DEPROVISIONED row
+    assert factors == []
+
+
+def test_deactivated_users_keep_their_row_when_deprovisioned_users_are_synced(database, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_DEPROVISIONED_USERS", True)
+
+    count, flags, statuses, _ = _incremental_users(database)
+
+    assert count == 2
+    assert flags == [("00uactive", False), ("00ugone", False)]
+    assert statuses["00ugone"] == "DEPROVISIONED"
+
+
+def test_incremental_sync_soft_deletes_applications_no_longer_listed(database):
+    async def scenario():
+        await database.init_db(database.db_path)
+        async with database.get_session() as session:
+            session.add(SyncHistory(tenant_id=TENANT, status=SyncStatus.RUNNING))
+            session.add(Application(tenant_id=TENANT, okta_id="0oakept", name="kept"))
+            session.add(Application(tenant_id=TENANT, okta_id="0oaremoved", name="removed"))
+            await session.commit()
+
+        async def list_applications(processor_func, since=None):
+            # /api/v1/apps ignores `since`: the whole application set is listed
+            await processor_func([{"okta_id": "0oakept", "name": "kept"}])
+            return 1
+
+        orchestrator = SyncOrchestrator(TENANT, db=database)
+        orchestrator._sync_mode = 'incremental'
+        okta = SimpleNamespace(pagination_errors=0, next_page_links={}, resume_after={})
+        await orchestrator.sync_model_streaming(
+            Application, list_applications, since=datetime.now(timezone.utc) - timedelta(hours=1), okta=okta
+        )
+        flags = await _deleted_flags(database, Application)
+        await database.close()
+        return flags
+
+    assert asyncio.run(scenario()) == [("0oakept", False), ("0oaremoved", True)]
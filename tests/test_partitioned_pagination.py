@@ -0,0 +1,193 @@
+"""Tests for parallel partitioned pagination in OktaAPIClient.make_request."""
+
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.core.okta.client.base_okta_api_client import OktaAPIClient
+
+STATUSES = OktaAPIClient.USER_PARTITION_STATUSES
+
+
+class FakeUsersClient(OktaAPIClient):
+    """Serves /api/v1/users from memory, pages of page_size, searched by status."""
+
+    def __init__(self, users_by_status, page_size=2, **kwargs):
+        super().__init__(**kwargs)
+        self.users_by_status = users_by_status
+        self.page_size = page_size
+        self.requests = []
+
+    async def _single_request(self, endpoint, method, params=None, body=None):
+        if endpoint.startswith("http"):
+            query = {key: values[0] for key, values in parse_qs(urlparse(endpoint).query).items()}
+        else:
+            query = dict(params or {})
+        self.requests.append(query)
+        search = query.get("search")
+        users = [
+            user
+            for status, status_users in self.users_by_status.items()
+            if not search or f'"{status}"' in search
+            for user in status_users
+        ]
+        offset = int(query.get("offset", 0))
+        page = users[offset:offset + self.page_size]
+        link_header = ""
+        if offset + self.page_size < len(users):
+            next_query = "&".join(f"{key}={value}" for key, value in {
+                **({"search": search} if search else {}), "offset": offset + self.page_size,
+            }.items())
+            link_header = f'<https://example.okta.com/api/v1/users?{next_query}>; rel="next"'
+        return {"status": "success", "data": page, "link_header": link_header}
+
+
+@pytest.fixture(autouse=True)
+def okta_env(monkeypatch):
+    monkeypatch.setenv("OKTA_CLIENT_ORGURL", "https://example.okta.com")
+    monkeypatch.setenv("OKTA_API_TOKEN", "test-token")
+    monkeypatch.setenv("API_PARALLEL_PARTITIONS", "4")
+
+
+def _users(status, count):
+    return [{"id": f"{status}-{index}", "status": status} for index in range(count)]
+
+
+def test_large_listing_reuses_probe_page():
+    users = {"ACTIVE": _users("ACTIVE", 5), "SUSPENDED": _users("SUSPENDED", 3)}
+    client = FakeUsersClient(users)
+
+    result = asyncio.run(client.make_request("/api/v1/users", params={"limit": 2}))
+
+    assert result["status"] == "success"
+    assert [user["id"] for user in result["data"]] == [user["id"] for user in users["ACTIVE"] + users["SUSPENDED"]]
+    assert result["partitions"] == len(STATUSES)
+    # ACTIVE: 3 pages (the probe is its first), SUSPENDED: 2, the 5 other statuses: 1 each
+    assert len(client.requests) == 3 + 2 + 5
+    first_active_pages = [query for query in client.requests
+                          if query.get("search") == 'status eq "ACTIVE"' and "offset" not in query]
+    assert len(first_active_pages) == 1
+
+
+def test_small_listing_fetches_other_statuses_in_one_search():
+    users = {"ACTIVE": _users("ACTIVE", 1), "STAGED": _users("STAGED", 1)}
+    client = FakeUsersClient(users)
+
+    result = asyncio.run(client.make_request("/api/v1/users", params={"limit": 2}))
+
+    assert [user["id"] for user in result["data"]] == ["ACTIVE-0", "STAGED-0"]
+    assert len(client.requests) == 2
+    assert all(f'"{status}"' in client.requests[1]["search"] for status in STATUSES[1:])
+
+
+def test_max_results_is_one_cutoff_across_partitions():
+    users = {"ACTIVE": _users("ACTIVE", 3), "STAGED": _users("STAGED", 6)}
+    client = FakeUsersClient(users)
+
+    result = asyncio.run(client.make_request("/api/v1/users", params={"limit": 2}, max_results=5))
+
+    assert [user["id"] for user in result["data"]] == ["ACTIVE-0", "ACTIVE-1", "ACTIVE-2", "STAGED-0", "STAGED-1"]
+    assert result["limited_by_max_results"] is True
+    # STAGED stops after the page that reaches the cutoff
+    staged_pages = [query for query in client.requests if query.get("search") == 'status eq "STAGED"']
+    assert len(staged_pages) == 1
+
+
+def test_max_pages_is_shared_by_all_partitions():
+    users = {status: _users(status, 4) for status in STATUSES}
+    client = FakeUsersClient(users, max_pages=5)
+
+    result = asyncio.run(client.make_request("/api/v1/users", params={"limit": 2}))
+
+    assert result["status"] == "success"
+    assert len(client.requests) == 5
+    assert result["pages"] == 5
+
+
+def test_one_page_requests_are_not_partitioned():
+    client = FakeUsersClient({"ACTIVE": _users("ACTIVE", 5)})
+
+    result = asyncio.run(client.make_request("/api/v1/users", params={"limit": 2}, max_results=2))
+
+    assert [user["id"] for user in result["data"]] == ["ACTIVE-0", "ACTIVE-1"]
+    assert client.requests == [{"limit": 2}]
+
+
+class FakeLogsClient(OktaAPIClient):
+    """Serves /api/v1/logs from memory: since inclusive, until exclusive, pages of page_size."""
+
+    def __init__(self, events, page_size=3, **kwargs):
+        super().__init__(**kwargs)
+        self.events = events
+        self.page_size = page_size
+        self.requests = []
+
+    async def _single_request(self, endpoint, method, params=None, body=None):
+        if endpoint.startswith("http"):
+            query = {key: values[0] for key, values in parse_qs(urlparse(endpoint).query).items()}
+        else:
+            query = dict(params or {})
+        self.requests.append(query)
+        since = self._parse_okta_time(query.get("since"))
+        until = self._parse_okta_time(query.get("until"))
+        events = [
+            event for event in self.events
+            if since <= self._parse_okta_time(event["published"]) and (not until or self._parse_okta_time(event["published"]) < until)
+        ]
+        if query.get("sortOrder") == "DESCENDING":
+            events.reverse()
+        offset = int(query.get("offset", 0))
+        page = events[offset:offset + self.page_size]
+        link_header = ""
+        if offset + self.page_size < len(events):
+            next_query = "&".join(f"{key}={value}" for key, value in {
+                **{key: value for key, value in query.items() if key != "offset"}, "offset": offset + self.page_size,
+            }.items())
+            link_header = f'<https://example.okta.com/api/v1/logs?{next_query}>; rel="next"'
+        return {"status": "success", "data": page, "link_header": link_header}
+
+
+def _events(count, seconds_apart=60):
+    return [
+        {"uuid": f"event-{index}", "published": f"2024-01-01T00:{index * seconds_apart // 60:02d}:{index * seconds_apart % 60:02d}.000Z"}
+        for index in range(count)
+    ]
+
+
+LOG_WINDOW = {"since": "2024-01-01T00:00:00.000Z", "until": "2024-01-01T00:30:00.000Z"}
+
+
+def test_logs_answered_by_one_page_are_not_split():
+    client = FakeLogsClient(_events(3), page_size=5)
+
+    result = asyncio.run(client.make_request("/api/v1/logs", params={**LOG_WINDOW, "limit": 5}))
+
+    assert [event["uuid"] for event in result["data"]] == ["event-0", "event-1", "event-2"]
+    assert client.requests == [{**LOG_WINDOW, "limit": 5}]
+
+
+def test_logs_split_the_range_left_after_the_first_page():
+    events = _events(20)
+    client = FakeLogsClient(events, page_size=3)
+
+    result = asyncio.run(client.make_request("/api/v1/logs", params={**LOG_WINDOW, "limit": 3}))
+
+    assert [event["uuid"] for event in result["data"]] == [event["uuid"] for event in events]
+    assert result["partitions"] == 5
+    assert client.requests[0] == {**LOG_WINDOW, "limit": 3}
+    # The windows start at the last event of the first page, not at the original since
+    window_starts = [query["since"] for query in client.requests[1:] if "offset" not in query]
+    assert min(window_starts) == events[2]["published"]
+
+
+def test_descending_logs_split_below_the_first_page():
+    events = _events(20)
+    client = FakeLogsClient(events, page_size=3)
+
+    result = asyncio.run(client.make_request(
+        "/api/v1/logs", params={**LOG_WINDOW, "limit": 3, "sortOrder": "DESCENDING"}, max_results=8
+    ))
+
+    assert [event["uuid"] for event in result["data"]] == [f"event-{index}" for index in range(19, 11, -1)]
+    assert all(query["until"] <= "2024-01-01T00:17:00.001Z" for query in client.requests[1:])
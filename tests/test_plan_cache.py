@@ -0,0 +1,123 @@
+"""Tests for question fingerprinting and plan reuse in the plan cache."""
+
+import time
+
+import pytest
+
+from src.core.agents.plan_cache import PlanCache, fingerprint_query
+
+GROUPS_FOR_USER_SCRIPT = '''import sqlite3
+conn = sqlite3.connect("sqlite_db/okta_sync.db")
+rows = conn.execute(
+    "SELECT g.name FROM groups g "
+    "JOIN user_group_memberships m ON m.group_okta_id = g.okta_id "
+    "JOIN users u ON u.okta_id = m.user_okta_id "
+    "WHERE u.email = '{email}'"
+).fetchall()
+print(rows)
+'''
+
+
+def _store(cache, question, script, data_source_type="sql"):
+    return cache.store(
+        question,
+        script,
+        display_type="table",
+        data_source_type=data_source_type,
+        pipeline_seconds=12.5,
+        tokens=4000,
+    )
+
+
+@pytest.mark.parametrize(
+    "question, template, slot_types, values",
+    [
+        ("Show groups for john@acme.com", "show groups for <email>", ("email",), ("john@acme.com",)),
+        ("Please, can you show groups for John@Acme.com?", "show groups for <email>", ("email",), ("John@Acme.com",)),
+        ("  LIST   users in group \"Sales Team\"  please", "list users in group <text>", ("text",), ("Sales Team",)),
+        ("apps assigned to 00u1abcdefghijklmnoP", "apps assigned to <id>", ("id",), ("00u1abcdefghijklmnoP",)),
+        ("Who's in 'Engineering'?", "who's in <text>", ("text",), ("Engineering",)),
+        # An email inside quotes is one email slot, not a text slot
+        ("groups for \"jane@acme.com\"", "groups for \"<email>\"", ("email",), ("jane@acme.com",)),
+        ("how many users are active", "how many users are active", (), ()),
+    ],
+)
+def test_fingerprint_normalizes_question_and_extracts_literals(question, template, slot_types, values):
+    fingerprint = fingerprint_query(question)
+    assert fingerprint.template == template
+    assert fingerprint.slot_types == slot_types
+    assert fingerprint.values == values
+
+
+def test_fingerprint_keeps_literals_in_question_order():
+    fingerprint = fingerprint_query("Compare 'Sales' with jane@acme.com and 00g1abcdefghijklmnoP")
+    assert fingerprint.slot_types == ("text", "email", "id")
+    assert fingerprint.values == ("Sales", "jane@acme.com", "00g1abcdefghijklmnoP")
+
+
+def test_sql_plan_is_reused_with_new_literal():
+    cache = PlanCache(max_entries=10, ttl_seconds=3600)
+    assert _store(cache, "Show groups for john@acme.com", GROUPS_FOR_USER_SCRIPT.format(email="john@acme.com"))
+
+    hit = cache.lookup("show groups for jane@acme.com?")
+    assert hit is not None and hit.parameterized
+    assert hit.script_code == GROUPS_FOR_USER_SCRIPT.format(email="jane@acme.com")
+    assert hit.tokens_saved == 4000
+
+    assert cache.lookup("show apps for jane@acme.com") is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['parameterized_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_unsafe_slot_value_is_not_rendered():
+    cache = PlanCache(max_entries=10, ttl_seconds=3600)
+    _store(cache, "Show groups for 'Sales'", GROUPS_FOR_USER_SCRIPT.format(email="Sales"))
+    assert cache.lookup("Show groups for 'Support'").script_code == GROUPS_FOR_USER_SCRIPT.format(email="Support")
+    # Same fingerprint, but the value would break out of the SQL string literal
+    assert fingerprint_query("Show groups for \"x' OR '1'='1\"").template == "show groups for <text>"
+    assert cache.lookup("Show groups for \"x' OR '1'='1\"") is None
+
+
+def test_script_with_discovered_ids_is_reused_for_exact_literals_only():
+    script = GROUPS_FOR_USER_SCRIPT.format(email="john@acme.com").replace(
+        "print(rows)", "print(rows, '00g1abcdefghijklmnoP')"
+    )
+    cache = PlanCache(max_entries=10, ttl_seconds=3600)
+    assert _store(cache, "Show groups for john@acme.com", script)
+
+    assert cache.lookup("Show groups for jane@acme.com") is None
+    hit = cache.lookup("show groups for john@acme.com")
+    assert hit is not None and not hit.parameterized and hit.script_code == script
+
+
+def test_api_plans_are_not_parameterized():
+    script = "print('john@acme.com')\n"
+    cache = PlanCache(max_entries=10, ttl_seconds=3600)
+    assert _store(cache, "Show factors for john@acme.com", script, data_source_type="api")
+    assert cache.lookup("Show factors for jane@acme.com") is None
+    assert cache.lookup("Show factors for john@acme.com").script_code == script
+
+
+def test_computed_dates_and_invalid_scripts_are_not_stored():
+    cache = PlanCache(max_entries=10, ttl_seconds=3600)
+    dated = GROUPS_FOR_USER_SCRIPT.format(email="john@acme.com").replace("print(rows)", "print('2026-10-09')")
+    assert not _store(cache, "Groups for john@acme.com created in the last 7 days", dated)
+    assert _store(cache, "Groups for john@acme.com created since 2026-10-09", dated)
+    assert not _store(cache, "Delete everything", "import os\nos.system('rm -rf /')\n")
+    assert cache.stats()['rejected'] == 2
+
+
+def test_discard_expiry_and_lru_eviction(monkeypatch):
+    cache = PlanCache(max_entries=2, ttl_seconds=60)
+    for email in ("a@acme.com", "b@acme.com", "c@acme.com"):
+        _store(cache, f"Show apps for {email}", f"print('{email}')\n", data_source_type="api")
+    assert cache.lookup("Show apps for a@acme.com") is None
+    assert cache.stats()['evictions'] == 1
+
+    assert cache.discard("Show apps for b@acme.com")
+    assert cache.lookup("Show apps for b@acme.com") is None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.lookup("Show apps for c@acme.com") is None
+    assert cache.stats()['expired'] == 1
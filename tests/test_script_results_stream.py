@@ -0,0 +1,79 @@
+"""Tests for the incremental QUERY RESULTS parser shared by the web stream and Slack."""
+
+import json
+
+from src.utils.script_results_stream import ScriptResultsStream, parse_script_output
+
+
+def _script_output(results, indent=None):
+    return "\n".join([
+        "Fetching users...",
+        "=" * 80,
+        "QUERY RESULTS",
+        "=" * 80,
+        json.dumps(results, indent=indent),
+        "=" * 80,
+    ])
+
+
+def test_parses_results_object_like_json_loads():
+    results = {"display_type": "table", "data": [{"id": 1}, {"id": 2}], "headers": ["id"], "count": 2}
+    for indent in (None, 2):
+        assert parse_script_output(_script_output(results, indent)) == results
+
+
+def test_null_fields_and_rows_parse():
+    results = {"display_type": "table", "data": [{"id": 1}, None], "headers": None, "metadata": None, "count": 2}
+    assert parse_script_output(_script_output(results)) == results
+    assert parse_script_output(_script_output(results, indent=2)) == results
+
+
+def test_bare_array_with_null_row():
+    parsed = parse_script_output(_script_output([None, {"id": 1}], indent=2))
+    assert parsed == {"display_type": "table", "data": [None, {"id": 1}], "count": 2}
+
+
+def test_no_results_block():
+    assert parse_script_output("just some output\n") is None
+
+
+def test_unparseable_block_returns_raw_output():
+    parsed = parse_script_output("before\nQUERY RESULTS\nnot json\n")
+    assert parsed["count"] == 0
+    assert "not json" in parsed["raw_output"]
+
+
+def test_truncated_block_returns_raw_output():
+    parsed = parse_script_output('QUERY RESULTS\n{"display_type": "table", "data": [\n{"id": 1},\n')
+    assert parsed["count"] == 0
+    assert "raw_output" in parsed
+
+
+def test_large_results_stream_in_batches():
+    rows = [{"id": index, "note": None} for index in range(7)]
+    results = {"display_type": "table", "data": rows, "headers": ["id", "note"], "metadata": None}
+    stream = ScriptResultsStream(batch_rows=3)
+    batches = []
+    for line in _script_output(results, indent=2).split("\n"):
+        batches.extend(stream.feed_line(line))
+
+    assert stream.streaming
+    final = stream.finish()
+    batches.extend(stream.final_batches())
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row for batch in batches for row in batch] == rows
+    assert "data" not in final
+    assert final["headers"] == ["id", "note"]
+    assert final["metadata"] is None
+    assert final["count"] == 7
+    assert stream.output_lines == ["Fetching users...", "=" * 80]
+
+
+def test_small_results_are_not_streamed():
+    stream = ScriptResultsStream(batch_rows=10)
+    for line in _script_output({"data": [{"id": 1}], "count": 1}).split("\n"):
+        assert stream.feed_line(line) == []
+    assert not stream.streaming
+    assert stream.finish() == {"data": [{"id": 1}], "count": 1}
+    assert stream.final_batches() == []
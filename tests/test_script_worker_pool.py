@@ -0,0 +1,177 @@
+"""Tests for the warm script worker pool, running real scripts on real workers."""
+
+import asyncio
+import os
+import textwrap
+
+from src.utils.script_worker_pool import ScriptWorkerPool
+
+
+def _script(tmp_path, name, code):
+    path = tmp_path / name
+    path.write_text(textwrap.dedent(code), encoding="utf-8")
+    return str(path)
+
+
+async def _run(pool, script_path, timeout=None):
+    job = await pool.submit(script_path, timeout=timeout)
+    stdout, stderr = await job.communicate()
+    return job, stdout.decode("utf-8"), stderr.decode("utf-8")
+
+
+def test_job_output_is_framed_per_job(tmp_path):
+    noisy = _script(tmp_path, "noisy.py", """
+        import sys
+        print("first line")
+        print("to stderr", file=sys.stderr)
+        print("__TAKO_JOB_END__ 0123456789abcdef 0 0")
+        sys.stdout.write("no trailing newline")
+        sys.exit(3)
+    """)
+    quiet = _script(tmp_path, "quiet.py", """
+        print("second job")
+    """)
+
+    async def main():
+        pool = ScriptWorkerPool(size=1, max_jobs=10, job_timeout=0, memory_limit_mb=0)
+        await pool.start()
+        try:
+            first, out1, err1 = await _run(pool, noisy)
+            second, out2, err2 = await _run(pool, quiet)
+            return first, out1, err1, second, out2, err2, pool.stats()
+        finally:
+            await pool.close()
+
+    first, out1, err1, second, out2, err2, stats = asyncio.run(main())
+
+    assert first.returncode == 3
+    # Another job's marker is plain output; the line without a newline is kept
+    assert out1 == "first line\n__TAKO_JOB_END__ 0123456789abcdef 0 0\nno trailing newline"
+    assert err1 == "to stderr\n"
+    assert second.returncode == 0
+    assert (out2, err2) == ("second job\n", "")
+    assert second.pid == first.pid
+    assert stats["warm_jobs"] == 2 and stats["cold_starts"] == 0 and stats["recycled"] == 0
+
+
+def test_timed_out_job_is_killed_and_its_worker_replaced(tmp_path):
+    slow = _script(tmp_path, "slow.py", """
+        import time
+        print("started")
+        time.sleep(60)
+        print("never printed")
+    """)
+    quick = _script(tmp_path, "quick.py", """
+        print("after timeout")
+    """)
+
+    async def main():
+        pool = ScriptWorkerPool(size=1, max_jobs=10, job_timeout=0, memory_limit_mb=0)
+        await pool.start()
+        try:
+            timed_out, out1, err1 = await asyncio.wait_for(_run(pool, slow, timeout=1), timeout=30)
+            after, out2, _ = await _run(pool, quick)
+            return timed_out, out1, err1, after, out2, pool.stats()
+        finally:
+            await pool.close()
+
+    timed_out, out1, err1, after, out2, stats = asyncio.run(main())
+
+    assert timed_out.timed_out
+    assert timed_out.returncode != 0
+    assert out1 == "started\n"
+    assert "Script execution timed out after 1 seconds" in err1
+    assert after.returncode == 0 and out2 == "after timeout\n"
+    assert after.pid != timed_out.pid
+    assert stats["timeouts"] == 1 and stats["recycled"] == 1
+
+
+def test_memory_error_retires_the_worker(tmp_path):
+    hungry = _script(tmp_path, "hungry.py", """
+        print("allocating")
+        blob = bytearray(8 * 1024 ** 3)
+        print("allocated", len(blob))
+    """)
+    quick = _script(tmp_path, "quick.py", """
+        print("fresh worker")
+    """)
+
+    async def main():
+        pool = ScriptWorkerPool(size=1, max_jobs=10, job_timeout=60, memory_limit_mb=2048)
+        await pool.start()
+        try:
+            failed, out1, err1 = await _run(pool, hungry)
+            after, out2, _ = await _run(pool, quick)
+            return failed, out1, err1, after, out2, pool.stats()
+        finally:
+            await pool.close()
+
+    failed, out1, err1, after, out2, stats = asyncio.run(main())
+
+    assert failed.returncode == 1
+    assert out1 == "allocating\n"
+    assert "MemoryError: script exceeded the worker memory limit" in err1
+    assert stats["recycled"] == 1 and stats["timeouts"] == 0
+    assert after.returncode == 0 and out2 == "fresh worker\n"
+    assert after.pid != failed.pid
+
+
+def test_jobs_on_one_worker_do_not_share_state(tmp_path):
+    helper_dir = tmp_path / "jobs"
+    helper_dir.mkdir()
+    (helper_dir / "job_helper.py").write_text("VALUE = 'from helper'\n", encoding="utf-8")
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+
+    writer = _script(helper_dir, "writer.py", f"""
+        import logging
+        import os
+        import sys
+        import base_okta_api_client
+        import job_helper
+
+        os.environ["TAKO_WORKER_TEST"] = "leaked"
+        os.chdir({str(elsewhere)!r})
+        sys.path.insert(0, "/tako-worker-test")
+        logging.basicConfig(level=logging.DEBUG)
+        base_okta_api_client.TAKO_WORKER_TEST = "leaked"
+        GLOBAL_FROM_JOB = "leaked"
+        print(job_helper.VALUE)
+    """)
+    reader = _script(tmp_path, "reader.py", """
+        import json
+        import logging
+        import os
+        import sys
+        import base_okta_api_client
+
+        print(json.dumps({
+            "env": os.environ.get("TAKO_WORKER_TEST"),
+            "cwd": os.getcwd(),
+            "sys_path": "/tako-worker-test" in sys.path,
+            "helper_module": "job_helper" in sys.modules,
+            "root_level": logging.root.level,
+            "client_attr": hasattr(base_okta_api_client, "TAKO_WORKER_TEST"),
+            "job_global": "GLOBAL_FROM_JOB" in globals(),
+        }))
+    """)
+
+    async def main():
+        pool = ScriptWorkerPool(size=1, max_jobs=10, job_timeout=60, memory_limit_mb=0)
+        await pool.start()
+        try:
+            _, before, _ = await _run(pool, reader)
+            first, out1, err1 = await _run(pool, writer)
+            second, after, _ = await _run(pool, reader)
+            return before, first, out1, err1, second, after
+        finally:
+            await pool.close()
+
+    before, first, out1, err1, second, after = asyncio.run(main())
+
+    assert first.returncode == 0, err1
+    assert out1 == "from helper\n"
+    assert second.pid == first.pid
+    assert after == before
+    assert '"env": null' in after and '"helper_module": false' in after
+    assert os.environ.get("TAKO_WORKER_TEST") is None
@@ -0,0 +1,154 @@
+"""Tests for full-sync loading: the staging database, swap_in_staging and deferred indexes."""
+
+import asyncio
+import sqlite3
+
+from src.config.settings import settings
+from src.core.okta.sync.models import Group, User
+from src.core.okta.sync.operations import DatabaseOperations, SHADOW_SYNC_TABLES, StagingDatabase
+from src.core.okta.sync.relationships import RelationshipWriter
+
+TENANT = "tenant-a"
+OTHER_TENANT = "tenant-b"
+
+
+def _run(database, scenario):
+    async def run():
+        await database.init_db(database.db_path)
+        try:
+            return await scenario()
+        finally:
+            await database.close()
+    return asyncio.run(run())
+
+
+def _indexes(path, table_name):
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            row[0]: bool(row[1]) for row in conn.execute(
+                "SELECT name, sql IS NULL FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table_name,)
+            )
+        }
+    finally:
+        conn.close()
+
+
+def _count(path, table_name, tenant_id):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table_name} WHERE tenant_id = ?", (tenant_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+async def _load(db, tenant_id, user_count, group_count):
+    async with db.get_session() as session:
+        await db.bulk_upsert(session, Group, [
+            {"okta_id": f"00g{tenant_id[-1]}{index}", "name": f"Group {index}"} for index in range(group_count)
+        ], tenant_id)
+        await db.bulk_upsert(session, User, [
+            {"okta_id": f"00u{tenant_id[-1]}{index}", "email": f"user{index}@example.com"} for index in range(user_count)
+        ], tenant_id)
+        writer = RelationshipWriter(session, tenant_id)
+        for index in range(user_count):
+            writer.add('user_group_memberships', {
+                'user_okta_id': f"00u{tenant_id[-1]}{index}",
+                'group_okta_id': f"00g{tenant_id[-1]}{index % group_count}",
+                'created_at': None,
+                'updated_at': None,
+            })
+        await writer.flush()
+
+
+def test_staging_tables_only_get_their_unique_constraints(tmp_path):
+    staging = StagingDatabase(tmp_path / "staging.db")
+
+    async def scenario():
+        await staging.init_db()
+        await _load(staging, TENANT, 3, 2)
+        await staging.close()
+
+    asyncio.run(scenario())
+    for table_name in SHADOW_SYNC_TABLES:
+        indexes = _indexes(staging.path, table_name)
+        # Only SQLite's automatic indexes behind PRIMARY KEY / UNIQUE constraints (no CREATE INDEX sql)
+        assert all(indexes.values()), (table_name, sorted(indexes))
+    assert len(_indexes(staging.path, "users")) == 2  # UNIQUE(okta_id), UNIQUE(tenant_id, okta_id)
+    assert _count(staging.path, "user_group_memberships", TENANT) == 3
+
+
+def test_swap_replaces_the_tenants_rows_and_rebuilds_deferred_indexes(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_DEFERRED_INDEXES", True)
+    monkeypatch.setattr(settings, "SYNC_DEFERRED_INDEX_MIN_ROWS", 5)
+    staging = StagingDatabase(tmp_path / "staging.db")
+    live_indexes = {}
+
+    async def scenario():
+        await _load(database, TENANT, 2, 1)
+        await _load(database, OTHER_TENANT, 4, 2)
+        live_indexes.update({name: _indexes(str(database.db_path), name) for name in SHADOW_SYNC_TABLES})
+
+        await staging.init_db()
+        await _load(staging, TENANT, 6, 3)
+        try:
+            return await database.swap_in_staging(staging, list(SHADOW_SYNC_TABLES), TENANT)
+        finally:
+            await staging.discard()
+
+    copied = _run(database, scenario)
+    db_path = str(database.db_path)
+
+    assert copied["users"] == 6 and copied["groups"] == 3 and copied["user_group_memberships"] == 6
+    assert (_count(db_path, "users", TENANT), _count(db_path, "groups", TENANT)) == (6, 3)
+    assert _count(db_path, "user_group_memberships", TENANT) == 6
+    # Other tenants' rows are untouched
+    assert (_count(db_path, "users", OTHER_TENANT), _count(db_path, "user_group_memberships", OTHER_TENANT)) == (4, 4)
+    # Every live index is back after the swap
+    assert {name: _indexes(db_path, name) for name in SHADOW_SYNC_TABLES} == live_indexes
+    assert not staging.exists()
+
+    # Only tables receiving at least SYNC_DEFERRED_INDEX_MIN_ROWS staged rows were deferred
+    rebuilt = DatabaseOperations._sqlite_maintenance[settings.SQLITE_PATH]["last_index_rebuild"]["indexes"]
+    assert "idx_user_tenant_email" in rebuilt and "idx_user_by_group" in rebuilt
+    assert "idx_group_tenant_name" not in rebuilt
+    assert all(seconds >= 0 for seconds in rebuilt.values())
+
+
+def test_in_place_full_sync_drops_and_rebuilds_secondary_indexes(database, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_DEFERRED_INDEX_MIN_ROWS", 0)
+    db_path = str(database.db_path)
+    before = {}
+    during = {}
+
+    async def scenario():
+        await _load(database, TENANT, 4, 2)
+        before.update({name: _indexes(db_path, name) for name in SHADOW_SYNC_TABLES})
+        dropped = await database.drop_secondary_indexes(list(SHADOW_SYNC_TABLES))
+        during.update({name: _indexes(db_path, name) for name in SHADOW_SYNC_TABLES})
+        timings = await database.rebuild_indexes(dropped)
+        return dropped, timings
+
+    dropped, timings = _run(database, scenario)
+    dropped_names = {index.name for index in dropped}
+    assert {"idx_user_tenant_email", "idx_user_by_group", "idx_user_device_mgmt_status"} <= dropped_names
+    # Unique constraints and indexes led by a foreign key (cascade lookups) stay
+    assert "ix_user_devices_user_okta_id" not in dropped_names and "idx_app_policy" not in dropped_names
+    assert not any(name in dropped_names for indexes in during.values() for name in indexes)
+    assert "ix_user_devices_user_okta_id" in during["user_devices"]
+    assert set(timings) == dropped_names
+    assert {name: _indexes(db_path, name) for name in SHADOW_SYNC_TABLES} == before
+
+
+def test_init_db_restores_indexes_a_dead_sync_left_dropped(database, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_DEFERRED_INDEX_MIN_ROWS", 0)
+    db_path = str(database.db_path)
+
+    async def scenario():
+        await database.drop_secondary_indexes(["users"])
+        assert "idx_user_tenant_email" not in _indexes(db_path, "users")
+        monkeypatch.setattr(DatabaseOperations, "_initialized", False)
+        await database.init_db(database.db_path)
+
+    _run(database, scenario)
+    assert "idx_user_tenant_email" in _indexes(db_path, "users")
@@ -0,0 +1,168 @@
+"""Tests for the sync-generation-aware SQL result cache."""
+
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from src.utils import sql_result_cache
+from src.utils.sql_result_cache import (
+    SQLResultCache,
+    cached_fetchall,
+    is_cacheable_sql,
+    normalize_sql,
+    read_sync_generation,
+)
+from src.utils.sqlite_reader_pool import close_reader_pools
+
+
+def _sync_history(conn, *rows):
+    conn.execute("CREATE TABLE IF NOT EXISTS sync_history (id INTEGER PRIMARY KEY, status TEXT, checkpoint JSON)")
+    for status, checkpoint in rows:
+        conn.execute(
+            "INSERT INTO sync_history (status, checkpoint) VALUES (?, ?)",
+            (status, json.dumps(checkpoint) if checkpoint is not None else None),
+        )
+    conn.commit()
+
+
+def test_normalize_sql_ignores_comments_whitespace_and_keyword_case():
+    assert normalize_sql("SELECT  *\nFROM users -- all of them\nWHERE status = 'ACTIVE';") == \
+        normalize_sql("select * from users where status = 'ACTIVE'")
+    # Literals and quoted identifiers keep their case
+    assert normalize_sql("SELECT \"Name\" FROM t WHERE x = 'Ab  C'") == "select \"Name\" from t where x = 'Ab  C'"
+    assert normalize_sql("SELECT 1 /* a */ ") == "select 1"
+
+
+def test_time_and_random_queries_are_not_cacheable():
+    assert is_cacheable_sql("SELECT * FROM users")
+    assert not is_cacheable_sql("SELECT * FROM users WHERE created_at > datetime('now', '-7 days')")
+    assert not is_cacheable_sql("SELECT CURRENT_TIMESTAMP")
+    assert not is_cacheable_sql("SELECT * FROM users ORDER BY random() LIMIT 5")
+
+
+def test_sync_generation_moves_with_finished_syncs():
+    conn = sqlite3.connect(":memory:")
+    assert read_sync_generation(conn) == "none"
+    _sync_history(conn)
+    assert read_sync_generation(conn) == "none"
+
+    _sync_history(conn, ("COMPLETED", None))
+    first = read_sync_generation(conn)
+    assert first == "1:1"
+
+    # A sync writing the live tables disables caching
+    _sync_history(conn, ("RUNNING", None))
+    assert read_sync_generation(conn) is None
+
+    conn.execute("UPDATE sync_history SET status = 'FAILED' WHERE id = 2")
+    assert read_sync_generation(conn) == "2:2"
+
+
+def test_shadow_sync_keeps_caching_until_its_swap_starts():
+    conn = sqlite3.connect(":memory:")
+    _sync_history(conn, ("COMPLETED", None), ("RUNNING", {"shadow": True, "nodes": {}}))
+    assert read_sync_generation(conn) == "2:1:loading"
+
+    conn.execute("UPDATE sync_history SET checkpoint = ? WHERE id = 2",
+                 (json.dumps({"shadow": True, "nodes": {}, "swap_started": True}),))
+    assert read_sync_generation(conn) is None
+
+
+def test_new_generation_drops_older_entries():
+    cache = SQLResultCache(max_bytes=10_000, max_entry_bytes=1_000)
+    cache.observe_generation("db", "g1")
+    assert cache.put("db", "g1", "q", "old", 10)
+    assert cache.get("db", "g1", "q") == "old"
+
+    cache.observe_generation("db", "g2")
+    assert cache.get("db", "g1", "q") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+    # A result computed under the old generation is not stored any more
+    assert not cache.put("db", "g1", "q", "late", 10)
+    # Other databases are not affected
+    cache.observe_generation("other", "g1")
+    assert cache.put("other", "g1", "q", "x", 10)
+    cache.observe_generation("db", "g3")
+    assert cache.get("other", "g1", "q") == "x"
+
+
+def test_bypassed_generation_keeps_entries():
+    cache = SQLResultCache(max_bytes=10_000, max_entry_bytes=1_000)
+    cache.observe_generation("db", "g1")
+    cache.put("db", "g1", "q", "value", 10)
+    cache.observe_generation("db", None)
+    assert cache.get("db", "g1", "q") == "value"
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_lru_eviction_and_entry_size_limit():
+    cache = SQLResultCache(max_bytes=100, max_entry_bytes=60)
+    cache.observe_generation("db", "g")
+    assert not cache.put("db", "g", "huge", "x", 61)
+    cache.put("db", "g", "a", "A", 40)
+    cache.put("db", "g", "b", "B", 40)
+    cache.get("db", "g", "a")  # b is now least recently used
+    cache.put("db", "g", "c", "C", 40)
+    assert cache.get("db", "g", "b") is None
+    assert cache.get("db", "g", "a") == "A"
+    assert cache.get("db", "g", "c") == "C"
+    assert cache.stats()["bytes"] == 80
+    assert cache.stats()["too_large"] == 1
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    cache = SQLResultCache(max_bytes=1024 * 1024, max_entry_bytes=1024 * 1024)
+    monkeypatch.setattr(sql_result_cache, "_cache", cache)
+    yield cache
+    close_reader_pools()
+
+
+def test_cached_fetchall_serves_repeats_until_the_next_sync(tmp_path, result_cache):
+    db_path = tmp_path / "okta_sync.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE users (okta_id TEXT, status TEXT)")
+    conn.execute("INSERT INTO users VALUES ('00u1', 'ACTIVE')")
+    _sync_history(conn, ("COMPLETED", None))
+
+    async def fetch(sql, params=()):
+        return await cached_fetchall(db_path, sql, params)
+
+    first = asyncio.run(fetch("SELECT okta_id FROM users WHERE status = ?", ("ACTIVE",)))
+    repeat = asyncio.run(fetch("select okta_id\n  from users where status = ?", ("ACTIVE",)))
+    other_params = asyncio.run(fetch("SELECT okta_id FROM users WHERE status = ?", ("SUSPENDED",)))
+    assert first == (["okta_id"], [("00u1",)], False)
+    assert repeat == (["okta_id"], [("00u1",)], True)
+    assert other_params == (["okta_id"], [], False)
+
+    # A sync writes the table and finishes: the cached result is dropped
+    _sync_history(conn, ("RUNNING", None))
+    conn.execute("INSERT INTO users VALUES ('00u2', 'ACTIVE')")
+    conn.commit()
+    during_sync = asyncio.run(fetch("SELECT okta_id FROM users WHERE status = ?", ("ACTIVE",)))
+    assert during_sync == (["okta_id"], [("00u1",), ("00u2",)], False)
+
+    conn.execute("UPDATE sync_history SET status = 'COMPLETED' WHERE id = 2")
+    conn.commit()
+    conn.close()
+    after_sync = asyncio.run(fetch("SELECT okta_id FROM users WHERE status = ?", ("ACTIVE",)))
+    again = asyncio.run(fetch("SELECT okta_id FROM users WHERE status = ?", ("ACTIVE",)))
+    assert after_sync == (["okta_id"], [("00u1",), ("00u2",)], False)
+    assert again[2] is True
+
+
+def test_time_dependent_queries_bypass_the_cache(tmp_path, result_cache):
+    db_path = tmp_path / "okta_sync.db"
+    conn = sqlite3.connect(db_path)
+    _sync_history(conn, ("COMPLETED", None))
+    conn.close()
+
+    sql = "SELECT COUNT(*) FROM sync_history WHERE datetime('now') IS NOT NULL"
+    results = [asyncio.run(cached_fetchall(db_path, sql)) for _ in range(2)]
+    assert [result[2] for result in results] == [False, False]
+    assert result_cache.stats()["entries"] == 0
@@ -0,0 +1,60 @@
+"""Tests for the cron schedules of the multi-tenant sync scheduler."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.okta.sync.scheduler import CronSchedule
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    ("*/15 * * * *", _utc(2026, 10, 16, 10, 7, 30), _utc(2026, 10, 16, 10, 15)),
+    ("*/15 * * * *", _utc(2026, 10, 16, 10, 45), _utc(2026, 10, 16, 11, 0)),
+    ("5/20 * * * *", _utc(2026, 10, 16, 10, 26), _utc(2026, 10, 16, 10, 45)),
+    ("0 */4 * * *", _utc(2026, 10, 16, 9, 0), _utc(2026, 10, 16, 12, 0)),
+    ("30 8-18/2 * * *", _utc(2026, 10, 16, 18, 30), _utc(2026, 10, 17, 8, 30)),
+    ("0 2 * * *", _utc(2026, 12, 31, 3, 0), _utc(2027, 1, 1, 2, 0)),
+    ("@daily", _utc(2026, 10, 16, 0, 0), _utc(2026, 10, 17, 0, 0)),
+    ("@HOURLY", _utc(2026, 10, 16, 10, 0), _utc(2026, 10, 16, 11, 0)),
+    ("@monthly", _utc(2026, 10, 16, 0, 0), _utc(2026, 11, 1, 0, 0)),
+    # 2026-10-16 is a Friday
+    ("0 8 * * 1-5", _utc(2026, 10, 16, 9, 0), _utc(2026, 10, 19, 8, 0)),
+    ("0 0 * * 7", _utc(2026, 10, 16, 0, 0), _utc(2026, 10, 18, 0, 0)),
+    ("@weekly", _utc(2026, 10, 16, 0, 0), _utc(2026, 10, 18, 0, 0)),
+    # Both day fields restricted: either one matches (the 20th, or the next Monday)
+    ("0 0 20 * 1", _utc(2026, 10, 16, 0, 0), _utc(2026, 10, 19, 0, 0)),
+    ("0 0 29 2 *", _utc(2026, 3, 1, 0, 0), _utc(2028, 2, 29, 0, 0)),
+    ("0 12 1,15 * *", _utc(2026, 10, 1, 12, 0), _utc(2026, 10, 15, 12, 0)),
+])
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_next_after_converts_to_utc():
+    moment = datetime(2026, 10, 16, 1, 30, tzinfo=timezone(timedelta(hours=2)))  # 2026-10-15 23:30 UTC
+    assert CronSchedule("0 0 * * *").next_after(moment) == _utc(2026, 10, 16, 0, 0)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_expression_that_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(_utc(2026, 1, 1))